@@ -0,0 +1,85 @@
+# Autenticacion JWT sin leer la fila del usuario en cada request. El polling
+# del chat y las lecturas de playlists autentican constantemente; el usuario
+# resuelto se guarda en una cache acotada con TTL (AUTH_USER_CACHE_*) bajo su
+# id. Se guardan los valores de sus columnas, no la instancia: cada request
+# arma un User nuevo y nada de lo que una vista le cuelgue (perfil cacheado,
+# atributos) pasa a la siguiente.
+#
+# Junto a los valores va la version del usuario: el hash de su contrasena que
+# simplejwt pone en cada token (CHECK_REVOKE_TOKEN). Un token con otra version
+# vuelve a la base, donde simplejwt lo rechaza si es anterior al cambio de
+# contrasena. Las senales de api/signals.py invalidan la entrada en cada save
+# o delete de User (perfil, desactivacion, contrasena). Con el backend "local"
+# esa invalidacion solo llega al proceso que guardo; los otros ven el cambio
+# al recibir un token nuevo o a mas tardar despues de AUTH_USER_CACHE_TIMEOUT.
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from django.conf import settings
+from .cache import make_backend
+
+user_cache = make_backend(prefix='AUTH_USER_CACHE')
+
+
+def user_key(user_id):
+    return f"auth-user:{user_id}"
+
+
+def invalidate_user(user_id):
+    if user_cache is not None:
+        user_cache.delete(user_key(user_id))
+
+
+def reset(backend=None):
+    # Descarta los usuarios guardados (tests, o tras cambiar la configuracion)
+    global user_cache
+    user_cache = make_backend(prefix='AUTH_USER_CACHE') if backend is None else backend
+
+
+def user_version(user):
+    # Lo que simplejwt compara contra el claim de revocacion del token
+    return get_md5_hash_password(user.password) if api_settings.CHECK_REVOKE_TOKEN else None
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def snapshot(self, user):
+        fields = self.user_model._meta.concrete_fields
+        return user_version(user), user._state.db, tuple(getattr(user, field.attname) for field in fields)
+
+    def rebuild(self, snapshot):
+        _, db, values = snapshot
+        fields = self.user_model._meta.concrete_fields
+        return self.user_model.from_db(db, [field.attname for field in fields], values)
+
+    def get_user(self, validated_token):
+        backend = user_cache
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if backend is None or user_id is None:
+            return super().get_user(validated_token)
+        version = validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+        cached = backend.get(user_key(user_id))
+        if cached is not None and cached[0] == version:
+            return self.rebuild(cached)
+        # Usuario inexistente, inactivo o token revocado: la excepcion no se cachea
+        user = super().get_user(validated_token)
+        backend.set(user_key(user_id), self.snapshot(user))
+        return user
+
+
+class StatelessReadJWTAuthentication(CachedJWTAuthentication):
+    # Para vistas que en GET solo necesitan el id del usuario: con
+    # AUTH_STATELESS_READS request.user es un TokenUser armado desde el token,
+    # sin consultar la base. Las escrituras siguen cargando el usuario.
+    def authenticate(self, request):
+        if not settings.AUTH_STATELESS_READS or request.method not in SAFE_METHODS:
+            return super().authenticate(request)
+        header = self.get_header(request)
+        raw_token = self.get_raw_token(header) if header is not None else None
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        return api_settings.TOKEN_USER_CLASS(validated_token), validated_token
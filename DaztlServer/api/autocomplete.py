@@ -0,0 +1,339 @@
+# Autocompletado en memoria para la busqueda mientras se escribe. Cada proceso
+# (worker de gunicorn o gateway gRPC en modo orm) guarda los titulos de
+# canciones y albumes y los nombres de artistas en un indice propio: la lista
+# ordenada de tokens hace de trie (los prefijos se resuelven con bisect) y los
+# errores de tipeo se buscan generando las variantes a una edicion de la
+# palabra. Postings y tokens de cada entrada van en array('I'), no en objetos
+# por fila, asi el recolector de basura no recorre millones de tuplas.
+#
+# Se construye desde la base al arrancar (o en la primera consulta) y se
+# mantiene al dia leyendo SearchChange, que escriben las senales de
+# api/signals.py, como mucho cada SUGGEST_REFRESH_SECONDS.
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Q
+from django.utils import timezone
+from .models import SearchChange
+from .search import DOCUMENTS, tokenize
+
+KINDS = ('song', 'album', 'artist')
+MAX_PREFIX_EXPANSIONS = 64
+MAX_FUZZY_EXPANSIONS = 8
+MIN_FUZZY_LENGTH = 3
+# Caracteres mas frecuentes del catalogo que se prueban al insertar o sustituir
+MAX_ALPHABET = 40
+# Entradas que se puntuan por cada resultado pedido antes de cortar
+CANDIDATES_PER_RESULT = 4
+# Ventana en la que se vuelven a leer cambios: una transaccion que tomo un id
+# menor puede confirmarse despues de que otro proceso ya avanzo el cursor
+SETTLE_SECONDS = 10
+MAX_CHANGES_PER_REFRESH = 10000
+COMPACT_MIN_DEAD = 1000
+
+EXACT, PREFIX, FUZZY = 0, 1, 2
+
+
+def edits(word, alphabet, prefix=False):
+    # Variantes a distancia 1: borrado, transposicion, sustitucion e insercion.
+    # Con prefix=True se omiten las que cambian solo el final: sus
+    # completados ya estan entre los del borrado del ultimo caracter.
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    variants = {a + b[1:] for a, b in splits if b}
+    variants.update(a + b[1] + b[0] + b[2:] for a, b in splits if len(b) > 1)
+    if prefix:
+        splits = splits[:-1]
+    variants.update(a + c + b[1:] for a, b in splits if len(b) > prefix for c in alphabet)
+    variants.update(a + c + b for a, b in splits for c in alphabet)
+    variants.discard(word)
+    return variants
+
+
+class AutocompleteIndex:
+    # suggest() y las escrituras incrementales (add/remove, desde refresh())
+    # toman el mismo lock: una entrada a medio agregar, un insort sobre
+    # _sorted_tokens o un update de _chars no se ven a mitad de camino. Con el
+    # GIL las consultas no corrian en paralelo de todos modos. load() arma un
+    # indice nuevo que nadie lee hasta que se publica con una asignacion
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._texts = []
+        self._kinds = array('B')
+        self._ids = array('q')
+        self._alive = bytearray()
+        # Los tokens de la entrada e son _entry_tokens[_starts[e]:_starts[e + 1]]
+        self._starts = array('I', [0])
+        self._entry_tokens = array('I')
+        self._entries = {}
+        self._tokens = []
+        self._token_ids = {}
+        self._postings = []
+        self._sorted_tokens = []
+        self._chars = Counter()
+        self._alphabet = None
+        self.dead = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _key(self, kind, object_id):
+        return object_id * len(KINDS) + KINDS.index(kind)
+
+    def load(self, rows):
+        # Carga inicial: ordena la lista de tokens una sola vez al final
+        for kind, object_id, text in rows:
+            self._add(kind, object_id, text, sort=False)
+        self._sorted_tokens.sort()
+
+    def add(self, kind, object_id, text):
+        with self._lock:
+            self._remove(kind, object_id)
+            self._add(kind, object_id, text, sort=True)
+
+    def remove(self, kind, object_id):
+        with self._lock:
+            self._remove(kind, object_id)
+
+    def _remove(self, kind, object_id):
+        entry = self._entries.pop(self._key(kind, object_id), None)
+        if entry is not None:
+            self._alive[entry] = 0
+            self.dead += 1
+
+    def _add(self, kind, object_id, text, sort):
+        tokens = tokenize(text)
+        if not tokens:
+            return
+        entry = len(self._texts)
+        self._texts.append(text)
+        self._kinds.append(KINDS.index(kind))
+        self._ids.append(object_id)
+        self._alive.append(1)
+        for token in tokens:
+            token_id = self._token_ids.get(token)
+            if token_id is None:
+                token_id = self._add_token(token, sort)
+            self._postings[token_id].append(entry)
+            self._entry_tokens.append(token_id)
+        self._starts.append(len(self._entry_tokens))
+        self._entries[self._key(kind, object_id)] = entry
+
+    def _add_token(self, token, sort):
+        if sort:
+            insort(self._sorted_tokens, token)
+        else:
+            self._sorted_tokens.append(token)
+        token_id = len(self._tokens)
+        self._tokens.append(token)
+        self._token_ids[token] = token_id
+        self._postings.append(array('I'))
+        self._chars.update(token)
+        self._alphabet = None
+        return token_id
+
+    def live_rows(self):
+        with self._lock:
+            return [(KINDS[self._kinds[e]], self._ids[e], self._texts[e]) for e in self._entries.values()]
+
+    def _edits(self, word, prefix=False):
+        if self._alphabet is None:
+            self._alphabet = ''.join(char for char, _ in self._chars.most_common(MAX_ALPHABET))
+        return edits(word, self._alphabet, prefix)
+
+    def _completions(self, prefix, limit):
+        start = bisect_left(self._sorted_tokens, prefix)
+        for token in self._sorted_tokens[start:start + limit]:
+            if not token.startswith(prefix):
+                break
+            yield token
+
+    def _last_word_matches(self, word, wanted):
+        # La palabra que se esta escribiendo: exacta, despues las que la
+        # completan (mas cortas primero) y si no alcanza, con un error de tipeo.
+        # Devuelve token id -> calidad, en orden de calidad
+        matches = {}
+        for token in sorted(self._completions(word, MAX_PREFIX_EXPANSIONS), key=len):
+            matches[self._token_ids[token]] = EXACT if token == word else PREFIX
+        found = sum(len(self._postings[token_id]) for token_id in matches)
+        if found < wanted and len(word) >= MIN_FUZZY_LENGTH:
+            variants = self._edits(word, prefix=True)
+            fuzzy = set()
+            for variant in variants:
+                fuzzy.update(self._completions(variant, MAX_FUZZY_EXPANSIONS))
+            for token in sorted(fuzzy, key=len):
+                matches.setdefault(self._token_ids[token], FUZZY if token in variants else FUZZY + PREFIX)
+        return matches
+
+    def _word_matches(self, word):
+        # Palabras ya escritas: la exacta o, si no existe, las que estan a un error
+        token_id = self._token_ids.get(word)
+        if token_id is not None:
+            return {token_id: EXACT}
+        if len(word) < MIN_FUZZY_LENGTH:
+            return {}
+        return {self._token_ids[v]: FUZZY for v in self._edits(word) if v in self._token_ids}
+
+    def suggest(self, query, limit=10, kinds=None):
+        words = tokenize(query)
+        if not words:
+            return []
+        with self._lock:
+            return self._suggest(words, limit, kinds)
+
+    def _suggest(self, words, limit, kinds):
+        *head, last = words
+        budget = limit * CANDIDATES_PER_RESULT
+        groups = [self._word_matches(word) for word in head]
+        groups.append(self._last_word_matches(last, budget))
+        if not all(groups):
+            return []
+        kind_codes = {KINDS.index(kind) for kind in kinds} if kinds else None
+
+        # Se recorren las postings de la palabra con menos entradas y las
+        # demas solo se verifican contra los tokens de cada candidata
+        driver = min(groups, key=lambda group: sum(len(self._postings[t]) for t in group))
+        others = [group for group in groups if group is not driver]
+        scored = {}
+        for token_id, quality in sorted(driver.items(), key=lambda item: item[1]):
+            for entry in self._postings[token_id]:
+                if entry in scored or not self._alive[entry]:
+                    continue
+                if kind_codes is not None and self._kinds[entry] not in kind_codes:
+                    continue
+                tokens = self._entry_tokens[self._starts[entry]:self._starts[entry + 1]]
+                score = quality
+                for group in others:
+                    common = group.keys() & tokens
+                    if not common:
+                        break
+                    score += min(map(group.get, common))
+                else:
+                    scored[entry] = (score, len(self._texts[entry]), entry)
+                    if len(scored) >= budget:
+                        break
+            if len(scored) >= budget:
+                break
+
+        return [
+            {'kind': KINDS[self._kinds[entry]], 'id': self._ids[entry], 'text': self._texts[entry]}
+            for _, _, entry in sorted(scored.values())[:limit]
+        ]
+
+
+def catalog_rows():
+    for kind in KINDS:
+        model, field = DOCUMENTS[kind]
+        yield from ((kind, pk, text) for pk, text in model.objects.values_list('pk', field).iterator())
+
+
+class Autocomplete:
+    # Indice del proceso mas el cursor sobre SearchChange
+    def __init__(self):
+        self.index = None
+        self.cursor = 0
+        self._applied = {}
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def load(self):
+        # El cursor se toma antes de leer las tablas: lo que cambie mientras
+        # tanto se vuelve a aplicar en el siguiente refresh
+        cursor = SearchChange.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        index = AutocompleteIndex()
+        index.load(catalog_rows())
+        self.index, self.cursor, self._applied = index, cursor, {}
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if not force and self.index is not None and now - self._checked_at < settings.SUGGEST_REFRESH_SECONDS:
+            return
+        # Si otro hilo ya esta leyendo cambios se responde con el indice actual
+        if not self._lock.acquire(blocking=self.index is None):
+            return
+        try:
+            # Un proceso que no leyo cambios en mas de la mitad de la retencion
+            # puede haberse perdido filas ya borradas por prune_search_changes
+            stale = now - self._checked_at > settings.SUGGEST_CHANGE_RETENTION_HOURS * 3600 / 2
+            self._checked_at = now
+            if self.index is None or stale:
+                self.load()
+            else:
+                self._apply_changes()
+        finally:
+            self._lock.release()
+
+    def _apply_changes(self):
+        recent = timezone.now() - timedelta(seconds=SETTLE_SECONDS)
+        changes = list(
+            SearchChange.objects.filter(Q(id__gt=self.cursor) | Q(created_at__gte=recent))
+            .order_by('id').values_list('id', 'kind', 'object_id', 'text', 'deleted', 'created_at')
+            [:MAX_CHANGES_PER_REFRESH + 1]
+        )
+        reload = any(change[1] == SearchChange.RELOAD and change[0] > self.cursor for change in changes)
+        if reload or len(changes) > MAX_CHANGES_PER_REFRESH:
+            self.load()
+            return
+        for change_id, kind, object_id, text, deleted, created_at in changes:
+            if change_id in self._applied:
+                continue
+            self._applied[change_id] = created_at
+            if kind not in KINDS:
+                continue
+            if deleted:
+                self.index.remove(kind, object_id)
+            else:
+                self.index.add(kind, object_id, text)
+        if changes:
+            self.cursor = max(self.cursor, changes[-1][0])
+        self._applied = {cid: created for cid, created in self._applied.items() if created >= recent}
+        # Muchas entradas reemplazadas: se reconstruye desde la memoria, sin ir a la base
+        if self.index.dead > max(COMPACT_MIN_DEAD, len(self.index)):
+            index = AutocompleteIndex()
+            index.load(self.index.live_rows())
+            self.index = index
+
+    def suggest(self, query, limit=None, kinds=None):
+        self.refresh()
+        return self.index.suggest(query, limit or settings.SUGGEST_RESULT_LIMIT, kinds)
+
+
+engine = Autocomplete()
+
+
+def suggest(query, limit=None, kinds=None):
+    return engine.suggest(query, limit, kinds)
+
+
+def parse_limit(value):
+    # limit invalido usa SUGGEST_RESULT_LIMIT; nunca se pasa de SUGGEST_MAX_RESULTS
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return settings.SUGGEST_RESULT_LIMIT
+    if limit <= 0:
+        return settings.SUGGEST_RESULT_LIMIT
+    return min(limit, settings.SUGGEST_MAX_RESULTS)
+
+
+def parse_kinds(values):
+    return [kind for kind in values if kind in KINDS] or None
+
+
+def prune_changes(hours=None, now=None):
+    hours = settings.SUGGEST_CHANGE_RETENTION_HOURS if hours is None else hours
+    cutoff = (now or timezone.now()) - timedelta(hours=hours)
+    deleted, _ = SearchChange.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+def warm_up():
+    # Al arrancar el proceso; si la base no responde se construye en la primera consulta
+    try:
+        engine.refresh(force=True)
+    except DatabaseError:
+        pass
@@ -0,0 +1,322 @@
+# Capa de broadcast del chat en vivo en modo ASGI (api/live_chat.py). Cada
+# LiveChat guardado se publica una vez en el canal de su cancion (senal en
+# api/signals.py) y cada cliente SSE/WebSocket conectado lo recibe de su propia
+# cola, sin consultar la base.
+#
+# CHAT_BROADCAST_BACKEND elige la implementacion: "memory" reparte solo entre
+# los clientes de este proceso (un nodo, un worker); "redis" publica en Redis
+# pub/sub (CHAT_BROADCAST_URL) y cada proceso reparte a sus clientes lo que
+# recibe, asi un mensaje guardado por cualquier worker o por el gateway llega a
+# todos. Otro broker se agrega heredando de BrokerBroadcast. El SubscribeChat
+# del gateway gRPC (daztl_rpc/chat_hub.py) escucha la misma capa con
+# add_listener().
+#
+# Las colas son acotadas (CHAT_QUEUE_SIZE). Con un cliente que no lee a tiempo,
+# CHAT_SLOW_CONSUMER decide: "disconnect" cierra su conexion (el cliente se
+# reconecta y recupera lo perdido desde su ultimo id) y "drop_oldest" descarta
+# sus mensajes mas viejos.
+import asyncio
+import json
+import threading
+from collections import Counter, deque, namedtuple
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from .serializers import LiveChatSerializer
+
+DISCONNECT = 'disconnect'
+DROP_OLDEST = 'drop_oldest'
+SLOW_CONSUMER_POLICIES = (DISCONNECT, DROP_OLDEST)
+BACKENDS = {
+    'memory': 'api.broadcast.MemoryBroadcast',
+    'redis': 'api.broadcast.RedisBroadcast',
+}
+
+# id del LiveChat y su JSON ya serializado, compartido por todos los clientes
+Message = namedtuple('Message', 'id data')
+
+
+def chat_channel(song_id):
+    return f"chat:{song_id}"
+
+
+class SlowConsumer(Exception):
+    pass
+
+
+class Subscriber:
+    # Cola de un cliente. Vive en el event loop que lo creo: push() solo se
+    # llama desde ese loop (publish() lo agenda con call_soon_threadsafe)
+    def __init__(self, broadcast, channel, maxsize, policy):
+        self.broadcast = broadcast
+        self.channel = channel
+        self.maxsize = maxsize
+        self.policy = policy
+        self.loop = asyncio.get_running_loop()
+        self.dropped = 0
+        self.closed = False
+        self.slow = False
+        self._queue = deque()
+        self._ready = asyncio.Event()
+
+    def push(self, message):
+        # False si el cliente ya estaba cerrado o se lo desconecta por lento
+        if self.closed:
+            return False
+        if len(self._queue) >= self.maxsize:
+            if self.policy != DROP_OLDEST:
+                self.slow = True
+                self.close()
+                return False
+            self._queue.popleft()
+            self.dropped += 1
+        self._queue.append(message)
+        self._ready.set()
+        return True
+
+    async def get(self, timeout=None):
+        # Siguiente mensaje; None si vencio el timeout (toca heartbeat) o si la
+        # suscripcion se cerro (ver .closed). SlowConsumer cuando se lo
+        # desconecto por lento y ya leyo lo que tenia en la cola
+        while not self._queue:
+            if self.slow:
+                raise SlowConsumer(f"Mas de {self.maxsize} mensajes sin leer")
+            if self.closed:
+                return None
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._queue.popleft()
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+        self.broadcast.unsubscribe(self)
+
+
+class BaseBroadcast:
+    def subscribe(self, channel):
+        # Desde el event loop que va a leer la suscripcion
+        raise NotImplementedError
+
+    def unsubscribe(self, subscriber):
+        raise NotImplementedError
+
+    def publish(self, channel, message):
+        # Desde cualquier hilo o loop
+        raise NotImplementedError
+
+    def add_listener(self, callback):
+        # callback(channel, message) por cada mensaje que llega a este proceso,
+        # desde el hilo que lo entrega: no tiene que bloquear
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def stats(self):
+        return {}
+
+
+class MemoryBroadcast(BaseBroadcast):
+    def __init__(self, queue_size=None, policy=None):
+        self.queue_size = queue_size or settings.CHAT_QUEUE_SIZE
+        self.policy = policy or settings.CHAT_SLOW_CONSUMER
+        if self.policy not in SLOW_CONSUMER_POLICIES:
+            raise ImproperlyConfigured(
+                f"CHAT_SLOW_CONSUMER desconocido '{self.policy}', se esperaba uno de {SLOW_CONSUMER_POLICIES}"
+            )
+        self._channels = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self.counters = Counter()
+
+    def subscribe(self, channel):
+        subscriber = Subscriber(self, channel, self.queue_size, self.policy)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscriber)
+            self.counters['subscribed'] += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            subscribers = self._channels.get(subscriber.channel)
+            if subscribers is None or subscriber not in subscribers:
+                return
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._channels[subscriber.channel]
+
+    def publish(self, channel, message):
+        self.deliver(channel, message)
+
+    def add_listener(self, callback):
+        with self._lock:
+            self._listeners.append(callback)
+
+    def deliver(self, channel, message):
+        # Un callback por event loop, no uno por cliente
+        with self._lock:
+            self.counters['published'] += 1
+            subscribers = list(self._channels.get(channel, ()))
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(channel, message)
+        by_loop = {}
+        for subscriber in subscribers:
+            by_loop.setdefault(subscriber.loop, []).append(subscriber)
+        for loop, group in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(self.push_all, group, message)
+            except RuntimeError:
+                # Loop cerrado: sus clientes ya no existen
+                for subscriber in group:
+                    self.unsubscribe(subscriber)
+
+    def push_all(self, subscribers, message):
+        # Corre en el loop de los clientes
+        delivered = dropped = disconnected = 0
+        for subscriber in subscribers:
+            if subscriber.closed:
+                continue
+            before = subscriber.dropped
+            if subscriber.push(message):
+                delivered += 1
+                dropped += subscriber.dropped - before
+            else:
+                disconnected += 1
+        with self._lock:
+            self.counters['delivered'] += delivered
+            self.counters['dropped'] += dropped
+            self.counters['disconnected'] += disconnected
+
+    def subscribers(self, channel):
+        with self._lock:
+            return len(self._channels.get(channel, ()))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': type(self).__name__,
+                'channels': len(self._channels),
+                'subscribers': sum(len(group) for group in self._channels.values()),
+                'queue_size': self.queue_size,
+                'policy': self.policy,
+                **{name: self.counters[name] for name in ('subscribed', 'published', 'delivered', 'dropped', 'disconnected')},
+            }
+
+
+class BrokerBroadcast(MemoryBroadcast):
+    # publish() manda el mensaje al broker; un hilo por proceso recibe lo que
+    # publican todos los procesos y llama deliver() para los clientes locales.
+    # Las subclases implementan send() y listen()
+    def __init__(self, queue_size=None, policy=None):
+        super().__init__(queue_size, policy)
+        self._listener = None
+        self._stopped = threading.Event()
+
+    def send(self, channel, payload):
+        raise NotImplementedError
+
+    def listen(self, stopped):
+        # Bloquea hasta que stopped este seteado; por cada mensaje recibido
+        # llama self.receive(channel, payload)
+        raise NotImplementedError
+
+    def subscribe(self, channel):
+        self.start()
+        return super().subscribe(channel)
+
+    def add_listener(self, callback):
+        super().add_listener(callback)
+        self.start()
+
+    def start(self):
+        with self._lock:
+            if self._listener is not None:
+                return
+            self._listener = threading.Thread(target=self.listen, args=(self._stopped,), name='chat-broadcast', daemon=True)
+        self._listener.start()
+
+    def publish(self, channel, message):
+        self.send(channel, f"{message.id} {message.data}")
+
+    def receive(self, channel, payload):
+        message_id, data = payload.split(' ', 1)
+        self.deliver(channel, Message(int(message_id), data))
+
+    def close(self):
+        self._stopped.set()
+
+
+class RedisBroadcast(BrokerBroadcast):
+    # Todos los procesos escuchan todos los canales de chat (un solo PSUBSCRIBE
+    # por proceso); deliver() descarta los de canciones sin clientes locales
+    prefix = 'daztl:'
+
+    def __init__(self, queue_size=None, policy=None, url=None):
+        super().__init__(queue_size, policy)
+        try:
+            import redis
+        except ImportError as exc:
+            raise ImproperlyConfigured("CHAT_BROADCAST_BACKEND=redis requiere el paquete redis") from exc
+        self.errors = redis.RedisError
+        self.client = redis.Redis.from_url(url or settings.CHAT_BROADCAST_URL, decode_responses=True)
+
+    def send(self, channel, payload):
+        # El mensaje ya esta guardado: si Redis no responde, los clientes lo
+        # recuperan al reconectarse. Se cuenta en stats()["send_errors"]
+        try:
+            self.client.publish(self.prefix + channel, payload)
+        except self.errors:
+            with self._lock:
+                self.counters['send_errors'] += 1
+
+    def listen(self, stopped):
+        while not stopped.is_set():
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.psubscribe(self.prefix + 'chat:*')
+                while not stopped.is_set():
+                    item = pubsub.get_message(timeout=1.0)
+                    if item is not None:
+                        self.receive(item['channel'][len(self.prefix):], item['data'])
+            except self.errors:
+                # Se reintenta; lo publicado mientras tanto se pierde para los
+                # clientes de este proceso
+                stopped.wait(1.0)
+            finally:
+                pubsub.close()
+
+    def stats(self):
+        return {**super().stats(), 'send_errors': self.counters['send_errors']}
+
+
+_broadcast = None
+_broadcast_lock = threading.Lock()
+
+
+def get_broadcast():
+    global _broadcast
+    if _broadcast is None:
+        with _broadcast_lock:
+            if _broadcast is None:
+                name = settings.CHAT_BROADCAST_BACKEND
+                _broadcast = import_string(BACKENDS.get(name, name))()
+    return _broadcast
+
+
+def reset(backend=None):
+    # Cierra la capa actual (tests, o tras cambiar la configuracion)
+    global _broadcast
+    with _broadcast_lock:
+        if _broadcast is not None:
+            _broadcast.close()
+        _broadcast = backend
+
+
+def publish_chat(chat):
+    data = json.dumps(LiveChatSerializer(chat).data)
+    get_broadcast().publish(chat_channel(chat.song_id), Message(chat.id, data))
@@ -0,0 +1,231 @@
+# Cache de respuestas para las lecturas publicas del catalogo: listados de
+# canciones, albumes y artistas, detalle de cancion y los RPC equivalentes del
+# gateway en modo orm. Se guarda la data ya serializada bajo una clave con la
+# version de ContentVersion("catalog"); las senales de api/signals.py la
+# incrementan y desde ese momento ningun proceso vuelve a leer las entradas
+# anteriores (quedan hasta que las saque el LRU o venza el TTL).
+#
+# CATALOG_CACHE_BACKEND elige donde se guardan: "local" (LRU con TTL en cada
+# proceso), "shared" (el alias CATALOG_CACHE_ALIAS de CACHES, p. ej. Redis,
+# compartido por todos los workers) u "off".
+import hashlib
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, router
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.response import Response
+from .models import ContentVersion
+
+CATALOG = 'catalog'
+BACKENDS = ('local', 'shared', 'off')
+
+
+def get_stamps(scopes):
+    # {scope: (version, updated_at)} en una consulta; los alcances que nunca
+    # cambiaron valen (0, None)
+    rows = ContentVersion.objects.filter(scope__in=scopes).values_list('scope', 'version', 'updated_at')
+    stamps = {scope: (version, updated_at) for scope, version, updated_at in rows}
+    return {scope: stamps.get(scope, (0, None)) for scope in scopes}
+
+
+def get_version(scope):
+    return get_stamps([scope])[scope][0]
+
+
+def bump_version(scope):
+    # UPDATE atomico en la base: no hay carrera entre procesos que escriben a la vez
+    def increment():
+        return ContentVersion.objects.filter(scope=scope).update(version=F('version') + 1, updated_at=timezone.now())
+    if not increment():
+        _, created = ContentVersion.objects.get_or_create(scope=scope, defaults={'version': 1})
+        if not created:
+            increment()
+
+
+class LocalCache:
+    # LRU con TTL en memoria del proceso
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class SharedCache:
+    # Alias de settings.CACHES compartido entre procesos
+    def __init__(self, alias, timeout):
+        self.alias = alias
+        self.timeout = timeout
+
+    def get(self, key):
+        return caches[self.alias].get(key)
+
+    def set(self, key, value):
+        caches[self.alias].set(key, value, self.timeout)
+
+    def delete(self, key):
+        caches[self.alias].delete(key)
+
+
+def make_backend(name=None, prefix='CATALOG_CACHE'):
+    # prefix elige el grupo de settings: <prefix>_BACKEND, _MAX_ENTRIES, _TIMEOUT, _ALIAS
+    def option(suffix):
+        return getattr(settings, f'{prefix}_{suffix}')
+    name = name or option('BACKEND')
+    if name == 'local':
+        return LocalCache(option('MAX_ENTRIES'), option('TIMEOUT'))
+    if name == 'shared':
+        return SharedCache(option('ALIAS'), option('TIMEOUT'))
+    if name == 'off':
+        return None
+    raise ValueError(f"{prefix}_BACKEND desconocido '{name}', se esperaba uno de {BACKENDS}")
+
+
+class CatalogCache:
+    def __init__(self, backend=None):
+        self.backend = make_backend() if backend is None else backend
+        self.hits = Counter()
+        self.misses = Counter()
+        # {alias de lectura: ((version, updated_at), leido_en)}
+        self._stamps = {}
+        self._lock = threading.Lock()
+
+    def enabled(self, endpoint):
+        return self.backend is not None and endpoint not in settings.CATALOG_CACHE_DISABLED
+
+    def stamp(self):
+        # (version, updated_at) del catalogo. Los cambios hechos en otros
+        # procesos se ven a mas tardar despues de CATALOG_CACHE_VERSION_SECONDS;
+        # los del propio proceso, enseguida
+        stamp = self.cached_stamp()
+        if stamp is None:
+            stamp = get_stamps([CATALOG])[CATALOG]
+            self.remember_stamp(stamp)
+        return stamp
+
+    def cached_stamp(self):
+        # None si hay que volver a leerlo de la base. Hay uno por base de
+        # lectura (daztl/db_router.py): la data de una replica atrasada queda
+        # bajo la version que esa replica tiene, no la del primario
+        entry = self._stamps.get(router.db_for_read(ContentVersion))
+        if entry is None or time.monotonic() - entry[1] >= settings.CATALOG_CACHE_VERSION_SECONDS:
+            return None
+        return entry[0]
+
+    def remember_stamp(self, stamp):
+        self._stamps[router.db_for_read(ContentVersion)] = (stamp, time.monotonic())
+
+    def version(self):
+        return self.stamp()[0]
+
+    def key(self, endpoint, params):
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{CATALOG}:{endpoint}:{self.version()}:{digest}"
+
+    def fetch(self, endpoint, params, compute):
+        # compute() devuelve la data serializada; las excepciones (404, ...) no se guardan
+        if not self.enabled(endpoint):
+            return compute()
+        key = self.key(endpoint, params)
+        data = self.backend.get(key)
+        with self._lock:
+            (self.misses if data is None else self.hits)[endpoint] += 1
+        if data is None:
+            data = compute()
+            self.backend.set(key, data)
+        return data
+
+    def invalidate(self):
+        bump_version(CATALOG)
+        self._stamps = {}
+
+    def stats(self):
+        with self._lock:
+            endpoints = {
+                endpoint: {
+                    'hits': self.hits[endpoint],
+                    'misses': self.misses[endpoint],
+                    'hit_rate': round(self.hits[endpoint] / (self.hits[endpoint] + self.misses[endpoint]), 4),
+                }
+                for endpoint in sorted(self.hits.keys() | self.misses.keys())
+            }
+        stamp, _ = self._stamps.get(DEFAULT_DB_ALIAS, ((None, None), 0))
+        return {
+            'backend': settings.CATALOG_CACHE_BACKEND if self.backend is not None else 'off',
+            'entries': len(self.backend) if isinstance(self.backend, LocalCache) else None,
+            'version': stamp[0],
+            'endpoints': endpoints,
+        }
+
+
+catalog_cache = CatalogCache()
+
+
+def fetch(endpoint, params, compute):
+    return catalog_cache.fetch(endpoint, params, compute)
+
+
+def invalidate():
+    catalog_cache.invalidate()
+
+
+def stats():
+    return catalog_cache.stats()
+
+
+def reset(backend=None):
+    # Descarta entradas y metricas (tests, o tras cambiar la configuracion)
+    global catalog_cache
+    catalog_cache = CatalogCache(backend)
+
+
+class CachedResponseMixin:
+    # Para vistas GET publicas cuya respuesta no depende del usuario. La clave
+    # incluye host y esquema porque los serializers arman URLs absolutas.
+    # cache_endpoint = None desactiva la cache en la vista.
+    cache_endpoint = None
+
+    def get(self, request, *args, **kwargs):
+        if self.cache_endpoint is None:
+            return super().get(request, *args, **kwargs)
+        params = {
+            'scheme': request.scheme,
+            'host': request.get_host(),
+            'kwargs': kwargs,
+            'query': sorted(request.query_params.lists()),
+        }
+
+        def compute():
+            return super(CachedResponseMixin, self).get(request, *args, **kwargs).data
+        return Response(fetch(self.cache_endpoint, params, compute))
@@ -0,0 +1,290 @@
+# Escritura por lotes de LiveChat. En un estreno el chat de una cancion recibe
+# cientos de mensajes por segundo y cada LiveChatCreateView hacia su propio
+# INSERT y commit; con CHAT_WRITE_MODE los mensajes se juntan en memoria y un
+# hilo por proceso los guarda con bulk_create cada CHAT_FLUSH_INTERVAL segundos
+# o al llegar a CHAT_BATCH_SIZE.
+#
+#   direct        un INSERT por mensaje, como siempre (por defecto)
+#   group_commit  el request espera a que se guarde su lote y responde 201 con
+#                 el id: nada se pierde, latencia de hasta CHAT_FLUSH_INTERVAL
+#   write_behind  responde 202 enseguida (sin id) y el mensaje se guarda con el
+#                 proximo lote. Si el proceso muere sin apagarse se pierde lo
+#                 pendiente; al apagarse (atexit, lifespan ASGI) se guarda
+#
+# Un solo hilo escribe y la cola conserva el orden de llegada: los ids de una
+# cancion siguen el orden en que se enviaron los mensajes. La marca de tiempo
+# se toma al enviar, no al guardar. Con CHAT_MAX_PENDING pendientes submit()
+# rechaza el mensaje con ChatBufferFull antes de encolarlo (las vistas
+# responden 503): un mensaje aceptado nunca devuelve error, asi el cliente no
+# lo reintenta y no se guarda dos veces. En write_behind un lote que falla
+# vuelve a intentarse en los ciclos siguientes; los mensajes que fallaron
+# CHAT_MAX_ATTEMPTS veces se descartan (se cuentan en stats() como failed y se
+# registran en el log) para que no bloqueen la cola. Los mensajes guardados se
+# publican en api/broadcast.py.
+import atexit
+import logging
+import threading
+from collections import Counter
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, close_old_connections, connection, transaction
+from django.utils import timezone
+from . import broadcast
+from .models import LiveChat
+
+DIRECT = 'direct'
+GROUP_COMMIT = 'group_commit'
+WRITE_BEHIND = 'write_behind'
+WRITE_MODES = (DIRECT, GROUP_COMMIT, WRITE_BEHIND)
+
+logger = logging.getLogger(__name__)
+
+
+class ChatBufferFull(Exception):
+    pass
+
+
+class PendingChat:
+    def __init__(self, chat):
+        self.chat = chat
+        self.done = threading.Event()
+        self.error = None
+        self.attempts = 0
+
+
+def chat_key(chat):
+    return chat.song_id, chat.user_id, chat.timestamp
+
+
+def fill_ids(chats):
+    # SQL Server no devuelve los ids de un INSERT de varias filas: se leen en
+    # una consulta por (cancion, usuario, timestamp). Una clave con varias
+    # filas (otro proceso guardo la misma) es ambigua y queda sin id
+    timestamps = [chat.timestamp for chat in chats]
+    rows = LiveChat.objects.filter(
+        song_id__in={chat.song_id for chat in chats},
+        timestamp__gte=min(timestamps),
+        timestamp__lte=max(timestamps),
+    ).values_list('pk', 'song_id', 'user_id', 'timestamp')
+    ids = {}
+    for pk, *key in rows:
+        ids.setdefault(tuple(key), []).append(pk)
+    for chat in chats:
+        pks = ids.get(chat_key(chat), ())
+        chat.pk = pks[0] if len(pks) == 1 else None
+
+
+def insert_without_ids(chats):
+    # bulk_create + fill_ids cuando la base no devuelve ids. Dos mensajes con
+    # la misma clave (mismo usuario y cancion en el mismo instante, segun la
+    # resolucion del reloj) se confundirian: el repetido se guarda con save(),
+    # que si devuelve su id, despues de leer los ids de los anteriores. Devuelve
+    # los guardados con bulk_create (los de save() los publica la senal)
+    bulk, segment, seen = [], [], set()
+    for chat in chats:
+        key = chat_key(chat)
+        if key in seen:
+            insert_segment(segment)
+            bulk.extend(segment)
+            segment = []
+            chat.save(force_insert=True)
+        else:
+            seen.add(key)
+            segment.append(chat)
+    insert_segment(segment)
+    return bulk + segment
+
+
+def insert_segment(chats):
+    if chats:
+        LiveChat.objects.bulk_create(chats)
+        fill_ids(chats)
+
+
+class ChatWriteBuffer:
+    def __init__(self, mode=None, batch_size=None, interval=None, max_pending=None, max_attempts=None):
+        self.mode = mode or settings.CHAT_WRITE_MODE
+        if self.mode not in (GROUP_COMMIT, WRITE_BEHIND):
+            raise ValueError(f"Modo con buffer desconocido '{self.mode}', se esperaba uno de {WRITE_MODES[1:]}")
+        self.batch_size = batch_size or settings.CHAT_BATCH_SIZE
+        self.interval = interval if interval is not None else settings.CHAT_FLUSH_INTERVAL
+        self.max_pending = max_pending or settings.CHAT_MAX_PENDING
+        self.max_attempts = max_attempts or settings.CHAT_MAX_ATTEMPTS
+        self._pending = []
+        self._lock = threading.Lock()
+        # Un flush a la vez: es lo que mantiene el orden entre lotes
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.counters = Counter()
+
+    def submit(self, chat):
+        # En group_commit vuelve cuando el mensaje ya esta guardado (chat.pk).
+        # ChatBufferFull si la cola esta llena; el mensaje no quedo encolado
+        if not self.start():
+            # Buffer ya cerrado (apagado): se guarda como en direct
+            chat.save()
+            return chat
+        pending = PendingChat(chat)
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self.counters['rejected'] += 1
+                raise ChatBufferFull(f"{len(self._pending)} mensajes pendientes de guardar")
+            self._pending.append(pending)
+            self.counters['submitted'] += 1
+            size = len(self._pending)
+        if size >= self.batch_size:
+            self._wake.set()
+        if self.mode == GROUP_COMMIT:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+        return chat
+
+    def start(self):
+        # False si el buffer ya se cerro
+        with self._lock:
+            if self._stopped.is_set():
+                return False
+            if self._thread is not None:
+                return True
+            self._thread = threading.Thread(target=self.run, name='chat-write-buffer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        return True
+
+    def run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except DatabaseError:
+                # Contado en stats(); write_behind reintenta en el proximo ciclo
+                pass
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        # Guarda todo lo pendiente en lotes de batch_size; devuelve cuantos
+        flushed = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = self._pending[:self.batch_size]
+                if not batch:
+                    return flushed
+                try:
+                    published = self.write([pending.chat for pending in batch])
+                except DatabaseError as exc:
+                    self.counters['errors'] += 1
+                    if self.mode == WRITE_BEHIND:
+                        # Queda al frente de la cola, en el mismo orden, salvo
+                        # los que ya agotaron sus intentos
+                        self.drop_exhausted(batch, exc)
+                        raise
+                    self.release(batch, exc)
+                    raise
+                self.release(batch)
+                flushed += len(batch)
+                for chat in published:
+                    broadcast.publish_chat(chat)
+
+    def drop_exhausted(self, batch, error):
+        for pending in batch:
+            pending.attempts += 1
+        # Los mas viejos llevan mas intentos: los agotados son un prefijo
+        exhausted = [pending for pending in batch if pending.attempts >= self.max_attempts]
+        if exhausted:
+            logger.error("Se descartan %d mensajes de chat despues de %d intentos: %s",
+                         len(exhausted), self.max_attempts, error)
+            self.release(exhausted, error)
+
+    def release(self, batch, error=None):
+        with self._lock:
+            del self._pending[:len(batch)]
+            if error is None:
+                self.counters['batches'] += 1
+                self.counters['written'] += len(batch)
+            else:
+                self.counters['failed'] += len(batch)
+        for pending in batch:
+            pending.error = error
+            pending.done.set()
+
+    def write(self, chats):
+        # Devuelve los mensajes a publicar: los que guardo save() ya los
+        # publico la senal de api/signals.py
+        try:
+            with transaction.atomic():
+                if connection.features.can_return_rows_from_bulk_insert:
+                    LiveChat.objects.bulk_create(chats)
+                    published = chats
+                else:
+                    published = insert_without_ids(chats)
+        except IntegrityError:
+            # Una cancion borrada mientras tanto invalida el lote entero: se
+            # guardan de a uno y se descartan los que fallan
+            for chat in chats:
+                # Ids que quedaron del lote deshecho
+                chat.pk = None
+                try:
+                    with transaction.atomic():
+                        chat.save(force_insert=True)
+                except IntegrityError:
+                    self.counters['discarded'] += 1
+            return []
+        return [chat for chat in published if chat.pk is not None]
+
+    def close(self):
+        # Detiene el hilo y guarda lo pendiente. Se marca con el lock tomado:
+        # submit() encola antes de esto o guarda el mensaje el mismo
+        with self._lock:
+            self._stopped.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'pending': len(self._pending),
+                'batch_size': self.batch_size,
+                'interval': self.interval,
+                **{name: self.counters[name] for name in ('submitted', 'written', 'batches', 'failed', 'errors', 'discarded', 'rejected')},
+            }
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = ChatWriteBuffer()
+    return _buffer
+
+
+def reset(buffer=None):
+    # Guarda lo pendiente y descarta el buffer (apagado, tests)
+    global _buffer
+    with _buffer_lock:
+        if _buffer is not None:
+            _buffer.close()
+        _buffer = buffer
+
+
+def save_chat(serializer, user):
+    # Guarda segun CHAT_WRITE_MODE; True si al volver ya esta en la base.
+    # ChatBufferFull si no se acepto: responder 503 para que se reintente
+    if settings.CHAT_WRITE_MODE == DIRECT:
+        serializer.save(user=user)
+        return True
+    chat = LiveChat(user=user, timestamp=timezone.now(), **serializer.validated_data)
+    serializer.instance = get_buffer().submit(chat)
+    return chat.pk is not None
@@ -0,0 +1,85 @@
+# GET condicional (If-None-Match / If-Modified-Since -> 304) sin serializar la
+# respuesta. El ETag sale de los sellos de ContentVersion de los alcances de
+# la vista ("catalog", "playlists:<user>", "profile:<user>") mas un hash de la
+# variante pedida (ruta, parametros, host, formato), no del cuerpo: validarlo
+# cuesta una consulta de una fila o ninguna si el catalogo ya esta en memoria.
+import hashlib
+import json
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_etags
+from . import cache
+
+
+def playlists_scope(user_id):
+    return f"playlists:{user_id}"
+
+
+def profile_scope(user_id):
+    return f"profile:{user_id}"
+
+
+def get_stamps(scopes):
+    # El catalogo usa la version que ya mantiene la cache de api/cache.py; si
+    # vencio se lee en la misma consulta que los demas alcances
+    catalog = cache.catalog_cache.cached_stamp() if cache.CATALOG in scopes else None
+    missing = [scope for scope in scopes if scope != cache.CATALOG or catalog is None]
+    stamps = cache.get_stamps(missing) if missing else {}
+    if catalog is not None:
+        stamps[cache.CATALOG] = catalog
+    elif cache.CATALOG in scopes:
+        cache.catalog_cache.remember_stamp(stamps[cache.CATALOG])
+    return [stamps[scope] for scope in scopes]
+
+
+def validators(scopes, variant):
+    # (etag, last_modified); last_modified es None si ningun alcance cambio nunca
+    stamps = get_stamps(scopes)
+    digest = hashlib.sha1(json.dumps(variant, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    etag = '"%s-%s"' % ('.'.join(str(version) for version, _ in stamps), digest)
+    modified = [updated_at for _, updated_at in stamps if updated_at is not None]
+    return etag, max(modified).timestamp() if modified else None
+
+
+def etag_matches(if_none_match, etag):
+    # Comparacion debil de If-None-Match, como la de Django para GET
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return '*' in etags or etag.removeprefix('W/') in (e.removeprefix('W/') for e in etags)
+
+
+class ConditionalGetMixin:
+    # conditional_scopes admite {user} (id del usuario autenticado). Las vistas
+    # con su propio get() llaman a self.conditional_get(request, handler, ...).
+    conditional_scopes = ()
+
+    def get_conditional_scopes(self):
+        return [scope.format(user=self.request.user.pk) for scope in self.conditional_scopes]
+
+    def get(self, request, *args, **kwargs):
+        return self.conditional_get(request, super().get, *args, **kwargs)
+
+    def conditional_get(self, request, handler, *args, **kwargs):
+        scopes = self.get_conditional_scopes()
+        variant = {
+            'scheme': request.scheme,
+            'host': request.get_host(),
+            'path': request.path,
+            'query': sorted(request.query_params.lists()),
+            'format': request.accepted_renderer.format,
+        }
+        etag, last_modified = validators(scopes, variant)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # El cliente siempre revalida; las respuestas por usuario no van a caches compartidas
+        if any('{user}' in scope for scope in self.conditional_scopes):
+            patch_cache_control(response, no_cache=True, private=True)
+        else:
+            patch_cache_control(response, no_cache=True)
+        return response
@@ -0,0 +1,73 @@
+# Contadores de los reportes: ArtistProfile.songs_count/albums_count/
+# likes_count y las filas de SystemCounter. Las senales de api/signals.py los
+# ajustan con UPDATE ... SET x = x + 1 en cada alta o baja, asi los reportes
+# leen una fila en lugar de contar tablas enteras. Los update(), bulk_create()
+# y borrados con SQL directo no disparan senales: `manage.py reconcile_counters`
+# vuelve a contar y corrige las diferencias.
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from .models import Album, ArtistProfile, Like, Playlist, Song, SystemCounter, User
+
+USERS = 'users'
+SONGS = 'songs'
+ALBUMS = 'albums'
+PLAYLISTS = 'playlists'
+SYSTEM_MODELS = {USERS: User, SONGS: Song, ALBUMS: Album, PLAYLISTS: Playlist}
+SYSTEM_NAMES = {model: name for name, model in SYSTEM_MODELS.items()}
+# Campo de ArtistProfile por modelo con FK "artist"
+ARTIST_FIELDS = {Song: 'songs_count', Album: 'albums_count', Like: 'likes_count'}
+
+
+def add(name, delta):
+    # UPDATE atomico; la fila se crea la primera vez que cambia el contador
+    def increment():
+        return SystemCounter.objects.filter(name=name).update(value=F('value') + delta)
+    if not increment():
+        _, created = SystemCounter.objects.get_or_create(name=name, defaults={'value': max(delta, 0)})
+        if not created:
+            increment()
+
+
+def add_to_artist(model, artist_id, delta):
+    field = ARTIST_FIELDS[model]
+    ArtistProfile.objects.filter(pk=artist_id).update(**{field: F(field) + delta})
+
+
+def system_totals():
+    # {nombre: valor} en una consulta; 0 para los que nunca cambiaron
+    values = dict(SystemCounter.objects.filter(name__in=SYSTEM_MODELS).values_list('name', 'value'))
+    return {name: values.get(name, 0) for name in SYSTEM_MODELS}
+
+
+def artist_count(model):
+    rows = model.objects.filter(artist=OuterRef('pk')).order_by().values('artist').annotate(total=Count('pk'))
+    return Coalesce(Subquery(rows.values('total'), output_field=IntegerField()), 0)
+
+
+def reconcile():
+    # Vuelve a contar y corrige; devuelve {contador: (guardado, real)} de los
+    # que no coincidian. Un alta que llega entre la cuenta y la correccion se
+    # pierde: correrlo con poco trafico
+    fixed = {}
+    stored = system_totals()
+    for name, model in SYSTEM_MODELS.items():
+        actual = model.objects.count()
+        if stored[name] != actual:
+            SystemCounter.objects.update_or_create(name=name, defaults={'value': actual})
+            fixed[name] = (stored[name], actual)
+
+    actual = {field: f'actual_{field}' for field in ARTIST_FIELDS.values()}
+    artists = ArtistProfile.objects.annotate(**{
+        actual[field]: artist_count(model) for model, field in ARTIST_FIELDS.items()
+    })
+    drift = Q()
+    for field, annotation in actual.items():
+        drift |= ~Q(**{field: F(annotation)})
+    for artist in artists.filter(drift):
+        for field, annotation in actual.items():
+            if getattr(artist, field) != getattr(artist, annotation):
+                fixed[f'artist:{artist.pk}:{field}'] = (getattr(artist, field), getattr(artist, annotation))
+        ArtistProfile.objects.filter(pk=artist.pk).update(**{
+            field: getattr(artist, annotation) for field, annotation in actual.items()
+        })
+    return fixed
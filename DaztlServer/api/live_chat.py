@@ -0,0 +1,225 @@
+# Chat en vivo sin polling para el modo ASGI (daztl/asgi.py). Dos transportes
+# sobre el mismo canal por cancion de api/broadcast.py:
+#
+#   GET /api/songs/<id>/chat/events/   Server-Sent Events (EventSource)
+#   ws://.../ws/songs/<id>/chat/       WebSocket; ademas permite enviar
+#                                      {"message": "..."} sin pasar por POST
+#
+# El token va en "Authorization: Bearer" o, para EventSource y WebSocket desde
+# el navegador que no mandan cabeceras, en ?token=. Al conectar se lee de la
+# base solo el usuario (o se toma de la cache de api/authentication.py) y lo
+# que el cliente se perdio desde Last-Event-ID / ?last_id= (CHAT_BACKFILL_LIMIT
+# mensajes como maximo); despues cada mensaje llega por el broadcast. Cada
+# CHAT_HEARTBEAT_SECONDS sin mensajes se manda un heartbeat para que proxies y
+# clientes detecten conexiones muertas. Con WSGI (gunicorn sync) no hay
+# streaming: el endpoint SSE responde 501 y queda el polling de
+# songs/<id>/chat/.
+import asyncio
+import json
+import re
+from urllib.parse import parse_qs
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from . import chat_buffer
+from .authentication import CachedJWTAuthentication
+from .broadcast import Message, SlowConsumer, chat_channel, get_broadcast
+from .models import LiveChat, Song
+from .serializers import LiveChatSerializer
+
+WEBSOCKET_PATH = re.compile(r'^/ws/songs/(?P<song_id>\d+)/chat/$')
+# Codigos de cierre del WebSocket
+CLOSE_GOING_AWAY = 1001
+CLOSE_TRY_AGAIN_LATER = 1013
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_NOT_FOUND = 4404
+
+
+def db_call(function):
+    # El WebSocket no pasa por el handler de Django: se aplican las mismas
+    # reglas de conexiones que en un request (CONN_MAX_AGE, health checks)
+    def call(*args):
+        close_old_connections()
+        try:
+            return function(*args)
+        finally:
+            close_old_connections()
+    return sync_to_async(call)
+
+
+def authenticate(raw_token):
+    # Usuario del token, o None si falta o no es valido
+    if not raw_token:
+        return None
+    auth = CachedJWTAuthentication()
+    try:
+        return auth.get_user(auth.get_validated_token(raw_token))
+    except AuthenticationFailed:
+        return None
+
+
+def parse_id(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def load_backlog(song_id, last_id):
+    # Mensajes posteriores a last_id, o None si la cancion no existe
+    if not Song.objects.filter(pk=song_id).exists():
+        return None
+    if not last_id:
+        return []
+    chats = LiveChatSerializer.setup_eager_loading(
+        LiveChat.objects.filter(song_id=song_id, pk__gt=last_id)
+    ).order_by('pk')[:settings.CHAT_BACKFILL_LIMIT]
+    return [Message(chat.pk, json.dumps(LiveChatSerializer(chat).data)) for chat in chats]
+
+
+def save_message(user, song_id, text):
+    # Errores, o None si se acepto. Pasa por CHAT_WRITE_MODE como
+    # LiveChatCreateView; se publica al guardarse, no aca
+    serializer = LiveChatSerializer(data={'song': song_id, 'message': text})
+    if not serializer.is_valid():
+        return serializer.errors
+    try:
+        chat_buffer.save_chat(serializer, user)
+    except chat_buffer.ChatBufferFull:
+        return {'detail': 'Chat saturado, reintentar mas tarde'}
+    return None
+
+
+async def open_subscription(raw_token, song_id, last_id):
+    # (user, subscriber, backlog); subscriber None si no hay usuario o cancion.
+    # Se suscribe antes de leer el backlog: un mensaje guardado en el medio
+    # llega por los dos lados y se descarta el repetido
+    user = await db_call(authenticate)(raw_token)
+    if user is None:
+        return None, None, None
+    subscriber = get_broadcast().subscribe(chat_channel(song_id))
+    backlog = await db_call(load_backlog)(song_id, last_id)
+    if backlog is None:
+        subscriber.close()
+        return user, None, None
+    return user, subscriber, backlog
+
+
+async def live_messages(subscriber, backlog):
+    # Backlog y despues mensajes en vivo; None cuando toca heartbeat.
+    # SlowConsumer si se lo desconecto por no leer a tiempo
+    seen = {message.id for message in backlog}
+    for message in backlog:
+        yield message
+    while True:
+        message = await subscriber.get(settings.CHAT_HEARTBEAT_SECONDS)
+        if message is None and subscriber.closed:
+            return
+        if message is None or message.id not in seen:
+            yield message
+
+
+def request_token(request):
+    auth = CachedJWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header else None
+    return raw_token or request.GET.get('token')
+
+
+@require_GET
+async def live_chat_events(request, song_id):
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"detail": "El chat en vivo requiere el servidor ASGI; usar songs/<id>/chat/"}, status=501)
+    last_id = parse_id(request.headers.get('Last-Event-ID') or request.GET.get('last_id'))
+    user, subscriber, backlog = await open_subscription(request_token(request), song_id, last_id)
+    if user is None:
+        return JsonResponse({"detail": "Token invalido o ausente"}, status=401)
+    if subscriber is None:
+        return JsonResponse({"detail": "No encontrado."}, status=404)
+    response = StreamingHttpResponse(sse_stream(subscriber, backlog), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # nginx no debe acumular los eventos
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def sse_stream(subscriber, backlog):
+    try:
+        yield f"retry: {settings.CHAT_RETRY_MILLISECONDS}\n\n"
+        async for message in live_messages(subscriber, backlog):
+            if message is None:
+                yield ": ping\n\n"
+            else:
+                yield f"id: {message.id}\ndata: {message.data}\n\n"
+    except SlowConsumer:
+        # El navegador se reconecta con Last-Event-ID y recupera lo perdido
+        pass
+    finally:
+        subscriber.close()
+
+
+async def websocket_application(scope, receive, send):
+    if (await receive())['type'] != 'websocket.connect':
+        return
+    match = WEBSOCKET_PATH.match(scope['path'])
+    if match is None:
+        await send({'type': 'websocket.close', 'code': CLOSE_NOT_FOUND})
+        return
+    query = parse_qs(scope.get('query_string', b'').decode())
+    raw_token = websocket_token(scope) or query.get('token', [None])[0]
+    song_id = int(match['song_id'])
+    user, subscriber, backlog = await open_subscription(raw_token, song_id, parse_id(query.get('last_id', [0])[0]))
+    if subscriber is None:
+        await send({'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED if user is None else CLOSE_NOT_FOUND})
+        return
+    await send({'type': 'websocket.accept'})
+    sender = asyncio.ensure_future(websocket_sender(send, subscriber, backlog))
+    try:
+        while True:
+            event = await receive()
+            if event['type'] == 'websocket.disconnect':
+                return
+            if event['type'] == 'websocket.receive':
+                errors = await websocket_receive(user, song_id, event)
+                if errors is not None:
+                    await send({'type': 'websocket.send', 'text': json.dumps({'type': 'error', 'errors': errors})})
+    finally:
+        sender.cancel()
+        subscriber.close()
+
+
+def websocket_token(scope):
+    for name, value in scope.get('headers', ()):
+        if name == b'authorization':
+            parts = value.decode().split()
+            if len(parts) == 2 and parts[0] == 'Bearer':
+                return parts[1]
+    return None
+
+
+async def websocket_receive(user, song_id, event):
+    try:
+        text = json.loads(event.get('text') or '')['message']
+    except (ValueError, TypeError, KeyError):
+        return {'message': ['Se esperaba {"message": "..."}']}
+    return await db_call(save_message)(user, song_id, text)
+
+
+async def websocket_sender(send, subscriber, backlog):
+    # Los mensajes ya vienen en JSON: se arma el frame sin volver a serializar
+    try:
+        async for message in live_messages(subscriber, backlog):
+            if message is None:
+                text = '{"type": "ping"}'
+            else:
+                text = f'{{"type": "message", "id": {message.id}, "data": {message.data}}}'
+            await send({'type': 'websocket.send', 'text': text})
+        code = CLOSE_GOING_AWAY
+    except SlowConsumer:
+        # El cliente se reconecta con ?last_id= y recupera lo perdido
+        code = CLOSE_TRY_AGAIN_LATER
+    await send({'type': 'websocket.close', 'code': code})
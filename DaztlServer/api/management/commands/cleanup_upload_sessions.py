@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.uploads import cleanup_expired_sessions
+
+
+class Command(BaseCommand):
+    help = "Elimina las sesiones de subida sin actividad y sus archivos parciales (pensado para cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=settings.UPLOAD_SESSION_TTL_HOURS,
+                            help="Horas sin actividad antes de borrar una sesión")
+
+    def handle(self, *args, **options):
+        removed, orphans = cleanup_expired_sessions(hours=options['hours'])
+        self.stdout.write(f"Sesiones eliminadas: {removed}, archivos huérfanos eliminados: {orphans}")
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.autocomplete import prune_changes
+
+
+class Command(BaseCommand):
+    help = "Elimina los cambios de busqueda ya leidos por el autocompletado (pensado para cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=settings.SUGGEST_CHANGE_RETENTION_HOURS,
+                            help="Horas que se conservan los cambios")
+
+    def handle(self, *args, **options):
+        deleted = prune_changes(hours=options['hours'])
+        self.stdout.write(f"Cambios eliminados: {deleted}")
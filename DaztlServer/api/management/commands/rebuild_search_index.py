@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from api.search import DOCUMENTS, REBUILD_BATCH_SIZE, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el indice de la busqueda global (despues de cargas masivas o update() sin senales)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', action='append', dest='kinds', choices=list(DOCUMENTS),
+                            help="Tipo a reindexar, repetible (por defecto todos)")
+        parser.add_argument('--batch-size', type=int, default=REBUILD_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        counts = rebuild_index(options['kinds'] or None, batch_size=options['batch_size'])
+        for kind, total in counts.items():
+            self.stdout.write(f"{kind}: {total} tokens indexados")
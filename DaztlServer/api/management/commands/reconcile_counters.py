@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recalcula los contadores de los reportes y corrige los que no coinciden (despues de update() o borrados sin senales)"
+
+    def handle(self, *args, **options):
+        fixed = reconcile()
+        for name, (stored, actual) in sorted(fixed.items()):
+            self.stdout.write(f"{name}: {stored} -> {actual}")
+        self.stdout.write(f"{len(fixed)} contadores corregidos")
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:56
+
+from django.db import migrations, models
+
+
+def build_search_index(apps, schema_editor):
+    # Indexa el contenido existente con los modelos historicos de la migracion
+    from api.search import tokenize
+    SearchIndexEntry = apps.get_model('api', 'SearchIndexEntry')
+    documents = {
+        'song': (apps.get_model('api', 'Song'), 'title'),
+        'album': (apps.get_model('api', 'Album'), 'title'),
+        'artist': (apps.get_model('api', 'ArtistProfile'), 'user__username'),
+        'playlist': (apps.get_model('api', 'Playlist'), 'name'),
+    }
+    for kind, (model, field) in documents.items():
+        last_pk = 0
+        while True:
+            rows = list(model.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', field)[:2000])
+            if not rows:
+                break
+            SearchIndexEntry.objects.bulk_create([
+                SearchIndexEntry(kind=kind, object_id=pk, token=token)
+                for pk, text in rows
+                for token in tokenize(text)
+            ])
+            last_pk = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_uploadsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchIndexEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('song', 'Song'), ('album', 'Album'), ('artist', 'Artist'), ('playlist', 'Playlist')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('token', models.CharField(max_length=64)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'object_id'], name='search_kind_object_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'token', 'object_id'), name='unique_search_token')],
+            },
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
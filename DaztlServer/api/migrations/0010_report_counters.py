@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:30
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_existing(apps, schema_editor):
+    # Valores iniciales de los contadores con los modelos historicos de la migracion
+    SystemCounter = apps.get_model('api', 'SystemCounter')
+    ArtistProfile = apps.get_model('api', 'ArtistProfile')
+    for name, model in (('users', 'User'), ('songs', 'Song'), ('albums', 'Album'), ('playlists', 'Playlist')):
+        SystemCounter.objects.create(name=name, value=apps.get_model('api', model).objects.count())
+    for field, model in (('songs_count', 'Song'), ('albums_count', 'Album'), ('likes_count', 'Like')):
+        rows = apps.get_model('api', model).objects.order_by().values('artist').annotate(total=Count('pk'))
+        for row in rows:
+            ArtistProfile.objects.filter(pk=row['artist']).update(**{field: row['total']})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_contentversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SystemCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='artistprofile',
+            name='albums_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='artistprofile',
+            name='likes_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='artistprofile',
+            name='songs_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:49
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_report_counters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='livechat',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_live_chat_send_time'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='livechat',
+            index=models.Index(fields=['song', 'timestamp'], name='livechat_song_time_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_live_chat_song_time_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artistprofile',
+            name='plays_count',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='song',
+            name='play_count',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='SongPlayDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('plays', models.BigIntegerField(default=0)),
+                ('song', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_plays', to='api.song')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('song', 'day'), name='song_play_day_unique')],
+            },
+        ),
+    ]
@@ -1,4 +1,7 @@
 import os
+import uuid
+from django.conf import settings
+from django.utils import timezone
 from django.utils.text import slugify
 from datetime import datetime
 from django.contrib.auth.models import AbstractUser
@@ -15,10 +18,36 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username
-class ArtistProfile(models.Model):
+
+
+class CounterFieldsMixin:
+    # Los contadores se mantienen con UPDATE ... SET x = x + n (api/counters.py,
+    # api/plays.py). Un save() completo de una instancia leida antes (admin,
+    # serializers, shell) no los escribe: volveria a guardar valores viejos.
+    # Solo se guardan si update_fields los nombra.
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not args and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in deferred and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class ArtistProfile(CounterFieldsMixin, models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     bio = models.TextField(blank=True)
     profile_picture = models.ImageField(upload_to='artist_pics/', blank=True)
+    # Mantenidos por api/counters.py para ArtistReportView
+    songs_count = models.IntegerField(default=0, editable=False)
+    albums_count = models.IntegerField(default=0, editable=False)
+    likes_count = models.IntegerField(default=0, editable=False)
+    # Reproducciones de todas sus canciones, sumadas por api/plays.py
+    plays_count = models.BigIntegerField(default=0, editable=False)
+    counter_fields = ('songs_count', 'albums_count', 'likes_count', 'plays_count')
 
     def __str__(self):
         return f"ArtistProfile: {self.user.username}"
@@ -27,12 +56,15 @@ def clean_cover_filename(instance, filename):
     return f"song_covers/{filename}"
 def clean_audio_filename(instance, filename):
     return f"songs/{filename}"
-class Song(models.Model):
+class Song(CounterFieldsMixin, models.Model):
     title = models.CharField(max_length=255)
     artist = models.ForeignKey(ArtistProfile, on_delete=models.CASCADE, related_name='songs')
     audio_file = models.FileField(upload_to=clean_audio_filename)
     cover_image = models.ImageField(upload_to=clean_cover_filename)
     release_date = models.DateField(auto_now_add=True)
+    # Sumado por api/plays.py
+    play_count = models.BigIntegerField(default=0, editable=False)
+    counter_fields = ('play_count',)
 
     def __str__(self):
         return self.title
@@ -82,7 +114,117 @@ class LiveChat(models.Model):
     song = models.ForeignKey(Song, on_delete=models.CASCADE)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     message = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Hora de envio; con CHAT_WRITE_MODE la asigna api/chat_buffer.py antes de guardar
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            # Historial por cancion y fecha (?since= en LiveChatListView)
+            models.Index(fields=['song', 'timestamp'], name='livechat_song_time_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.song.title}"
+
+
+class UploadSession(models.Model):
+    # Subida reanudable de audio: los chunks se agregan a un archivo parcial
+    # en MEDIA_ROOT/upload_sessions y al finalizar se convierte en un Song
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    artist = models.ForeignKey(ArtistProfile, on_delete=models.CASCADE, related_name='upload_sessions')
+    title = models.CharField(max_length=255)
+    filename = models.CharField(max_length=255)
+    total_size = models.BigIntegerField()
+    received_bytes = models.BigIntegerField(default=0)
+    next_chunk = models.PositiveIntegerField(default=0)
+    song = models.OneToOneField(Song, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload_session')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def partial_path(self):
+        return os.path.join(settings.MEDIA_ROOT, 'upload_sessions', f"{self.id}.part")
+
+    @property
+    def is_complete(self):
+        return self.received_bytes == self.total_size
+
+    def __str__(self):
+        return f"UploadSession {self.id} ({self.received_bytes}/{self.total_size})"
+
+
+class SearchIndexEntry(models.Model):
+    # Indice invertido de la busqueda global (api/search.py): un token
+    # normalizado por fila. Se mantiene con las senales de api/signals.py.
+    KIND_CHOICES = [
+        ('song', 'Song'),
+        ('album', 'Album'),
+        ('artist', 'Artist'),
+        ('playlist', 'Playlist'),
+    ]
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    token = models.CharField(max_length=64)
+
+    class Meta:
+        constraints = [
+            # Tambien es el indice de busqueda: seek por token (o rango de
+            # prefijo) y object_id ya ordenado sin ir a la tabla
+            models.UniqueConstraint(fields=['kind', 'token', 'object_id'], name='unique_search_token'),
+        ]
+        # Para reindexar o borrar todas las entradas de un objeto
+        indexes = [models.Index(fields=['kind', 'object_id'], name='search_kind_object_idx')]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id} {self.token}"
+
+
+class SearchChange(models.Model):
+    # Registro de cambios del catalogo para los indices en memoria de
+    # api/autocomplete.py: cada proceso aplica las filas con id mayor a la
+    # ultima que vio. kind RELOAD pide reconstruir el indice completo.
+    RELOAD = '*'
+    kind = models.CharField(max_length=10)
+    object_id = models.BigIntegerField(default=0)
+    text = models.CharField(max_length=255, blank=True)
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id} {'deleted' if self.deleted else self.text}"
+
+
+class ContentVersion(models.Model):
+    # Sello de version por alcance ("catalog", ...). Cada cambio lo incrementa
+    # y las cachés de api/cache.py lo usan en sus claves, asi un cambio hecho
+    # en un proceso invalida las entradas de todos los demas.
+    scope = models.CharField(max_length=64, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.scope}@{self.version}"
+
+
+class SystemCounter(models.Model):
+    # Totales de SystemReportView ("users", "songs", ...), mantenidos por api/counters.py
+    name = models.CharField(max_length=64, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}={self.value}"
+
+
+class SongPlayDaily(models.Model):
+    # Reproducciones de una cancion en un dia (TIME_ZONE), sumadas por api/plays.py
+    song = models.ForeignKey(Song, on_delete=models.CASCADE, related_name='daily_plays')
+    day = models.DateField()
+    plays = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['song', 'day'], name='song_play_day_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.song_id}@{self.day}={self.plays}"
@@ -0,0 +1,79 @@
+# Paginacion por cursor (keyset sobre id) para los listados. Es opcional: los
+# clientes que no envian cursor ni page_size siguen recibiendo la lista completa
+# como antes; con cualquiera de los dos la respuesta es {next, previous, results}.
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+from rest_framework.pagination import CursorPagination
+
+
+def parse_page_size(value):
+    # page_size invalido usa el tamano por defecto; nunca se pasa del maximo
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return settings.API_PAGE_SIZE
+    if size <= 0:
+        return settings.API_PAGE_SIZE
+    return min(size, settings.API_MAX_PAGE_SIZE)
+
+
+class OptionalCursorPagination(CursorPagination):
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+
+    def __init__(self):
+        self.page_size = settings.API_PAGE_SIZE
+        self.max_page_size = settings.API_MAX_PAGE_SIZE
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        return parse_page_size(request.query_params.get(self.page_size_query_param))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+CHAT_WINDOW_PARAMS = ('since_id', 'before_id', 'since', 'limit')
+
+
+def parse_id(value):
+    try:
+        return max(int(value), 0) or None
+    except (TypeError, ValueError):
+        return None
+
+
+def chat_window_requested(params):
+    return any(name in params for name in CHAT_WINDOW_PARAMS)
+
+
+def chat_window(queryset, params):
+    # Historial incremental del chat, siempre en orden de id: con since_id (o
+    # since, una fecha ISO) los primeros `limit` posteriores; si no, los
+    # ultimos `limit` (anteriores a before_id si viene). Un cliente que se
+    # reconecta pide since_id=<ultimo id que vio> y recibe solo lo nuevo;
+    # hacia atras pagina con before_id=<id mas viejo que tiene>
+    since_id = parse_id(params.get('since_id'))
+    before_id = parse_id(params.get('before_id'))
+    since = parse_datetime(params.get('since') or '')
+    limit = parse_page_size(params.get('limit'))
+    if since_id:
+        queryset = queryset.filter(pk__gt=since_id)
+    if before_id:
+        queryset = queryset.filter(pk__lt=before_id)
+    if since:
+        queryset = queryset.filter(timestamp__gt=since)
+    if since_id or since:
+        return list(queryset.order_by('pk')[:limit])
+    return list(queryset.order_by('-pk')[:limit])[::-1]
+
+
+def search_limit(request):
+    # En /api/search/ page_size limita cada seccion (canciones, albumes, ...)
+    value = request.query_params.get('page_size')
+    return None if value is None else parse_page_size(value)
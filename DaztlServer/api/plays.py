@@ -0,0 +1,311 @@
+# Registro de reproducciones. RecordPlay y POST /api/songs/<id>/play/ no
+# escriben en la base: record() suma la reproduccion a un contador en memoria
+# por (cancion, dia) y un hilo por proceso vuelca los totales cada
+# PLAYS_FLUSH_INTERVAL segundos, o antes al juntar PLAYS_FLUSH_EVENTS.
+#
+# El volcado es el rollup: en una transaccion suma a Song.play_count, a
+# ArtistProfile.plays_count y a SongPlayDaily(cancion, dia). Se hace un
+# UPDATE ... SET x = x + n por cada grupo de filas que reciben el mismo n, no
+# uno por reproduccion: mil reproducciones de la misma cancion son una fila.
+# Las canciones que no existen (o se borraron) se descartan al volcar.
+#
+# PLAYS_BUFFER elige que pasa con lo pendiente si el proceso muere:
+#   memory  se pierde; al apagarse normalmente (atexit, lifespan ASGI) se vuelca
+#   log     cada reproduccion tambien se agrega a un archivo de PLAYS_LOG_DIR
+#           (un write por evento, sin fsync). Al arrancar, cada proceso vuelca
+#           los archivos que dejaron procesos caidos. Un corte justo entre el
+#           commit y el borrado del archivo cuenta esas reproducciones dos veces
+import atexit
+import fcntl
+import glob
+import os
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import ArtistProfile, Song, SongPlayDaily
+
+MEMORY = 'memory'
+LOG = 'log'
+BUFFERS = (MEMORY, LOG)
+# Parametros por IN (...); SQL Server acepta hasta 2100 por consulta
+IN_CHUNK = 1000
+
+
+def chunks(values, size=IN_CHUNK):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def add_grouped(queryset, field, deltas, key='pk'):
+    # {id: n} -> un UPDATE por cada n distinto (y por cada IN_CHUNK ids)
+    by_delta = {}
+    for row_id, delta in deltas.items():
+        by_delta.setdefault(delta, []).append(row_id)
+    for delta, row_ids in by_delta.items():
+        for chunk in chunks(sorted(row_ids)):
+            queryset.filter(**{f'{key}__in': chunk}).update(**{field: F(field) + delta})
+
+
+def rollup(counts):
+    # {(song_id, dia): reproducciones} -> contadores; devuelve cuantas se sumaron
+    artists = {}
+    for chunk in chunks({song_id for song_id, _ in counts}):
+        artists.update(Song.objects.filter(pk__in=chunk).values_list('pk', 'artist_id'))
+    per_song, per_artist, per_day = Counter(), Counter(), {}
+    for (song_id, day), plays in counts.items():
+        if song_id not in artists:
+            continue
+        per_song[song_id] += plays
+        per_artist[artists[song_id]] += plays
+        per_day.setdefault(day, {})[song_id] = plays
+    with transaction.atomic():
+        add_grouped(Song.objects, 'play_count', per_song)
+        add_grouped(ArtistProfile.objects, 'plays_count', per_artist)
+        for day, songs in per_day.items():
+            existing = set()
+            for chunk in chunks(songs):
+                existing.update(SongPlayDaily.objects.filter(day=day, song_id__in=chunk).values_list('song_id', flat=True))
+            SongPlayDaily.objects.bulk_create([
+                SongPlayDaily(song_id=song_id, day=day, plays=plays)
+                for song_id, plays in songs.items() if song_id not in existing
+            ], batch_size=IN_CHUNK)
+            add_grouped(SongPlayDaily.objects.filter(day=day), 'plays',
+                        {song_id: songs[song_id] for song_id in existing}, key='song_id')
+    return sum(per_song.values())
+
+
+class PlayLog:
+    # Archivos append-only con una linea "song_id dia" por reproduccion. El
+    # proceso dueno tiene cada archivo bloqueado (flock) hasta borrarlo: los
+    # que se pueden bloquear al arrancar son de procesos que ya no existen
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.file = self.open()
+
+    def open(self):
+        path = os.path.join(self.directory, f"plays-{os.getpid()}-{time.time_ns()}.log")
+        # Con buffering por linea cada evento es un write(): sobrevive a la
+        # caida del proceso, no a la del sistema
+        segment = open(path, 'a', buffering=1)
+        fcntl.flock(segment, fcntl.LOCK_EX)
+        return segment
+
+    def append(self, song_id, day):
+        self.file.write(f"{song_id} {day.isoformat()}\n")
+
+    def rotate(self):
+        # Cierra el archivo actual para escritura y devuelve su handle (sigue
+        # bloqueado); los eventos nuevos van a uno nuevo
+        sealed, self.file = self.file, self.open()
+        return sealed
+
+    @staticmethod
+    def discard(segments):
+        for segment in segments:
+            os.unlink(segment.name)
+            segment.close()
+
+    def orphans(self):
+        # Archivos de procesos caidos, ya bloqueados por este proceso
+        found = []
+        for path in sorted(glob.glob(os.path.join(self.directory, 'plays-*.log'))):
+            if path == self.file.name:
+                continue
+            try:
+                segment = open(path, 'r')
+            except FileNotFoundError:
+                continue
+            try:
+                fcntl.flock(segment, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                segment.close()
+                continue
+            if not os.path.exists(path):
+                # Lo borro su dueno entre el glob y el flock
+                segment.close()
+                continue
+            found.append(segment)
+        return found
+
+    @staticmethod
+    def read(segment):
+        counts = Counter()
+        segment.seek(0)
+        for line in segment:
+            parts = line.split()
+            # Una linea cortada por la caida se ignora
+            if len(parts) == 2 and parts[0].isdigit():
+                try:
+                    counts[(int(parts[0]), date.fromisoformat(parts[1]))] += 1
+                except ValueError:
+                    continue
+        return counts
+
+    def close(self):
+        self.file.close()
+
+
+class PlayRecorder:
+    def __init__(self, buffer=None, interval=None, max_events=None, log_dir=None):
+        self.buffer = buffer or settings.PLAYS_BUFFER
+        if self.buffer not in BUFFERS:
+            raise ValueError(f"PLAYS_BUFFER desconocido '{self.buffer}', se esperaba uno de {BUFFERS}")
+        self.interval = interval if interval is not None else settings.PLAYS_FLUSH_INTERVAL
+        self.max_events = max_events or settings.PLAYS_FLUSH_EVENTS
+        self.log = PlayLog(log_dir or settings.PLAYS_LOG_DIR) if self.buffer == LOG else None
+        self._counts = Counter()
+        self._events = 0
+        # Archivos ya rotados cuyo contenido todavia no se guardo
+        self._sealed = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._day = None
+        self._day_ends = 0
+        self.counters = Counter()
+
+    def today(self):
+        # timezone.localdate() es casi todo el costo de record(): se recalcula
+        # solo al pasar la medianoche local
+        now = time.time()
+        if now >= self._day_ends:
+            local = timezone.localtime()
+            midnight = datetime.combine(local.date() + timedelta(days=1), datetime.min.time(), tzinfo=local.tzinfo)
+            self._day, self._day_ends = local.date(), midnight.timestamp()
+        return self._day
+
+    def record(self, song_id, day=None):
+        key = (song_id, day or self.today())
+        with self._lock:
+            self._counts[key] += 1
+            self._events += 1
+            events = self._events
+            if self.log is not None:
+                self.log.append(*key)
+        if self._thread is None:
+            self.start()
+        if events >= self.max_events:
+            self._wake.set()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None or self._stopped.is_set():
+                return
+            self._thread = threading.Thread(target=self.run, name='play-recorder', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def run(self):
+        if self.log is not None:
+            self.recover()
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                # El ultimo volcado lo hace close()
+                return
+            try:
+                self.flush()
+            except DatabaseError:
+                # Contado en stats(); lo pendiente se reintenta en el proximo ciclo
+                pass
+            finally:
+                close_old_connections()
+
+    def recover(self):
+        # Vuelca los archivos de procesos caidos; si falla quedan para otro intento
+        segments = self.log.orphans()
+        try:
+            counts = Counter()
+            for segment in segments:
+                counts.update(PlayLog.read(segment))
+            if counts:
+                self.counters['recovered'] += rollup(counts)
+            PlayLog.discard(segments)
+        except DatabaseError:
+            for segment in segments:
+                segment.close()
+            self.counters['errors'] += 1
+
+    def flush(self):
+        # Devuelve cuantas reproducciones se sumaron
+        with self._flush_lock:
+            with self._lock:
+                counts, self._counts = self._counts, Counter()
+                events, self._events = self._events, 0
+                if self.log is not None and events:
+                    self._sealed.append(self.log.rotate())
+            if not counts:
+                return 0
+            try:
+                stored = rollup(counts)
+            except DatabaseError:
+                # Vuelven al contador; los archivos rotados se conservan
+                with self._lock:
+                    self._counts.update(counts)
+                    self._events += events
+                    self.counters['errors'] += 1
+                raise
+            if self.log is not None:
+                PlayLog.discard(self._sealed)
+                self._sealed = []
+            with self._lock:
+                self.counters['flushes'] += 1
+                self.counters['recorded'] += events
+                self.counters['stored'] += stored
+                self.counters['discarded'] += events - stored
+            return stored
+
+    def close(self):
+        # Detiene el hilo y guarda lo pendiente
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+        if self.log is not None:
+            self.log.close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'buffer': self.buffer,
+                'pending': self._events,
+                'interval': self.interval,
+                **{name: self.counters[name] for name in ('recorded', 'stored', 'discarded', 'flushes', 'errors', 'recovered')},
+            }
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder():
+    global _recorder
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = PlayRecorder()
+    return _recorder
+
+
+def reset(recorder=None):
+    # Guarda lo pendiente y descarta el recorder (apagado, tests)
+    global _recorder
+    with _recorder_lock:
+        if _recorder is not None:
+            _recorder.close()
+        _recorder = recorder
+
+
+def record(song_id):
+    get_recorder().record(song_id)
@@ -0,0 +1,175 @@
+# Busqueda global sobre un indice invertido. Cada cancion, album, artista y
+# playlist se guarda como tokens normalizados (minusculas, sin acentos) en
+# SearchIndexEntry; buscar es un seek por token o por rango de prefijo sobre
+# una columna indexada en lugar de un LIKE '%q%' que recorre las cuatro tablas.
+import re
+import unicodedata
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from .models import Album, ArtistProfile, Playlist, SearchChange, SearchIndexEntry, Song
+
+TOKEN_RE = re.compile(r"\w+")
+MAX_TOKEN_LENGTH = SearchIndexEntry._meta.get_field('token').max_length
+MAX_QUERY_TOKENS = 8
+REBUILD_BATCH_SIZE = 2000
+
+# tipo -> (modelo, campo con el texto indexado)
+DOCUMENTS = {
+    'song': (Song, 'title'),
+    'album': (Album, 'title'),
+    'artist': (ArtistProfile, 'user__username'),
+    'playlist': (Playlist, 'name'),
+}
+
+
+def normalize(text):
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text):
+    tokens = []
+    for token in TOKEN_RE.findall(normalize(text)):
+        token = token[:MAX_TOKEN_LENGTH]
+        if token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+def kind_for(instance):
+    for kind, (model, _) in DOCUMENTS.items():
+        if isinstance(instance, model):
+            return kind
+    return None
+
+
+def document_text(instance, field):
+    value = instance
+    for attr in field.split('__'):
+        value = getattr(value, attr)
+    return value
+
+
+def build_entries(kind, object_id, text):
+    return [SearchIndexEntry(kind=kind, object_id=object_id, token=token) for token in tokenize(text)]
+
+
+def index_instance(instance):
+    kind = kind_for(instance)
+    text = document_text(instance, DOCUMENTS[kind][1])
+    with transaction.atomic():
+        SearchIndexEntry.objects.filter(kind=kind, object_id=instance.pk).delete()
+        SearchIndexEntry.objects.bulk_create(build_entries(kind, instance.pk, text))
+        SearchChange.objects.create(kind=kind, object_id=instance.pk, text=text[:255])
+
+
+def unindex_instance(instance):
+    kind = kind_for(instance)
+    with transaction.atomic():
+        SearchIndexEntry.objects.filter(kind=kind, object_id=instance.pk).delete()
+        SearchChange.objects.create(kind=kind, object_id=instance.pk, deleted=True)
+
+
+def rebuild_index(kinds=None, batch_size=REBUILD_BATCH_SIZE):
+    # Recorre cada tabla por rangos de pk (sin cursores abiertos mientras se
+    # escribe) y reemplaza las entradas de ese tipo en una transaccion
+    counts = {}
+    for kind in kinds or DOCUMENTS:
+        model, field = DOCUMENTS[kind]
+        total = 0
+        with transaction.atomic():
+            SearchIndexEntry.objects.filter(kind=kind).delete()
+            last_pk = 0
+            while True:
+                rows = list(model.objects.filter(pk__gt=last_pk).order_by('pk')
+                            .values_list('pk', field)[:batch_size])
+                if not rows:
+                    break
+                entries = [entry for pk, text in rows for entry in build_entries(kind, pk, text)]
+                SearchIndexEntry.objects.bulk_create(entries, batch_size=batch_size)
+                total += len(entries)
+                last_pk = rows[-1][0]
+        counts[kind] = total
+    # Los autocompletados en memoria de cada proceso se reconstruyen desde cero
+    SearchChange.objects.create(kind=SearchChange.RELOAD)
+    return counts
+
+
+# Caracteres cuyo siguiente caracter ordena despues en cualquier collation
+INCREMENTABLE = set('abcdefghijklmnopqrstuvwxy012345678')
+
+
+def prefix_upper_bound(prefix):
+    # Cota exclusiva para los tokens que empiezan con prefix: "mal" -> "mam",
+    # "maz" -> "mb". None si no hay cota (p. ej. "zz").
+    stem = prefix
+    while stem and stem[-1] not in INCREMENTABLE:
+        stem = stem[:-1]
+    return stem[:-1] + chr(ord(stem[-1]) + 1) if stem else None
+
+
+def prefix_filter(prefix, include_exact=True):
+    # SQLite no usa el indice para LIKE 'p%' ESCAPE; el rango token >= p AND
+    # token < cota si se resuelve con un seek en cualquier motor. startswith
+    # descarta lo que sobre del rango.
+    condition = Q(token__startswith=prefix)
+    condition &= Q(token__gte=prefix) if include_exact else Q(token__gt=prefix)
+    upper = prefix_upper_bound(prefix)
+    if upper:
+        condition &= Q(token__lt=upper)
+    return condition
+
+
+def search_ids(kind, query, limit):
+    # Las palabras anteriores a la ultima deben estar completas en el documento
+    # y la ultima puede ser un prefijo (la que se esta escribiendo). Primero van
+    # los documentos donde la ultima tambien esta completa y despues los que la
+    # completan. Cada consulta es un seek sobre (kind, token, object_id) que se
+    # corta en `limit`, sin agregaciones.
+    tokens = tokenize(query)[:MAX_QUERY_TOKENS]
+    if not tokens:
+        return []
+    *words, last = tokens
+    entries = SearchIndexEntry.objects.filter(kind=kind)
+    if not words:
+        # Dentro del rango del prefijo el token exacto es el menor, asi que el
+        # orden del indice ya pone primero las coincidencias completas
+        phases = [
+            entries.filter(prefix_filter(last)).order_by('token', 'object_id').values_list('object_id', flat=True),
+        ]
+    else:
+        required = [entries.filter(token=word).values_list('object_id', flat=True) for word in words]
+        phases = [
+            entries.filter(condition).values_list('object_id', flat=True)
+            .intersection(*required).order_by('object_id')
+            for condition in (Q(token=last), prefix_filter(last, include_exact=False))
+        ]
+    ranked, seen = [], set()
+    for queryset in phases:
+        # Un documento puede tener varios tokens con el mismo prefijo o estar
+        # en las dos fases
+        offset = 0
+        while len(ranked) < limit:
+            batch = list(queryset[offset:offset + limit])
+            for object_id in batch:
+                if object_id not in seen:
+                    seen.add(object_id)
+                    ranked.append(object_id)
+            if len(batch) < limit:
+                break
+            offset += limit
+    return ranked[:limit]
+
+
+def search(kind, query, limit=None, queryset=None):
+    # Devuelve los objetos en orden de relevancia. Sin palabras (q vacio) se
+    # devuelven los primeros `limit`, como antes un icontains '' devolvia todo.
+    limit = limit or settings.SEARCH_RESULT_LIMIT
+    model = DOCUMENTS[kind][0]
+    queryset = model.objects.all() if queryset is None else queryset
+    if not tokenize(query):
+        return list(queryset.order_by('id')[:limit])
+    ids = search_ids(kind, query, limit)
+    objects = queryset.in_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
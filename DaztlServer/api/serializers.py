@@ -1,7 +1,11 @@
+import os
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import (
     User, ArtistProfile, Song, Album,
-    Playlist, Notification, LiveChat, Like
+    Playlist, Notification, LiveChat, Like, UploadSession
 )
 
 # — CU-01 y CU-02: User & Profile
@@ -50,6 +54,11 @@ class SongSerializer(serializers.ModelSerializer):
     class Meta:
         model = Song
         fields = ['id','title','artist_name','audio_url','cover_url','release_date']
+    # Cada serializer con relaciones anidadas declara como precargarlas; las
+    # vistas lo aplican a su queryset para que el listado use un numero fijo de consultas
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.select_related('artist__user')
 
 
 class AlbumSerializer(serializers.ModelSerializer):
@@ -58,12 +67,20 @@ class AlbumSerializer(serializers.ModelSerializer):
     class Meta:
         model = Album
         fields = ['id','title','artist','artist_name','cover_image','songs']
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.select_related('artist__user').prefetch_related(
+            Prefetch('songs', queryset=SongSerializer.setup_eager_loading(Song.objects.all()))
+        )
 
 class ArtistProfileSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     class Meta:
         model = ArtistProfile
         fields = ['id','user','bio','profile_picture']
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.select_related('user')
 
 # — CU-05/06/07: Playlists
 class PlaylistSerializer(serializers.ModelSerializer):
@@ -73,6 +90,12 @@ class PlaylistSerializer(serializers.ModelSerializer):
         model = Playlist
         fields = ['id','name','songs','created_at', 'cover']
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.prefetch_related(
+            Prefetch('songs', queryset=SongSerializer.setup_eager_loading(Song.objects.all()))
+        )
+
 
 # — CU-08/09: Subir contenido
 class SongUploadSerializer(serializers.ModelSerializer):
@@ -80,6 +103,25 @@ class SongUploadSerializer(serializers.ModelSerializer):
         model = Song
         fields = ['title','audio_file', 'cover_image']
 
+class UploadSessionSerializer(serializers.ModelSerializer):
+    expires_at = serializers.SerializerMethodField()
+    class Meta:
+        model = UploadSession
+        fields = ['id','title','filename','total_size','received_bytes','next_chunk','song','created_at','expires_at']
+        read_only_fields = ['id','received_bytes','next_chunk','song','created_at']
+    def get_expires_at(self, obj):
+        # Las sesiones sin actividad durante UPLOAD_SESSION_TTL se eliminan (cleanup_upload_sessions)
+        return obj.updated_at + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+    def validate_filename(self, value):
+        value = os.path.basename(value)
+        if not value:
+            raise serializers.ValidationError("Nombre de archivo inválido.")
+        return value
+    def validate_total_size(self, value):
+        if value <= 0 or value > settings.UPLOAD_SESSION_MAX_SIZE:
+            raise serializers.ValidationError(f"El tamaño debe estar entre 1 y {settings.UPLOAD_SESSION_MAX_SIZE} bytes.")
+        return value
+
 class AlbumUploadSerializer(serializers.ModelSerializer):
     song_ids = serializers.ListField(child=serializers.IntegerField(), write_only=True)
     class Meta:
@@ -96,6 +138,7 @@ class ArtistReportSerializer(serializers.Serializer):
     total_songs = serializers.IntegerField()
     total_albums = serializers.IntegerField()
     total_likes = serializers.IntegerField()
+    total_plays = serializers.IntegerField()
 
 class SystemReportSerializer(serializers.Serializer):
     total_users = serializers.IntegerField()
@@ -109,6 +152,9 @@ class LiveChatSerializer(serializers.ModelSerializer):
     class Meta:
         model = LiveChat
         fields = ['id','song','user','message','timestamp']
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.select_related('user')
 class LikeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Like
@@ -0,0 +1,117 @@
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from . import authentication, broadcast, cache, counters
+from .conditional import playlists_scope, profile_scope
+from .models import Album, ArtistProfile, LiveChat, Playlist, Song, User
+from .search import index_instance, unindex_instance
+
+INDEXED_MODELS = (Song, Album, ArtistProfile, Playlist)
+# Modelos que aparecen en las respuestas cacheadas del catalogo (api/cache.py)
+CATALOG_MODELS = (Song, Album, ArtistProfile)
+
+
+# Los update() y bulk_create() no disparan senales: despues de cargas masivas
+# correr `manage.py rebuild_search_index`
+@receiver(post_save)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    if raw or sender not in INDEXED_MODELS:
+        return
+    index_instance(instance)
+
+
+@receiver(post_delete)
+def remove_from_search_index(sender, instance, **kwargs):
+    if sender in INDEXED_MODELS:
+        unindex_instance(instance)
+
+
+@receiver(post_save, sender=User)
+def update_artist_search_index(sender, instance, raw=False, update_fields=None, **kwargs):
+    # El nombre indexado del artista es el username del usuario
+    if raw or (update_fields is not None and 'username' not in update_fields):
+        return
+    artist = ArtistProfile.objects.filter(user=instance).select_related('user').first()
+    if artist is not None:
+        index_instance(artist)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_catalog_cache(sender, instance, raw=False, **kwargs):
+    if not raw and sender in CATALOG_MODELS:
+        cache.invalidate()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_catalog_cache_for_artist(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Username y datos del usuario se muestran en canciones, albumes y artistas;
+    # el login solo actualiza last_login y no cambia el catalogo
+    if raw or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    if ArtistProfile.objects.filter(user_id=instance.pk).exists():
+        cache.invalidate()
+
+
+@receiver(m2m_changed, sender=Album.songs.through)
+def invalidate_catalog_cache_for_album_songs(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        cache.invalidate()
+
+
+@receiver(post_save, sender=Playlist)
+@receiver(post_delete, sender=Playlist)
+def bump_playlists_version(sender, instance, raw=False, **kwargs):
+    # ETag de las playlists del usuario (api/conditional.py)
+    if not raw:
+        cache.bump_version(playlists_scope(instance.user_id))
+
+
+@receiver(m2m_changed, sender=Playlist.songs.through)
+def bump_playlists_version_for_songs(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        cache.bump_version(playlists_scope(instance.user_id))
+        return
+    # song.playlist_set.add(...): instance es la cancion y pk_set las playlists
+    playlists = Playlist.objects.filter(songs=instance) if pk_set is None else Playlist.objects.filter(pk__in=pk_set)
+    for user_id in set(playlists.values_list('user_id', flat=True)):
+        cache.bump_version(playlists_scope(user_id))
+
+
+@receiver(post_save, sender=User)
+def bump_profile_version(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    cache.bump_version(profile_scope(instance.pk))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_authenticated_user(sender, instance, raw=False, **kwargs):
+    # Usuario guardado en api/authentication.py
+    if not raw:
+        authentication.invalidate_user(instance.pk)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def update_report_counters(sender, instance, raw=False, created=None, **kwargs):
+    # Altas y bajas; created es None en post_delete y False en un update
+    if raw or created is False:
+        return
+    delta = 1 if created else -1
+    if sender in counters.ARTIST_FIELDS:
+        counters.add_to_artist(sender, instance.artist_id, delta)
+    if sender in counters.SYSTEM_NAMES:
+        counters.add(counters.SYSTEM_NAMES[sender], delta)
+
+
+@receiver(post_save, sender=LiveChat)
+def publish_live_chat(sender, instance, created, raw=False, **kwargs):
+    # A los clientes SSE/WebSocket (api/live_chat.py), recien despues del commit
+    if created and not raw:
+        transaction.on_commit(partial(broadcast.publish_chat, instance))
@@ -0,0 +1,52 @@
+# Utilidades para servir archivos de audio por rangos (RFC 7233) desde
+# SongStreamView. static() no soporta Range, asi que cada seek del reproductor
+# volvia a descargar la cancion desde el byte 0.
+import re
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range_header(header, size):
+    # Devuelve (start, end) inclusivo, o None para responder el archivo completo.
+    # Varios rangos en una sola peticion no se soportan y se ignoran (200 completo,
+    # permitido por el RFC); un rango valido pero fuera del archivo es 416.
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # bytes=-N: los ultimos N bytes
+        length = int(end)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable()
+        return max(0, size - length), size - 1
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size or end < start:
+        raise RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+
+def file_etag(stat):
+    # Tamano + mtime: cambia cuando el archivo se reemplaza sin tener que leerlo
+    return f'"{stat.st_size:x}-{int(stat.st_mtime * 1000000):x}"'
+
+
+def iter_file_range(path, start, length, chunk_size):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
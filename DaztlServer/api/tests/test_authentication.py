@@ -0,0 +1,106 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from api.models import User, Playlist
+from api.tests.utils import assert_max_queries
+
+def user_queries(ctx):
+    return [q['sql'] for q in ctx.captured_queries if 'FROM "api_user"' in q['sql']]
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="cacheduser",
+            email="cached@example.com",
+            password="password123",
+            role="listener"
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def test_repeated_requests_reuse_user(self):
+        assert self.client.get(reverse('profile')).status_code == status.HTTP_200_OK
+        with assert_max_queries(10) as ctx:
+            response = self.client.get(reverse('profile'))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['username'] == "cacheduser"
+        assert user_queries(ctx) == []
+
+    def test_profile_update_invalidates_cached_user(self):
+        self.client.get(reverse('profile'))
+        response = self.client.put(reverse('profile-update'), {
+            "username": "cacheduser",
+            "email": "cached@example.com",
+            "first_name": "Nuevo",
+            "last_name": "Nombre",
+        }, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+        assert self.client.get(reverse('profile')).data['first_name'] == "Nuevo"
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(reverse('profile'))
+        self.user.is_active = False
+        self.user.save()
+
+        assert self.client.get(reverse('profile')).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_cache_can_be_disabled(self, settings):
+        from api import authentication
+        settings.AUTH_USER_CACHE_BACKEND = 'off'
+        authentication.reset()
+
+        self.client.get(reverse('profile'))
+        with assert_max_queries(10) as ctx:
+            self.client.get(reverse('profile'))
+        assert len(user_queries(ctx)) == 1
+
+    def test_stateless_reads_skip_user_lookup(self, settings):
+        settings.AUTH_STATELESS_READS = True
+        settings.AUTH_USER_CACHE_BACKEND = 'off'
+        from api import authentication
+        authentication.reset()
+        Playlist.objects.create(user=self.user, name="Mine")
+
+        with assert_max_queries(10) as ctx:
+            response = self.client.get(reverse('playlist-list'))
+        assert [p['name'] for p in response.data] == ["Mine"]
+        assert user_queries(ctx) == []
+
+        # Las escrituras siguen cargando el usuario
+        with assert_max_queries(10) as ctx:
+            response = self.client.post(reverse('playlist-create'), {"name": "Other"}, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert user_queries(ctx)
+
+    def test_each_request_gets_its_own_user(self):
+        from api.authentication import CachedJWTAuthentication
+        auth = CachedJWTAuthentication()
+        token = auth.get_validated_token(str(AccessToken.for_user(self.user)))
+        first = auth.get_user(token)
+        first.first_name = "Cambiado"
+        first._state.fields_cache['playlist'] = object()
+
+        with assert_max_queries(0):
+            second = auth.get_user(token)
+        assert second is not first
+        assert second.first_name == ""
+        assert second._state.fields_cache == {}
+        assert second.pk == self.user.pk and not second._state.adding
+
+    def test_password_change_revokes_old_tokens(self):
+        self.client.get(reverse('profile'))
+        old_token = str(AccessToken.for_user(self.user))
+        # Cambio hecho por otro proceso: la senal no invalida esta cache
+        self.user.set_password("otra-clave")
+        User.objects.filter(pk=self.user.pk).update(password=self.user.password)
+
+        # El token nuevo trae otra version y recarga el usuario de la base
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+        assert self.client.get(reverse('profile')).status_code == status.HTTP_200_OK
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {old_token}")
+        assert self.client.get(reverse('profile')).status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,182 @@
+import importlib
+import io
+import sys
+import threading
+import time
+from datetime import timedelta
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from api import autocomplete
+from api.autocomplete import Autocomplete, AutocompleteIndex, edits
+from api.models import User, ArtistProfile, Song, Album, SearchChange
+from api.search import rebuild_index
+
+def make_index(*rows):
+    index = AutocompleteIndex()
+    index.load(rows)
+    return index
+
+def texts(results):
+    return [result['text'] for result in results]
+
+def test_edits_cover_one_typo():
+    variants = edits("amro", "ao")
+    assert {"amo", "amor", "aamro", "aaro"} <= variants
+    assert "amro" not in variants
+
+class TestAutocompleteIndex:
+    def test_prefix_ranks_exact_then_shorter(self):
+        index = make_index(("song", 1, "Amorfo"), ("song", 2, "Amor"), ("album", 3, "Amor Eterno"))
+
+        assert texts(index.suggest("amo")) == ["Amor", "Amorfo", "Amor Eterno"]
+        assert texts(index.suggest("amor et")) == ["Amor Eterno"]
+        assert index.suggest("amor", limit=1) == [{'kind': 'song', 'id': 2, 'text': 'Amor'}]
+
+    def test_tolerates_typos(self):
+        index = make_index(("song", 1, "Corazón Partío"), ("artist", 2, "rosalía"))
+
+        assert texts(index.suggest("corazno")) == ["Corazón Partío"]
+        assert texts(index.suggest("corzon parti")) == ["Corazón Partío"]
+        assert texts(index.suggest("rosalai")) == ["rosalía"]
+        assert index.suggest("xyz") == []
+
+    def test_filters_by_kind_and_replaces_entries(self):
+        index = make_index(("song", 1, "Luna"), ("album", 1, "Luna Llena"))
+
+        assert texts(index.suggest("lun", kinds=["album"])) == ["Luna Llena"]
+        index.add("song", 1, "Sol")
+        index.remove("album", 1)
+        assert index.suggest("lun") == []
+        assert texts(index.suggest("sol")) == ["Sol"]
+        assert len(index) == 1 and index.dead == 2
+
+    def test_suggest_is_submillisecond(self):
+        words = [f"{a}{b}{c}" for a in "bcdfglmnprst" for b in "aeiou" for c in ("la", "ro", "mi", "ne")]
+        index = make_index(*(("song", i, f"{words[i % len(words)]} {words[(i * 7) % len(words)]}")
+                             for i in range(5000)))
+
+        start = time.perf_counter()
+        for query in ("ba", "mero", "bala fi", "sulo"):
+            index.suggest(query)
+        assert (time.perf_counter() - start) / 4 < 0.001
+
+    def test_suggest_while_entries_are_added(self):
+        # refresh() agrega entradas desde un hilo mientras otros consultan
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        index = make_index(("song", 0, "base"))
+        errors, done = [], threading.Event()
+
+        def read():
+            # Con un limit alto se recorren las postings hasta la ultima
+            # entrada, la que se esta agregando
+            while not done.is_set():
+                try:
+                    for query in ("bal", "bal1", "xbal1"):
+                        index.suggest(query, limit=2000)
+                except Exception as exc:
+                    errors.append(exc)
+                    return
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        try:
+            for i in range(1, 5000):
+                index.add("song", i, f"bal{i % 13} balada{i}")
+                if errors:
+                    break
+        finally:
+            done.set()
+            for reader in readers:
+                reader.join()
+            sys.setswitchinterval(interval)
+
+        assert errors == []
+        assert texts(index.suggest("balada4999"))[0] == "bal7 balada4999"
+
+@pytest.mark.django_db
+class TestAutocompleteService:
+    @pytest.fixture(autouse=True)
+    def media_root(self, tmp_path, settings):
+        settings.MEDIA_ROOT = str(tmp_path)
+        settings.SUGGEST_REFRESH_SECONDS = 0
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.artist_user = User.objects.create_user(
+            username="suggestartist",
+            email="suggest@example.com",
+            password="password123",
+            role="artist"
+        )
+        self.artist = ArtistProfile.objects.create(user=self.artist_user, bio="bio")
+
+    def create_song(self, title):
+        return Song.objects.create(
+            title=title,
+            artist=self.artist,
+            audio_file=SimpleUploadedFile("s.mp3", b"file_content", content_type="audio/mpeg"),
+            cover_image=SimpleUploadedFile("s.png", b"cover", content_type="image/png"),
+        )
+
+    def test_refresh_applies_catalog_changes(self):
+        song = self.create_song("Despacito")
+        engine = Autocomplete()
+        assert texts(engine.suggest("despa")) == ["Despacito"]
+
+        song.title = "Despechá"
+        song.save()
+        Album.objects.create(title="Despedida", artist=self.artist)
+        assert texts(engine.suggest("despe")) == ["Despechá", "Despedida"]
+
+        song.delete()
+        assert texts(engine.suggest("desp")) == ["Despedida"]
+
+    def test_rebuild_forces_reload(self):
+        engine = Autocomplete()
+        engine.refresh(force=True)
+        # bulk_create no dispara senales; rebuild_index avisa con RELOAD
+        Song.objects.bulk_create([Song(title="Bulk Song", artist=self.artist, audio_file="songs/x.mp3")])
+        assert engine.suggest("bulk") == []
+
+        rebuild_index()
+        assert texts(engine.suggest("bulk")) == ["Bulk Song"]
+
+    def test_rest_endpoint(self, monkeypatch):
+        monkeypatch.setattr(autocomplete, 'engine', Autocomplete())
+        self.create_song("Bailando")
+        Album.objects.create(title="Bailar Sola", artist=self.artist)
+
+        response = self.client.get(reverse('search-suggest'), {'q': 'bail'})
+        assert response.status_code == status.HTTP_200_OK
+        assert texts(response.data['suggestions']) == ["Bailando", "Bailar Sola"]
+
+        response = self.client.get(reverse('search-suggest'), {'q': 'bail', 'kind': 'album', 'limit': 'x'})
+        assert response.data['suggestions'] == [
+            {'kind': 'album', 'id': Album.objects.get().id, 'text': "Bailar Sola"}
+        ]
+
+    @pytest.mark.parametrize('enabled', [False, True])
+    def test_wsgi_warm_up_is_opt_in(self, settings, monkeypatch, enabled):
+        settings.SUGGEST_WARM_UP = enabled
+        calls = []
+        monkeypatch.setattr(autocomplete, 'warm_up', lambda: calls.append(True))
+        monkeypatch.delitem(sys.modules, 'daztl.wsgi', raising=False)
+
+        importlib.import_module('daztl.wsgi')
+        assert calls == ([True] if enabled else [])
+
+    def test_prune_search_changes(self):
+        self.create_song("Vieja")
+        SearchChange.objects.update(created_at=timezone.now() - timedelta(days=2))
+        self.create_song("Nueva")
+
+        call_command('prune_search_changes', stdout=io.StringIO())
+
+        assert list(SearchChange.objects.values_list('text', flat=True)) == ["Nueva"]
@@ -0,0 +1,132 @@
+import time
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from api import cache
+from api.cache import LocalCache
+from api.models import User, ArtistProfile, Song, Album, ContentVersion
+from api.tests.utils import assert_max_queries
+
+def test_local_cache_evicts_least_recently_used():
+    local = LocalCache(max_entries=2, timeout=60)
+    local.set("a", 1)
+    local.set("b", 2)
+    assert local.get("a") == 1
+    local.set("c", 3)
+
+    assert local.get("b") is None
+    assert (local.get("a"), local.get("c")) == (1, 3)
+
+def test_local_cache_expires_entries():
+    local = LocalCache(max_entries=10, timeout=0.01)
+    local.set("a", 1)
+    time.sleep(0.02)
+    assert local.get("a") is None
+    assert len(local) == 0
+
+@pytest.mark.django_db
+class TestCatalogCache:
+    @pytest.fixture(autouse=True)
+    def media_root(self, tmp_path, settings):
+        settings.MEDIA_ROOT = str(tmp_path)
+        settings.CATALOG_CACHE_VERSION_SECONDS = 60
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.artist_user = User.objects.create_user(
+            username="cacheartist",
+            email="cache@example.com",
+            password="password123",
+            role="artist"
+        )
+        self.artist = ArtistProfile.objects.create(user=self.artist_user, bio="bio")
+
+    def create_song(self, title):
+        return Song.objects.create(
+            title=title,
+            artist=self.artist,
+            audio_file=SimpleUploadedFile("c.mp3", b"file_content", content_type="audio/mpeg"),
+            cover_image=SimpleUploadedFile("c.png", b"cover", content_type="image/png"),
+        )
+
+    def titles(self, url_name='song-list', **params):
+        response = self.client.get(reverse(url_name), params)
+        assert response.status_code == status.HTTP_200_OK
+        return [item['title'] for item in response.data]
+
+    def test_repeated_read_skips_database(self):
+        self.create_song("Cached Song")
+        assert self.titles() == ["Cached Song"]
+
+        with assert_max_queries(0):
+            assert self.titles() == ["Cached Song"]
+        # Otros parametros son otra clave
+        assert self.titles(q="nada") == []
+        assert cache.stats()['endpoints']['song-list'] == {'hits': 1, 'misses': 2, 'hit_rate': 0.3333}
+
+    def test_model_changes_invalidate(self):
+        song = self.create_song("Before")
+        assert self.titles() == ["Before"]
+
+        song.title = "After"
+        song.save()
+        assert self.titles() == ["After"]
+
+        album = Album.objects.create(title="Album", artist=self.artist)
+        assert [a['songs'] for a in self.client.get(reverse('album-list')).data] == [[]]
+        album.songs.add(song)
+        assert [len(a['songs']) for a in self.client.get(reverse('album-list')).data] == [1]
+
+        self.artist_user.username = "renamed"
+        self.artist_user.save()
+        response = self.client.get(reverse('artist-list'))
+        assert [a['user']['username'] for a in response.data] == ["renamed"]
+
+    def test_change_from_other_process_is_seen_after_version_check(self, settings):
+        self.create_song("Old")
+        assert self.titles() == ["Old"]
+
+        # Otro proceso: cambia la fila y la version sin pasar por la cache de este
+        Song.objects.update(title="New")
+        ContentVersion.objects.filter(scope=cache.CATALOG).update(version=999)
+        assert self.titles() == ["Old"]
+
+        settings.CATALOG_CACHE_VERSION_SECONDS = 0
+        assert self.titles() == ["New"]
+
+    def test_song_detail_cached_and_404_not_cached(self):
+        song = self.create_song("Detail")
+        url = reverse('song-detail', kwargs={'pk': song.id})
+        assert self.client.get(url).data['title'] == "Detail"
+        with assert_max_queries(0):
+            assert self.client.get(url).data['title'] == "Detail"
+
+        missing = reverse('song-detail', kwargs={'pk': song.id + 1})
+        assert self.client.get(missing).status_code == status.HTTP_404_NOT_FOUND
+        assert self.client.get(missing).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_disabled_endpoint_is_not_cached(self, settings):
+        settings.CATALOG_CACHE_DISABLED = ['song-list']
+        self.create_song("Uncached")
+        self.titles()
+        with assert_max_queries(1) as ctx:
+            self.titles()
+        assert len(ctx.captured_queries) == 1
+        assert 'song-list' not in cache.stats()['endpoints']
+
+    def test_stats_endpoint_requires_admin(self):
+        self.client.force_authenticate(user=self.artist_user)
+        assert self.client.get(reverse('catalog-cache')).status_code == status.HTTP_403_FORBIDDEN
+
+        admin = User.objects.create_user(username="cacheadmin", password="password123", is_staff=True)
+        self.client.force_authenticate(user=admin)
+        self.titles()
+        response = self.client.get(reverse('catalog-cache'))
+        assert response.data['backend'] == 'local'
+        assert response.data['endpoints']['song-list']['misses'] == 1
+
+        version = cache.get_version(cache.CATALOG)
+        assert self.client.delete(reverse('catalog-cache')).status_code == status.HTTP_204_NO_CONTENT
+        assert cache.get_version(cache.CATALOG) == version + 1
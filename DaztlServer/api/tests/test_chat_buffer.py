@@ -0,0 +1,165 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError, connection
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from api import chat_buffer, live_chat
+from api.chat_buffer import ChatWriteBuffer, GROUP_COMMIT, WRITE_BEHIND
+from api.models import User, ArtistProfile, Song, LiveChat
+
+
+class ChatBufferSetup:
+    @pytest.fixture(autouse=True)
+    def media_root(self, tmp_path, settings):
+        settings.MEDIA_ROOT = str(tmp_path)
+
+    @pytest.fixture(autouse=True)
+    def published(self, monkeypatch):
+        published = []
+        monkeypatch.setattr(chat_buffer.broadcast, 'publish_chat', lambda chat: published.append(chat.pk))
+        return published
+
+    def setup_method(self):
+        self.client = APIClient()
+        artist_user = User.objects.create_user(username="bufferartist", password="password123", role="artist")
+        artist = ArtistProfile.objects.create(user=artist_user)
+        self.songs = [
+            Song.objects.create(
+                title=title,
+                artist=artist,
+                audio_file=SimpleUploadedFile("b.mp3", b"file_content", content_type="audio/mpeg"),
+                cover_image=SimpleUploadedFile("b.png", b"cover", content_type="image/png"),
+            )
+            for title in ("One", "Two")
+        ]
+        self.user = User.objects.create_user(username="bufferlistener", password="password123")
+        self.client.force_authenticate(self.user)
+
+    def teardown_method(self):
+        chat_buffer.reset()
+
+    def send(self, song, message):
+        return self.client.post(f'/api/songs/{song.id}/chat/send/', {'song': song.id, 'message': message})
+
+
+@pytest.mark.django_db
+class TestWriteBehind(ChatBufferSetup):
+    @pytest.fixture(autouse=True)
+    def buffered(self, settings):
+        settings.CHAT_WRITE_MODE = WRITE_BEHIND
+        # Sin flush automatico: el test decide cuando se guarda
+        chat_buffer.reset(ChatWriteBuffer(interval=3600))
+
+    def test_send_is_acknowledged_before_insert(self, published):
+        one, two = self.songs
+        responses = [self.send(song, text) for song, text in ((one, "a"), (two, "b"), (one, "c"))]
+
+        assert [r.status_code for r in responses] == [status.HTTP_202_ACCEPTED] * 3
+        assert responses[0].data['id'] is None and responses[0].data['message'] == "a"
+        assert not LiveChat.objects.exists()
+
+        assert chat_buffer.get_buffer().flush() == 3
+        chats = list(LiveChat.objects.filter(song=one).order_by('pk'))
+        assert [c.message for c in chats] == ["a", "c"]
+        # La hora es la del envio, no la del lote
+        assert [c.timestamp.isoformat().replace('+00:00', 'Z') for c in chats] == [
+            responses[0].data['timestamp'], responses[2].data['timestamp']
+        ]
+        assert published == list(LiveChat.objects.order_by('pk').values_list('pk', flat=True))
+        assert chat_buffer.get_buffer().stats()['batches'] == 1
+
+    def test_batches_keep_submission_order(self):
+        buffer = ChatWriteBuffer(batch_size=2, interval=3600)
+        chat_buffer.reset(buffer)
+        for i in range(5):
+            self.send(self.songs[0], f"m{i}")
+        buffer.flush()
+
+        assert list(LiveChat.objects.order_by('pk').values_list('message', flat=True)) == [f"m{i}" for i in range(5)]
+        assert buffer.stats()['batches'] == 3
+
+    def test_ids_are_read_back_without_bulk_returning(self, monkeypatch, published):
+        monkeypatch.setattr(type(connection.features), 'can_return_rows_from_bulk_insert', False)
+        self.send(self.songs[0], "a")
+        self.send(self.songs[1], "b")
+        chat_buffer.get_buffer().flush()
+
+        assert sorted(published) == sorted(LiveChat.objects.values_list('pk', flat=True))
+
+    def test_same_instant_messages_get_their_own_ids(self, monkeypatch, published, django_capture_on_commit_callbacks):
+        monkeypatch.setattr(type(connection.features), 'can_return_rows_from_bulk_insert', False)
+        buffer = chat_buffer.get_buffer()
+        at = timezone.now()
+        chats = [LiveChat(song=self.songs[0], user=self.user, message=text, timestamp=at) for text in ("a", "b", "c")]
+        chats.append(LiveChat(song=self.songs[1], user=self.user, message="d", timestamp=at))
+        for chat in chats:
+            buffer.submit(chat)
+        with django_capture_on_commit_callbacks(execute=True):
+            buffer.flush()
+
+        assert [LiveChat.objects.get(pk=chat.pk).message for chat in chats] == ["a", "b", "c", "d"]
+        assert sorted(published) == sorted(chat.pk for chat in chats)
+
+    def test_full_buffer_rejects_before_queueing(self):
+        buffer = ChatWriteBuffer(interval=3600, max_pending=2)
+        chat_buffer.reset(buffer)
+        responses = [self.send(self.songs[0], f"m{i}") for i in range(3)]
+
+        assert [r.status_code for r in responses] == [status.HTTP_202_ACCEPTED] * 2 + [status.HTTP_503_SERVICE_UNAVAILABLE]
+        assert buffer.flush() == 2
+        assert list(LiveChat.objects.values_list('message', flat=True)) == ["m0", "m1"]
+        assert buffer.stats()['rejected'] == 1
+
+    def test_failing_batch_is_dropped_after_max_attempts(self, monkeypatch):
+        buffer = ChatWriteBuffer(interval=3600, max_attempts=2)
+        chat_buffer.reset(buffer)
+        self.send(self.songs[0], "no entra")
+        write = buffer.write
+        monkeypatch.setattr(buffer, 'write', lambda chats: (_ for _ in ()).throw(DatabaseError("persistente")))
+        for _ in range(2):
+            with pytest.raises(DatabaseError):
+                buffer.flush()
+        assert buffer.stats()['pending'] == 0 and buffer.stats()['failed'] == 1
+
+        # La cola ya no esta bloqueada
+        monkeypatch.setattr(buffer, 'write', write)
+        self.send(self.songs[0], "entra")
+        assert buffer.flush() == 1
+        assert list(LiveChat.objects.values_list('message', flat=True)) == ["entra"]
+
+    def test_websocket_messages_use_the_buffer(self):
+        assert live_chat.save_message(self.user, self.songs[0].id, "por socket") is None
+        assert not LiveChat.objects.exists()
+        chat_buffer.get_buffer().flush()
+        assert LiveChat.objects.get().message == "por socket"
+
+    def test_close_flushes_pending_messages(self):
+        self.send(self.songs[0], "al apagar")
+        chat_buffer.reset()
+        assert LiveChat.objects.filter(message="al apagar").exists()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCommittedBatches(ChatBufferSetup):
+    def test_send_waits_for_its_batch(self, settings):
+        settings.CHAT_WRITE_MODE = GROUP_COMMIT
+        chat_buffer.reset(ChatWriteBuffer(interval=0.05))
+        response = self.send(self.songs[0], "durable")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert LiveChat.objects.get(pk=response.data['id']).message == "durable"
+        assert chat_buffer.get_buffer().stats()['written'] == 1
+
+    def test_deleted_song_drops_only_its_messages(self, settings):
+        # Las FK se verifican al commit: hace falta una transaccion real
+        settings.CHAT_WRITE_MODE = WRITE_BEHIND
+        buffer = ChatWriteBuffer(interval=3600)
+        chat_buffer.reset(buffer)
+        self.send(self.songs[0], "queda")
+        self.send(self.songs[1], "se pierde")
+        Song.objects.filter(pk=self.songs[1].pk).delete()
+        buffer.flush()
+
+        assert list(LiveChat.objects.values_list('message', flat=True)) == ["queda"]
+        assert buffer.stats()['discarded'] == 1
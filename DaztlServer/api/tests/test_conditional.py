@@ -0,0 +1,100 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import User, ArtistProfile, Song, Playlist
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    @pytest.fixture(autouse=True)
+    def media_root(self, tmp_path, settings):
+        settings.MEDIA_ROOT = str(tmp_path)
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="etaguser",
+            email="etag@example.com",
+            password="password123",
+            role="listener"
+        )
+        artist_user = User.objects.create_user(
+            username="etagartist",
+            email="etagartist@example.com",
+            password="password123",
+            role="artist"
+        )
+        self.artist = ArtistProfile.objects.create(user=artist_user, bio="bio")
+        self.song = Song.objects.create(
+            title="Etag Song",
+            artist=self.artist,
+            audio_file=SimpleUploadedFile("e.mp3", b"file_content", content_type="audio/mpeg"),
+        )
+
+    def get(self, url, etag=None, **params):
+        extra = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url, params, **extra)
+
+    def test_matching_etag_returns_not_modified(self):
+        first = self.get(reverse('song-list'))
+        assert first.status_code == status.HTTP_200_OK
+        assert first['ETag']
+        assert 'Last-Modified' in first
+        assert 'no-cache' in first['Cache-Control']
+
+        again = self.get(reverse('song-list'), first['ETag'])
+        assert again.status_code == status.HTTP_304_NOT_MODIFIED
+        assert again['ETag'] == first['ETag']
+        assert not again.content
+
+    def test_etag_changes_when_catalog_changes(self):
+        etag = self.get(reverse('song-list'))['ETag']
+        self.song.title = "Renamed"
+        self.song.save()
+
+        response = self.get(reverse('song-list'), etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+        assert [s['title'] for s in response.data] == ["Renamed"]
+
+    def test_etag_depends_on_query(self):
+        full = self.get(reverse('song-list'))['ETag']
+        paged = self.get(reverse('song-list'), page_size=1)['ETag']
+        assert full != paged
+        assert self.get(reverse('song-list'), full, page_size=1).status_code == status.HTTP_200_OK
+
+    def test_song_detail_not_modified(self):
+        url = reverse('song-detail', kwargs={'pk': self.song.pk})
+        etag = self.get(url)['ETag']
+        assert self.get(url, etag).status_code == status.HTTP_304_NOT_MODIFIED
+        assert self.get(reverse('song-detail', kwargs={'pk': 9999})).get('ETag') is None
+
+    def test_playlist_etag_is_per_user(self):
+        playlist = Playlist.objects.create(user=self.user, name="Mine")
+        other = User.objects.create_user(username="other", email="o@example.com", password="password123")
+        self.client.force_authenticate(user=self.user)
+        response = self.get(reverse('playlist-list'))
+        etag = response['ETag']
+        assert 'private' in response['Cache-Control']
+        assert self.get(reverse('playlist-list'), etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+        # Los cambios de otro usuario no invalidan la copia
+        Playlist.objects.create(user=other, name="Theirs")
+        assert self.get(reverse('playlist-list'), etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+        playlist.songs.add(self.song)
+        response = self.get(reverse('playlist-list'), etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+
+    def test_profile_not_modified_until_saved(self):
+        self.client.force_authenticate(user=self.user)
+        etag = self.get(reverse('profile'))['ETag']
+        assert self.get(reverse('profile'), etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+        self.user.first_name = "Nuevo"
+        self.user.save()
+        response = self.get(reverse('profile'), etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['first_name'] == "Nuevo"
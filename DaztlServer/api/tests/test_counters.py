@@ -0,0 +1,123 @@
+import io
+import pytest
+from datetime import date
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from api import counters
+from api.models import User, ArtistProfile, Song, Album, Playlist, SystemCounter
+from api.plays import rollup
+from api.tests.utils import assert_max_queries
+
+@pytest.mark.django_db
+class TestReportCounters:
+    @pytest.fixture(autouse=True)
+    def media_root(self, tmp_path, settings):
+        settings.MEDIA_ROOT = str(tmp_path)
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.artist_user = User.objects.create_user(
+            username="counterartist",
+            email="counter@example.com",
+            password="password123",
+            role="artist"
+        )
+        self.artist = ArtistProfile.objects.create(user=self.artist_user, bio="bio")
+        self.listener = User.objects.create_user(
+            username="counterlistener",
+            email="cl@example.com",
+            password="password123"
+        )
+
+    def create_song(self, title):
+        return Song.objects.create(
+            title=title,
+            artist=self.artist,
+            audio_file=SimpleUploadedFile("c.mp3", b"file_content", content_type="audio/mpeg"),
+            cover_image=SimpleUploadedFile("c.png", b"cover", content_type="image/png"),
+        )
+
+    def artist_report(self):
+        self.client.force_authenticate(user=self.artist_user)
+        with assert_max_queries(1):
+            response = self.client.get('/api/reports/artist/')
+        assert response.status_code == status.HTTP_200_OK
+        return response.data
+
+    def test_artist_counters_follow_creates_and_deletes(self):
+        song = self.create_song("One")
+        self.create_song("Two")
+        Album.objects.create(title="Album", artist=self.artist)
+        song.delete()
+
+        assert self.artist_report() == {'total_songs': 1, 'total_albums': 1, 'total_likes': 0, 'total_plays': 0}
+
+    def test_like_and_unlike_update_artist_counter(self):
+        self.client.force_authenticate(user=self.listener)
+        url = reverse('like-artist', args=[self.artist.id])
+        assert self.client.post(url).status_code == status.HTTP_201_CREATED
+        # Un segundo like del mismo usuario no crea otra fila ni suma
+        self.client.post(url)
+        self.artist.refresh_from_db()
+        assert self.artist.likes_count == 1
+
+        assert self.client.delete(url).status_code == status.HTTP_200_OK
+        self.artist.refresh_from_db()
+        assert self.artist.likes_count == 0
+
+    def test_full_save_of_stale_instance_keeps_counters(self):
+        stale_artist = ArtistProfile.objects.get(pk=self.artist.pk)
+        song = self.create_song("One")
+        stale_song = Song.objects.get(pk=song.pk)
+        rollup({(song.pk, date(2026, 1, 1)): 4})
+
+        stale_artist.bio = "nueva bio"
+        stale_artist.save()
+        stale_song.title = "Uno"
+        stale_song.save()
+
+        artist = ArtistProfile.objects.get(pk=self.artist.pk)
+        assert (artist.bio, artist.songs_count, artist.plays_count) == ("nueva bio", 1, 4)
+        assert Song.objects.filter(pk=song.pk).values_list('title', 'play_count').get() == ("Uno", 4)
+
+        # Nombrados en update_fields si se guardan (correcciones a mano)
+        artist.plays_count = 0
+        artist.save(update_fields=['plays_count'])
+        assert ArtistProfile.objects.get(pk=self.artist.pk).plays_count == 0
+
+    def test_system_report_reads_counters(self):
+        admin = User.objects.create_user(username="counteradmin", password="password123", is_staff=True)
+        self.create_song("One")
+        Playlist.objects.create(user=self.listener, name="Mine")
+        self.client.force_authenticate(user=admin)
+
+        with assert_max_queries(1):
+            response = self.client.get('/api/reports/system/')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {'total_users': 3, 'total_songs': 1, 'total_albums': 0, 'total_playlists': 1}
+
+    def test_deleting_user_cascades_counters(self):
+        self.create_song("One")
+        Playlist.objects.create(user=self.artist_user, name="Mine")
+        self.artist_user.delete()
+
+        assert counters.system_totals() == {'users': 1, 'songs': 0, 'albums': 0, 'playlists': 0}
+
+    def test_reconcile_fixes_drift(self):
+        self.create_song("One")
+        # update() y bulk_create() no pasan por las senales
+        Song.objects.bulk_create([Song(title="Bulk", artist=self.artist, audio_file="songs/b.mp3", cover_image="song_covers/b.png")])
+        SystemCounter.objects.filter(name=counters.USERS).update(value=99)
+
+        out = io.StringIO()
+        call_command('reconcile_counters', stdout=out)
+
+        assert counters.system_totals()[counters.USERS] == 2
+        assert counters.system_totals()[counters.SONGS] == 2
+        self.artist.refresh_from_db()
+        assert self.artist.songs_count == 2
+        assert "3 contadores corregidos" in out.getvalue()
+        assert counters.reconcile() == {}
@@ -0,0 +1,86 @@
+import threading
+import time
+import pytest
+from django.db import connection
+from daztl.db_pool import ConnectionPool, PoolTimeout, close_all, wrapper_class
+
+class FakeConnection:
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+def fake_ping(conn):
+    if not conn.alive:
+        raise RuntimeError("conexion cortada")
+
+def test_reuses_released_connections():
+    pool = ConnectionPool(FakeConnection, size=2)
+    conn, new = pool.checkout()
+    assert new
+    pool.release(conn)
+
+    again, new = pool.checkout()
+    assert again is conn and not new
+    assert pool.stats()["created"] == 1
+    assert pool.stats()["checkouts"] == 2
+
+def test_waits_for_a_free_connection():
+    pool = ConnectionPool(FakeConnection, size=1, timeout=5)
+    conn, _ = pool.checkout()
+    threading.Timer(0.05, pool.release, args=(conn,)).start()
+
+    again, _ = pool.checkout()
+    assert again is conn
+    stats = pool.stats()
+    assert stats["waits"] == 1
+    assert stats["wait_time_max"] >= 0.04
+
+def test_times_out_when_exhausted():
+    pool = ConnectionPool(FakeConnection, size=1, timeout=0.05)
+    pool.checkout()
+    with pytest.raises(PoolTimeout):
+        pool.checkout()
+    assert pool.stats()["timeouts"] == 1
+
+def test_discards_dead_idle_connections():
+    pool = ConnectionPool(FakeConnection, size=1, ping=fake_ping, ping_after=0)
+    conn, _ = pool.checkout()
+    pool.release(conn)
+    conn.alive = False
+
+    replacement, new = pool.checkout()
+    assert new and replacement is not conn
+    assert conn.closed
+    assert pool.stats()["discarded"] == 1
+
+def test_recycles_old_connections():
+    pool = ConnectionPool(FakeConnection, size=1, recycle=0.01)
+    conn, _ = pool.checkout()
+    time.sleep(0.02)
+    pool.release(conn)
+    assert conn.closed
+    assert pool.stats()["open"] == 0
+
+def test_django_wrapper_returns_connection_to_pool(tmp_path, django_db_blocker):
+    settings_dict = {**connection.settings_dict, 'NAME': str(tmp_path / "pool.sqlite3"), 'POOL': {'SIZE': 1}}
+    wrapper_cls = wrapper_class('django.db.backends.sqlite3')
+    with django_db_blocker.unblock():
+        try:
+            first = wrapper_cls(settings_dict, alias='pooltest')
+            with first.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            raw = first.connection
+            first.close()
+
+            second = wrapper_cls(settings_dict, alias='pooltest')
+            with second.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            assert second.connection is raw
+            assert second._pool.stats()["created"] == 1
+            second.close()
+            assert second._pool.stats()["idle"] == 1
+        finally:
+            close_all()
@@ -0,0 +1,117 @@
+from datetime import timedelta
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from api import cache
+from api.models import User, ArtistProfile, Song, ContentVersion
+from daztl import db_router
+
+REPLICA = 'replica'
+
+@pytest.fixture
+def replica(db, tmp_path, settings):
+    # Segunda base SQLite como replica: tiene su propio esquema y sus propios
+    # datos, asi se ve desde cual se leyo cada respuesta. La conexion se crea a
+    # mano, fuera de DATABASES, para que el TestCase de pytest-django la permita
+    config = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(tmp_path / 'replica.sqlite3')}
+    config = connections.configure_settings({DEFAULT_DB_ALIAS: {}, REPLICA: config})[REPLICA]
+    connections[REPLICA] = DatabaseWrapper(config, REPLICA)
+    call_command('migrate', database=REPLICA, run_syncdb=True, verbosity=0)
+    settings.DB_REPLICAS = [REPLICA]
+    settings.DB_REPLICA_MAX_LAG = 5
+    settings.CATALOG_CACHE_BACKEND = 'off'
+    cache.reset()
+    caches[settings.DB_REPLICA_CACHE_ALIAS].clear()
+    db_router.reset()
+    yield REPLICA
+    db_router.reset()
+    connections[REPLICA].close()
+    del connections[REPLICA]
+
+def seed(alias, title):
+    # bulk_create no dispara las senales, que escribirian en el primario
+    User.objects.using(alias).bulk_create([User(id=100, username=f"{alias}-artist", role="artist")])
+    ArtistProfile.objects.using(alias).bulk_create([ArtistProfile(id=100, user_id=100)])
+    Song.objects.using(alias).bulk_create([
+        Song(id=100, title=title, artist_id=100, audio_file="songs/a.mp3", cover_image="song_covers/a.png")
+    ])
+
+def set_version(alias, version, updated_at=None):
+    ContentVersion.objects.using(alias).update_or_create(scope='catalog', defaults={'version': version})
+    ContentVersion.objects.using(alias).filter(scope='catalog').update(updated_at=updated_at or timezone.now())
+
+@pytest.mark.django_db
+class TestReplicaRouter:
+    @pytest.fixture(autouse=True)
+    def seeded(self, replica):
+        seed(DEFAULT_DB_ALIAS, "Primary Song")
+        seed(REPLICA, "Replica Song")
+        set_version(DEFAULT_DB_ALIAS, 3)
+        set_version(REPLICA, 3)
+
+    def setup_method(self):
+        self.client = APIClient()
+
+    def titles(self):
+        response = self.client.get(reverse('song-list'))
+        assert response.status_code == status.HTTP_200_OK
+        return [item['title'] for item in response.data]
+
+    def test_catalog_reads_use_replica(self):
+        assert self.titles() == ["Replica Song"]
+
+    def test_reads_outside_catalog_views_use_primary(self):
+        assert list(Song.objects.values_list('title', flat=True)) == ["Primary Song"]
+        with db_router.replica_reads():
+            assert list(Song.objects.values_list('title', flat=True)) == ["Replica Song"]
+
+    def test_lagging_replica_is_skipped(self):
+        set_version(DEFAULT_DB_ALIAS, 4)
+        set_version(REPLICA, 3, timezone.now() - timedelta(minutes=5))
+        assert db_router.replica_lag(REPLICA) >= 300
+        assert self.titles() == ["Primary Song"]
+
+    def test_replica_within_max_lag_is_used(self):
+        set_version(DEFAULT_DB_ALIAS, 4)
+        set_version(REPLICA, 3, timezone.now() - timedelta(seconds=1))
+        assert db_router.replica_lag(REPLICA) < 5
+        assert self.titles() == ["Replica Song"]
+
+    def test_writer_reads_from_primary_afterwards(self):
+        writer = User.objects.create_user(username="writer", password="password123")
+        reader = User.objects.create_user(username="reader", password="password123")
+        self.client.force_authenticate(writer)
+        response = self.client.post(reverse('playlist-create'), {'name': 'Mine'})
+        assert response.status_code == status.HTTP_201_CREATED
+        assert db_router.is_sticky(writer.pk)
+        assert self.titles() == ["Primary Song"]
+
+        self.client.force_authenticate(reader)
+        assert self.titles() == ["Replica Song"]
+
+    def test_catalog_cache_keeps_replica_version(self, settings):
+        # Lo que se leyo de una replica atrasada queda bajo la version de la
+        # replica: quien lee del primario no recibe esa copia
+        settings.CATALOG_CACHE_BACKEND = 'local'
+        settings.CATALOG_CACHE_VERSION_SECONDS = 60
+        cache.reset()
+        set_version(DEFAULT_DB_ALIAS, 4)
+        set_version(REPLICA, 3, timezone.now() - timedelta(seconds=1))
+        assert self.titles() == ["Replica Song"]
+
+        writer = User.objects.create_user(username="writer", password="password123")
+        db_router.mark_sticky(writer.pk)
+        self.client.force_authenticate(writer)
+        assert self.titles() == ["Primary Song"]
+
+    def test_unreachable_replica_is_skipped(self):
+        connections[REPLICA].close()
+        connections[REPLICA].settings_dict['NAME'] = '/nonexistent/replica.sqlite3'
+        assert not db_router.healthy(REPLICA)
+        assert self.titles() == ["Primary Song"]
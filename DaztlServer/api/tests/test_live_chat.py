@@ -0,0 +1,219 @@
+import asyncio
+import json
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from api import broadcast
+from api.broadcast import DROP_OLDEST, Message, MemoryBroadcast, SlowConsumer, chat_channel
+from api.live_chat import CLOSE_UNAUTHORIZED, websocket_application
+from api.models import User, ArtistProfile, Song, LiveChat
+
+CHANNEL = chat_channel(1)
+
+
+def test_publish_reaches_subscribers_of_the_channel():
+    async def scenario():
+        hub = MemoryBroadcast(queue_size=8, policy='disconnect')
+        first, second, other = hub.subscribe(CHANNEL), hub.subscribe(CHANNEL), hub.subscribe(chat_channel(2))
+        hub.publish(CHANNEL, Message(1, '{}'))
+        received = [await first.get(1), await second.get(1), await other.get(0.01)]
+        first.close()
+        return received, hub.subscribers(CHANNEL), hub.stats()
+
+    received, subscribers, stats = asyncio.run(scenario())
+    assert received == [Message(1, '{}'), Message(1, '{}'), None]
+    assert subscribers == 1
+    assert stats['delivered'] == 2
+
+
+def test_slow_subscriber_is_disconnected():
+    async def scenario():
+        hub = MemoryBroadcast(queue_size=2, policy='disconnect')
+        slow = hub.subscribe(CHANNEL)
+        for i in range(3):
+            hub.publish(CHANNEL, Message(i, '{}'))
+        await asyncio.sleep(0)
+        received = [(await slow.get(0)).id, (await slow.get(0)).id]
+        with pytest.raises(SlowConsumer):
+            await slow.get(0)
+        return received, hub.stats()
+
+    received, stats = asyncio.run(scenario())
+    assert received == [0, 1]
+    assert stats['disconnected'] == 1 and stats['subscribers'] == 0
+
+
+def test_drop_oldest_keeps_latest_messages():
+    async def scenario():
+        hub = MemoryBroadcast(queue_size=2, policy=DROP_OLDEST)
+        subscriber = hub.subscribe(CHANNEL)
+        for i in range(5):
+            hub.publish(CHANNEL, Message(i, '{}'))
+        await asyncio.sleep(0)
+        return [(await subscriber.get(0)).id, (await subscriber.get(0)).id], hub.stats()
+
+    received, stats = asyncio.run(scenario())
+    assert received == [3, 4]
+    assert stats['dropped'] == 3
+
+
+class WebSocket:
+    # Cliente ASGI minimo para websocket_application
+    def __init__(self, path, query=b''):
+        self.scope = {'type': 'websocket', 'path': path, 'query_string': query, 'headers': []}
+        self.inbox = asyncio.Queue()
+        self.outbox = asyncio.Queue()
+
+    async def connect(self):
+        self.task = asyncio.ensure_future(websocket_application(self.scope, self.inbox.get, self.outbox.put))
+        await self.inbox.put({'type': 'websocket.connect'})
+        return await self.receive()
+
+    async def receive(self):
+        return await asyncio.wait_for(self.outbox.get(), 5)
+
+    async def receive_json(self):
+        return json.loads((await self.receive())['text'])
+
+    async def send_json(self, data):
+        await self.inbox.put({'type': 'websocket.receive', 'text': json.dumps(data)})
+
+    async def disconnect(self):
+        await self.inbox.put({'type': 'websocket.disconnect', 'code': 1000})
+        await asyncio.wait_for(self.task, 5)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestLiveChatChannel:
+    @pytest.fixture(autouse=True)
+    def media_root(self, tmp_path, settings):
+        settings.MEDIA_ROOT = str(tmp_path)
+        settings.CHAT_HEARTBEAT_SECONDS = 5
+        broadcast.reset()
+        yield
+        broadcast.reset()
+
+    def setup_method(self):
+        self.client = APIClient()
+        artist_user = User.objects.create_user(username="liveartist", password="password123", role="artist")
+        self.song = Song.objects.create(
+            title="Live",
+            artist=ArtistProfile.objects.create(user=artist_user),
+            audio_file=SimpleUploadedFile("l.mp3", b"file_content", content_type="audio/mpeg"),
+            cover_image=SimpleUploadedFile("l.png", b"cover", content_type="image/png"),
+        )
+        self.user = User.objects.create_user(username="livelistener", password="password123")
+        self.token = str(AccessToken.for_user(self.user))
+        self.path = f'/ws/songs/{self.song.id}/chat/'
+
+    def test_websocket_receives_messages_sent_by_rest_and_socket(self):
+        client = self.client
+        client.force_authenticate(self.user)
+
+        async def scenario():
+            socket = WebSocket(self.path, f'token={self.token}'.encode())
+            assert (await socket.connect())['type'] == 'websocket.accept'
+            await socket.send_json({'message': 'desde el socket'})
+            first = await socket.receive_json()
+
+            # Lo guardado por POST tambien llega, sin polling
+            def post():
+                return client.post(f'/api/songs/{self.song.id}/chat/send/', {'song': self.song.id, 'message': 'por POST'})
+            assert (await sync_to_async(post)()).status_code == status.HTTP_201_CREATED
+            second = await socket.receive_json()
+
+            await socket.send_json({'nada': 1})
+            error = await socket.receive_json()
+            await socket.disconnect()
+            return first, second, error
+
+        first, second, error = async_to_sync(scenario)()
+        assert first['type'] == 'message' and first['data']['message'] == 'desde el socket'
+        assert first['data']['user']['username'] == 'livelistener'
+        assert second['data']['message'] == 'por POST'
+        assert error['type'] == 'error'
+        assert broadcast.get_broadcast().subscribers(chat_channel(self.song.id)) == 0
+
+    def test_websocket_rejects_invalid_token(self):
+        async def scenario():
+            return await WebSocket(self.path, b'token=invalido').connect()
+
+        assert async_to_sync(scenario)() == {'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED}
+
+    def test_websocket_reconnect_backfills_from_last_id(self):
+        chats = [LiveChat.objects.create(song=self.song, user=self.user, message=f"m{i}") for i in range(3)]
+
+        async def scenario():
+            socket = WebSocket(self.path, f'token={self.token}&last_id={chats[0].id}'.encode())
+            await socket.connect()
+            received = [await socket.receive_json(), await socket.receive_json()]
+            await socket.disconnect()
+            return received
+
+        assert [frame['data']['message'] for frame in async_to_sync(scenario)()] == ["m1", "m2"]
+
+    def test_slow_websocket_client_is_closed(self, settings):
+        settings.CHAT_QUEUE_SIZE = 2
+        broadcast.reset()
+        sent = []
+
+        async def blocked_send(event):
+            # El cliente no lee: el primer frame despues del accept no termina de enviarse
+            sent.append(event)
+            if len(sent) > 1 and event['type'] != 'websocket.close':
+                await asyncio.sleep(3600)
+
+        async def scenario():
+            inbox = asyncio.Queue()
+            await inbox.put({'type': 'websocket.connect'})
+            scope = {'type': 'websocket', 'path': self.path, 'query_string': f'token={self.token}'.encode(), 'headers': []}
+            task = asyncio.ensure_future(websocket_application(scope, inbox.get, blocked_send))
+            while not sent:
+                await asyncio.sleep(0.01)
+            hub = broadcast.get_broadcast()
+            for i in range(5):
+                hub.publish(chat_channel(self.song.id), Message(i, '{}'))
+            await asyncio.sleep(0.05)
+            stats = hub.stats()
+            await inbox.put({'type': 'websocket.disconnect', 'code': 1000})
+            await asyncio.wait_for(task, 5)
+            return stats
+
+        stats = async_to_sync(scenario)()
+        assert stats['disconnected'] == 1 and stats['subscribers'] == 0
+
+    def test_sse_streams_backlog_and_live_messages(self):
+        chat = LiveChat.objects.create(song=self.song, user=self.user, message="antes")
+        LiveChat.objects.create(song=self.song, user=self.user, message="perdido")
+
+        async def scenario():
+            response = await AsyncClient().get(
+                reverse('live-chat-events', args=[self.song.id]),
+                headers={'authorization': f'Bearer {self.token}', 'last-event-id': str(chat.id)},
+            )
+            stream = aiter(response.streaming_content)
+            frames = [await anext(stream), await anext(stream)]
+            broadcast.get_broadcast().publish(chat_channel(self.song.id), Message(999, '{"message": "en vivo"}'))
+            frames.append(await anext(stream))
+            return response, [frame.decode() for frame in frames]
+
+        response, frames = async_to_sync(scenario)()
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'text/event-stream'
+        assert frames[0].startswith('retry:')
+        assert frames[1].startswith(f'id: {chat.id + 1}\n') and '"perdido"' in frames[1]
+        assert frames[2] == 'id: 999\ndata: {"message": "en vivo"}\n\n'
+
+    def test_sse_requires_asgi_and_token(self):
+        url = reverse('live-chat-events', args=[self.song.id])
+        assert self.client.get(url, {'token': self.token}).status_code == status.HTTP_501_NOT_IMPLEMENTED
+
+        async def scenario():
+            return await AsyncClient().get(url)
+
+        assert async_to_sync(scenario)().status_code == status.HTTP_401_UNAUTHORIZED
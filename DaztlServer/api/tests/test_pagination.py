@@ -0,0 +1,107 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.core.files.uploadedfile import SimpleUploadedFile
+from datetime import timedelta
+from django.utils import timezone
+from api.models import User, ArtistProfile, Song, LiveChat
+from api.tests.utils import assert_max_queries
+
+@pytest.mark.django_db
+class TestPagination:
+    @pytest.fixture(autouse=True)
+    def media_root(self, tmp_path, settings):
+        settings.MEDIA_ROOT = str(tmp_path)
+        settings.API_PAGE_SIZE = 2
+        settings.API_MAX_PAGE_SIZE = 3
+
+    def setup_method(self):
+        self.client = APIClient()
+        artist_user = User.objects.create_user(
+            username="pageartist",
+            email="page@example.com",
+            password="password123",
+            role="artist"
+        )
+        artist = ArtistProfile.objects.create(user=artist_user, bio="bio")
+        for i in range(5):
+            Song.objects.create(
+                title=f"Page Song {i}",
+                artist=artist,
+                audio_file=SimpleUploadedFile(f"page{i}.mp3", b"file_content", content_type="audio/mpeg")
+            )
+
+    def test_without_params_returns_full_list(self):
+        response = self.client.get(reverse('song-list'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert isinstance(response.data, list)
+        assert len(response.data) == 5
+
+    def test_cursor_walks_all_pages(self):
+        titles = []
+        url = reverse('song-list') + "?page_size=2"
+        while url:
+            response = self.client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.data['results']) <= 2
+            titles += [s['title'] for s in response.data['results']]
+            url = response.data['next']
+
+        assert titles == [f"Page Song {i}" for i in range(5)]
+
+    def test_page_size_is_capped(self):
+        response = self.client.get(reverse('song-list'), {"page_size": 100})
+        assert len(response.data['results']) == 3
+
+        response = self.client.get(reverse('song-list'), {"page_size": "abc"})
+        assert len(response.data['results']) == 2
+
+    def test_global_search_limits_each_section(self):
+        response = self.client.get(reverse('global-search'), {"q": "Page", "page_size": 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [s['title'] for s in response.data['songs']] == ["Page Song 0", "Page Song 1"]
+        assert len(response.data['artists']) == 1
+
+    def chat(self, count):
+        song = Song.objects.first()
+        listener = User.objects.create_user(username="pagelistener", password="password123")
+        self.client.force_authenticate(listener)
+        base = timezone.now() - timedelta(minutes=count)
+        chats = [
+            LiveChat.objects.create(song=song, user=listener, message=f"m{i}", timestamp=base + timedelta(minutes=i))
+            for i in range(count)
+        ]
+        return reverse('live-chat-list', kwargs={'song_id': song.id}), chats
+
+    def messages(self, url, params):
+        with assert_max_queries(1):
+            response = self.client.get(url, params)
+        assert response.status_code == status.HTTP_200_OK
+        return [c['message'] for c in response.data]
+
+    def test_chat_since_id_returns_only_newer(self):
+        url, chats = self.chat(5)
+
+        assert self.messages(url, {"since_id": chats[1].id}) == ["m2", "m3"]
+        assert self.messages(url, {"since_id": chats[1].id, "limit": 3}) == ["m2", "m3", "m4"]
+        assert self.messages(url, {"since_id": chats[4].id}) == []
+
+    def test_chat_limit_returns_latest_and_before_id_walks_back(self):
+        url, chats = self.chat(5)
+
+        assert self.messages(url, {"limit": 2}) == ["m3", "m4"]
+        assert self.messages(url, {"before_id": chats[3].id, "limit": 2}) == ["m1", "m2"]
+        assert self.messages(url, {"since_id": chats[0].id, "before_id": chats[3].id, "limit": 3}) == ["m1", "m2"]
+
+    def test_chat_since_timestamp(self):
+        url, chats = self.chat(4)
+
+        assert self.messages(url, {"since": chats[1].timestamp.isoformat(), "limit": 3}) == ["m2", "m3"]
+
+    def test_chat_without_params_is_ordered_by_id(self):
+        url, _ = self.chat(3)
+
+        assert self.messages(url, {}) == ["m0", "m1", "m2"]
@@ -0,0 +1,126 @@
+import os
+import pytest
+from datetime import date
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from api import plays
+from api.models import User, ArtistProfile, Song, SongPlayDaily
+from api.plays import PlayLog, PlayRecorder, rollup
+from api.tests.utils import assert_max_queries
+
+DAY = date(2026, 1, 1)
+NEXT_DAY = date(2026, 1, 2)
+
+
+@pytest.mark.django_db
+class TestPlays:
+    @pytest.fixture(autouse=True)
+    def media_root(self, tmp_path, settings):
+        settings.MEDIA_ROOT = str(tmp_path)
+        settings.PLAYS_LOG_DIR = str(tmp_path / 'plays')
+        yield
+        plays.reset()
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.artist_user = User.objects.create_user(username="playartist", password="password123", role="artist")
+        self.artist = ArtistProfile.objects.create(user=self.artist_user)
+        self.songs = [
+            Song.objects.create(
+                title=title,
+                artist=self.artist,
+                audio_file=SimpleUploadedFile("p.mp3", b"file_content", content_type="audio/mpeg"),
+                cover_image=SimpleUploadedFile("p.png", b"cover", content_type="image/png"),
+            )
+            for title in ("One", "Two", "Three")
+        ]
+
+    def play_counts(self):
+        return list(Song.objects.order_by('pk').values_list('play_count', flat=True))
+
+    def daily(self):
+        return set(SongPlayDaily.objects.values_list('song_id', 'day', 'plays'))
+
+    def test_flush_rolls_up_per_song_artist_and_day(self):
+        one, two, _ = self.songs
+        recorder = PlayRecorder(buffer=plays.MEMORY, interval=3600)
+        for song, day in ((one, DAY), (one, DAY), (two, DAY), (one, NEXT_DAY)):
+            recorder.record(song.pk, day)
+
+        assert recorder.flush() == 4
+        assert self.play_counts() == [3, 1, 0]
+        assert self.daily() == {(one.pk, DAY, 2), (two.pk, DAY, 1), (one.pk, NEXT_DAY, 1)}
+
+        # El segundo volcado suma a las filas del dia que ya existen
+        recorder.record(one.pk, DAY)
+        recorder.record(two.pk, NEXT_DAY)
+        recorder.flush()
+        self.artist.refresh_from_db()
+        assert self.artist.plays_count == 6
+        assert self.daily() == {(one.pk, DAY, 3), (two.pk, DAY, 1), (one.pk, NEXT_DAY, 1), (two.pk, NEXT_DAY, 1)}
+        assert recorder.stats()['flushes'] == 2
+
+    def test_songs_with_the_same_count_share_one_update(self):
+        counts = {(song.pk, DAY): 5 for song in self.songs}
+        # Lectura de canciones, un UPDATE de canciones y uno del artista,
+        # lectura y alta de las filas del dia, y el savepoint del atomic
+        with assert_max_queries(7):
+            assert rollup(counts) == 15
+        assert self.play_counts() == [5, 5, 5]
+
+    def test_unknown_songs_are_discarded(self):
+        recorder = PlayRecorder(buffer=plays.MEMORY, interval=3600)
+        recorder.record(self.songs[0].pk, DAY)
+        recorder.record(99999, DAY)
+
+        assert recorder.flush() == 1
+        assert recorder.stats()['discarded'] == 1
+        assert not SongPlayDaily.objects.filter(song_id=99999).exists()
+
+    def test_log_replays_segments_left_by_a_dead_process(self, settings):
+        directory = settings.PLAYS_LOG_DIR
+        os.makedirs(directory)
+        with open(os.path.join(directory, 'plays-1-1.log'), 'w') as orphan:
+            # La ultima linea quedo cortada por la caida
+            orphan.write(f"{self.songs[0].pk} {DAY.isoformat()}\n" * 3 + f"{self.songs[1].pk} 2026-")
+
+        recorder = PlayRecorder(buffer=plays.LOG, interval=3600)
+        recorder.recover()
+
+        assert self.play_counts() == [3, 0, 0]
+        assert recorder.stats()['recovered'] == 3
+        assert os.listdir(directory) == [os.path.basename(recorder.log.file.name)]
+
+    def test_log_segments_are_kept_until_flushed(self, settings):
+        recorder = PlayRecorder(buffer=plays.LOG, interval=3600)
+        recorder.record(self.songs[0].pk, DAY)
+        recorder.record(self.songs[0].pk, DAY)
+        segment = recorder.log.file.name
+        assert PlayLog.read(open(segment)) == {(self.songs[0].pk, DAY): 2}
+        # Otro proceso no lo toma como huerfano mientras este lo tiene bloqueado
+        assert PlayLog(settings.PLAYS_LOG_DIR).orphans() == []
+
+        recorder.flush()
+        assert not os.path.exists(segment)
+        assert self.play_counts() == [2, 0, 0]
+
+    def test_record_play_endpoint_defers_writes(self):
+        recorder = PlayRecorder(buffer=plays.MEMORY, interval=3600)
+        plays.reset(recorder)
+        self.client.force_authenticate(self.artist_user)
+        url = reverse('record-play', args=[self.songs[0].pk])
+
+        with assert_max_queries(0):
+            response = self.client.post(url)
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert self.play_counts() == [0, 0, 0]
+
+        recorder.flush()
+        assert self.play_counts() == [1, 0, 0]
+        assert self.client.get('/api/reports/artist/').data['total_plays'] == 1
+
+    def test_record_play_requires_authentication(self):
+        response = self.client.post(reverse('record-play', args=[self.songs[0].pk]))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
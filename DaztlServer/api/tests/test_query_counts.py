@@ -0,0 +1,95 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.core.files.uploadedfile import SimpleUploadedFile
+from api import cache
+from api.models import User, ArtistProfile, Song, Album, Playlist, LiveChat
+from api.tests.utils import assert_max_queries
+
+# Consultas maximas por endpoint. Con force_authenticate la autenticacion no
+# consulta la base, asi que solo cuentan las consultas de la vista.
+# ETAG: la lectura de los sellos de ContentVersion (api/conditional.py)
+ETAG = 1
+QUERY_LIMITS = [
+    ("song-list", 1 + ETAG),
+    ("album-list", 3 + ETAG),
+    ("artist-list", 1 + ETAG),
+    ("playlist-list", 2 + ETAG),
+    ("global-search", 10),
+]
+
+@pytest.mark.django_db
+class TestListQueryCounts:
+    @pytest.fixture(autouse=True)
+    def media_root(self, tmp_path, settings):
+        settings.MEDIA_ROOT = str(tmp_path)
+        # Se cuentan las consultas de la vista sin la cache del catalogo
+        settings.CATALOG_CACHE_BACKEND = 'off'
+        cache.reset()
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.listener = User.objects.create_user(
+            username="querylistener",
+            email="ql@example.com",
+            password="password123",
+            role="listener"
+        )
+        self.client.force_authenticate(user=self.listener)
+        self.created = 0
+
+    def create_catalog(self, count):
+        for i in range(self.created, self.created + count):
+            user = User.objects.create_user(
+                username=f"queryartist{i}",
+                email=f"qa{i}@example.com",
+                password="password123",
+                role="artist"
+            )
+            artist = ArtistProfile.objects.create(user=user, bio="bio")
+            song = Song.objects.create(
+                title=f"Query Song {i}",
+                artist=artist,
+                audio_file=SimpleUploadedFile(f"q{i}.mp3", b"file_content", content_type="audio/mpeg"),
+                cover_image=SimpleUploadedFile(f"q{i}.png", b"cover", content_type="image/png"),
+            )
+            album = Album.objects.create(title=f"Query Album {i}", artist=artist)
+            album.songs.add(song)
+            playlist = Playlist.objects.create(user=self.listener, name=f"Query Playlist {i}")
+            playlist.songs.add(song)
+            LiveChat.objects.create(song=song, user=user, message=f"hola {i}")
+        self.created += count
+
+    def count_queries(self, url, limit):
+        with assert_max_queries(limit) as ctx:
+            response = self.client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        return len(ctx.captured_queries)
+
+    @pytest.mark.parametrize("url_name, limit", QUERY_LIMITS)
+    def test_list_endpoint_queries_do_not_grow(self, url_name, limit):
+        url = reverse(url_name) + "?q=query"
+        self.create_catalog(1)
+        single = self.count_queries(url, limit)
+
+        self.create_catalog(20)
+        assert self.count_queries(url, limit) == single
+
+    def test_live_chat_queries_do_not_grow(self):
+        self.create_catalog(1)
+        song = Song.objects.get()
+        for i in range(20):
+            LiveChat.objects.create(song=song, user=self.listener, message=f"mensaje {i}")
+
+        url = reverse('live-chat-list', kwargs={'song_id': song.id})
+        with assert_max_queries(1):
+            response = self.client.get(url)
+        assert len(response.data) == 21
+
+    def test_helper_reports_extra_queries(self):
+        self.create_catalog(2)
+        with pytest.raises(AssertionError, match="maximo esperado 1"):
+            with assert_max_queries(1):
+                for song in Song.objects.all():
+                    song.artist.user.username
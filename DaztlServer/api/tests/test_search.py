@@ -0,0 +1,100 @@
+import io
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import User, ArtistProfile, Song, Album, Playlist, SearchIndexEntry
+from api.search import tokenize, search
+
+def test_tokenize_folds_accents_and_case():
+    assert tokenize("Canción del ÑANDÚ, canción") == ["cancion", "del", "nandu"]
+
+@pytest.mark.django_db
+class TestSearchIndex:
+    @pytest.fixture(autouse=True)
+    def media_root(self, tmp_path, settings):
+        settings.MEDIA_ROOT = str(tmp_path)
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.artist_user = User.objects.create_user(
+            username="rosalía",
+            email="rosalia@example.com",
+            password="password123",
+            role="artist"
+        )
+        self.artist = ArtistProfile.objects.create(user=self.artist_user, bio="bio")
+
+    def create_song(self, title):
+        return Song.objects.create(
+            title=title,
+            artist=self.artist,
+            audio_file=SimpleUploadedFile("s.mp3", b"file_content", content_type="audio/mpeg"),
+            cover_image=SimpleUploadedFile("s.png", b"cover", content_type="image/png"),
+        )
+
+    def titles(self, query, limit=None):
+        return [song.title for song in search('song', query, limit)]
+
+    def test_prefix_and_accent_insensitive_match(self):
+        self.create_song("Corazón Partío")
+        self.create_song("Otra Canción")
+
+        assert self.titles("corazon part") == ["Corazón Partío"]
+        assert self.titles("CANCIÓN") == ["Otra Canción"]
+        assert self.titles("corazon otra") == []
+
+    def test_whole_word_ranks_before_prefix(self):
+        self.create_song("Amorfo")
+        self.create_song("Amor")
+
+        assert self.titles("amor") == ["Amor", "Amorfo"]
+        assert self.titles("amor", limit=1) == ["Amor"]
+
+        self.create_song("Amor Eternos")
+        self.create_song("Amor Eterno")
+        assert self.titles("amor etern") == ["Amor Eternos", "Amor Eterno"]
+        assert self.titles("amor eterno") == ["Amor Eterno", "Amor Eternos"]
+
+    def test_index_follows_saves_and_deletes(self):
+        song = self.create_song("Primera Version")
+        song.title = "Segunda Version"
+        song.save()
+        assert self.titles("primera") == []
+        assert self.titles("segunda") == ["Segunda Version"]
+
+        song.delete()
+        assert not SearchIndexEntry.objects.filter(kind='song').exists()
+
+    def test_username_change_reindexes_artist(self):
+        self.artist_user.username = "motomami"
+        self.artist_user.save()
+
+        assert search('artist', "moto") == [self.artist]
+        assert search('artist', "rosalia") == []
+
+    def test_rebuild_command(self):
+        self.create_song("Despechá")
+        Album.objects.create(title="Motomami", artist=self.artist)
+        Playlist.objects.create(user=self.artist_user, name="Favoritas")
+        SearchIndexEntry.objects.all().delete()
+
+        call_command('rebuild_search_index', stdout=io.StringIO())
+
+        assert self.titles("despecha") == ["Despechá"]
+        assert [a.title for a in search('album', "moto")] == ["Motomami"]
+        assert [p.name for p in search('playlist', "fav")] == ["Favoritas"]
+        assert search('artist', "rosa") == [self.artist]
+
+    def test_global_search_endpoint(self):
+        self.create_song("Saoko")
+        Album.objects.create(title="Saoko Papi", artist=self.artist)
+
+        response = self.client.get(reverse('global-search'), {"q": "saoko"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [s['title'] for s in response.data['songs']] == ["Saoko"]
+        assert [a['title'] for a in response.data['albums']] == ["Saoko Papi"]
+        assert response.data['artists'] == []
@@ -0,0 +1,108 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.core.files.uploadedfile import SimpleUploadedFile
+from api.models import User, ArtistProfile, Song
+from api.streaming import RangeNotSatisfiable, parse_range_header
+
+AUDIO = bytes(range(256)) * 4  # 1024 bytes
+
+@pytest.mark.django_db
+class TestSongStreamView:
+    @pytest.fixture(autouse=True)
+    def media_root(self, tmp_path, settings):
+        settings.MEDIA_ROOT = str(tmp_path)
+        settings.AUDIO_STREAM_CHUNK_SIZE = 100
+        settings.AUDIO_STREAM_ACCEL_REDIRECT = ''
+        self.settings = settings
+
+    def setup_method(self):
+        self.client = APIClient()
+
+    def create_song(self):
+        artist_user = User.objects.create_user(
+            username="streamartist",
+            email="stream@example.com",
+            password="password123",
+            role="artist"
+        )
+        artist_profile = ArtistProfile.objects.create(user=artist_user, bio="bio")
+        song = Song.objects.create(
+            title="Stream Song",
+            artist=artist_profile,
+            audio_file=SimpleUploadedFile("stream.mp3", AUDIO, content_type="audio/mpeg")
+        )
+        return song, reverse('song-stream', kwargs={'pk': song.pk})
+
+    def test_full_file(self):
+        _, url = self.create_song()
+        response = self.client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert b"".join(response.streaming_content) == AUDIO
+        assert response['Content-Length'] == str(len(AUDIO))
+        assert response['Content-Type'] == "audio/mpeg"
+        assert response['Accept-Ranges'] == "bytes"
+        assert response.has_header('ETag')
+        assert response.has_header('Last-Modified')
+
+    def test_range_request_returns_partial_content(self):
+        _, url = self.create_song()
+        response = self.client.get(url, HTTP_RANGE="bytes=100-349")
+
+        assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+        assert b"".join(response.streaming_content) == AUDIO[100:350]
+        assert response['Content-Range'] == f"bytes 100-349/{len(AUDIO)}"
+        assert response['Content-Length'] == "250"
+
+    def test_suffix_and_open_ranges(self):
+        _, url = self.create_song()
+
+        response = self.client.get(url, HTTP_RANGE="bytes=-24")
+        assert b"".join(response.streaming_content) == AUDIO[-24:]
+
+        response = self.client.get(url, HTTP_RANGE="bytes=1000-")
+        assert b"".join(response.streaming_content) == AUDIO[1000:]
+
+    def test_unsatisfiable_range(self):
+        _, url = self.create_song()
+        response = self.client.get(url, HTTP_RANGE="bytes=5000-")
+
+        assert response.status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        assert response['Content-Range'] == f"bytes */{len(AUDIO)}"
+
+    def test_etag_revalidation(self):
+        _, url = self.create_song()
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        # If-Range con un ETag viejo: el rango se ignora y se envia el archivo completo
+        response = self.client.get(url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"viejo"')
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_accel_redirect_mode(self):
+        self.settings.AUDIO_STREAM_ACCEL_REDIRECT = '/protected-media/'
+        song, url = self.create_song()
+        response = self.client.get(url, HTTP_RANGE="bytes=0-9")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['X-Accel-Redirect'] == f"/protected-media/{song.audio_file.name}"
+        assert response.content == b""
+
+    def test_missing_song(self):
+        response = self.client.get(reverse('song-stream', kwargs={'pk': 9999}))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_parse_range_header():
+    assert parse_range_header(None, 100) is None
+    assert parse_range_header("bytes=0-9", 100) == (0, 9)
+    assert parse_range_header("bytes=90-200", 100) == (90, 99)
+    assert parse_range_header("bytes=-10", 100) == (90, 99)
+    # Varios rangos no se soportan: archivo completo
+    assert parse_range_header("bytes=0-1,5-6", 100) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range_header("bytes=100-", 100)
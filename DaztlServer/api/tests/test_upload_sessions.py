@@ -0,0 +1,176 @@
+import hashlib
+import io
+import os
+from datetime import timedelta
+import pytest
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import User, ArtistProfile, Song, UploadSession
+
+AUDIO = os.urandom(250 * 1024)
+CHUNK = 100 * 1024
+
+def cover_file():
+    buf = io.BytesIO()
+    Image.new("RGB", (8, 8), "blue").save(buf, format="PNG")
+    return SimpleUploadedFile("cover.png", buf.getvalue(), content_type="image/png")
+
+@pytest.mark.django_db
+class TestUploadSessions:
+    @pytest.fixture(autouse=True)
+    def media_root(self, tmp_path, settings):
+        settings.MEDIA_ROOT = str(tmp_path)
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.artist_user = User.objects.create_user(
+            username="sessionartist",
+            email="session@example.com",
+            password="password123",
+            role="artist"
+        )
+        ArtistProfile.objects.create(user=self.artist_user, bio="bio")
+        self.client.force_authenticate(user=self.artist_user)
+
+    def create_session(self, total_size=len(AUDIO)):
+        response = self.client.post(reverse('upload-session-create'), {
+            "title": "Resumable Song",
+            "filename": "resumable.mp3",
+            "total_size": total_size,
+        }, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        return response.data['id']
+
+    def put_chunk(self, session_id, index, offset, data, **extra):
+        url = reverse('upload-session-chunk', kwargs={'pk': session_id, 'index': index})
+        return self.client.put(f"{url}?offset={offset}", data=data,
+                               content_type='application/octet-stream', **extra)
+
+    def upload_all(self, session_id):
+        for index, offset in enumerate(range(0, len(AUDIO), CHUNK)):
+            response = self.put_chunk(session_id, index, offset, AUDIO[offset:offset + CHUNK])
+            assert response.status_code == status.HTTP_200_OK
+
+    def test_full_flow_creates_song(self):
+        session_id = self.create_session()
+        self.upload_all(session_id)
+
+        progress = self.client.get(reverse('upload-session-detail', kwargs={'pk': session_id}))
+        assert progress.data['received_bytes'] == len(AUDIO)
+        assert progress.data['next_chunk'] == 3
+
+        response = self.client.post(reverse('upload-session-finalize', kwargs={'pk': session_id}),
+                                    {"cover_image": cover_file()}, format='multipart')
+        assert response.status_code == status.HTTP_201_CREATED
+
+        song = Song.objects.get(title="Resumable Song")
+        with open(song.audio_file.path, "rb") as f:
+            assert f.read() == AUDIO
+        session = UploadSession.objects.get(pk=session_id)
+        assert session.song == song
+        assert not os.path.exists(session.partial_path)
+
+        # Finalizar otra vez devuelve la misma cancion
+        again = self.client.post(reverse('upload-session-finalize', kwargs={'pk': session_id}), {}, format='multipart')
+        assert again.status_code == status.HTTP_200_OK
+        assert again.data['id'] == song.id
+
+    def test_out_of_order_chunk_is_conflict(self):
+        session_id = self.create_session()
+        self.put_chunk(session_id, 0, 0, AUDIO[:CHUNK])
+
+        response = self.put_chunk(session_id, 2, 2 * CHUNK, AUDIO[2 * CHUNK:])
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.data['next_chunk'] == 1
+        assert response.data['received_bytes'] == CHUNK
+
+    def test_retried_chunk_is_idempotent(self):
+        session_id = self.create_session()
+        self.put_chunk(session_id, 0, 0, AUDIO[:CHUNK])
+
+        response = self.put_chunk(session_id, 0, 0, AUDIO[:CHUNK])
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['received_bytes'] == CHUNK
+
+    def test_chunk_checksum_mismatch_is_rejected(self):
+        session_id = self.create_session()
+        response = self.put_chunk(session_id, 0, 0, AUDIO[:CHUNK], HTTP_X_CHUNK_SHA256="0" * 64)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        valid = hashlib.sha256(AUDIO[:CHUNK]).hexdigest()
+        response = self.put_chunk(session_id, 0, 0, AUDIO[:CHUNK], HTTP_X_CHUNK_SHA256=valid)
+        assert response.status_code == status.HTTP_200_OK
+        session = UploadSession.objects.get(pk=session_id)
+        assert os.path.getsize(session.partial_path) == CHUNK
+
+    def test_chunk_body_is_read_outside_the_transaction(self, monkeypatch):
+        from django.db import connection
+        from api import views
+        session_id = self.create_session()
+        outer_blocks = len(connection.atomic_blocks)
+        seen = []
+        write_chunk = views.write_chunk
+
+        def spy(*args, **kwargs):
+            seen.append(len(connection.atomic_blocks))
+            return write_chunk(*args, **kwargs)
+        monkeypatch.setattr(views, 'write_chunk', spy)
+
+        response = self.put_chunk(session_id, 0, 0, AUDIO[:CHUNK])
+        assert response.status_code == status.HTTP_200_OK
+        assert seen == [outer_blocks]
+
+    def test_chunk_is_discarded_if_session_moved_while_writing(self, monkeypatch):
+        from api import views
+        session_id = self.create_session()
+        write_chunk = views.write_chunk
+
+        def racing_write(*args, **kwargs):
+            write_chunk(*args, **kwargs)
+            # Otro request registra la misma posicion mientras se escribia
+            UploadSession.objects.filter(pk=session_id).update(received_bytes=CHUNK, next_chunk=1)
+        monkeypatch.setattr(views, 'write_chunk', racing_write)
+
+        response = self.put_chunk(session_id, 0, 0, AUDIO[:CHUNK])
+        assert response.status_code == status.HTTP_409_CONFLICT
+        session = UploadSession.objects.get(pk=session_id)
+        assert os.path.getsize(session.partial_path) == 0
+
+    def test_finalize_incomplete_session_is_conflict(self):
+        session_id = self.create_session()
+        self.put_chunk(session_id, 0, 0, AUDIO[:CHUNK])
+
+        response = self.client.post(reverse('upload-session-finalize', kwargs={'pk': session_id}),
+                                    {"cover_image": cover_file()}, format='multipart')
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert not Song.objects.exists()
+
+    def test_listener_cannot_create_session(self):
+        listener = User.objects.create_user(
+            username="sessionlistener",
+            email="sl@example.com",
+            password="password123",
+            role="listener"
+        )
+        self.client.force_authenticate(user=listener)
+        response = self.client.post(reverse('upload-session-create'), {
+            "title": "x", "filename": "x.mp3", "total_size": 10,
+        }, format='json')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_cleanup_removes_stale_sessions(self):
+        stale_id = self.create_session()
+        fresh_id = self.create_session()
+        UploadSession.objects.filter(pk=stale_id).update(updated_at=timezone.now() - timedelta(days=2))
+        stale_path = UploadSession.objects.get(pk=stale_id).partial_path
+
+        call_command('cleanup_upload_sessions', stdout=io.StringIO())
+
+        assert not UploadSession.objects.filter(pk=stale_id).exists()
+        assert not os.path.exists(stale_path)
+        assert UploadSession.objects.filter(pk=fresh_id).exists()
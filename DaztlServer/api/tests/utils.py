@@ -0,0 +1,15 @@
+from contextlib import contextmanager
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@contextmanager
+def assert_max_queries(limit, using=connection):
+    # Falla si el bloque ejecuta mas de `limit` consultas; el mensaje lista las
+    # consultas para encontrar rapido el N+1 que se colo
+    with CaptureQueriesContext(using) as ctx:
+        yield ctx
+    executed = len(ctx.captured_queries)
+    if executed > limit:
+        queries = "\n".join(f"{i}. {q['sql']}" for i, q in enumerate(ctx.captured_queries, start=1))
+        raise AssertionError(f"{executed} consultas ejecutadas, maximo esperado {limit}:\n{queries}")
@@ -0,0 +1,114 @@
+# Soporte para las subidas reanudables (UploadSession). Cada chunk se escribe
+# directamente en su offset del archivo parcial; los bytes anteriores nunca se
+# vuelven a leer y al finalizar el archivo se mueve (no se copia) a MEDIA_ROOT.
+#
+# Un chunk se recibe sin transaccion abierta: los PUT de una misma sesion se
+# ordenan con un flock del archivo parcial y el avance se registra con un
+# UPDATE condicionado a la posicion esperada.
+import fcntl
+import hashlib
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.utils import timezone
+from .models import UploadSession
+
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class ChunkError(Exception):
+    pass
+
+
+class LocalUploadedFile(UploadedFile):
+    # Archivo que ya esta completo en disco. Con temporary_file_path
+    # FileSystemStorage lo mueve a su destino en lugar de copiarlo.
+    def __init__(self, path, name, content_type=None):
+        super().__init__(open(path, 'rb'), name, content_type, os.path.getsize(path))
+        self._path = path
+
+    def temporary_file_path(self):
+        return self._path
+
+
+def create_partial_file(session):
+    os.makedirs(os.path.dirname(session.partial_path), exist_ok=True)
+    open(session.partial_path, 'wb').close()
+
+
+@contextmanager
+def locked_partial_file(session):
+    # Archivo parcial bloqueado (flock) mientras se escribe y registra un chunk
+    try:
+        f = open(session.partial_path, 'r+b')
+    except FileNotFoundError:
+        raise ChunkError("El archivo parcial de la sesión ya no existe") from None
+    with f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        yield f
+
+
+def write_chunk(f, stream, offset, length, expected_sha256=None):
+    sha256 = hashlib.sha256()
+    f.seek(offset)
+    remaining = length
+    while remaining > 0:
+        data = stream.read(min(READ_BLOCK_SIZE, remaining))
+        if not data:
+            f.truncate(offset)
+            raise ChunkError(f"Chunk incompleto: faltaron {remaining} bytes")
+        f.write(data)
+        sha256.update(data)
+        remaining -= len(data)
+    if expected_sha256 and sha256.hexdigest() != expected_sha256.lower():
+        f.truncate(offset)
+        raise ChunkError("El checksum sha256 del chunk no coincide")
+    # Descarta bytes de un intento anterior que se escribio pero nunca se registro
+    f.truncate()
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def record_chunk(session, index, offset, length):
+    # Compare-and-set sobre la posicion esperada; False si la sesion cambio
+    # (se borro o se finalizo) mientras llegaba el chunk
+    now = timezone.now()
+    stored = UploadSession.objects.filter(
+        pk=session.pk, next_chunk=index, received_bytes=offset, song__isnull=True
+    ).update(received_bytes=offset + length, next_chunk=index + 1, updated_at=now)
+    if stored:
+        session.received_bytes, session.next_chunk, session.updated_at = offset + length, index + 1, now
+    return bool(stored)
+
+
+def delete_session(session):
+    try:
+        os.remove(session.partial_path)
+    except FileNotFoundError:
+        pass
+    session.delete()
+
+
+def cleanup_expired_sessions(hours=None, now=None):
+    # Borra las sesiones sin actividad (incluidas las ya finalizadas, cuyo
+    # archivo ya se movio) y los .part que quedaron sin fila en la base
+    hours = settings.UPLOAD_SESSION_TTL_HOURS if hours is None else hours
+    cutoff = (now or timezone.now()) - timedelta(hours=hours)
+    removed = 0
+    for session in UploadSession.objects.filter(updated_at__lt=cutoff):
+        delete_session(session)
+        removed += 1
+
+    orphans = 0
+    sessions_dir = os.path.join(settings.MEDIA_ROOT, 'upload_sessions')
+    if os.path.isdir(sessions_dir):
+        known = {str(pk) for pk in UploadSession.objects.values_list('pk', flat=True)}
+        for entry in os.scandir(sessions_dir):
+            stem = entry.name[:-len('.part')] if entry.name.endswith('.part') else None
+            mtime = datetime.fromtimestamp(entry.stat().st_mtime, tz=dt_timezone.utc)
+            if stem is not None and stem not in known and mtime < cutoff:
+                os.remove(entry.path)
+                orphans += 1
+    return removed, orphans
@@ -1,7 +1,7 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.views import TokenRefreshView
-from . import views
+from . import live_chat, views
     
 urlpatterns = [
     # CU-01 / CU-02
@@ -13,20 +13,25 @@ urlpatterns = [
     path('auth/register-artist/', views.RegisterArtistView.as_view(), name='register-artist'),
 
     # CU-03 / CU-04
-    path('songs/', views.SongListView.as_view()),
-    path('songs/<int:pk>/', views.SongDetailView.as_view()),
-    path('albums/', views.AlbumListView.as_view()),
-    path('artists/', views.ArtistListView.as_view()),
+    path('songs/', views.SongListView.as_view(), name='song-list'),
+    path('songs/<int:pk>/', views.SongDetailView.as_view(), name='song-detail'),
+    path('songs/<int:pk>/stream/', views.SongStreamView.as_view(), name='song-stream'),
+    path('albums/', views.AlbumListView.as_view(), name='album-list'),
+    path('artists/', views.ArtistListView.as_view(), name='artist-list'),
 
     # CU-05/06/07 Playlists
-    path('playlists/create/', views.PlaylistCreateView.as_view()),
+    path('playlists/create/', views.PlaylistCreateView.as_view(), name='playlist-create'),
     path('playlists/<int:pk>/upload_cover/', views.PlaylistUploadCoverView.as_view()),
-    path('playlists/<int:pk>/', views.PlaylistDetailView.as_view()),
+    path('playlists/<int:pk>/', views.PlaylistDetailView.as_view(), name='playlist-detail'),
     path('playlists/<int:pk>/add_song/', views.AddSongToPlaylistView.as_view()),
-    path('playlists/', views.PlaylistListView.as_view()),
+    path('playlists/', views.PlaylistListView.as_view(), name='playlist-list'),
 
     # CU-08/09 Subir contenido
-    path('songs/upload/', views.SongUploadView.as_view()),
+    path('songs/upload/', views.SongUploadView.as_view(), name='song-upload'),
+    path('songs/upload/sessions/', views.UploadSessionCreateView.as_view(), name='upload-session-create'),
+    path('songs/upload/sessions/<uuid:pk>/', views.UploadSessionDetailView.as_view(), name='upload-session-detail'),
+    path('songs/upload/sessions/<uuid:pk>/chunks/<int:index>/', views.UploadSessionChunkView.as_view(), name='upload-session-chunk'),
+    path('songs/upload/sessions/<uuid:pk>/finalize/', views.UploadSessionFinalizeView.as_view(), name='upload-session-finalize'),
     path('albums/upload/', views.AlbumUploadView.as_view()),
 
     # CU-10/11 Reportes
@@ -34,8 +39,13 @@ urlpatterns = [
     path('reports/system/', views.SystemReportView.as_view()),
 
     # CU-12 Chat en vivo
-    path('songs/<int:song_id>/chat/', views.LiveChatListView.as_view()),
+    path('songs/<int:song_id>/chat/', views.LiveChatListView.as_view(), name='live-chat-list'),
     path('songs/<int:song_id>/chat/send/', views.LiveChatCreateView.as_view()),
+    # Modo ASGI: mensajes en vivo por Server-Sent Events (api/live_chat.py)
+    path('songs/<int:song_id>/chat/events/', live_chat.live_chat_events, name='live-chat-events'),
+
+    # Reproducciones (api/plays.py)
+    path('songs/<int:song_id>/play/', views.record_play, name='record-play'), #POST
 
     #CU-13 Like/unlike artista
     path('artists/<int:artist_id>/like/', views.like_artist, name='like-artist'), #POST
@@ -44,5 +54,9 @@ urlpatterns = [
     path('refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     #Implementacion de busqueda generalizada para escritorio
     path('search/', views.GlobalSearchView.as_view(), name='global-search'),
+    #Metricas e invalidacion de la cache del catalogo (solo admin)
+    path('cache/catalog/', views.CatalogCacheView.as_view(), name='catalog-cache'),
+    #Autocompletado mientras se escribe (indice en memoria)
+    path('search/suggest/', views.SuggestView.as_view(), name='search-suggest'),
 
 ]
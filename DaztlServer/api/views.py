@@ -6,15 +6,42 @@ from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.parsers import MultiPartParser
 from rest_framework.parsers import FormParser
+import mimetypes
+import os
+from urllib.parse import quote
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from .pagination import OptionalCursorPagination, chat_window, chat_window_requested, search_limit
+from .search import search
+from .cache import CachedResponseMixin
+from .conditional import ConditionalGetMixin
+from .authentication import StatelessReadJWTAuthentication
+from daztl.db_router import ReplicaReadMixin
+from . import cache
+from . import counters
+from . import chat_buffer
+from . import plays
+from . import autocomplete
+from .streaming import RangeNotSatisfiable, parse_range_header, file_etag, iter_file_range
+from django.db import transaction
+from rest_framework.exceptions import PermissionDenied
+from .uploads import (
+    ChunkError, LocalUploadedFile, cleanup_expired_sessions, create_partial_file,
+    delete_session, locked_partial_file, record_chunk, write_chunk
+)
 from .models import (
     User, ArtistProfile, Song, Album,
-    Playlist, Notification, Like, LiveChat
+    Playlist, Notification, Like, LiveChat, UploadSession
 )
 from .serializers import (
     RegisterSerializer, UserSerializer, ProfileUpdateSerializer,
     SongSerializer, AlbumSerializer, ArtistProfileSerializer,
     PlaylistSerializer, SongUploadSerializer, AlbumUploadSerializer,
-    LiveChatSerializer, ArtistReportSerializer, SystemReportSerializer, LikeSerializer, ProfilePictureUploadSerializer
+    LiveChatSerializer, ArtistReportSerializer, SystemReportSerializer, LikeSerializer, ProfilePictureUploadSerializer,
+    UploadSessionSerializer
 )
 
 NotificationSerializer = None
@@ -87,31 +114,96 @@ class ProfileUpdateView(generics.UpdateAPIView):
     def get_object(self):
         return self.request.user
 
-class SongListView(generics.ListAPIView):
+class SongListView(ReplicaReadMixin, ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = SongSerializer
+    pagination_class = OptionalCursorPagination
+    cache_endpoint = 'song-list'
+    conditional_scopes = ('catalog',)
     def get_queryset(self):
         q = self.request.query_params.get('q','')
-        return Song.objects.filter(title__icontains=q)
+        return SongSerializer.setup_eager_loading(Song.objects.filter(title__icontains=q))
 
-class AlbumListView(generics.ListAPIView):
+class AlbumListView(ReplicaReadMixin, ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = AlbumSerializer
+    pagination_class = OptionalCursorPagination
+    cache_endpoint = 'album-list'
+    conditional_scopes = ('catalog',)
     def get_queryset(self):
         q = self.request.query_params.get('q','')
-        return Album.objects.filter(title__icontains=q)
+        return AlbumSerializer.setup_eager_loading(Album.objects.filter(title__icontains=q))
 
-class ArtistListView(generics.ListAPIView):
+class ArtistListView(ReplicaReadMixin, ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = ArtistProfileSerializer
+    pagination_class = OptionalCursorPagination
+    cache_endpoint = 'artist-list'
+    conditional_scopes = ('catalog',)
     def get_queryset(self):
         q = self.request.query_params.get('q','')
-        return ArtistProfile.objects.filter(user__username__icontains=q)
+        return ArtistProfileSerializer.setup_eager_loading(ArtistProfile.objects.filter(user__username__icontains=q))
 
-class SongDetailView(generics.RetrieveAPIView):
+class SongDetailView(ReplicaReadMixin, ConditionalGetMixin, CachedResponseMixin, generics.RetrieveAPIView):
     permission_classes = [permissions.AllowAny]
-    queryset = Song.objects.all()
+    queryset = SongSerializer.setup_eager_loading(Song.objects.all())
     serializer_class = SongSerializer
+    cache_endpoint = 'song-detail'
+    conditional_scopes = ('catalog',)
+
+class SongStreamView(APIView):
+    # Audio con soporte de Range/206 y validacion por ETag/Last-Modified para
+    # que el reproductor pueda adelantar sin descargar la cancion completa
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, pk):
+        song = get_object_or_404(Song, pk=pk)
+        try:
+            path = song.audio_file.path
+            stat = os.stat(path)
+        except (ValueError, FileNotFoundError):
+            return Response({"detail": "Archivo de audio no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+        etag = file_etag(stat)
+        last_modified = int(stat.st_mtime)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if settings.AUDIO_STREAM_ACCEL_REDIRECT:
+            # nginx lee el archivo con sendfile y resuelve el Range por su cuenta
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = settings.AUDIO_STREAM_ACCEL_REDIRECT.rstrip('/') + '/' + quote(song.audio_file.name)
+        else:
+            size = stat.st_size
+            range_header = request.META.get('HTTP_RANGE')
+            if_range = request.META.get('HTTP_IF_RANGE')
+            if if_range and if_range not in (etag, http_date(last_modified)):
+                # El archivo cambio desde que el cliente guardo el rango: se envia completo
+                range_header = None
+            try:
+                byte_range = parse_range_header(range_header, size)
+            except RangeNotSatisfiable:
+                response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+
+            start, end = byte_range or (0, size - 1)
+            length = end - start + 1
+            response = StreamingHttpResponse(
+                iter_file_range(path, start, length, settings.AUDIO_STREAM_CHUNK_SIZE),
+                status=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+                content_type=content_type,
+            )
+            response['Content-Length'] = str(length)
+            if byte_range:
+                response['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+        response['Accept-Ranges'] = 'bytes'
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
 
 class PlaylistCreateView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -138,11 +230,14 @@ class PlaylistUploadCoverView(APIView):
 
         return Response({"message": "Cover subido exitosamente."}, status=status.HTTP_200_OK)
 
-class PlaylistDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PlaylistDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
+    authentication_classes = [StatelessReadJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = PlaylistSerializer
+    # Las playlists incluyen las canciones: cambian con el catalogo tambien
+    conditional_scopes = ('catalog', 'playlists:{user}')
     def get_queryset(self):
-        return Playlist.objects.filter(user=self.request.user)
+        return PlaylistSerializer.setup_eager_loading(Playlist.objects.filter(user_id=self.request.user.pk))
 
 class AddSongToPlaylistView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -159,12 +254,15 @@ class AddSongToPlaylistView(APIView):
         except Song.DoesNotExist:
             return Response({"status": "error", "message": "Canción no encontrada"}, status=404)
 
-class PlaylistListView(generics.ListAPIView):
+class PlaylistListView(ConditionalGetMixin, generics.ListAPIView):
+    authentication_classes = [StatelessReadJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = PlaylistSerializer
+    pagination_class = OptionalCursorPagination
+    conditional_scopes = ('catalog', 'playlists:{user}')
 
     def get_queryset(self):
-        return Playlist.objects.filter(user=self.request.user)
+        return PlaylistSerializer.setup_eager_loading(Playlist.objects.filter(user_id=self.request.user.pk))
 class SongUploadView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = SongUploadSerializer
@@ -172,51 +270,201 @@ class SongUploadView(generics.CreateAPIView):
         artist_profile = self.request.user.artistprofile
         ser.save(artist=artist_profile)
 
+# Subida reanudable: crear sesion -> PUT de chunks numerados -> finalizar
+class UploadSessionCreateView(generics.CreateAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = UploadSessionSerializer
+    def perform_create(self, ser):
+        artist = ArtistProfile.objects.filter(user=self.request.user).first()
+        if artist is None:
+            raise PermissionDenied("Solo los artistas pueden subir canciones.")
+        # Limpieza oportunista de sesiones abandonadas
+        cleanup_expired_sessions()
+        create_partial_file(ser.save(artist=artist))
+
+class UploadSessionDetailView(generics.RetrieveDestroyAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = UploadSessionSerializer
+    def get_queryset(self):
+        return UploadSession.objects.filter(artist__user=self.request.user)
+    def perform_destroy(self, session):
+        delete_session(session)
+
+class UploadSessionChunkView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def put(self, request, pk, index):
+        try:
+            offset = int(request.query_params['offset'])
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (KeyError, ValueError):
+            return Response({"error": "Se requiere el parámetro offset."}, status=status.HTTP_400_BAD_REQUEST)
+        if length <= 0:
+            return Response({"error": "El chunk está vacío."}, status=status.HTTP_400_BAD_REQUEST)
+        if length > settings.UPLOAD_SESSION_MAX_CHUNK_SIZE:
+            return Response({"error": f"El chunk excede {settings.UPLOAD_SESSION_MAX_CHUNK_SIZE} bytes."},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        with transaction.atomic():
+            # Lock corto: solo valida la posicion, sin esperar el cuerpo
+            session = get_object_or_404(UploadSession.objects.select_for_update(), pk=pk, artist__user=request.user)
+            response = self.check_position(session, index, offset, length)
+        if response is not None:
+            return response
+        # El cuerpo y el fsync van fuera de la transaccion: un cliente lento no
+        # retiene el lock de la fila ni la conexion. El flock del archivo
+        # parcial ordena los PUT concurrentes de la sesion
+        try:
+            with locked_partial_file(session) as f:
+                try:
+                    session.refresh_from_db(fields=['received_bytes', 'next_chunk', 'song'])
+                except UploadSession.DoesNotExist:
+                    raise Http404
+                response = self.check_position(session, index, offset, length)
+                if response is not None:
+                    return response
+                write_chunk(f, request.stream, offset, length, request.META.get('HTTP_X_CHUNK_SHA256'))
+                if not record_chunk(session, index, offset, length):
+                    f.truncate(offset)
+                    return Response({"error": "La sesión cambió mientras se recibía el chunk."},
+                                    status=status.HTTP_409_CONFLICT)
+        except ChunkError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(UploadSessionSerializer(session).data)
+
+    def check_position(self, session, index, offset, length):
+        # Respuesta si el chunk no se debe escribir, None si va en la posicion actual
+        if session.song_id:
+            return Response({"error": "La sesión ya fue finalizada."}, status=status.HTTP_409_CONFLICT)
+        if index < session.next_chunk and offset + length <= session.received_bytes:
+            # Reintento de un chunk que ya se guardo (la respuesta anterior se perdio)
+            return Response(UploadSessionSerializer(session).data)
+        if index != session.next_chunk or offset != session.received_bytes:
+            return Response({
+                "error": "El chunk no corresponde a la posición actual de la sesión.",
+                "next_chunk": session.next_chunk,
+                "received_bytes": session.received_bytes,
+            }, status=status.HTTP_409_CONFLICT)
+        if offset + length > session.total_size:
+            return Response({"error": "El chunk excede el tamaño declarado del archivo."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return None
+
+class UploadSessionFinalizeView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request, pk):
+        with transaction.atomic():
+            session = get_object_or_404(UploadSession.objects.select_for_update(), pk=pk, artist__user=request.user)
+            if session.song_id:
+                return Response(SongSerializer(session.song, context={'request': request}).data)
+            if not session.is_complete:
+                return Response({
+                    "error": "Faltan chunks por subir.",
+                    "received_bytes": session.received_bytes,
+                    "total_size": session.total_size,
+                }, status=status.HTTP_409_CONFLICT)
+
+            audio_file = LocalUploadedFile(session.partial_path, session.filename)
+            try:
+                ser = SongUploadSerializer(data={
+                    'title': session.title,
+                    'audio_file': audio_file,
+                    'cover_image': request.FILES.get('cover_image'),
+                })
+                if not ser.is_valid():
+                    return Response(ser.errors, status=status.HTTP_400_BAD_REQUEST)
+                song = ser.save(artist=session.artist)
+            finally:
+                audio_file.close()
+            session.song = song
+            session.save(update_fields=['song', 'updated_at'])
+        return Response(SongSerializer(song, context={'request': request}).data, status=status.HTTP_201_CREATED)
+
 class AlbumUploadView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = AlbumUploadSerializer
     def get_serializer_context(self):
         return {'request': self.request}
 
-class ArtistReportView(APIView):
+class ArtistReportView(ReplicaReadMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
     def get(self, req):
-        art = req.user.artistprofile
+        # Contadores mantenidos por api/counters.py; se leen siempre de la
+        # base, no del artistprofile que pueda traer cacheado el usuario
+        art = ArtistProfile.objects.get(user_id=req.user.pk)
         data = {
-            'total_songs': art.songs.count(),
-            'total_albums': art.albums.count(),
-            'total_likes': Like.objects.filter(artist=art).count()
+            'total_songs': art.songs_count,
+            'total_albums': art.albums_count,
+            'total_likes': art.likes_count,
+            'total_plays': art.plays_count
         }
         return Response(ArtistReportSerializer(data).data)
 
-class SystemReportView(APIView):
+class SystemReportView(ReplicaReadMixin, APIView):
     permission_classes = [permissions.IsAdminUser]
     def get(self, _):
+        totals = counters.system_totals()
         data = {
-            'total_users': User.objects.count(),
-            'total_songs': Song.objects.count(),
-            'total_albums': Album.objects.count(),
-            'total_playlists': Playlist.objects.count()
+            'total_users': totals[counters.USERS],
+            'total_songs': totals[counters.SONGS],
+            'total_albums': totals[counters.ALBUMS],
+            'total_playlists': totals[counters.PLAYLISTS]
         }
         return Response(SystemReportSerializer(data).data)
 
+class CatalogCacheView(APIView):
+    # Metricas de la cache del catalogo de este proceso; DELETE la invalida en todos
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(cache.stats())
+
+    def delete(self, request):
+        cache.invalidate()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 class LiveChatListView(generics.ListAPIView):
+    authentication_classes = [StatelessReadJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = LiveChatSerializer
+    pagination_class = OptionalCursorPagination
     def get_queryset(self):
         song_id = self.kwargs['song_id']
-        return LiveChat.objects.filter(song_id=song_id)
+        chats = LiveChatSerializer.setup_eager_loading(LiveChat.objects.filter(song_id=song_id))
+        # since_id/before_id/since/limit: solo la ventana pedida, sin cursor
+        if chat_window_requested(self.request.query_params):
+            return chat_window(chats, self.request.query_params)
+        return chats.order_by('pk')
+
+    def paginate_queryset(self, queryset):
+        if chat_window_requested(self.request.query_params):
+            return None
+        return super().paginate_queryset(queryset)
 
 class LiveChatCreateView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = LiveChatSerializer
-    def perform_create(self, ser):
-        ser.save(user=self.request.user)
+    def create(self, request, *args, **kwargs):
+        ser = self.get_serializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        # 202 sin id con CHAT_WRITE_MODE=write_behind: se guarda con el proximo lote
+        try:
+            stored = chat_buffer.save_chat(ser, request.user)
+        except chat_buffer.ChatBufferFull:
+            return Response({"detail": "Chat saturado, reintentar mas tarde"},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '1'})
+        return Response(ser.data, status=status.HTTP_201_CREATED if stored else status.HTTP_202_ACCEPTED)
         # CU-XX Obtener perfil del usuario autenticado
-class ProfileView(APIView):
+class ProfileView(ConditionalGetMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
+    conditional_scopes = ('profile:{user}',)
 
     def get(self, request):
+        return self.conditional_get(request, self.profile)
+
+    def profile(self, request):
         user = request.user
         profile_picture_url = ""
         if user.profile_picture:
@@ -248,7 +496,7 @@ class ProfilePictureUploadView(APIView):
 from django.http import Http404
 from rest_framework import status
 from rest_framework.response import Response
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, authentication_classes
 from .models import Like, ArtistProfile
 
 # --- CU-13: Like/Unlike artista ---
@@ -271,10 +519,19 @@ def like_artist(request, artist_id):
             return Response({"error": "Like no encontrado"}, status=status.HTTP_404_NOT_FOUND)
 
 @api_view(['GET'])
+@authentication_classes([StatelessReadJWTAuthentication])
 def is_liked(request, artist_id):
-    is_liked = Like.objects.filter(user=request.user, artist_id=artist_id).exists()
+    is_liked = Like.objects.filter(user_id=request.user.pk, artist_id=artist_id).exists()
     return Response({"liked": is_liked}, status=status.HTTP_200_OK)
 
+# --- Reproducciones ---
+@api_view(['POST'])
+def record_play(request, song_id):
+    # No toca la base: api/plays.py la suma al proximo volcado, y descarta
+    # entonces las de canciones que no existen
+    plays.record(song_id)
+    return Response({"status": "Reproduccion registrada"}, status=status.HTTP_202_ACCEPTED)
+
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
@@ -306,16 +563,18 @@ class CustomLoginView(TokenObtainPairView):
             }
     serializer_class = CustomTokenSerializer
 
-class GlobalSearchView(APIView):
+class GlobalSearchView(ReplicaReadMixin, APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
         query = request.query_params.get('q', '')
+        limit = search_limit(request)
 
-        songs = Song.objects.filter(title__icontains=query)
-        albums = Album.objects.filter(title__icontains=query)
-        artists = ArtistProfile.objects.filter(user__username__icontains=query)
-        playlists = Playlist.objects.filter(name__icontains=query)
+        # Resultados ordenados por relevancia desde el indice de api/search.py
+        songs = search('song', query, limit, SongSerializer.setup_eager_loading(Song.objects.all()))
+        albums = search('album', query, limit, AlbumSerializer.setup_eager_loading(Album.objects.all()))
+        artists = search('artist', query, limit, ArtistProfileSerializer.setup_eager_loading(ArtistProfile.objects.all()))
+        playlists = search('playlist', query, limit, PlaylistSerializer.setup_eager_loading(Playlist.objects.all()))
 
         songs_data = SongSerializer(songs, many=True).data
         albums_data = AlbumSerializer(albums, many=True).data
@@ -327,4 +586,14 @@ class GlobalSearchView(APIView):
             'albums': albums_data,
             'artists': artists_data,
             'playlists': playlists_data
-        })
\ No newline at end of file
+        })
+
+class SuggestView(APIView):
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        # Sugerencias mientras se escribe, desde el indice en memoria de api/autocomplete.py
+        query = request.query_params.get('q', '')
+        limit = autocomplete.parse_limit(request.query_params.get('limit'))
+        kinds = autocomplete.parse_kinds(request.query_params.getlist('kind'))
+        return Response({'suggestions': autocomplete.suggest(query, limit, kinds)})
@@ -0,0 +1,127 @@
+# Compara la latencia de cada RPC del servicer con el backend HTTP (proxy a la
+# API REST) y con el backend ORM (modelos de Django en el mismo proceso).
+#
+# El modo http necesita la API REST levantada (API_BASE_URL); ambos modos usan
+# la base de datos configurada en DJANGO_SETTINGS_MODULE.
+#
+#   python benchmarks/bench_backends.py --iterations 200 --token <jwt> --playlist-id 3
+import argparse
+import os
+import statistics
+import sys
+import time
+
+RPC_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "daztl_rpc")
+sys.path.insert(0, RPC_ROOT)
+
+from backends import BACKEND_MODES, get_backend  # noqa: E402
+from server import MusicServiceServicer  # noqa: E402
+import proto.daztl_service_pb2 as pb2  # noqa: E402
+
+
+class BenchContext:
+    def __init__(self, token=None):
+        self.metadata = [("authorization", f"Bearer {token}")] if token else []
+        self.code = None
+
+    def invocation_metadata(self):
+        return self.metadata
+
+    def set_code(self, code):
+        self.code = code
+
+    def set_details(self, details):
+        pass
+
+    def abort(self, code, details):
+        self.code = code
+        raise RuntimeError(details)
+
+
+def build_calls(args):
+    calls = {
+        "ListSongs": lambda s, c: s.ListSongs(pb2.PageRequest(), c),
+        "GetSong": lambda s, c: s.GetSong(pb2.SongIdRequest(id=args.song_id), c),
+        "ListAlbums": lambda s, c: s.ListAlbums(pb2.PageRequest(), c),
+        "ListArtists": lambda s, c: s.ListArtists(pb2.PageRequest(), c),
+        "SearchSongs": lambda s, c: s.SearchSongs(pb2.SearchRequest(query=args.query), c),
+        "GlobalSearch": lambda s, c: s.GlobalSearch(pb2.SearchRequest(query=args.query), c),
+    }
+    if args.token:
+        calls.update({
+            "GetProfile": lambda s, c: s.GetProfile(pb2.Empty(), c),
+            "ListPlaylists": lambda s, c: s.ListPlaylists(pb2.PlaylistListRequest(token=args.token), c),
+            "IsArtistLiked": lambda s, c: s.IsArtistLiked(
+                pb2.ArtistIdRequest(artist_id=args.artist_id, token=args.token), c),
+        })
+        if args.playlist_id:
+            calls["GetPlaylistDetail"] = lambda s, c: s.GetPlaylistDetail(
+                pb2.PlaylistDetailRequest(token=args.token, playlist_id=args.playlist_id), c)
+    if args.rpcs:
+        calls = {name: fn for name, fn in calls.items() if name in args.rpcs}
+    return calls
+
+
+def run(servicer, call, iterations, warmup, token):
+    for _ in range(warmup):
+        call(servicer, BenchContext(token))
+    samples = []
+    errors = 0
+    for _ in range(iterations):
+        context = BenchContext(token)
+        start = time.perf_counter()
+        try:
+            call(servicer, context)
+        except RuntimeError:
+            pass
+        samples.append((time.perf_counter() - start) * 1000)
+        if context.code is not None:
+            errors += 1
+    samples.sort()
+    return {
+        "mean": statistics.fmean(samples),
+        "p50": samples[len(samples) // 2],
+        "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark http vs orm backend por RPC")
+    parser.add_argument("--modes", nargs="+", choices=BACKEND_MODES, default=list(BACKEND_MODES))
+    parser.add_argument("--rpcs", nargs="*", help="Limitar a estos RPCs")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--token", help="JWT de acceso para los RPCs autenticados")
+    parser.add_argument("--song-id", type=int, default=1)
+    parser.add_argument("--artist-id", type=int, default=1)
+    parser.add_argument("--playlist-id", type=int)
+    parser.add_argument("--query", default="a")
+    args = parser.parse_args()
+
+    calls = build_calls(args)
+    results = {}
+    for mode in args.modes:
+        servicer = MusicServiceServicer(get_backend(mode))
+        for name, call in calls.items():
+            results[(name, mode)] = run(servicer, call, args.iterations, args.warmup, args.token)
+
+    header = f"{'RPC':<20}" + "".join(f"{mode + ' mean':>12}{mode + ' p95':>12}" for mode in args.modes)
+    if len(args.modes) == 2:
+        header += f"{'speedup':>10}"
+    print(header)
+    for name in calls:
+        row = f"{name:<20}"
+        for mode in args.modes:
+            r = results[(name, mode)]
+            row += f"{r['mean']:>10.2f}ms{r['p95']:>10.2f}ms"
+            if r["errors"]:
+                row += f" ({r['errors']} err)"
+        if len(args.modes) == 2:
+            first, second = (results[(name, mode)]["mean"] for mode in args.modes)
+            row += f"{first / second:>9.1f}x"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# Fan-out del chat en vivo (daztl_rpc/chat_hub.py): miles de suscriptores
+# asyncio en la misma cancion, como los SubscribeChat de grpc.aio, y un
+# emisor que publica N mensajes. Mide cuanto tarda publish(), la latencia
+# desde que se publica hasta que cada suscriptor lo lee (p50/p99) y los
+# mensajes entregados por segundo. No toca la base ni la red.
+#
+#   python benchmarks/bench_chat_hub.py --subscribers 1000 5000 --messages 200
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+RPC_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "daztl_rpc")
+sys.path.insert(0, RPC_ROOT)
+
+from chat_hub import SLOW_CONSUMER_POLICIES, ChatHub  # noqa: E402
+
+SONG_ID = 1
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def listen(subscription, count, latencies):
+    received = 0
+    async for sent_at in subscription:
+        latencies.append(time.perf_counter() - sent_at)
+        received += 1
+        if received == count:
+            break
+    subscription.close()
+    return received
+
+
+async def run(subscribers, messages, queue_size, policy, interval):
+    hub = ChatHub(queue_size=queue_size, policy=policy)
+    latencies = []
+    listeners = [
+        asyncio.ensure_future(listen(hub.subscribe_async(SONG_ID), messages, latencies))
+        for _ in range(subscribers)
+    ]
+    await asyncio.sleep(0)
+
+    publish_times = []
+    started = time.perf_counter()
+    for _ in range(messages):
+        before = time.perf_counter()
+        hub.publish(SONG_ID, before)
+        publish_times.append(time.perf_counter() - before)
+        # Cede el loop para que los suscriptores lean entre mensajes
+        await asyncio.sleep(interval)
+    received = await asyncio.wait_for(asyncio.gather(*listeners, return_exceptions=True), 60)
+    elapsed = time.perf_counter() - started
+
+    delivered = sum(r for r in received if isinstance(r, int))
+    stats = hub.stats()
+    print(
+        f"{subscribers:>7} subs  publish p50={statistics.median(publish_times) * 1000:7.2f}ms"
+        f"  entrega p50={percentile(latencies, 0.5) * 1000:7.2f}ms p99={percentile(latencies, 0.99) * 1000:7.2f}ms"
+        f"  {delivered / elapsed:>10.0f} msg/s"
+        f"  descartados={stats['dropped']} desconectados={stats['disconnected']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fan-out del chat en vivo a suscriptores asyncio")
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--queue-size", type=int, default=256)
+    parser.add_argument("--policy", choices=SLOW_CONSUMER_POLICIES, default=SLOW_CONSUMER_POLICIES[0])
+    parser.add_argument("--interval", type=float, default=0, help="segundos entre mensajes")
+    args = parser.parse_args()
+    for subscribers in args.subscribers:
+        asyncio.run(run(subscribers, args.messages, args.queue_size, args.policy, args.interval))
+
+
+if __name__ == "__main__":
+    main()
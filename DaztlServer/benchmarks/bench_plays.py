@@ -0,0 +1,130 @@
+# Ingesta de reproducciones de api/plays.py. Mide dos cosas:
+#
+#   record   reproducciones por segundo que acepta PlayRecorder.record() con
+#            varios hilos, en modo memory y log (el volcado no se mide)
+#   flush    cuanto tarda el volcado de --events reproducciones repartidas
+#            entre --songs canciones (rollup), contra guardar cada reproduccion
+#            con su propio UPDATE/INSERT como se haria sin buffer
+#
+# El volcado escribe en la base de DJANGO_SETTINGS_MODULE y crea canciones si
+# faltan: usar una base descartable.
+#
+#   DJANGO_SETTINGS_MODULE=daztl.settings python benchmarks/bench_plays.py --threads 1 8 --songs 1000
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+DJANGO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DJANGO_ROOT)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "daztl.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import transaction  # noqa: E402
+from django.db.models import F  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from api import plays  # noqa: E402
+from api.models import User, ArtistProfile, Song, SongPlayDaily  # noqa: E402
+
+
+def measure_record(buffer, threads, events, song_ids, log_dir):
+    # Sin volcados durante la medicion: solo el costo de aceptar el evento
+    recorder = plays.PlayRecorder(buffer=buffer, interval=3600, max_events=events * threads + 1, log_dir=log_dir)
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        sample = [rng.choice(song_ids) for _ in range(1000)]
+        barrier.wait()
+        for i in range(events):
+            recorder.record(sample[i % 1000])
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    recorder.close()
+    return events * threads / elapsed
+
+
+def ensure_songs(count):
+    missing = count - Song.objects.count()
+    if missing > 0:
+        user = User.objects.create(username=f"bench_plays_{time.time_ns()}", role="artist", password="!")
+        artist = ArtistProfile.objects.create(user=user)
+        Song.objects.bulk_create([
+            Song(title=f"Bench {i}", artist=artist, audio_file="songs/bench.mp3", cover_image="song_covers/bench.png")
+            for i in range(missing)
+        ], batch_size=1000)
+    return list(Song.objects.order_by("pk").values_list("pk", flat=True)[:count])
+
+
+def play_events(song_ids, events, rng):
+    # Pocas canciones concentran la mayoria de las reproducciones
+    weights = [1 / (rank + 1) for rank in range(len(song_ids))]
+    return rng.choices(song_ids, weights, k=events)
+
+
+def naive_insert(events):
+    # Lo que costaria sin buffer: cada reproduccion en su propia transaccion
+    artists = dict(Song.objects.filter(pk__in=set(events)).values_list("pk", "artist_id"))
+    today = timezone.localdate()
+    for song_id in events:
+        with transaction.atomic():
+            Song.objects.filter(pk=song_id).update(play_count=F("play_count") + 1)
+            ArtistProfile.objects.filter(pk=artists[song_id]).update(plays_count=F("plays_count") + 1)
+            if not SongPlayDaily.objects.filter(song_id=song_id, day=today).update(plays=F("plays") + 1):
+                SongPlayDaily.objects.create(song_id=song_id, day=today, plays=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproducciones: record() por hilo y volcado por lotes vs una escritura por reproduccion")
+    parser.add_argument("--threads", nargs="+", type=int, default=[1, 4, 8])
+    parser.add_argument("--record-events", type=int, default=200_000, help="Reproducciones por hilo al medir record()")
+    parser.add_argument("--songs", type=int, default=1000, help="Canciones distintas en el volcado")
+    parser.add_argument("--events", type=int, default=100_000, help="Reproducciones por volcado")
+    parser.add_argument("--naive-events", type=int, default=2000, help="Reproducciones guardadas de a una")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    song_ids = ensure_songs(args.songs)
+
+    print(f"{'buffer':>8}{'threads':>9}{'events/s':>14}")
+    with tempfile.TemporaryDirectory() as log_dir:
+        for buffer in plays.BUFFERS:
+            for threads in args.threads:
+                rate = measure_record(buffer, threads, args.record_events, song_ids, log_dir)
+                print(f"{buffer:>8}{threads:>9}{rate:>14,.0f}")
+
+    events = play_events(song_ids, args.events, rng)
+    today = timezone.localdate()
+    counts = Counter((song_id, today) for song_id in events)
+    start = time.perf_counter()
+    plays.rollup(counts)
+    rollup_elapsed = time.perf_counter() - start
+
+    naive = play_events(song_ids, args.naive_events, rng)
+    start = time.perf_counter()
+    naive_insert(naive)
+    naive_elapsed = time.perf_counter() - start
+
+    print()
+    print(f"{'flush':>8}{'events':>10}{'seconds':>10}{'events/s':>14}")
+    print(f"{'rollup':>8}{args.events:>10}{rollup_elapsed:>10.3f}{args.events / rollup_elapsed:>14,.0f}")
+    print(f"{'naive':>8}{args.naive_events:>10}{naive_elapsed:>10.3f}{args.naive_events / naive_elapsed:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
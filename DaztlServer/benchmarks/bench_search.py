@@ -0,0 +1,134 @@
+# Compara la busqueda global anterior (cuatro LIKE '%q%' con icontains) contra
+# el indice invertido de api/search.py a 10k, 100k y 1M canciones. Por cada
+# cancion se generan 1/10 albumes, 1/10 playlists y 1/100 artistas.
+#
+# Inserta datos sinteticos en la base de DJANGO_SETTINGS_MODULE y no los borra:
+# usar una base descartable. Los tamanos se llenan en orden, reutilizando las
+# filas del tamano anterior.
+#
+#   DJANGO_SETTINGS_MODULE=daztl.settings python benchmarks/bench_search.py --sizes 10000 100000 1000000
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+DJANGO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DJANGO_ROOT)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "daztl.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from api.models import User, ArtistProfile, Song, Album, Playlist  # noqa: E402
+from api.search import DOCUMENTS, rebuild_index, search_ids  # noqa: E402
+
+SYLLABLES = ["ma", "lo", "ra", "ti", "ne", "so", "pu", "ca", "dé", "vi", "ño", "bru", "zal", "quí", "fe", "go"]
+INSERT_BATCH = 5000
+
+
+def make_vocabulary(size, rng):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def make_title(vocabulary, rng):
+    return " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 4))).capitalize()
+
+
+def bulk_insert(model, objects):
+    for start in range(0, len(objects), INSERT_BATCH):
+        model.objects.bulk_create(objects[start:start + INSERT_BATCH])
+
+
+def fill(songs, vocabulary, rng):
+    # bulk_create no dispara las senales: el indice se reconstruye despues
+    artists_needed = max(1, songs // 100) - ArtistProfile.objects.count()
+    if artists_needed > 0:
+        offset = User.objects.count()
+        users = [User(username=f"{rng.choice(vocabulary)}_{offset + i}", role="artist", password="!")
+                 for i in range(artists_needed)]
+        bulk_insert(User, users)
+        new_users = User.objects.filter(role="artist", artistprofile__isnull=True)
+        bulk_insert(ArtistProfile, [ArtistProfile(user=user) for user in new_users])
+    artist_ids = list(ArtistProfile.objects.values_list("id", flat=True))
+    user_ids = list(ArtistProfile.objects.values_list("user_id", flat=True))
+
+    bulk_insert(Song, [
+        Song(title=make_title(vocabulary, rng), artist_id=rng.choice(artist_ids),
+             audio_file="songs/bench.mp3", cover_image="song_covers/bench.png")
+        for _ in range(songs - Song.objects.count())
+    ])
+    bulk_insert(Album, [
+        Album(title=make_title(vocabulary, rng), artist_id=rng.choice(artist_ids))
+        for _ in range(songs // 10 - Album.objects.count())
+    ])
+    bulk_insert(Playlist, [
+        Playlist(name=make_title(vocabulary, rng), user_id=rng.choice(user_ids))
+        for _ in range(songs // 10 - Playlist.objects.count())
+    ])
+
+
+def icontains_search(query, limit=None):
+    for model, field in DOCUMENTS.values():
+        ids = model.objects.filter(**{f"{field}__icontains": query}).values_list("id", flat=True)
+        list(ids[:limit] if limit else ids)
+
+
+def index_search(query, limit):
+    for kind in DOCUMENTS:
+        search_ids(kind, query, limit)
+
+
+def measure(fn, queries, repeat):
+    samples = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            fn(query)
+            samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.fmean(samples), samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Busqueda global: icontains vs indice invertido")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=20, help="Consultas distintas por tamano")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(2000, rng)
+    # Palabras completas, prefijos de tres letras y "palabra prefijo" (lo que
+    # se tipea en el buscador), en partes iguales
+    words = rng.sample(vocabulary, args.queries * 2)
+    third = args.queries // 3
+    queries = (words[:third]
+               + [w[:3] for w in words[third:2 * third]]
+               + [f"{a} {b[:3]}" for a, b in zip(words[2 * third:args.queries], words[args.queries:])])
+
+    print(f"{'songs':>9}{'reindex':>10}{'icontains':>22}{'icontains+limit':>22}{'index':>22}")
+    for size in sorted(args.sizes):
+        fill(size, vocabulary, rng)
+        start = time.perf_counter()
+        rebuild_index()
+        reindex = time.perf_counter() - start
+
+        row = f"{size:>9}{reindex:>9.1f}s"
+        for fn in (icontains_search,
+                   lambda q: icontains_search(q, args.limit),
+                   lambda q: index_search(q, args.limit)):
+            mean, p95 = measure(fn, queries, args.repeat)
+            row += f"{mean:>10.1f}ms p95 {p95:>6.1f}ms"
+        print(row, flush=True)
+
+
+if __name__ == "__main__":
+    main()
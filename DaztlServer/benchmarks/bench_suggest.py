@@ -0,0 +1,87 @@
+# Latencia de api/autocomplete.py (el indice en memoria detras de Suggest) con
+# 10k, 100k y 1M titulos sinteticos. No toca la base: mide la construccion del
+# indice y suggest() con prefijos de 1 a 3 letras, palabras con un error de
+# tipeo y "palabra prefijo".
+#
+#   python benchmarks/bench_suggest.py --sizes 10000 100000 1000000
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import resource
+
+DJANGO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DJANGO_ROOT)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "daztl.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from api.autocomplete import AutocompleteIndex  # noqa: E402
+
+SYLLABLES = ["ma", "lo", "ra", "ti", "ne", "so", "pu", "ca", "dé", "vi", "ño", "bru", "zal", "quí", "fe", "go"]
+
+
+def make_vocabulary(size, rng):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def make_rows(size, vocabulary, rng):
+    kinds = ["song"] * 10 + ["album"] + ["artist"]
+    for i in range(size):
+        title = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 4)))
+        yield rng.choice(kinds), i, title.capitalize()
+
+
+def typo(word, rng):
+    i = rng.randrange(1, len(word))
+    return word[:i] + word[i + 1:] if rng.random() < 0.5 else word[:i] + "x" + word[i:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia del autocompletado en memoria")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(5000, rng)
+    words = [rng.choice(vocabulary) for _ in range(args.queries)]
+    queries = {
+        "prefijo": [w[:rng.randint(1, 3)] for w in words],
+        "tipeo": [typo(w, rng) for w in words],
+        "palabra prefijo": [f"{w} {rng.choice(vocabulary)[:2]}" for w in words],
+    }
+
+    print(f"{'titulos':>9}{'carga':>9}{'memoria':>10}" + "".join(f"{name:>26}" for name in queries))
+    for size in sorted(args.sizes):
+        start = time.perf_counter()
+        index = AutocompleteIndex()
+        index.load(make_rows(size, vocabulary, rng))
+        load = time.perf_counter() - start
+        # Pico de memoria del proceso (ru_maxrss esta en KB en Linux)
+        memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+        row = f"{size:>9}{load:>8.1f}s{memory:>7.0f} MB"
+        for batch in queries.values():
+            samples = []
+            for query in batch:
+                start = time.perf_counter()
+                index.suggest(query, args.limit)
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            p95 = samples[int(len(samples) * 0.95)]
+            row += f"{statistics.fmean(samples):>12.3f}ms p95 {p95:>6.3f}ms"
+        print(row, flush=True)
+
+
+if __name__ == "__main__":
+    main()
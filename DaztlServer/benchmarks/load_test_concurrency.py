@@ -0,0 +1,139 @@
+# Prueba de carga: cuantas llamadas ListSongs puede tener en vuelo cada modo de
+# servidor cuando la API REST tarda --backend-latency segundos en responder.
+#
+# Levanta una API REST falsa (asyncio) en este proceso, arranca server.py en un
+# subproceso con --server threaded y luego con --server async, y dispara
+# --requests llamadas concurrentes con un cliente grpc.aio.
+#
+#   python benchmarks/load_test_concurrency.py --requests 2000 --backend-latency 0.5
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import grpc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RPC_ROOT = os.path.join(ROOT, "daztl_rpc")
+sys.path.insert(0, RPC_ROOT)
+
+import proto.daztl_service_pb2 as pb2  # noqa: E402
+import proto.daztl_service_pb2_grpc as pb2_grpc  # noqa: E402
+
+SONGS = json.dumps([
+    {"id": i, "title": f"Song {i}", "artist_name": "artist", "audio_url": "", "cover_url": "",
+     "release_date": "2025-01-01"}
+    for i in range(20)
+]).encode()
+
+
+class FakeApi:
+    def __init__(self, latency):
+        self.latency = latency
+        self.in_flight = 0
+        self.peak = 0
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                while (await reader.readline()) not in (b"\r\n", b""):
+                    pass
+                self.in_flight += 1
+                self.peak = max(self.peak, self.in_flight)
+                await asyncio.sleep(self.latency)
+                self.in_flight -= 1
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(SONGS)}\r\n\r\n".encode() + SONGS
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_for_channel(target, timeout=15):
+    async with grpc.aio.insecure_channel(target) as channel:
+        await asyncio.wait_for(channel.channel_ready(), timeout)
+
+
+async def fire(target, total, channels):
+    # Varios canales (conexiones HTTP/2) para no topar con el limite de streams
+    # concurrentes de una sola conexion
+    pool = [grpc.aio.insecure_channel(target) for _ in range(channels)]
+    stubs = [pb2_grpc.MusicServiceStub(c) for c in pool]
+
+    async def one(i):
+        try:
+            await stubs[i % channels].ListSongs(pb2.PageRequest(), timeout=300)
+            return True
+        except grpc.aio.AioRpcError:
+            return False
+
+    try:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(one(i) for i in range(total)))
+        return time.perf_counter() - start, results.count(False)
+    finally:
+        for channel in pool:
+            await channel.close()
+
+
+async def run_mode(mode, args, api, api_port):
+    grpc_port = free_port()
+    env = dict(os.environ, API_BASE_URL=f"http://127.0.0.1:{api_port}/api", BACKEND_POOL_SIZE=str(args.pool_size))
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(RPC_ROOT, "server.py"), "--backend", "http",
+         "--server", mode, "--port", str(grpc_port)],
+        env=env, cwd=ROOT, stdout=subprocess.DEVNULL,
+    )
+    try:
+        target = f"127.0.0.1:{grpc_port}"
+        await wait_for_channel(target)
+        api.peak = 0
+        elapsed, errors = await fire(target, args.requests, args.channels)
+    finally:
+        proc.terminate()
+        proc.wait()
+    # Concurrencia efectiva = trabajo total en el backend / tiempo real
+    effective = args.requests * args.backend_latency / elapsed
+    print(f"{mode:<10}{args.requests:>10}{elapsed:>12.2f}s{args.requests / elapsed:>12.1f}"
+          f"{effective:>14.1f}{api.peak:>12}{errors:>8}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Concurrencia de ListSongs: servidor threaded vs async")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--backend-latency", type=float, default=0.5)
+    parser.add_argument("--pool-size", type=int, default=500,
+                        help="Conexiones hacia la API para el backend asincrono")
+    parser.add_argument("--channels", type=int, default=8, help="Canales gRPC del cliente")
+    parser.add_argument("--modes", nargs="+", default=["threaded", "async"])
+    args = parser.parse_args()
+
+    api = FakeApi(args.backend_latency)
+    api_server = await asyncio.start_server(api.handle, "127.0.0.1", 0, backlog=4096)
+    api_port = api_server.sockets[0].getsockname()[1]
+
+    print(f"{'server':<10}{'requests':>10}{'elapsed':>13}{'rps':>12}{'concurrency':>14}{'peak':>12}{'errors':>8}")
+    async with api_server:
+        for mode in args.modes:
+            await run_mode(mode, args, api, api_port)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
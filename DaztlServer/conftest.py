@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def catalog_cache():
+    # Cada test hace rollback y las versiones de ContentVersion se repiten:
+    # sin esto un test podria leer respuestas cacheadas por otro
+    from api import authentication, cache
+    cache.reset()
+    authentication.reset()
@@ -9,8 +9,39 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from asgiref.sync import sync_to_async
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'daztl.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Despues de get_asgi_application(), que inicializa Django
+from api import broadcast, chat_buffer, plays  # noqa: E402
+from api.live_chat import websocket_application  # noqa: E402
+
+
+async def lifespan(scope, receive, send):
+    # Al apagar el worker se guardan los mensajes pendientes del chat y las
+    # reproducciones, y se cierra la capa de broadcast (el listener de Redis)
+    while True:
+        event = await receive()
+        if event['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif event['type'] == 'lifespan.shutdown':
+            await sync_to_async(chat_buffer.reset)()
+            await sync_to_async(plays.reset)()
+            broadcast.reset()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    # HTTP lo atiende Django (incluido el SSE de songs/<id>/chat/events/); los
+    # WebSocket del chat, api/live_chat.py
+    if scope['type'] == 'websocket':
+        await websocket_application(scope, receive, send)
+    elif scope['type'] == 'lifespan':
+        await lifespan(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
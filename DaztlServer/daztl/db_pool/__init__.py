@@ -0,0 +1,211 @@
+# Pool de conexiones a la base compartido por los hilos de un proceso (gateway
+# gRPC en modo orm, workers async). Django abre una conexion por hilo y con
+# CONN_MAX_AGE la conserva mientras viva el hilo; con muchos hilos eso son
+# muchas conexiones ODBC abiertas contra SQL Server. Con DB_POOL=1 el motor
+# "daztl.db_pool" (base.py) toma una conexion de un conjunto fijo al empezar
+# cada request o RPC y la devuelve al cerrarla, en lugar de cerrarla de verdad.
+import threading
+import time
+from collections import deque
+from importlib import import_module
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    # connect() abre una conexion nueva; ping(conn) lanza si ya no sirve
+    def __init__(self, connect, size=10, timeout=30, recycle=3600, ping=None, ping_after=30):
+        self._connect = connect
+        self._ping = ping
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+        # (conexion, abierta_en, devuelta_en); se reutiliza la ultima devuelta
+        self._idle = deque()
+        self._opened_at = {}
+        self._open = 0
+        self._cond = threading.Condition()
+        self.checkouts = 0
+        self.created = 0
+        self.discarded = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+
+    def checkout(self):
+        # (conexion, nueva); espera hasta `timeout` segundos si el pool esta lleno
+        start = time.monotonic()
+        while True:
+            with self._cond:
+                waited = False
+                while not self._idle and self._open >= self.size:
+                    remaining = self.timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise PoolTimeout(f"Sin conexiones libres despues de {self.timeout}s (pool de {self.size})")
+                    waited = True
+                    self._cond.wait(remaining)
+                if self._idle:
+                    conn, opened_at, released_at = self._idle.pop()
+                else:
+                    conn = None
+                    self._open += 1
+                elapsed = time.monotonic() - start
+                self.checkouts += 1
+                self.waits += waited
+                self.wait_time += elapsed
+                self.max_wait = max(self.max_wait, elapsed)
+            if conn is None:
+                return self._new_connection(), True
+            if self._usable(conn, released_at):
+                return conn, False
+            self._discard(conn)
+
+    def _new_connection(self):
+        try:
+            conn = self._connect()
+        except BaseException:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.created += 1
+            self._opened_at[id(conn)] = time.monotonic()
+        return conn
+
+    def _usable(self, conn, released_at):
+        # Solo se valida la conexion que estuvo ociosa un rato: el servidor
+        # o un firewall pueden haberla cortado
+        if self._ping is None or time.monotonic() - released_at < self.ping_after:
+            return True
+        try:
+            self._ping(conn)
+        except Exception:
+            return False
+        return True
+
+    def release(self, conn, discard=False):
+        now = time.monotonic()
+        opened_at = self._opened_at.get(id(conn), now)
+        if discard or (self.recycle and now - opened_at >= self.recycle):
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, opened_at, now))
+            self._cond.notify()
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._opened_at.pop(id(conn), None)
+            self._open -= 1
+            self.discarded += 1
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self.size,
+                "open": self._open,
+                "in_use": self._open - len(self._idle),
+                "idle": len(self._idle),
+                "checkouts": self.checkouts,
+                "created": self.created,
+                "discarded": self.discarded,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "wait_time_total": self.wait_time,
+                "wait_time_avg": self.wait_time / self.checkouts if self.checkouts else 0.0,
+                "wait_time_max": self.max_wait,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, connect, options, ping=None):
+    # Un pool por alias de DATABASES y por proceso
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None:
+            pool = _pools[alias] = ConnectionPool(
+                connect,
+                size=options.get('SIZE', 10),
+                timeout=options.get('TIMEOUT', 30),
+                recycle=options.get('RECYCLE', 3600),
+                ping=ping,
+                ping_after=options.get('PING_AFTER', 30),
+            )
+        return pool
+
+
+def stats():
+    with _pools_lock:
+        return {alias: pool.stats() for alias, pool in _pools.items()}
+
+
+def close_all():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def ping(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT 1")
+    finally:
+        cursor.close()
+
+
+class PooledConnectionMixin:
+    _pool = None
+    _state_ready = False
+    _fresh_connection = False
+
+    def get_new_connection(self, conn_params):
+        self._pool = get_pool(self.alias, lambda: super(PooledConnectionMixin, self).get_new_connection(conn_params),
+                              self.settings_dict.get('POOL', {}), ping)
+        conn, self._fresh_connection = self._pool.checkout()
+        return conn
+
+    def init_connection_state(self):
+        # Los SET de sesion ya quedaron aplicados en una conexion reutilizada;
+        # se repite si este hilo todavia no configuro su wrapper (driver, features)
+        if self._fresh_connection or not self._state_ready:
+            super().init_connection_state()
+            self._state_ready = True
+
+    def _close(self):
+        # Vuelve al pool sin transaccion abierta; si no se puede limpiar, o
+        # hubo errores y ya no responde, se descarta
+        try:
+            self.connection.rollback()
+            if self.errors_occurred:
+                ping(self.connection)
+        except self.Database.Error:
+            self._pool.release(self.connection, discard=True)
+            return
+        self._pool.release(self.connection)
+
+
+def wrapper_class(backend):
+    base = import_module(f"{backend}.base")
+    return type('DatabaseWrapper', (PooledConnectionMixin, base.DatabaseWrapper), {})
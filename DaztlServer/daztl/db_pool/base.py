@@ -0,0 +1,7 @@
+# Motor "daztl.db_pool": el DatabaseWrapper de DB_POOL_BACKEND (mssql) con las
+# conexiones tomadas del pool del proceso. Usar con CONN_MAX_AGE = 0 para que
+# Django devuelva la conexion al terminar cada request o RPC.
+from django.conf import settings
+from . import wrapper_class
+
+DatabaseWrapper = wrapper_class(settings.DB_POOL_BACKEND)
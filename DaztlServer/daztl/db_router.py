@@ -0,0 +1,188 @@
+# Lecturas del catalogo, la busqueda y los reportes en replicas de solo
+# lectura (DB_REPLICAS, alias de DATABASES). Solo van a una replica los GET de
+# las vistas con ReplicaReadMixin y los RPC de catalogo del gateway en modo
+# orm; todo lo demas, y cualquier escritura, sigue en "default".
+#
+# - Leer lo propio: un request (o RPC del gateway en modo orm) que escribe deja
+#   al usuario "pegado" al primario durante DB_REPLICA_STICKY_SECONDS. La marca se guarda en el alias
+#   DB_REPLICA_CACHE_ALIAS de CACHES; con varios workers tiene que ser una
+#   cache compartida (Redis), si no solo la ve el proceso que atendio la escritura.
+# - Atraso: una replica cuya version de ContentVersion("catalog") esta mas de
+#   DB_REPLICA_MAX_LAG segundos detras del primario, o que no responde, deja de
+#   recibir lecturas. Se revisa cada DB_REPLICA_LAG_CHECK_SECONDS por proceso.
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+from django.utils import timezone
+from rest_framework.permissions import SAFE_METHODS
+
+CATALOG = 'catalog'
+
+
+class RoutingScope:
+    # Estado de un request o RPC: si puede leer de replicas, quien lo hace y
+    # si ya escribio algo (desde ahi todo va al primario)
+    def __init__(self, replica_reads=False, user_id=None):
+        self.replica_reads = replica_reads
+        self.user_id = user_id
+        self.wrote = False
+        self.alias = None
+
+
+_scope = contextvars.ContextVar('db_routing_scope', default=None)
+
+
+def sticky_key(user_id):
+    return f"replica-sticky:{user_id}"
+
+
+def mark_sticky(user_id):
+    caches[settings.DB_REPLICA_CACHE_ALIAS].set(sticky_key(user_id), True, settings.DB_REPLICA_STICKY_SECONDS)
+
+
+def is_sticky(user_id):
+    return caches[settings.DB_REPLICA_CACHE_ALIAS].get(sticky_key(user_id)) is not None
+
+
+def replica_lag(alias, now=None):
+    # Segundos de atraso estimados: 0 si la replica ya tiene la version del
+    # catalogo del primario; si no, desde su ultimo cambio aplicado (cota
+    # superior: el primer cambio que le falta puede ser posterior)
+    from api.models import ContentVersion
+    def stamp(db):
+        return ContentVersion.objects.using(db).filter(scope=CATALOG).values_list('version', 'updated_at').first()
+    primary = stamp(DEFAULT_DB_ALIAS)
+    if primary is None:
+        return 0.0
+    replica = stamp(alias)
+    if replica is not None and replica[0] >= primary[0]:
+        return 0.0
+    since = replica[1] if replica is not None else primary[1]
+    return max(((now or timezone.now()) - since).total_seconds(), 0.0)
+
+
+_health = {}
+_health_lock = threading.Lock()
+
+
+def healthy(alias):
+    now = time.monotonic()
+    with _health_lock:
+        entry = _health.get(alias)
+    if entry is not None and now - entry[1] < settings.DB_REPLICA_LAG_CHECK_SECONDS:
+        return entry[0]
+    try:
+        ok = replica_lag(alias) <= settings.DB_REPLICA_MAX_LAG
+    except DatabaseError:
+        ok = False
+    with _health_lock:
+        _health[alias] = (ok, now)
+    return ok
+
+
+def reset():
+    # Olvida el estado de las replicas (tests, o tras cambiar la configuracion)
+    with _health_lock:
+        _health.clear()
+
+
+def choose_alias(scope):
+    # Una base por request: todas sus lecturas ven el mismo estado
+    if scope.user_id is not None and is_sticky(scope.user_id):
+        return DEFAULT_DB_ALIAS
+    replicas = [alias for alias in settings.DB_REPLICAS if healthy(alias)]
+    return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+
+def use_replicas(user_id=None):
+    # Habilita las replicas para el resto del request en curso
+    scope = _scope.get()
+    if scope is not None:
+        scope.replica_reads = True
+        scope.user_id = user_id
+
+
+def set_user(user_id):
+    # Quien hace el request en curso, cuando se conoce despues de abrir el
+    # scope (el gateway gRPC autentica dentro de cada llamada)
+    scope = _scope.get()
+    if scope is not None:
+        scope.user_id = user_id
+
+
+@contextmanager
+def routing_scope(replica_reads=False, user_id=None):
+    # Para llamadas fuera del ciclo de request de Django (gateway gRPC): igual
+    # que ReplicaRoutingMiddleware, si escribio deja pegado al usuario
+    if not settings.DB_REPLICAS:
+        yield None
+        return
+    scope = RoutingScope(replica_reads=replica_reads, user_id=user_id)
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+        if scope.wrote and scope.user_id is not None:
+            mark_sticky(scope.user_id)
+
+
+def replica_reads(user_id=None):
+    return routing_scope(replica_reads=True, user_id=user_id)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        scope = _scope.get()
+        if scope is None or not scope.replica_reads or scope.wrote:
+            return None
+        if scope.alias is None:
+            scope.alias = choose_alias(scope)
+        return scope.alias
+
+    def db_for_write(self, model, **hints):
+        # Siempre el primario, tambien para instancias leidas de una replica
+        scope = _scope.get()
+        if scope is not None:
+            scope.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primario y replicas tienen los mismos datos
+        aliases = {DEFAULT_DB_ALIAS, *settings.DB_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DB_REPLICAS:
+            return self.get_response(request)
+        scope = RoutingScope()
+        token = _scope.set(scope)
+        try:
+            return self.get_response(request)
+        finally:
+            _scope.reset(token)
+            # DRF deja en request.user el usuario que autentico con JWT
+            user = getattr(request, 'user', None)
+            if scope.wrote and user is not None and user.is_authenticated:
+                mark_sticky(user.pk)
+
+
+class ReplicaReadMixin:
+    # Para vistas cuyo GET solo lee catalogo, busqueda o reportes. Se activa
+    # despues de autenticar: el usuario siempre se lee del primario.
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            use_replicas(request.user.pk)
@@ -26,7 +26,7 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -40,6 +40,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'daztl.db_router.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -90,6 +91,50 @@ DATABASES = {
     }
 }
 
+# Conexiones persistentes: cada worker conserva su conexion ODBC durante
+# DB_CONN_MAX_AGE segundos ("none" = sin limite, 0 = una por request) y la
+# valida antes de reutilizarla en un request nuevo
+DB_CONN_MAX_AGE = os.getenv('DB_CONN_MAX_AGE', '60')
+DATABASES['default']['CONN_MAX_AGE'] = None if DB_CONN_MAX_AGE.lower() == 'none' else int(DB_CONN_MAX_AGE)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = os.getenv('DB_CONN_HEALTH_CHECKS', '1') == '1'
+
+# DB_POOL=1 (gateway gRPC, workers async): los hilos del proceso comparten
+# DB_POOL_SIZE conexiones (daztl/db_pool). Cada request o RPC toma una y la
+# devuelve al terminar, por eso CONN_MAX_AGE queda en 0
+DB_POOL = os.getenv('DB_POOL', '0') == '1'
+DB_POOL_BACKEND = DATABASES['default']['ENGINE']
+if DB_POOL:
+    DATABASES['default'].update({
+        'ENGINE': 'daztl.db_pool',
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'SIZE': int(os.getenv('DB_POOL_SIZE', 10)),
+            # Segundos de espera por una conexion libre antes de fallar
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+            # Segundos de vida de una conexion antes de reemplazarla
+            'RECYCLE': int(os.getenv('DB_POOL_RECYCLE', 3600)),
+            # Las conexiones ociosas por mas de estos segundos se validan al tomarlas
+            'PING_AFTER': float(os.getenv('DB_POOL_PING_AFTER', 30)),
+        },
+    })
+
+# Replicas de solo lectura para catalogo, busqueda y reportes (daztl/db_router.py).
+# DB_REPLICA_HOSTS separados por coma: cada uno es un alias "replicaN" con la
+# misma configuracion que default salvo el host
+DB_REPLICAS = []
+for index, host in enumerate(h for h in os.getenv('DB_REPLICA_HOSTS', '').split(',') if h):
+    alias = f'replica{index + 1}'
+    DATABASES[alias] = {**DATABASES['default'], 'HOST': host, 'TEST': {'MIRROR': 'default'}}
+    DB_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['daztl.db_router.ReplicaRouter']
+# Segundos que un usuario lee del primario despues de escribir
+DB_REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS', 10))
+# Atraso maximo tolerado (segundos) y cada cuanto lo revisa cada proceso
+DB_REPLICA_MAX_LAG = float(os.getenv('DB_REPLICA_MAX_LAG', 5))
+DB_REPLICA_LAG_CHECK_SECONDS = float(os.getenv('DB_REPLICA_LAG_CHECK_SECONDS', 2))
+# Alias de CACHES donde se marcan los usuarios pegados al primario
+DB_REPLICA_CACHE_ALIAS = os.getenv('DB_REPLICA_CACHE_ALIAS', 'default')
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -107,6 +152,103 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# /api/songs/<id>/stream/: tamano de cada lectura al servir el audio desde Django
+AUDIO_STREAM_CHUNK_SIZE = int(os.getenv('AUDIO_STREAM_CHUNK_SIZE', 64 * 1024))
+# Prefijo de la location internal de nginx (p. ej. /protected-media/). Si esta
+# definido, Django solo responde cabeceras y nginx envia el archivo con sendfile.
+# Dejar vacio cuando los clientes llegan directo a gunicorn sin pasar por nginx.
+AUDIO_STREAM_ACCEL_REDIRECT = os.getenv('AUDIO_STREAM_ACCEL_REDIRECT', '')
+
+# Subidas reanudables (/api/songs/upload/sessions/)
+UPLOAD_SESSION_MAX_SIZE = int(os.getenv('UPLOAD_SESSION_MAX_SIZE', 500 * 1024 * 1024))
+UPLOAD_SESSION_MAX_CHUNK_SIZE = int(os.getenv('UPLOAD_SESSION_MAX_CHUNK_SIZE', 8 * 1024 * 1024))
+# Horas sin recibir chunks antes de que cleanup_upload_sessions borre la sesion
+UPLOAD_SESSION_TTL_HOURS = int(os.getenv('UPLOAD_SESSION_TTL_HOURS', 24))
+
+# Paginacion opcional de los listados (?page_size= / ?cursor=)
+API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', 50))
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', 200))
+
+# Resultados por seccion de /api/search/ (indice invertido de api/search.py)
+SEARCH_RESULT_LIMIT = int(os.getenv('SEARCH_RESULT_LIMIT', 50))
+
+# Autocompletado en memoria (/api/search/suggest/ y el RPC Suggest)
+SUGGEST_RESULT_LIMIT = int(os.getenv('SUGGEST_RESULT_LIMIT', 10))
+SUGGEST_MAX_RESULTS = int(os.getenv('SUGGEST_MAX_RESULTS', 50))
+# Cada cuanto cada proceso lee los cambios del catalogo (SearchChange)
+SUGGEST_REFRESH_SECONDS = float(os.getenv('SUGGEST_REFRESH_SECONDS', 2))
+# Horas que prune_search_changes conserva los cambios ya leidos
+SUGGEST_CHANGE_RETENTION_HOURS = int(os.getenv('SUGGEST_CHANGE_RETENTION_HOURS', 24))
+# Construir el indice al cargar daztl/wsgi.py. Apagado: importar la app no toca
+# la base (manage.py, checks, gunicorn --preload) y el indice se arma en la
+# primera consulta
+SUGGEST_WARM_UP = os.getenv('SUGGEST_WARM_UP', '0') == '1'
+
+# Cache de respuestas del catalogo (api/cache.py): local (LRU por proceso),
+# shared (el alias CATALOG_CACHE_ALIAS de CACHES) u off
+CATALOG_CACHE_BACKEND = os.getenv('CATALOG_CACHE_BACKEND', 'local')
+CATALOG_CACHE_ALIAS = os.getenv('CATALOG_CACHE_ALIAS', 'default')
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', 300))
+CATALOG_CACHE_MAX_ENTRIES = int(os.getenv('CATALOG_CACHE_MAX_ENTRIES', 1000))
+# Cada cuanto un proceso relee la version del catalogo para ver cambios de otros procesos
+CATALOG_CACHE_VERSION_SECONDS = float(os.getenv('CATALOG_CACHE_VERSION_SECONDS', 1))
+# Endpoints sin cache, separados por coma: nombres de URL o de RPC (p. ej. "song-list,ListSongs")
+CATALOG_CACHE_DISABLED = [name for name in os.getenv('CATALOG_CACHE_DISABLED', '').split(',') if name]
+
+# Usuarios autenticados por JWT (api/authentication.py): local, shared u off
+AUTH_USER_CACHE_BACKEND = os.getenv('AUTH_USER_CACHE_BACKEND', 'local')
+AUTH_USER_CACHE_ALIAS = os.getenv('AUTH_USER_CACHE_ALIAS', 'default')
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 60))
+AUTH_USER_CACHE_MAX_ENTRIES = int(os.getenv('AUTH_USER_CACHE_MAX_ENTRIES', 10000))
+# En GET, las vistas con StatelessReadJWTAuthentication usan el TokenUser del
+# token en lugar de cargar el usuario
+AUTH_STATELESS_READS = os.getenv('AUTH_STATELESS_READS', '0') == '1'
+
+# Chat en vivo en modo ASGI (api/broadcast.py, api/live_chat.py): memory (solo
+# los clientes de este proceso) o redis (CHAT_BROADCAST_URL, compartido por
+# todos los workers y el gateway); tambien acepta la ruta de una clase propia
+CHAT_BROADCAST_BACKEND = os.getenv('CHAT_BROADCAST_BACKEND', 'memory')
+CHAT_BROADCAST_URL = os.getenv('CHAT_BROADCAST_URL', 'redis://redis:6379/2')
+# Mensajes sin leer por cliente; al pasarse, disconnect cierra su conexion y
+# drop_oldest descarta los mas viejos
+CHAT_QUEUE_SIZE = int(os.getenv('CHAT_QUEUE_SIZE', 256))
+CHAT_SLOW_CONSUMER = os.getenv('CHAT_SLOW_CONSUMER', 'disconnect')
+CHAT_HEARTBEAT_SECONDS = float(os.getenv('CHAT_HEARTBEAT_SECONDS', 15))
+# Espera antes de reconectar que se sugiere a EventSource
+CHAT_RETRY_MILLISECONDS = int(os.getenv('CHAT_RETRY_MILLISECONDS', 3000))
+# Mensajes que se reenvian al reconectar con Last-Event-ID
+CHAT_BACKFILL_LIMIT = int(os.getenv('CHAT_BACKFILL_LIMIT', 100))
+
+# Escritura de LiveChat (api/chat_buffer.py): direct (un INSERT por mensaje),
+# group_commit (bulk_create por lotes, el request espera su lote) o
+# write_behind (bulk_create por lotes, responde 202 sin esperar)
+CHAT_WRITE_MODE = os.getenv('CHAT_WRITE_MODE', 'direct')
+CHAT_BATCH_SIZE = int(os.getenv('CHAT_BATCH_SIZE', 200))
+CHAT_FLUSH_INTERVAL = float(os.getenv('CHAT_FLUSH_INTERVAL', 0.2))
+# Pendientes a partir de los cuales se rechazan mensajes nuevos (503)
+CHAT_MAX_PENDING = int(os.getenv('CHAT_MAX_PENDING', 10000))
+# Volcados fallidos tras los que write_behind descarta un mensaje (con el
+# intervalo por defecto, una base caida durante unos 30 segundos)
+CHAT_MAX_ATTEMPTS = int(os.getenv('CHAT_MAX_ATTEMPTS', 150))
+
+# Reproducciones (api/plays.py): se suman en memoria y se vuelcan a los
+# contadores cada PLAYS_FLUSH_INTERVAL segundos o al juntar PLAYS_FLUSH_EVENTS.
+# PLAYS_BUFFER=log ademas las agrega a archivos de PLAYS_LOG_DIR para no
+# perderlas si el proceso muere
+PLAYS_BUFFER = os.getenv('PLAYS_BUFFER', 'memory')
+PLAYS_LOG_DIR = os.getenv('PLAYS_LOG_DIR', os.path.join(BASE_DIR, 'plays_log'))
+PLAYS_FLUSH_INTERVAL = float(os.getenv('PLAYS_FLUSH_INTERVAL', 1.0))
+PLAYS_FLUSH_EVENTS = int(os.getenv('PLAYS_FLUSH_EVENTS', 100000))
+
+# Cache compartida para los backends shared, p. ej.
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache CACHE_LOCATION=redis://redis:6379/1
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 from datetime import timedelta
 
@@ -116,10 +258,14 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': False,
     'BLACKLIST_AFTER_ROTATION': False,
     'ALGORITHM': 'HS256',
-    'SIGNING_KEY': 'YOUR_SECRET_KEY',
+    # El gateway gRPC verifica los tokens con la misma clave (daztl_rpc/jwt_auth.py)
+    'SIGNING_KEY': os.getenv('JWT_SIGNING_KEY', 'YOUR_SECRET_KEY'),
     'VERIFYING_KEY': None,
     'AUDIENCE': None,
     'ISSUER': None,
     'JWK_URL': None,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    # Los tokens llevan el hash de la contrasena: cambiarla invalida los
+    # emitidos antes, tambien para la cache de api/authentication.py
+    'CHECK_REVOKE_TOKEN': True,
 }
@@ -14,3 +14,12 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'daztl.settings')
 
 application = get_wsgi_application()
+
+# Con SUGGEST_WARM_UP cada worker arma su indice de autocompletado antes de
+# recibir requests; si no, en la primera consulta
+from django.conf import settings  # noqa: E402
+
+if settings.SUGGEST_WARM_UP:
+    from api.autocomplete import warm_up
+
+    warm_up()
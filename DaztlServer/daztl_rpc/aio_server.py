@@ -0,0 +1,451 @@
+import asyncio
+import base64
+import functools
+import json
+import os
+import signal
+
+import grpc
+import proto.daztl_service_pb2 as daztl_service_pb2
+import proto.daztl_service_pb2_grpc as daztl_service_pb2_grpc
+import messages
+import media
+import uploads
+from singleflight import AsyncSingleFlight
+from chat_hub import ChatHub, SlowConsumer
+from jwt_auth import AsyncJWTInterceptor, make_verifier
+from backends import get_async_backend, BackendTimeout, BackendUnavailable
+from backends.base import verified_claims
+from server import MusicServiceServicer, SHUTDOWN_GRACE, SINGLE_FLIGHT, conditional_args, not_modified, page_args
+
+# None = sin limite; el servidor asyncio no reserva un hilo por RPC
+MAX_CONCURRENT_RPCS = int(os.getenv("GRPC_MAX_CONCURRENT_RPCS", "0")) or None
+# grpc core cancela (CANCELLED) las llamadas que esperan handler por encima de
+# este limite (1000 por defecto), y con rafagas grandes se alcanza enseguida
+MAX_PENDING_REQUESTS = int(os.getenv("GRPC_MAX_PENDING_REQUESTS", "10000"))
+
+
+def handle_backend_errors_async(response_cls):
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(self, request, context):
+            try:
+                return await handler(self, request, context)
+            except grpc.aio.AbortError:
+                raise
+            except BackendTimeout:
+                context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
+                context.set_details("Backend API timeout")
+            except BackendUnavailable:
+                context.set_code(grpc.StatusCode.UNAVAILABLE)
+                context.set_details("Backend API unreachable")
+            except Exception as e:
+                context.set_code(grpc.StatusCode.INTERNAL)
+                context.set_details(f"Backend API error: {str(e)}")
+            return response_cls()
+        return wrapper
+    return decorator
+
+
+class AsyncMusicServiceServicer(daztl_service_pb2_grpc.MusicServiceServicer):
+    # Misma semantica que MusicServiceServicer, pero cada RPC espera al backend
+    # sin bloquear un hilo: miles de llamadas en vuelo comparten un event loop.
+    get_token_from_metadata = staticmethod(MusicServiceServicer.get_token_from_metadata)
+    stats = MusicServiceServicer.stats
+
+    def __init__(self, backend=None, single_flight=SINGLE_FLIGHT, chat_hub=None):
+        self.backend = backend or get_async_backend()
+        self.flights = AsyncSingleFlight() if single_flight else None
+        self.chat = chat_hub or ChatHub(local_writes=self.backend.mode == "orm")
+
+    async def shared(self, method, call, **params):
+        if self.flights is None:
+            return await call(**params)
+        return await self.flights.do(method, params, lambda: call(**params))
+
+    @handle_backend_errors_async(daztl_service_pb2.GenericResponse)
+    async def RegisterUser(self, request, context):
+        payload = {
+            "username": request.username,
+            "password": request.password,
+            "email": request.email,
+            "first_name": request.first_name,
+            "last_name": request.last_name
+        }
+        res = await self.backend.register_user(payload)
+        if res.status_code == 201:
+            return daztl_service_pb2.GenericResponse(status="success", message="User registered successfully")
+        return daztl_service_pb2.GenericResponse(status="error", message=res.text)
+
+    @handle_backend_errors_async(daztl_service_pb2.GenericResponse)
+    async def RegisterArtist(self, request, context):
+        payload = {
+            "username": request.username,
+            "password": request.password,
+            "email": request.email,
+            "first_name": request.first_name,
+            "last_name": request.last_name,
+            "bio": request.bio
+        }
+        res = await self.backend.register_artist(payload)
+        if res.status_code == 201:
+            return daztl_service_pb2.GenericResponse(status="success", message="User registered successfully")
+        context.set_code(grpc.StatusCode.FAILED_PRECONDITION)
+        context.set_details(f"Backend error: {res.text}")
+        return daztl_service_pb2.GenericResponse(status="error", message=res.text)
+
+    @handle_backend_errors_async(daztl_service_pb2.LoginResponse)
+    async def LoginUser(self, request, context):
+        res = await self.backend.login({"username": request.username, "password": request.password})
+        if res.status_code == 200:
+            return messages.login_message(res.json())
+        context.set_code(grpc.StatusCode.UNAUTHENTICATED)
+        context.set_details("Invalid username or password")
+        return daztl_service_pb2.LoginResponse()
+
+    @handle_backend_errors_async(daztl_service_pb2.GenericResponse)
+    async def UpdateProfile(self, request, context):
+        payload = {
+            "email": request.email,
+            "first_name": request.first_name,
+            "last_name": request.last_name,
+            "username": request.username,
+            "password": request.password
+        }
+        res = await self.backend.update_profile(request.token, payload)
+        if res.status_code == 200:
+            return daztl_service_pb2.GenericResponse(status="success", message="Profile updated successfully")
+        return daztl_service_pb2.GenericResponse(status="error", message=res.text)
+
+    @handle_backend_errors_async(daztl_service_pb2.SongListResponse)
+    async def ListSongs(self, request, context):
+        params = {**page_args(request), **conditional_args(context)}
+        res = await self.shared("ListSongs", self.backend.list_songs, **params)
+        if not_modified(res, context):
+            return daztl_service_pb2.SongListResponse()
+        if res.status_code == 200:
+            return messages.song_list_message(res.json())
+        context.set_code(grpc.StatusCode.INTERNAL)
+        context.set_details("Failed to fetch songs")
+        return daztl_service_pb2.SongListResponse()
+
+    @handle_backend_errors_async(daztl_service_pb2.SongResponse)
+    async def GetSong(self, request, context):
+        res = await self.shared("GetSong", self.backend.get_song, song_id=request.id, **conditional_args(context))
+        if not_modified(res, context):
+            return daztl_service_pb2.SongResponse()
+        if res.status_code == 200:
+            return messages.song_message(res.json())
+        context.set_code(grpc.StatusCode.NOT_FOUND)
+        context.set_details("Song not found")
+        return daztl_service_pb2.SongResponse()
+
+    async def StreamSong(self, request, context):
+        try:
+            res = await self.backend.get_song(request.song_id)
+        except BackendTimeout:
+            await context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, "Backend API timeout")
+        except BackendUnavailable:
+            await context.abort(grpc.StatusCode.UNAVAILABLE, "Backend API unreachable")
+        if res.status_code != 200:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "Song not found")
+
+        try:
+            path, size = media.locate_audio(res.json(), request.offset)
+        except FileNotFoundError:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "Audio file not found")
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.OUT_OF_RANGE, str(e))
+
+        content_type = media.guess_content_type(path)
+        chunk_size = media.clamp_chunk_size(request.chunk_size)
+        async for offset, data in media.iter_file_chunks_async(path, request.offset, chunk_size):
+            yield daztl_service_pb2.AudioChunk(
+                data=data, offset=offset, total_size=size, content_type=content_type
+            )
+
+    @handle_backend_errors_async(daztl_service_pb2.GenericResponse)
+    async def UploadSong(self, request_iterator, context):
+        try:
+            upload = await uploads.receive_async(uploads.song_upload(), request_iterator)
+        except uploads.UploadError as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(e))
+            return daztl_service_pb2.GenericResponse(status="error", message=str(e))
+
+        with upload:
+            meta = upload.metadata
+            res = await self.backend.upload_song(meta.token, meta.title,
+                                                 upload.files["audio_data"], upload.files["cover_data"])
+        if res.status_code == 201:
+            return daztl_service_pb2.GenericResponse(status="success", message="Canción subida exitosamente")
+        return daztl_service_pb2.GenericResponse(status="error", message=res.text)
+
+    @handle_backend_errors_async(daztl_service_pb2.LoginResponse)
+    async def RefreshToken(self, request, context):
+        res = await self.backend.refresh_token(request.refresh_token)
+        if res.status_code == 200:
+            return messages.login_message(res.json())
+        context.set_code(grpc.StatusCode.UNAUTHENTICATED)
+        context.set_details("Invalid refresh token")
+        return daztl_service_pb2.LoginResponse()
+
+    @handle_backend_errors_async(daztl_service_pb2.UserProfileResponse)
+    async def GetProfile(self, request, context):
+        auth_header = dict(context.invocation_metadata()).get("authorization")
+        if not auth_header:
+            await context.abort(grpc.StatusCode.UNAUTHENTICATED, "Missing authorization header")
+
+        response = await self.backend.get_profile(auth_header, **conditional_args(context))
+        if not_modified(response, context):
+            return daztl_service_pb2.UserProfileResponse()
+        if response.status_code == 200:
+            return messages.profile_message(response.json())
+        if response.status_code == 401:
+            await context.abort(grpc.StatusCode.UNAUTHENTICATED, "Token inválido o expirado")
+        await context.abort(grpc.StatusCode.INTERNAL, "Error al consultar el perfil")
+
+    @handle_backend_errors_async(daztl_service_pb2.GenericResponse)
+    async def CreatePlaylist(self, request, context):
+        res = await self.backend.create_playlist(request.token, request.name)
+        if res.status_code != 201:
+            return daztl_service_pb2.GenericResponse(status="error", message=res.text)
+
+        playlist_id = res.json().get("id", -1)
+        if request.cover_url:
+            image_data = base64.b64decode(request.cover_url)
+            res_upload = await self.backend.upload_playlist_cover(request.token, playlist_id, image_data)
+            if res_upload.status_code != 200:
+                return daztl_service_pb2.GenericResponse(
+                    status="error",
+                    message=f"Playlist creada pero fallo al subir imagen: {res_upload.text}"
+                )
+
+        message = json.dumps({"id": playlist_id, "message": "Playlist creada exitosamente"})
+        return daztl_service_pb2.GenericResponse(status="success", message=message)
+
+    @handle_backend_errors_async(daztl_service_pb2.GenericResponse)
+    async def UploadCover(self, request_iterator, context):
+        try:
+            upload = await uploads.receive_async(uploads.cover_upload(), request_iterator)
+        except uploads.UploadError as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(e))
+            return daztl_service_pb2.GenericResponse(status="error", message=str(e))
+
+        with upload:
+            meta = upload.metadata
+            res = await self.backend.upload_playlist_cover_file(meta.token, meta.playlist_id, upload.files["data"])
+        if res.status_code == 200:
+            return daztl_service_pb2.GenericResponse(status="success", message="Cover subido exitosamente")
+        return daztl_service_pb2.GenericResponse(status="error", message=res.text)
+
+    @handle_backend_errors_async(daztl_service_pb2.PlaylistResponse)
+    async def GetPlaylist(self, request, context):
+        token = self.get_token_from_metadata(context)
+        response = await self.backend.get_playlist(token, request.id)
+        if response.status_code != 200:
+            context.set_code(grpc.StatusCode.PERMISSION_DENIED if response.status_code == 401
+                             else grpc.StatusCode.INTERNAL)
+            return daztl_service_pb2.PlaylistResponse(id=0, name="Error", songs=[])
+        return messages.playlist_message(response.json())
+
+    @handle_backend_errors_async(daztl_service_pb2.GenericResponse)
+    async def AddSongToPlaylist(self, request, context):
+        response = await self.backend.add_song_to_playlist(request.token, request.playlist_id, request.song_id)
+        if response.status_code == 200:
+            return daztl_service_pb2.GenericResponse(status="success", message="Canción agregada a la playlist")
+        return daztl_service_pb2.GenericResponse(status="error", message=response.text)
+
+    @handle_backend_errors_async(daztl_service_pb2.PlaylistDetailResponse)
+    async def GetPlaylistDetail(self, request, context):
+        response = await self.backend.get_playlist(request.token, request.playlist_id)
+        if response.status_code == 200:
+            return messages.playlist_detail_message(response.json())
+        return daztl_service_pb2.PlaylistDetailResponse(
+            status="error",
+            message=f"Error al obtener playlist: {response.text}"
+        )
+
+    @handle_backend_errors_async(daztl_service_pb2.PlaylistListResponse)
+    async def ListPlaylists(self, request, context):
+        response = await self.backend.list_playlists(request.token, **page_args(request), **conditional_args(context))
+        if not_modified(response, context):
+            return daztl_service_pb2.PlaylistListResponse()
+        if response.status_code == 200:
+            return messages.playlist_list_message(response.json())
+        context.set_code(grpc.StatusCode.UNAUTHENTICATED)
+        context.set_details("No autorizado para obtener playlists")
+        return daztl_service_pb2.PlaylistListResponse()
+
+    @handle_backend_errors_async(daztl_service_pb2.SongListResponse)
+    async def SearchSongs(self, request, context):
+        token = self.get_token_from_metadata(context)
+        response = await self.backend.list_songs(request.query, token=token, **page_args(request))
+        if response.status_code != 200:
+            await context.abort(grpc.StatusCode.INTERNAL, "Error al buscar canciones en el backend")
+        return messages.song_list_message(response.json())
+
+    @handle_backend_errors_async(daztl_service_pb2.GlobalSearchResponse)
+    async def GlobalSearch(self, request, context):
+        token = self.get_token_from_metadata(context)
+        response = await self.backend.global_search(request.query, token=token, page_size=request.page_size)
+        if response.status_code != 200:
+            await context.abort(grpc.StatusCode.INTERNAL, "Error al buscar contenido en el backend")
+        return messages.global_search_message(response.json())
+
+    @handle_backend_errors_async(daztl_service_pb2.SuggestResponse)
+    async def Suggest(self, request, context):
+        response = await self.shared("Suggest", self.backend.suggest, query=request.query,
+                                     limit=request.limit, kinds=list(request.kinds))
+        if response.status_code != 200:
+            await context.abort(grpc.StatusCode.INTERNAL, "Error al obtener sugerencias")
+        return messages.suggest_message(response.json())
+
+    @handle_backend_errors_async(daztl_service_pb2.AlbumListResponse)
+    async def ListAlbums(self, request, context):
+        params = {**page_args(request), **conditional_args(context)}
+        response = await self.shared("ListAlbums", self.backend.list_albums, **params)
+        if not_modified(response, context):
+            return daztl_service_pb2.AlbumListResponse()
+        if response.status_code == 200:
+            return messages.album_list_message(response.json())
+        context.set_code(grpc.StatusCode.INTERNAL)
+        context.set_details("Failed to fetch albums")
+        return daztl_service_pb2.AlbumListResponse()
+
+    @handle_backend_errors_async(daztl_service_pb2.ArtistListResponse)
+    async def ListArtists(self, request, context):
+        params = {**page_args(request), **conditional_args(context)}
+        response = await self.shared("ListArtists", self.backend.list_artists, **params)
+        if not_modified(response, context):
+            return daztl_service_pb2.ArtistListResponse()
+        if response.status_code == 200:
+            return messages.artist_list_message(response.json())
+        context.set_code(grpc.StatusCode.INTERNAL)
+        context.set_details("Failed to fetch artists")
+        return daztl_service_pb2.ArtistListResponse()
+
+    @handle_backend_errors_async(daztl_service_pb2.GenericResponse)
+    async def LikeArtist(self, request, context):
+        res = await self.backend.like_status(request.token, request.artist_id)
+        if res.status_code != 200:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details("Failed to check like status")
+            return daztl_service_pb2.GenericResponse()
+
+        if res.json().get("liked", False):
+            res = await self.backend.unlike_artist(request.token, request.artist_id)
+        else:
+            res = await self.backend.like_artist(request.token, request.artist_id)
+
+        if res.status_code in (200, 201):
+            return daztl_service_pb2.GenericResponse(status="success", message="Like status updated successfully")
+        context.set_code(grpc.StatusCode.INTERNAL)
+        context.set_details(f"Error updating like: {res.text}")
+        return daztl_service_pb2.GenericResponse()
+
+    @handle_backend_errors_async(daztl_service_pb2.LikeStatusResponse)
+    async def IsArtistLiked(self, request, context):
+        res = await self.backend.like_status(request.token, request.artist_id)
+        if res.status_code == 200:
+            return daztl_service_pb2.LikeStatusResponse(is_liked=res.json().get("liked", False))
+        context.set_code(grpc.StatusCode.INTERNAL)
+        context.set_details("Failed to get like status")
+        return daztl_service_pb2.LikeStatusResponse()
+
+    @handle_backend_errors_async(daztl_service_pb2.ChatListResponse)
+    async def ListChatMessages(self, request, context):
+        token = self.get_token_from_metadata(context)
+        response = await self.backend.list_chat_messages(
+            token, request.song_id, request.since_id, request.before_id, request.limit)
+        if response.status_code == 200:
+            return messages.chat_list_message(response.json())
+        context.set_code(grpc.StatusCode.UNAUTHENTICATED if response.status_code == 401
+                         else grpc.StatusCode.INTERNAL)
+        context.set_details("Error al obtener el chat")
+        return daztl_service_pb2.ChatListResponse()
+
+    @handle_backend_errors_async(daztl_service_pb2.GenericResponse)
+    async def SendChatMessage(self, request, context):
+        response = await self.backend.send_chat_message(request.token, request.song_id, request.message)
+        # A los SubscribeChat llega por api/broadcast.py cuando se guarda
+        if response.status_code not in (201, 202):
+            return daztl_service_pb2.GenericResponse(status="error", message=response.text)
+        return daztl_service_pb2.GenericResponse(status="success", message="Mensaje enviado")
+
+    @handle_backend_errors_async(daztl_service_pb2.GenericResponse)
+    async def RecordPlay(self, request, context):
+        response = await self.backend.record_play(request.token, request.song_id)
+        if response.status_code != 202:
+            return daztl_service_pb2.GenericResponse(status="error", message=response.text)
+        return daztl_service_pb2.GenericResponse(status="success", message="Reproduccion registrada")
+
+    async def subscriber_token(self, context):
+        token = self.get_token_from_metadata(context)
+        if not token:
+            return None
+        if verified_claims(token) is not None:
+            return token
+        response = await self.backend.get_profile(f"Bearer {token}")
+        return token if response.status_code == 200 else None
+
+    async def SubscribeChat(self, request, context):
+        # Cada suscripcion es una tarea esperando en su cola: miles de oyentes
+        # de la misma cancion no ocupan hilos
+        try:
+            token = await self.subscriber_token(context)
+        except BackendTimeout:
+            await context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, "Backend API timeout")
+        except BackendUnavailable:
+            await context.abort(grpc.StatusCode.UNAVAILABLE, "Backend API unreachable")
+        if token is None:
+            await context.abort(grpc.StatusCode.UNAUTHENTICATED, "Token inválido o expirado")
+        if not self.chat.available():
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION,
+                                "SubscribeChat requiere CHAT_BROADCAST_BACKEND=redis con este despliegue")
+        subscription = self.chat.subscribe_async(request.song_id)
+        try:
+            async for message in subscription:
+                yield message
+        except SlowConsumer as e:
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+        finally:
+            subscription.close()
+
+
+async def serve_async(backend_mode=None, port=50051, max_concurrent_rpcs=MAX_CONCURRENT_RPCS, reuse_port=False):
+    backend = get_async_backend(backend_mode)
+    verifier = make_verifier(backend.mode)
+    server = grpc.aio.server(
+        interceptors=[AsyncJWTInterceptor(verifier)] if verifier else None,
+        maximum_concurrent_rpcs=max_concurrent_rpcs,
+        options=[
+            ("grpc.server.max_pending_requests", MAX_PENDING_REQUESTS),
+            ("grpc.server.max_pending_requests_hard_limit", MAX_PENDING_REQUESTS),
+            ("grpc.so_reuseport", int(reuse_port)),
+        ],
+    )
+    await backend.warm_up()
+    servicer = AsyncMusicServiceServicer(backend, chat_hub=ChatHub(local_writes=backend.mode == "orm" and not reuse_port))
+    # Inicializa Django y el broadcast del chat ahora: si falla, falla el arranque
+    servicer.chat.attach()
+    daztl_service_pb2_grpc.add_MusicServiceServicer_to_server(servicer, server)
+    server.add_insecure_port(f"[::]:{port}")
+    await server.start()
+    print(f"gRPC asyncio server running on port {port} (pid {os.getpid()}, {backend.mode} backend)...")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        await server.stop(SHUTDOWN_GRACE)
+        await backend.close()
+        print(f"backend stats: {servicer.stats()}")
+
+
+def run_async(backend_mode=None, port=50051, max_concurrent_rpcs=MAX_CONCURRENT_RPCS, reuse_port=False):
+    asyncio.run(serve_async(backend_mode, port, max_concurrent_rpcs, reuse_port))
@@ -0,0 +1,30 @@
+import os
+
+from .base import BackendResponse
+from .errors import BackendError, BackendTimeout, BackendUnavailable
+
+BACKEND_MODES = ("http", "orm")
+DEFAULT_BACKEND = os.getenv("DAZTL_BACKEND", "http")
+
+
+def get_backend(mode=None, **options):
+    mode = (mode or DEFAULT_BACKEND).lower()
+    if mode == "http":
+        from .http import HttpBackend
+        return HttpBackend(**options)
+    if mode == "orm":
+        # Importa Django solo cuando se pide el modo en proceso
+        from .orm import OrmBackend
+        return OrmBackend()
+    raise ValueError(f"Unknown backend mode '{mode}', expected one of {BACKEND_MODES}")
+
+
+def get_async_backend(mode=None, **options):
+    mode = (mode or DEFAULT_BACKEND).lower()
+    if mode == "http":
+        from .aio import AsyncHttpBackend
+        return AsyncHttpBackend(**options)
+    if mode == "orm":
+        from .aio import AsyncOrmBackend
+        return AsyncOrmBackend()
+    raise ValueError(f"Unknown backend mode '{mode}', expected one of {BACKEND_MODES}")
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import os
+
+import aiohttp
+
+from .base import BackendResponse
+from .errors import BackendError, BackendTimeout, BackendUnavailable
+from .http import API_BASE_URL, REQUEST_TIMEOUT, HttpBackend, make_auth_header
+
+# El servidor asyncio no esta limitado a un hilo por RPC, el limite real de
+# concurrencia hacia gunicorn lo pone este pool
+ASYNC_POOL_SIZE = int(os.getenv("BACKEND_POOL_SIZE", "100"))
+
+
+class AsyncHttpBackend(HttpBackend):
+    # Reutiliza el mapeo de rutas de HttpBackend: cada metodo devuelve la
+    # corrutina de _request, asi que se usan con await.
+    def __init__(self, base_url=API_BASE_URL, timeout=REQUEST_TIMEOUT, pool_size=ASYNC_POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._session = None
+
+    def _get_session(self):
+        # La sesion se crea dentro del event loop que la va a usar
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    def stats(self):
+        connector = self._session.connector if self._session else None
+        return {"pool": {
+            "max_connections": self.pool_size,
+            "idle_connections": sum(len(c) for c in connector._conns.values()) if connector else 0,
+        }}
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+    async def warm_up(self):
+        pass
+
+    async def _request(self, method, path, files=None, **kwargs):
+        if files:
+            form = aiohttp.FormData()
+            for field, (filename, content, content_type) in files.items():
+                form.add_field(field, content, filename=filename, content_type=content_type)
+            kwargs["data"] = form
+        kwargs = {k: v for k, v in kwargs.items() if v is not None}
+        try:
+            async with self._get_session().request(method, self._url(path), **kwargs) as res:
+                body = await res.read()
+                status = res.status
+                headers = res.headers.copy()
+        except asyncio.TimeoutError as e:
+            raise BackendTimeout(str(e)) from e
+        except aiohttp.ClientConnectionError as e:
+            raise BackendUnavailable(str(e)) from e
+        except aiohttp.ClientError as e:
+            raise BackendError(str(e)) from e
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            data = body.decode("utf-8", errors="replace")
+        return BackendResponse(status, data, headers)
+
+    async def _post_multipart(self, path, token, fields, files):
+        # aiohttp envia los archivos abiertos por bloques, sin cargarlos en memoria
+        form = aiohttp.FormData()
+        for name, value in fields.items():
+            form.add_field(name, str(value))
+        handles = []
+        try:
+            for name, staged in files.items():
+                handle = open(staged.path, "rb")
+                handles.append(handle)
+                form.add_field(name, handle, filename=staged.filename, content_type=staged.content_type)
+            return await self._post(path, headers=make_auth_header(token), data=form)
+        finally:
+            for handle in handles:
+                handle.close()
+
+
+class AsyncOrmBackend:
+    # El ORM de Django es sincrono: cada operacion corre en el executor de
+    # asgiref y el event loop queda libre mientras tanto.
+    mode = "orm"
+
+    def __init__(self, backend=None):
+        if backend is None:
+            from .orm import OrmBackend
+            backend = OrmBackend()
+        self._backend = backend
+
+    def stats(self):
+        return self._backend.stats()
+
+    async def close(self):
+        pass
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        from asgiref.sync import sync_to_async
+        return sync_to_async(getattr(self._backend, name), thread_sensitive=False)
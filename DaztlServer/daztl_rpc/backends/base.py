@@ -0,0 +1,56 @@
+import contextvars
+import json
+
+# (token, claims) ya verificados por el interceptor JWT del gateway (jwt_auth.py)
+verified_token = contextvars.ContextVar("verified_token", default=None)
+
+
+def verified_claims(token):
+    verified = verified_token.get()
+    if verified is not None and verified[0] == token:
+        return verified[1]
+    return None
+
+
+def page_params(page_size=0, page_token=""):
+    # Parametros de paginacion de la API REST. Sin ninguno la API devuelve la
+    # lista completa (comportamiento anterior)
+    params = {}
+    if page_size:
+        params["page_size"] = page_size
+    if page_token:
+        params["cursor"] = page_token
+    return params
+
+
+def chat_window_params(since_id=0, before_id=0, limit=0):
+    # Historial incremental de LiveChatListView; 0 (default del proto) es "sin filtro"
+    params = {}
+    if since_id:
+        params["since_id"] = since_id
+    if before_id:
+        params["before_id"] = before_id
+    if limit:
+        params["limit"] = limit
+    return params
+
+
+class BackendResponse:
+    # Misma interfaz que requests.Response (status_code, json(), text, headers)
+    # para que los handlers del servicer no dependan del modo de backend.
+    def __init__(self, status_code, data=None, headers=None):
+        self.status_code = status_code
+        self.data = data
+        self.headers = headers if headers is not None else {}
+
+    def json(self):
+        return self.data
+
+    @property
+    def text(self):
+        if isinstance(self.data, str):
+            return self.data
+        return json.dumps(self.data, default=str, ensure_ascii=False)
+
+    def __repr__(self):
+        return f"<BackendResponse [{self.status_code}]>"
@@ -0,0 +1,10 @@
+class BackendError(Exception):
+    pass
+
+
+class BackendTimeout(BackendError):
+    pass
+
+
+class BackendUnavailable(BackendError):
+    pass
@@ -0,0 +1,252 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .base import chat_window_params, page_params
+from .errors import BackendError, BackendTimeout, BackendUnavailable
+from .multipart import MultipartStream
+
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000/api")
+REQUEST_TIMEOUT = 60
+# Por defecto una conexion keep-alive por hilo del ThreadPoolExecutor del servidor
+POOL_SIZE = int(os.getenv("BACKEND_POOL_SIZE", os.getenv("GRPC_MAX_WORKERS", "10")))
+
+
+def conditional_header(etag, headers=None):
+    # If-None-Match reenviado desde la metadata del cliente gRPC
+    if not etag:
+        return headers
+    return {**(headers or {}), "If-None-Match": etag}
+
+
+def make_auth_header(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.misses = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+
+    def record_checkout(self, waited):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_time += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def snapshot(self):
+        with self._lock:
+            checkouts = self.checkouts
+            return {
+                "checkouts": checkouts,
+                "hits": checkouts - self.misses,
+                "misses": self.misses,
+                "hit_rate": (checkouts - self.misses) / checkouts if checkouts else 0.0,
+                "wait_time_total": self.wait_time,
+                "wait_time_avg": self.wait_time / checkouts if checkouts else 0.0,
+                "wait_time_max": self.max_wait,
+            }
+
+
+class _StatsPoolMixin:
+    # hit = conexion reutilizada del pool, miss = urllib3 tuvo que crear una nueva
+    stats = None
+
+    def _get_conn(self, timeout=None):
+        start = time.perf_counter()
+        conn = super()._get_conn(timeout=timeout)
+        self.stats.record_checkout(time.perf_counter() - start)
+        return conn
+
+    def _new_conn(self):
+        self.stats.record_miss()
+        return super()._new_conn()
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    def __init__(self, stats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type("StatsHTTPConnectionPool", (_StatsPoolMixin, HTTPConnectionPool), {"stats": self.stats}),
+            "https": type("StatsHTTPSConnectionPool", (_StatsPoolMixin, HTTPSConnectionPool), {"stats": self.stats}),
+        }
+
+
+class HttpBackend:
+    # Proxy hacia la API REST de Django (modo original del gateway). Todas las
+    # llamadas comparten una Session con conexiones keep-alive hacia gunicorn.
+    mode = "http"
+
+    def __init__(self, base_url=API_BASE_URL, timeout=REQUEST_TIMEOUT, pool_size=POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.pool_stats = PoolStats()
+        # pool_block: con el pool lleno los hilos esperan una conexion libre en
+        # lugar de abrir conexiones descartables que agotan los puertos efimeros
+        adapter = PooledHTTPAdapter(
+            self.pool_stats,
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            pool_block=True,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def stats(self):
+        return {"pool": self.pool_stats.snapshot()}
+
+    def close(self):
+        self.session.close()
+
+    def warm_up(self):
+        # El indice de autocompletado vive en los workers de gunicorn
+        pass
+
+    def _url(self, path):
+        return f"{self.base_url}/{path}"
+
+    def _request(self, method, path, **kwargs):
+        try:
+            return self.session.request(method, self._url(path), timeout=self.timeout, **kwargs)
+        except requests.exceptions.Timeout as e:
+            raise BackendTimeout(str(e)) from e
+        except requests.exceptions.ConnectionError as e:
+            raise BackendUnavailable(str(e)) from e
+        except requests.exceptions.RequestException as e:
+            raise BackendError(str(e)) from e
+
+    def _get(self, path, **kwargs):
+        return self._request("GET", path, **kwargs)
+
+    def _post(self, path, **kwargs):
+        return self._request("POST", path, **kwargs)
+
+    def _put(self, path, **kwargs):
+        return self._request("PUT", path, **kwargs)
+
+    def _delete(self, path, **kwargs):
+        return self._request("DELETE", path, **kwargs)
+
+    def _post_multipart(self, path, token, fields, files):
+        # files: {campo: StagedFile de uploads.py}, se envian desde disco por bloques
+        body = MultipartStream(fields, files)
+        headers = make_auth_header(token)
+        headers["Content-Type"] = body.content_type
+        try:
+            return self._post(path, headers=headers, data=body)
+        finally:
+            body.close()
+
+    # — Usuarios
+    def register_user(self, payload):
+        return self._post("register/", json=payload)
+
+    def register_artist(self, payload):
+        return self._post("auth/register-artist/", json=payload)
+
+    def login(self, payload):
+        return self._post("login/", json=payload)
+
+    def refresh_token(self, refresh):
+        return self._post("refresh/", json={"refresh": refresh})
+
+    def update_profile(self, token, payload):
+        return self._put("profile/edit", headers=make_auth_header(token), json=payload)
+
+    def get_profile(self, auth_header, etag=None):
+        return self._get("profile/", headers=conditional_header(etag, {"Authorization": auth_header}))
+
+    # — Catalogo
+    def list_songs(self, query=None, token=None, page_size=0, page_token="", etag=None):
+        params = page_params(page_size, page_token)
+        if query is not None:
+            params["q"] = query
+        headers = make_auth_header(token) if token else None
+        return self._get("songs/", headers=conditional_header(etag, headers), params=params)
+
+    def get_song(self, song_id, etag=None):
+        return self._get(f"songs/{song_id}/", headers=conditional_header(etag))
+
+    def upload_song(self, token, title, audio, cover):
+        return self._post_multipart("songs/upload/", token, {"title": title},
+                                    {"audio_file": audio, "cover_image": cover})
+
+    def list_albums(self, page_size=0, page_token="", etag=None):
+        return self._get("albums/", headers=conditional_header(etag), params=page_params(page_size, page_token))
+
+    def list_artists(self, page_size=0, page_token="", etag=None):
+        return self._get("artists/", headers=conditional_header(etag), params=page_params(page_size, page_token))
+
+    def global_search(self, query, token=None, page_size=0):
+        headers = make_auth_header(token) if token else None
+        return self._get("search/", headers=headers, params={"q": query, **page_params(page_size)})
+
+    def suggest(self, query, limit=0, kinds=()):
+        params = {"q": query, "kind": list(kinds)}
+        if limit:
+            params["limit"] = limit
+        return self._get("search/suggest/", params=params)
+
+    # — Playlists
+    def create_playlist(self, token, name):
+        return self._post("playlists/create/", headers=make_auth_header(token), json={"name": name})
+
+    def upload_playlist_cover(self, token, playlist_id, image_data, filename="cover.jpg", content_type="image/jpeg"):
+        files = {"cover": (filename, image_data, content_type)}
+        return self._post(f"playlists/{playlist_id}/upload_cover/", headers=make_auth_header(token), files=files)
+
+    def upload_playlist_cover_file(self, token, playlist_id, cover):
+        return self._post_multipart(f"playlists/{playlist_id}/upload_cover/", token, {}, {"cover": cover})
+
+    def get_playlist(self, token, playlist_id):
+        return self._get(f"playlists/{playlist_id}/", headers=make_auth_header(token))
+
+    def add_song_to_playlist(self, token, playlist_id, song_id):
+        return self._post(
+            f"playlists/{playlist_id}/add_song/",
+            headers=make_auth_header(token),
+            json={"song_id": song_id},
+        )
+
+    def list_playlists(self, token, page_size=0, page_token="", etag=None):
+        return self._get("playlists/", headers=conditional_header(etag, make_auth_header(token)),
+                         params=page_params(page_size, page_token))
+
+    # — Likes
+    def like_status(self, token, artist_id):
+        return self._get(f"artists/{artist_id}/like/status/", headers=make_auth_header(token))
+
+    def like_artist(self, token, artist_id):
+        return self._post(f"artists/{artist_id}/like/", headers=make_auth_header(token))
+
+    def unlike_artist(self, token, artist_id):
+        return self._delete(f"artists/{artist_id}/like/", headers=make_auth_header(token))
+
+    # — Chat
+    def list_chat_messages(self, token, song_id, since_id=0, before_id=0, limit=0):
+        return self._get(f"songs/{song_id}/chat/", headers=make_auth_header(token),
+                         params=chat_window_params(since_id, before_id, limit))
+
+    def send_chat_message(self, token, song_id, message):
+        return self._post(f"songs/{song_id}/chat/send/", headers=make_auth_header(token),
+                          json={"song": song_id, "message": message})
+
+    # — Reproducciones
+    def record_play(self, token, song_id):
+        return self._post(f"songs/{song_id}/play/", headers=make_auth_header(token))
@@ -0,0 +1,60 @@
+import io
+import uuid
+
+
+class MultipartStream:
+    # Cuerpo multipart/form-data que lee los archivos desde disco a medida que
+    # requests lo envia. Con files= requests arma el cuerpo completo en memoria;
+    # este objeto tiene __len__ (Content-Length conocido) y read() por bloques.
+    def __init__(self, fields, files, boundary=None):
+        self.boundary = boundary or uuid.uuid4().hex
+        self._parts = []
+        for name, value in fields.items():
+            self._parts.append(
+                self._part_header(name) + b"\r\n" + str(value).encode("utf-8") + b"\r\n"
+            )
+        for name, staged in files.items():
+            self._parts.append(
+                self._part_header(name, staged.filename)
+                + f"Content-Type: {staged.content_type}\r\n\r\n".encode("utf-8")
+            )
+            self._parts.append(staged)
+            self._parts.append(b"\r\n")
+        self._parts.append(f"--{self.boundary}--\r\n".encode("utf-8"))
+        self._length = sum(part.size if hasattr(part, "path") else len(part) for part in self._parts)
+        self._pending = iter(self._parts)
+        self._current = None
+
+    @property
+    def content_type(self):
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def _part_header(self, name, filename=None):
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += '; filename="{}"'.format(filename.replace('"', "%22"))
+        return f"--{self.boundary}\r\nContent-Disposition: {disposition}\r\n".encode("utf-8")
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        buf = bytearray()
+        while size < 0 or len(buf) < size:
+            if self._current is None:
+                part = next(self._pending, None)
+                if part is None:
+                    break
+                self._current = open(part.path, "rb") if hasattr(part, "path") else io.BytesIO(part)
+            data = self._current.read(-1 if size < 0 else size - len(buf))
+            if not data:
+                self._current.close()
+                self._current = None
+                continue
+            buf += data
+        return bytes(buf)
+
+    def close(self):
+        if self._current is not None:
+            self._current.close()
+            self._current = None
@@ -0,0 +1,480 @@
+import functools
+import os
+import sys
+
+import django
+
+DJANGO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Host publico usado para construir URLs absolutas de media, igual que la API REST
+PUBLIC_HOST = os.getenv("API_PUBLIC_HOST", "localhost:8000")
+
+
+def setup_django():
+    if DJANGO_ROOT not in sys.path:
+        sys.path.insert(0, DJANGO_ROOT)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "daztl.settings")
+    django.setup()
+
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.core.files.base import ContentFile  # noqa: E402
+from django.db import close_old_connections  # noqa: E402
+from django.http import HttpRequest, QueryDict  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.exceptions import AuthenticationFailed  # noqa: E402
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError  # noqa: E402
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer  # noqa: E402
+from rest_framework_simplejwt.settings import api_settings  # noqa: E402
+
+from api.models import User, ArtistProfile, Song, Album, Playlist, Like, LiveChat  # noqa: E402
+from api.serializers import (  # noqa: E402
+    RegisterSerializer, ProfileUpdateSerializer, SongSerializer, AlbumSerializer,
+    ArtistProfileSerializer, PlaylistSerializer, SongUploadSerializer, LiveChatSerializer,
+)
+from api.pagination import OptionalCursorPagination, chat_window, parse_page_size  # noqa: E402
+from api import autocomplete, cache, chat_buffer, conditional, plays  # noqa: E402
+from api.authentication import CachedJWTAuthentication  # noqa: E402
+from api.search import search  # noqa: E402
+from api.uploads import LocalUploadedFile  # noqa: E402
+from api.views import CustomLoginView  # noqa: E402
+from daztl import db_pool, db_router  # noqa: E402
+
+from .base import BackendResponse, chat_window_params, page_params, verified_claims  # noqa: E402
+
+UNAUTHORIZED = {"detail": "Given token not valid for any token type"}
+
+
+def db_call(method):
+    # Cada llamada se comporta como un request de Django: descarta conexiones
+    # caducadas o rotas antes y despues de usar el ORM desde un hilo del servidor gRPC,
+    # y como ReplicaRoutingMiddleware deja en el primario al usuario que escribio.
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        close_old_connections()
+        try:
+            with db_router.routing_scope():
+                return method(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return wrapper
+
+
+def replica_read(method):
+    # Lecturas publicas del catalogo: pueden ir a una replica (daztl/db_router.py),
+    # salvo para quien acaba de escribir. Va debajo de @db_call
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if settings.DB_REPLICAS:
+            db_router.use_replicas(self._token_user_id(kwargs.get("token")))
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+def staged_file(staged):
+    # Archivo ya escrito y verificado por uploads.py del gateway: se mueve a
+    # MEDIA_ROOT en lugar de copiarlo
+    return LocalUploadedFile(staged.path, staged.filename, staged.content_type)
+
+
+class OrmBackend:
+    # Llama directamente a los modelos y serializers de api/ dentro del proceso gRPC
+    mode = "orm"
+
+    def __init__(self, public_host=PUBLIC_HOST):
+        self.public_host = public_host
+        self._jwt = CachedJWTAuthentication()
+
+    def stats(self):
+        stats = {"cache": cache.stats()}
+        if settings.DB_POOL:
+            stats["db_pool"] = db_pool.stats()
+        return stats
+
+    @db_call
+    def warm_up(self):
+        # Carga el indice de autocompletado antes de aceptar RPCs
+        autocomplete.warm_up()
+
+    def _request(self, user=None):
+        request = HttpRequest()
+        request.META["HTTP_HOST"] = self.public_host
+        request.META["SERVER_PORT"] = "80"
+        request.user = user
+        return request
+
+    def _context(self, user=None):
+        return {"request": self._request(user)}
+
+    def _list(self, queryset, serializer_class, user=None, page_size=0, page_token=""):
+        # Misma paginacion por cursor que la API REST: el modo orm y el http
+        # devuelven los mismos tokens y la misma forma {next, previous, results}
+        request = self._request(user)
+        request.GET = QueryDict(mutable=True)
+        request.GET.update(page_params(page_size, page_token))
+        context = {"request": request}
+        paginator = OptionalCursorPagination()
+        page = paginator.paginate_queryset(queryset, Request(request))
+        if page is None:
+            return BackendResponse(200, serializer_class(queryset, many=True, context=context).data)
+        data = serializer_class(page, many=True, context=context).data
+        return BackendResponse(200, paginator.get_paginated_response(data).data)
+
+    def _cached_list(self, endpoint, queryset, serializer_class, page_size, page_token, etag, **params):
+        # Catalogo publico: misma cache que los listados REST (api/cache.py)
+        params.update(host=self.public_host, page=page_params(page_size, page_token))
+
+        def page():
+            return BackendResponse(200, cache.fetch(endpoint, params, lambda: self._list(
+                queryset, serializer_class, page_size=page_size, page_token=page_token).data))
+        return self._conditional([cache.CATALOG], {"rpc": endpoint, **params}, etag, page)
+
+    def _conditional(self, scopes, variant, etag, compute):
+        # Igual que ConditionalGetMixin: con el ETag vigente responde 304 sin
+        # consultar ni serializar; si no, agrega el ETag a la respuesta
+        current, _ = conditional.validators(scopes, variant)
+        if conditional.etag_matches(etag, current):
+            return BackendResponse(304, None, {"ETag": current})
+        response = compute()
+        if response.status_code == 200:
+            response.headers["ETag"] = current
+        return response
+
+    def _authenticate(self, token):
+        if not token:
+            return None
+        try:
+            # Firma y expiracion ya las verifico el interceptor en este mismo RPC
+            validated = verified_claims(token) or self._jwt.get_validated_token(token)
+            user = self._jwt.get_user(validated)
+        except (InvalidToken, AuthenticationFailed):
+            return None
+        db_router.set_user(user.pk)
+        return user
+
+    def _token_user_id(self, token):
+        # Solo elige la base de una lectura publica: no consulta al usuario
+        if not token:
+            return None
+        try:
+            validated = verified_claims(token) or self._jwt.get_validated_token(token)
+        except InvalidToken:
+            return None
+        return validated.get(api_settings.USER_ID_CLAIM)
+
+    # — Usuarios
+    @db_call
+    def register_user(self, payload):
+        serializer = RegisterSerializer(data=payload)
+        if not serializer.is_valid():
+            return BackendResponse(400, serializer.errors)
+        serializer.save()
+        return BackendResponse(201, serializer.data)
+
+    @db_call
+    def register_artist(self, payload):
+        username = payload.get("username")
+        email = payload.get("email")
+        if User.objects.filter(username=username).exists():
+            return BackendResponse(400, {"error": "El nombre de usuario ya existe"})
+        if User.objects.filter(email=email).exists():
+            return BackendResponse(400, {"error": "El email ya está registrado"})
+        try:
+            user = User.objects.create_user(
+                username=username,
+                email=email,
+                password=payload.get("password"),
+                first_name=payload.get("first_name", ""),
+                last_name=payload.get("last_name", ""),
+                role="artist",
+            )
+            artist_profile = ArtistProfile.objects.create(user=user, bio=payload.get("bio", ""))
+        except Exception as e:
+            return BackendResponse(400, {"error": str(e)})
+        return BackendResponse(201, {
+            "message": "Artista registrado exitosamente",
+            "user_id": user.id,
+            "username": user.username,
+            "email": user.email,
+            "artist_profile_id": artist_profile.id,
+        })
+
+    @db_call
+    def login(self, payload):
+        serializer = CustomLoginView.CustomTokenSerializer(data=payload, context=self._context())
+        try:
+            if not serializer.is_valid():
+                return BackendResponse(400, serializer.errors)
+        except AuthenticationFailed as e:
+            return BackendResponse(401, {"detail": str(e.detail)})
+        return BackendResponse(200, serializer.validated_data)
+
+    @db_call
+    def refresh_token(self, refresh):
+        serializer = TokenRefreshSerializer(data={"refresh": refresh})
+        try:
+            if not serializer.is_valid():
+                return BackendResponse(400, serializer.errors)
+        except TokenError as e:
+            return BackendResponse(401, {"detail": str(e)})
+        return BackendResponse(200, serializer.validated_data)
+
+    @db_call
+    def update_profile(self, token, payload):
+        user = self._authenticate(token)
+        if user is None:
+            return BackendResponse(401, UNAUTHORIZED)
+        serializer = ProfileUpdateSerializer(user, data=payload)
+        if not serializer.is_valid():
+            return BackendResponse(400, serializer.errors)
+        serializer.save()
+        return BackendResponse(200, serializer.data)
+
+    @db_call
+    def get_profile(self, auth_header, etag=None):
+        token = auth_header.split(" ", 1)[1] if " " in auth_header else auth_header
+        user = self._authenticate(token)
+        if user is None:
+            return BackendResponse(401, UNAUTHORIZED)
+
+        def profile():
+            profile_picture_url = ""
+            if user.profile_picture:
+                profile_picture_url = self._request(user).build_absolute_uri(user.profile_picture.url)
+            return BackendResponse(200, {
+                "username": user.username,
+                "email": user.email,
+                "first_name": user.first_name,
+                "last_name": user.last_name,
+                "profile_image_url": profile_picture_url,
+            })
+        return self._conditional([conditional.profile_scope(user.pk)], {"rpc": "GetProfile"}, etag, profile)
+
+    # — Catalogo
+    @db_call
+    @replica_read
+    def list_songs(self, query=None, token=None, page_size=0, page_token="", etag=None):
+        songs = SongSerializer.setup_eager_loading(Song.objects.filter(title__icontains=query or ""))
+        return self._cached_list("ListSongs", songs, SongSerializer, page_size, page_token, etag, query=query or "")
+
+    @db_call
+    @replica_read
+    def get_song(self, song_id, etag=None):
+        params = {"host": self.public_host, "id": song_id}
+
+        def compute():
+            song = SongSerializer.setup_eager_loading(Song.objects.all()).get(pk=song_id)
+            return SongSerializer(song, context=self._context()).data
+
+        def song():
+            try:
+                return BackendResponse(200, cache.fetch("GetSong", params, compute))
+            except Song.DoesNotExist:
+                return BackendResponse(404, {"detail": "No Song matches the given query."})
+        return self._conditional([cache.CATALOG], {"rpc": "GetSong", **params}, etag, song)
+
+    @db_call
+    def upload_song(self, token, title, audio, cover):
+        user = self._authenticate(token)
+        if user is None:
+            return BackendResponse(401, UNAUTHORIZED)
+        artist = ArtistProfile.objects.filter(user=user).first()
+        if artist is None:
+            return BackendResponse(403, {"detail": "Solo los artistas pueden subir canciones"})
+        audio_file, cover_file = staged_file(audio), staged_file(cover)
+        try:
+            serializer = SongUploadSerializer(
+                data={"title": title, "audio_file": audio_file, "cover_image": cover_file},
+                context=self._context(user),
+            )
+            if not serializer.is_valid():
+                return BackendResponse(400, serializer.errors)
+            serializer.save(artist=artist)
+        finally:
+            audio_file.close()
+            cover_file.close()
+        return BackendResponse(201, serializer.data)
+
+    @db_call
+    @replica_read
+    def list_albums(self, page_size=0, page_token="", etag=None):
+        albums = AlbumSerializer.setup_eager_loading(Album.objects.all())
+        return self._cached_list("ListAlbums", albums, AlbumSerializer, page_size, page_token, etag)
+
+    @db_call
+    @replica_read
+    def list_artists(self, page_size=0, page_token="", etag=None):
+        artists = ArtistProfileSerializer.setup_eager_loading(ArtistProfile.objects.all())
+        return self._cached_list("ListArtists", artists, ArtistProfileSerializer, page_size, page_token, etag)
+
+    @db_call
+    @replica_read
+    def global_search(self, query, token=None, page_size=0):
+        context = self._context()
+        limit = parse_page_size(page_size) if page_size else None
+        songs = search("song", query, limit, SongSerializer.setup_eager_loading(Song.objects.all()))
+        albums = search("album", query, limit, AlbumSerializer.setup_eager_loading(Album.objects.all()))
+        artists = search("artist", query, limit, ArtistProfileSerializer.setup_eager_loading(ArtistProfile.objects.all()))
+        playlists = search("playlist", query, limit, PlaylistSerializer.setup_eager_loading(Playlist.objects.all()))
+        return BackendResponse(200, {
+            "songs": SongSerializer(songs, many=True, context=context).data,
+            "albums": AlbumSerializer(albums, many=True, context=context).data,
+            "artists": ArtistProfileSerializer(artists, many=True, context=context).data,
+            "playlists": PlaylistSerializer(playlists, many=True, context=context).data,
+        })
+
+    @db_call
+    def suggest(self, query, limit=0, kinds=()):
+        limit = autocomplete.parse_limit(limit)
+        kinds = autocomplete.parse_kinds(kinds)
+        return BackendResponse(200, {"suggestions": autocomplete.suggest(query, limit, kinds)})
+
+    # — Playlists
+    @db_call
+    def create_playlist(self, token, name):
+        user = self._authenticate(token)
+        if user is None:
+            return BackendResponse(401, UNAUTHORIZED)
+        serializer = PlaylistSerializer(data={"name": name}, context=self._context(user))
+        if not serializer.is_valid():
+            return BackendResponse(400, serializer.errors)
+        serializer.save(user=user)
+        return BackendResponse(201, serializer.data)
+
+    @db_call
+    def upload_playlist_cover(self, token, playlist_id, image_data, filename="cover.jpg", content_type="image/jpeg"):
+        user = self._authenticate(token)
+        if user is None:
+            return BackendResponse(401, UNAUTHORIZED)
+        try:
+            playlist = Playlist.objects.get(pk=playlist_id, user=user)
+        except Playlist.DoesNotExist:
+            return BackendResponse(404, {"error": "Playlist no encontrada o no tienes permisos."})
+        if not image_data:
+            return BackendResponse(400, {"error": "No se proporcionó ninguna imagen."})
+        playlist.cover = ContentFile(image_data, name=filename)
+        playlist.save()
+        return BackendResponse(200, {"message": "Cover subido exitosamente."})
+
+    @db_call
+    def upload_playlist_cover_file(self, token, playlist_id, cover):
+        user = self._authenticate(token)
+        if user is None:
+            return BackendResponse(401, UNAUTHORIZED)
+        try:
+            playlist = Playlist.objects.get(pk=playlist_id, user=user)
+        except Playlist.DoesNotExist:
+            return BackendResponse(404, {"error": "Playlist no encontrada o no tienes permisos."})
+        cover_file = staged_file(cover)
+        try:
+            playlist.cover = cover_file
+            playlist.save()
+        finally:
+            cover_file.close()
+        return BackendResponse(200, {"message": "Cover subido exitosamente."})
+
+    @db_call
+    def get_playlist(self, token, playlist_id):
+        user = self._authenticate(token)
+        if user is None:
+            return BackendResponse(401, UNAUTHORIZED)
+        try:
+            playlist = PlaylistSerializer.setup_eager_loading(Playlist.objects.all()).get(pk=playlist_id, user=user)
+        except Playlist.DoesNotExist:
+            return BackendResponse(404, {"detail": "No Playlist matches the given query."})
+        return BackendResponse(200, PlaylistSerializer(playlist, context=self._context(user)).data)
+
+    @db_call
+    def add_song_to_playlist(self, token, playlist_id, song_id):
+        user = self._authenticate(token)
+        if user is None:
+            return BackendResponse(401, UNAUTHORIZED)
+        try:
+            playlist = Playlist.objects.get(pk=playlist_id, user=user)
+            song = Song.objects.get(pk=song_id)
+        except Playlist.DoesNotExist:
+            return BackendResponse(404, {"status": "error", "message": "Playlist no encontrada"})
+        except Song.DoesNotExist:
+            return BackendResponse(404, {"status": "error", "message": "Canción no encontrada"})
+        playlist.songs.add(song)
+        return BackendResponse(200, {"status": "success", "message": "Canción agregada correctamente"})
+
+    @db_call
+    def list_playlists(self, token, page_size=0, page_token="", etag=None):
+        user = self._authenticate(token)
+        if user is None:
+            return BackendResponse(401, UNAUTHORIZED)
+        playlists = PlaylistSerializer.setup_eager_loading(Playlist.objects.filter(user=user))
+        variant = {"rpc": "ListPlaylists", "host": self.public_host, "page": page_params(page_size, page_token)}
+        return self._conditional([cache.CATALOG, conditional.playlists_scope(user.pk)], variant, etag,
+                                 lambda: self._list(playlists, PlaylistSerializer, user, page_size, page_token))
+
+    # — Likes
+    @db_call
+    def like_status(self, token, artist_id):
+        user = self._authenticate(token)
+        if user is None:
+            return BackendResponse(401, UNAUTHORIZED)
+        return BackendResponse(200, {"liked": Like.objects.filter(user=user, artist_id=artist_id).exists()})
+
+    @db_call
+    def like_artist(self, token, artist_id):
+        user = self._authenticate(token)
+        if user is None:
+            return BackendResponse(401, UNAUTHORIZED)
+        try:
+            artist = ArtistProfile.objects.get(id=artist_id)
+        except ArtistProfile.DoesNotExist:
+            return BackendResponse(404, {"error": "Artista no encontrado"})
+        Like.objects.get_or_create(user=user, artist=artist)
+        return BackendResponse(201, {"status": "Like agregado"})
+
+    @db_call
+    def unlike_artist(self, token, artist_id):
+        user = self._authenticate(token)
+        if user is None:
+            return BackendResponse(401, UNAUTHORIZED)
+        try:
+            artist = ArtistProfile.objects.get(id=artist_id)
+        except ArtistProfile.DoesNotExist:
+            return BackendResponse(404, {"error": "Artista no encontrado"})
+        try:
+            Like.objects.get(user=user, artist=artist).delete()
+        except Like.DoesNotExist:
+            return BackendResponse(404, {"error": "Like no encontrado"})
+        return BackendResponse(200, {"status": "Like eliminado"})
+
+    # — Chat
+    @db_call
+    def list_chat_messages(self, token, song_id, since_id=0, before_id=0, limit=0):
+        user = self._authenticate(token)
+        if user is None:
+            return BackendResponse(401, UNAUTHORIZED)
+        chats = LiveChatSerializer.setup_eager_loading(LiveChat.objects.filter(song_id=song_id))
+        params = chat_window_params(since_id, before_id, limit)
+        chats = chat_window(chats, params) if params else chats.order_by("pk")
+        return BackendResponse(200, LiveChatSerializer(chats, many=True, context=self._context(user)).data)
+
+    @db_call
+    def send_chat_message(self, token, song_id, message):
+        user = self._authenticate(token)
+        if user is None:
+            return BackendResponse(401, UNAUTHORIZED)
+        serializer = LiveChatSerializer(data={"song": song_id, "message": message}, context=self._context(user))
+        if not serializer.is_valid():
+            return BackendResponse(400, serializer.errors)
+        try:
+            stored = chat_buffer.save_chat(serializer, user)
+        except chat_buffer.ChatBufferFull:
+            return BackendResponse(503, {"detail": "Chat saturado, reintentar mas tarde"})
+        return BackendResponse(201 if stored else 202, serializer.data)
+
+    # — Reproducciones
+    @db_call
+    def record_play(self, token, song_id):
+        user = self._authenticate(token)
+        if user is None:
+            return BackendResponse(401, UNAUTHORIZED)
+        plays.record(song_id)
+        return BackendResponse(202, {"status": "Reproduccion registrada"})
@@ -0,0 +1,259 @@
+# Reparto del chat en vivo a los SubscribeChat de este proceso. Los mensajes
+# llegan de la capa de broadcast de api/broadcast.py, la misma que usan el SSE
+# y el WebSocket: cada LiveChat se publica ahi una vez guardado (ya con id),
+# se haya enviado por SendChatMessage, por REST o por el WebSocket, y desde
+# cualquier proceso si CHAT_BROADCAST_BACKEND es un broker (redis). Con
+# "memory" solo se ven los mensajes guardados en este mismo proceso: alcanza
+# con el backend orm en un unico proceso (local_writes); en otro caso
+# SubscribeChat responde FAILED_PRECONDITION. El mensaje protobuf se arma una
+# vez por proceso y se comparte entre todos los suscriptores.
+#
+# Las colas son acotadas (GRPC_CHAT_QUEUE_SIZE). Con un cliente que no lee a
+# tiempo, GRPC_CHAT_SLOW_CONSUMER decide: "disconnect" cierra su stream (el
+# cliente se vuelve a suscribir y recupera lo perdido con ListChatMessages) y
+# "drop_oldest" descarta sus mensajes mas viejos.
+import asyncio
+import json
+import os
+import sys
+import threading
+from collections import Counter, deque
+
+import messages
+
+DJANGO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QUEUE_SIZE = int(os.getenv("GRPC_CHAT_QUEUE_SIZE", "256"))
+DISCONNECT = "disconnect"
+DROP_OLDEST = "drop_oldest"
+SLOW_CONSUMER_POLICIES = (DISCONNECT, DROP_OLDEST)
+SLOW_CONSUMER_POLICY = os.getenv("GRPC_CHAT_SLOW_CONSUMER", DISCONNECT)
+
+
+class SlowConsumer(Exception):
+    pass
+
+
+def running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def shared_broadcast():
+    # La capa de api/broadcast.py con la configuracion de Django
+    # (CHAT_BROADCAST_*); el backend http no inicializa Django por su cuenta
+    if DJANGO_ROOT not in sys.path:
+        sys.path.insert(0, DJANGO_ROOT)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "daztl.settings")
+    import django
+    django.setup()
+    from api import broadcast
+    return broadcast.get_broadcast()
+
+
+class Subscription:
+    # Para el servidor con hilos: el handler espera en get() y publish() lo despierta
+    def __init__(self, hub, song_id, maxsize, policy):
+        self.hub = hub
+        self.song_id = song_id
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self.closed = False
+        self.slow = False
+        self._queue = deque()
+        self._cond = threading.Condition()
+
+    def push(self, message):
+        # False si el suscriptor quedo desconectado por lento
+        with self._cond:
+            if self.closed:
+                return False
+            if len(self._queue) >= self.maxsize:
+                if self.policy != DROP_OLDEST:
+                    self.closed = self.slow = True
+                    self._cond.notify()
+                    return False
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append(message)
+            self._cond.notify()
+            return True
+
+    def get(self, timeout=None):
+        # Siguiente mensaje, o None si vencio el timeout o se cerro la suscripcion
+        with self._cond:
+            self._cond.wait_for(lambda: self._queue or self.closed, timeout)
+            if self._queue:
+                return self._queue.popleft()
+            if self.slow:
+                raise SlowConsumer(f"Mas de {self.maxsize} mensajes sin leer")
+            return None
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+        self.hub.unsubscribe(self)
+
+    def __iter__(self):
+        while True:
+            message = self.get()
+            if message is None:
+                return
+            yield message
+
+
+class AsyncSubscription(Subscription):
+    # Para grpc.aio: push() corre en el event loop que la creo (publish() lo
+    # agenda ahi si se publica desde otro hilo)
+    def __init__(self, hub, song_id, maxsize, policy):
+        super().__init__(hub, song_id, maxsize, policy)
+        self.loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+
+    def push(self, message):
+        delivered = super().push(message)
+        self._ready.set()
+        return delivered
+
+    async def get_async(self):
+        while True:
+            message = self.get(timeout=0)
+            if message is not None or self.closed:
+                return message
+            self._ready.clear()
+            await self._ready.wait()
+
+    def close(self):
+        super().close()
+        self._ready.set()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self.get_async()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+
+class ChatHub:
+    def __init__(self, queue_size=QUEUE_SIZE, policy=SLOW_CONSUMER_POLICY, broadcast=None, local_writes=False):
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Politica desconocida '{policy}', se esperaba una de {SLOW_CONSUMER_POLICIES}")
+        self.queue_size = queue_size
+        self.policy = policy
+        # True si todos los mensajes se guardan en este proceso (backend orm
+        # sin supervisor): alcanza con el broadcast en memoria
+        self.local_writes = local_writes
+        self._broadcast = broadcast
+        self._attached = False
+        self._attach_lock = threading.Lock()
+        self._rooms = {}
+        self._lock = threading.Lock()
+        self.counters = Counter()
+
+    def attach(self):
+        # Se engancha a api/broadcast.py; serve() lo llama al arrancar para que
+        # un error de configuracion de Django no aparezca en el primer RPC
+        with self._attach_lock:
+            if not self._attached:
+                if self._broadcast is None:
+                    self._broadcast = shared_broadcast()
+                self._broadcast.add_listener(self.receive)
+                self._attached = True
+        return self._broadcast
+
+    def available(self):
+        # Si este proceso ve todos los mensajes del chat. Los handlers lo
+        # llaman antes de subscribe()
+        layer = self.attach()
+        # attach() es quien deja api/ importable (shared_broadcast)
+        from api.broadcast import BrokerBroadcast
+        return isinstance(layer, BrokerBroadcast) or self.local_writes
+
+    def receive(self, channel, message):
+        # Listener de api/broadcast.py: Message(id, JSON de LiveChatSerializer)
+        prefix, _, song_id = channel.partition(":")
+        if prefix != "chat" or not song_id.isdigit() or not self.subscribers(int(song_id)):
+            return
+        self.publish(int(song_id), messages.chat_message({**json.loads(message.data), "id": message.id}))
+
+    def subscribe(self, song_id, subscription_class=Subscription):
+        subscription = subscription_class(self, song_id, self.queue_size, self.policy)
+        with self._lock:
+            self._rooms.setdefault(song_id, set()).add(subscription)
+            self.counters["subscribed"] += 1
+        return subscription
+
+    def subscribe_async(self, song_id):
+        return self.subscribe(song_id, AsyncSubscription)
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            room = self._rooms.get(subscription.song_id)
+            if room is None or subscription not in room:
+                return
+            room.discard(subscription)
+            if not room:
+                del self._rooms[subscription.song_id]
+
+    def publish(self, song_id, message):
+        # Desde cualquier hilo (el listener de redis, el que guardo el mensaje).
+        # Las suscripciones asyncio de otro loop reciben un callback por loop;
+        # devuelve a cuantas se entrego en este hilo
+        with self._lock:
+            self.counters["published"] += 1
+            subscribers = list(self._rooms.get(song_id, ()))
+        current = running_loop()
+        local, by_loop = [], {}
+        for subscription in subscribers:
+            loop = getattr(subscription, "loop", None)
+            if loop is None or loop is current:
+                local.append(subscription)
+            else:
+                by_loop.setdefault(loop, []).append(subscription)
+        for loop, group in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(self.push_all, group, message)
+            except RuntimeError:
+                # Loop cerrado: sus streams ya no existen
+                for subscription in group:
+                    self.unsubscribe(subscription)
+        return self.push_all(local, message)
+
+    def push_all(self, subscribers, message):
+        delivered = dropped = 0
+        slow = []
+        for subscription in subscribers:
+            before = subscription.dropped
+            if subscription.push(message):
+                delivered += 1
+                dropped += subscription.dropped - before
+            elif subscription.slow:
+                slow.append(subscription)
+        for subscription in slow:
+            self.unsubscribe(subscription)
+        with self._lock:
+            self.counters["delivered"] += delivered
+            self.counters["dropped"] += dropped
+            self.counters["disconnected"] += len(slow)
+        return delivered
+
+    def subscribers(self, song_id):
+        with self._lock:
+            return len(self._rooms.get(song_id, ()))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rooms": len(self._rooms),
+                "subscribers": sum(len(room) for room in self._rooms.values()),
+                "queue_size": self.queue_size,
+                "policy": self.policy,
+                **{name: self.counters[name] for name in ("subscribed", "published", "delivered", "dropped", "disconnected")},
+            }
@@ -0,0 +1,287 @@
+# Verificacion local de los access tokens de simplejwt en el gateway. Un
+# interceptor revisa firma HS256, expiracion y tipo de token antes de llamar
+# al handler: un token vencido o adulterado se rechaza con UNAUTHENTICATED sin
+# ir a Django. Los claims se guardan por token hasta su "exp", y el token
+# verificado queda en backends.base.verified_token para que el backend orm no
+# repita la validacion. Django sigue siendo quien decide sobre el usuario
+# (inexistente, inactivo): en modo http la API recibe el token igual que antes.
+#
+# En los uploads cliente-streaming el token viene en la metadata del primer
+# mensaje: se verifica al leerlo, antes de que el handler acepte un solo byte
+# del archivo (uploads.receive solo ve streams ya autenticados).
+#
+# La clave es la misma de SIMPLE_JWT: en modo orm se lee de la configuracion de
+# Django y en modo http de JWT_SIGNING_KEY, la variable que usa settings.py.
+import base64
+import binascii
+import hashlib
+import hmac
+import itertools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import grpc
+
+from backends.base import verified_token
+
+JWT_VERIFY = os.getenv("GRPC_JWT_VERIFY", "1") == "1"
+JWT_SIGNING_KEY = os.getenv("JWT_SIGNING_KEY", "YOUR_SECRET_KEY")
+CLAIMS_CACHE_SIZE = int(os.getenv("GRPC_JWT_CACHE_SIZE", "10000"))
+ALGORITHM = "HS256"
+TOKEN_TYPE = "access"
+
+INVALID_TOKEN = "Token inválido o expirado"
+MISSING_TOKEN = "Missing authorization header"
+
+# RPC autenticados y de donde sale el token: campo "token" del request,
+# metadata "authorization" ("Bearer <token>") o metadata del primer mensaje
+# de un upload
+REQUEST_TOKEN = "request"
+METADATA_TOKEN = "metadata"
+UPLOAD_TOKEN = "upload"
+AUTHENTICATED_METHODS = {
+    "UpdateProfile": REQUEST_TOKEN,
+    "CreatePlaylist": REQUEST_TOKEN,
+    "AddSongToPlaylist": REQUEST_TOKEN,
+    "GetPlaylistDetail": REQUEST_TOKEN,
+    "ListPlaylists": REQUEST_TOKEN,
+    "LikeArtist": REQUEST_TOKEN,
+    "IsArtistLiked": REQUEST_TOKEN,
+    "GetPlaylist": METADATA_TOKEN,
+    "GetProfile": METADATA_TOKEN,
+    "ListChatMessages": METADATA_TOKEN,
+    "SendChatMessage": REQUEST_TOKEN,
+    "SubscribeChat": METADATA_TOKEN,
+    "RecordPlay": REQUEST_TOKEN,
+    "UploadSong": UPLOAD_TOKEN,
+    "UploadCover": UPLOAD_TOKEN,
+}
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def b64decode(segment):
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def decode(token, key, now=None):
+    # Mismas comprobaciones que AccessToken de simplejwt con la configuracion del proyecto
+    try:
+        header_segment, payload_segment, signature_segment = token.split(".")
+        header = json.loads(b64decode(header_segment))
+        claims = json.loads(b64decode(payload_segment))
+        signature = b64decode(signature_segment)
+    except (ValueError, binascii.Error):
+        raise InvalidToken("Token mal formado")
+    if not isinstance(header, dict) or header.get("alg") != ALGORITHM:
+        raise InvalidToken("Algoritmo no soportado")
+    expected = hmac.new(key.encode(), f"{header_segment}.{payload_segment}".encode(), hashlib.sha256).digest()
+    if not hmac.compare_digest(signature, expected):
+        raise InvalidToken("Firma invalida")
+    if not isinstance(claims, dict) or claims.get("token_type") != TOKEN_TYPE:
+        raise InvalidToken("No es un access token")
+    exp = claims.get("exp")
+    if not isinstance(exp, (int, float)) or exp <= (now or time.time()):
+        raise InvalidToken("Token expirado")
+    return claims
+
+
+class JWTVerifier:
+    def __init__(self, key=JWT_SIGNING_KEY, cache_size=CLAIMS_CACHE_SIZE):
+        self.key = key
+        self.cache_size = cache_size
+        self._claims = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claims(self, token):
+        now = time.time()
+        with self._lock:
+            claims = self._claims.get(token)
+            if claims is not None:
+                if claims["exp"] > now:
+                    self._claims.move_to_end(token)
+                    return claims
+                del self._claims[token]
+        claims = decode(token, self.key, now)
+        with self._lock:
+            self._claims[token] = claims
+            while len(self._claims) > self.cache_size:
+                self._claims.popitem(last=False)
+        return claims
+
+
+def make_verifier(backend_mode):
+    # None si la verificacion esta desactivada o la API no firma con HS256
+    if not JWT_VERIFY:
+        return None
+    if backend_mode == "orm":
+        from django.conf import settings
+        if settings.SIMPLE_JWT.get("ALGORITHM", ALGORITHM) != ALGORITHM:
+            return None
+        return JWTVerifier(settings.SIMPLE_JWT.get("SIGNING_KEY") or settings.SECRET_KEY)
+    return JWTVerifier()
+
+
+def request_token(source, request, metadata):
+    if source == REQUEST_TOKEN:
+        return request.token
+    if source == UPLOAD_TOKEN:
+        # Sin metadata primero no hay token; el stream no llega al handler
+        if request is None or request.WhichOneof("payload") != "metadata":
+            return ""
+        return request.metadata.token
+    token = dict(metadata).get("authorization", "")
+    return token.split(" ", 1)[1] if " " in token else token
+
+
+def authenticate(verifier, source, request, context):
+    # (token, claims) o (None, mensaje de error)
+    token = request_token(source, request, context.invocation_metadata())
+    if not token:
+        return None, MISSING_TOKEN
+    try:
+        return token, verifier.claims(token)
+    except InvalidToken:
+        return None, INVALID_TOKEN
+
+
+class JWTInterceptor(grpc.ServerInterceptor):
+    def __init__(self, verifier, methods=AUTHENTICATED_METHODS):
+        self.verifier = verifier
+        self.methods = methods
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        source = self.methods.get(handler_call_details.method.rsplit("/", 1)[-1])
+        if source is None or handler is None:
+            return handler
+        if handler.unary_unary is not None:
+            behavior = handler.unary_unary
+
+            def authenticated(request, context):
+                token, claims = authenticate(self.verifier, source, request, context)
+                if token is None:
+                    context.abort(grpc.StatusCode.UNAUTHENTICATED, claims)
+                reset = verified_token.set((token, claims))
+                try:
+                    return behavior(request, context)
+                finally:
+                    verified_token.reset(reset)
+
+            return grpc.unary_unary_rpc_method_handler(
+                authenticated,
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+        if handler.unary_stream is not None:
+            behavior = handler.unary_stream
+
+            def authenticated_stream(request, context):
+                token, claims = authenticate(self.verifier, source, request, context)
+                if token is None:
+                    context.abort(grpc.StatusCode.UNAUTHENTICATED, claims)
+                # No se restaura: un stream cancelado puede cerrarse desde otro
+                # hilo. El valor que quede solo sirve para este mismo token
+                # (verified_claims lo compara)
+                verified_token.set((token, claims))
+                yield from behavior(request, context)
+
+            return grpc.unary_stream_rpc_method_handler(
+                authenticated_stream,
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+        if handler.stream_unary is not None:
+            behavior = handler.stream_unary
+
+            def authenticated_upload(request_iterator, context):
+                first = next(request_iterator, None)
+                token, claims = authenticate(self.verifier, source, first, context)
+                if token is None:
+                    context.abort(grpc.StatusCode.UNAUTHENTICATED, claims)
+                reset = verified_token.set((token, claims))
+                try:
+                    return behavior(itertools.chain([first], request_iterator), context)
+                finally:
+                    verified_token.reset(reset)
+
+            return grpc.stream_unary_rpc_method_handler(
+                authenticated_upload,
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+        return handler
+
+
+async def prepend(first, request_iterator):
+    yield first
+    async for request in request_iterator:
+        yield request
+
+
+class AsyncJWTInterceptor(grpc.aio.ServerInterceptor):
+    def __init__(self, verifier, methods=AUTHENTICATED_METHODS):
+        self.verifier = verifier
+        self.methods = methods
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        source = self.methods.get(handler_call_details.method.rsplit("/", 1)[-1])
+        if source is None or handler is None:
+            return handler
+        # Cada RPC corre en su propia tarea: no hace falta restaurar el valor
+        if handler.unary_unary is not None:
+            behavior = handler.unary_unary
+
+            async def authenticated(request, context):
+                token, claims = authenticate(self.verifier, source, request, context)
+                if token is None:
+                    await context.abort(grpc.StatusCode.UNAUTHENTICATED, claims)
+                verified_token.set((token, claims))
+                return await behavior(request, context)
+
+            return grpc.unary_unary_rpc_method_handler(
+                authenticated,
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+        if handler.unary_stream is not None:
+            behavior = handler.unary_stream
+
+            async def authenticated_stream(request, context):
+                token, claims = authenticate(self.verifier, source, request, context)
+                if token is None:
+                    await context.abort(grpc.StatusCode.UNAUTHENTICATED, claims)
+                verified_token.set((token, claims))
+                async for message in behavior(request, context):
+                    yield message
+
+            return grpc.unary_stream_rpc_method_handler(
+                authenticated_stream,
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+        if handler.stream_unary is not None:
+            behavior = handler.stream_unary
+
+            async def authenticated_upload(request_iterator, context):
+                first = None
+                async for first in request_iterator:
+                    break
+                token, claims = authenticate(self.verifier, source, first, context)
+                if token is None:
+                    await context.abort(grpc.StatusCode.UNAUTHENTICATED, claims)
+                verified_token.set((token, claims))
+                return await behavior(prepend(first, request_iterator), context)
+
+            return grpc.stream_unary_rpc_method_handler(
+                authenticated_upload,
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+        return handler
@@ -0,0 +1,85 @@
+# Acceso directo a los archivos de MEDIA_ROOT desde el gateway. El contenedor
+# grpc monta el mismo volumen que Django, asi que el audio se lee del disco en
+# lugar de descargarlo entero desde la ruta /media/ de la API.
+import asyncio
+import mimetypes
+import mmap
+import os
+from urllib.parse import unquote, urlparse
+
+MEDIA_ROOT = os.getenv(
+    "MEDIA_ROOT",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "media"),
+)
+MEDIA_URL = os.getenv("MEDIA_URL", "/media/")
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+MIN_CHUNK_SIZE = 4 * 1024
+# Por debajo del limite de 4 MB por mensaje de gRPC
+MAX_CHUNK_SIZE = 1024 * 1024
+
+
+def resolve_media_path(url, media_root=None):
+    # audio_url llega absoluta (http://host/media/songs/x.mp3) o relativa;
+    # devuelve None si no apunta dentro de MEDIA_ROOT
+    media_root = os.path.realpath(media_root or MEDIA_ROOT)
+    path = urlparse(url or "").path
+    if not path.startswith(MEDIA_URL):
+        return None
+    full_path = os.path.realpath(os.path.join(media_root, unquote(path[len(MEDIA_URL):])))
+    if not full_path.startswith(media_root + os.sep):
+        return None
+    return full_path
+
+
+def locate_audio(song, offset=0, media_root=None):
+    # song es el JSON de SongSerializer. Devuelve (path, size); FileNotFoundError
+    # si el archivo no esta en disco, ValueError si el offset cae fuera del archivo
+    path = resolve_media_path(song.get("audio_url"), media_root)
+    if path is None or not os.path.isfile(path):
+        raise FileNotFoundError(song.get("audio_url"))
+    size = os.path.getsize(path)
+    if offset < 0 or offset > size:
+        raise ValueError(f"offset {offset} fuera de rango (tamano {size})")
+    return path, size
+
+
+def guess_content_type(path):
+    return mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+def clamp_chunk_size(chunk_size):
+    if not chunk_size:
+        return DEFAULT_CHUNK_SIZE
+    return max(MIN_CHUNK_SIZE, min(chunk_size, MAX_CHUNK_SIZE))
+
+
+def iter_file_chunks(path, offset=0, chunk_size=DEFAULT_CHUNK_SIZE):
+    # El archivo se mapea en memoria: cada slice copia solo el chunk que se
+    # envia y las paginas las maneja la cache del sistema, nunca se carga la
+    # pista completa en el heap del proceso
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if offset >= size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            for start in range(offset, size, chunk_size):
+                yield start, mm[start:start + chunk_size]
+
+
+async def iter_file_chunks_async(path, offset=0, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Para grpc.aio: con el archivo fuera de la cache de paginas cada slice del
+    # mmap lee del disco, asi que cada chunk se lee en el executor y en el
+    # event loop solo queda el yield
+    loop = asyncio.get_running_loop()
+    chunks = iter_file_chunks(path, offset, chunk_size)
+    try:
+        while True:
+            chunk = await loop.run_in_executor(None, next, chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        chunks.close()
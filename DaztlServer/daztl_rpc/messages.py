@@ -0,0 +1,138 @@
+# Conversion de las respuestas JSON de la API (o de los serializers en modo orm)
+# a mensajes protobuf. Compartido por el servidor con hilos y el servidor asyncio.
+from urllib.parse import parse_qs, urlparse
+
+import proto.daztl_service_pb2 as daztl_service_pb2
+
+
+def page_items(data):
+    # Los listados paginados llegan como {next, previous, results}; el cursor
+    # del enlace next es el next_page_token. Sin paginar llega la lista sola.
+    if not isinstance(data, dict):
+        return data, ""
+    next_link = data.get("next")
+    token = parse_qs(urlparse(next_link).query).get("cursor", [""])[0] if next_link else ""
+    return data.get("results", []), token
+
+
+def song_message(song):
+    return daztl_service_pb2.SongResponse(
+        id=song["id"],
+        title=song["title"],
+        artist=song.get("artist") or song.get("artist_name") or "",
+        audio_url=song.get("audio_url") or "",
+        cover_url=song.get("cover_url") or "",
+        release_date=song.get("release_date") or ""
+    )
+
+
+def album_message(album):
+    return daztl_service_pb2.AlbumResponse(
+        id=album["id"],
+        title=album["title"],
+        artist_name=album.get("artist_name") or "",
+        cover_url=album.get("cover_image") or ""
+    )
+
+
+def artist_message(artist):
+    return daztl_service_pb2.ArtistResponse(
+        id=artist["id"],
+        name=(artist.get("user") or {}).get("username", ""),
+        profile_picture=artist.get("profile_picture") or ""
+    )
+
+
+def playlist_message(playlist):
+    return daztl_service_pb2.PlaylistResponse(
+        id=playlist["id"],
+        name=playlist["name"],
+        cover_url=playlist.get("cover") or "",
+        songs=[song_message(s) for s in playlist.get("songs", [])]
+    )
+
+
+def song_list_message(data):
+    songs, token = page_items(data)
+    return daztl_service_pb2.SongListResponse(songs=[song_message(s) for s in songs], next_page_token=token)
+
+
+def album_list_message(data):
+    albums, token = page_items(data)
+    return daztl_service_pb2.AlbumListResponse(albums=[album_message(a) for a in albums], next_page_token=token)
+
+
+def artist_list_message(data):
+    artists, token = page_items(data)
+    return daztl_service_pb2.ArtistListResponse(artists=[artist_message(a) for a in artists], next_page_token=token)
+
+
+def playlist_list_message(data):
+    playlists, token = page_items(data)
+    return daztl_service_pb2.PlaylistListResponse(
+        playlists=[playlist_message(p) for p in playlists], next_page_token=token
+    )
+
+
+def playlist_detail_message(playlist):
+    return daztl_service_pb2.PlaylistDetailResponse(
+        id=playlist["id"],
+        name=playlist["name"],
+        songs=[song_message(s) for s in playlist.get("songs", [])],
+        cover_url=playlist.get("cover") or "",
+        status="success",
+        message="Playlist cargada correctamente"
+    )
+
+
+def global_search_message(data):
+    return daztl_service_pb2.GlobalSearchResponse(
+        songs=[song_message(s) for s in data.get("songs", [])],
+        albums=[album_message(a) for a in data.get("albums", [])],
+        artists=[artist_message(ar) for ar in data.get("artists", [])],
+        playlists=[playlist_message(p) for p in data.get("playlists", [])]
+    )
+
+
+def suggest_message(data):
+    return daztl_service_pb2.SuggestResponse(suggestions=[
+        daztl_service_pb2.Suggestion(kind=s["kind"], id=s["id"], text=s["text"])
+        for s in data.get("suggestions", [])
+    ])
+
+
+def chat_message(chat):
+    return daztl_service_pb2.ChatMessage(
+        id=chat.get("id") or 0,
+        user=(chat.get("user") or {}).get("username", ""),
+        message=chat["message"],
+        timestamp=chat.get("timestamp") or ""
+    )
+
+
+def chat_list_message(data):
+    chats, _ = page_items(data)
+    return daztl_service_pb2.ChatListResponse(messages=[chat_message(c) for c in chats])
+
+
+def profile_message(data):
+    return daztl_service_pb2.UserProfileResponse(
+        username=data["username"],
+        email=data["email"],
+        first_name=data["first_name"],
+        last_name=data["last_name"],
+        profile_image_url=data.get("profile_image_url", "")
+    )
+
+
+def login_message(tokens):
+    user_info = tokens.get("user_info", {})
+    return daztl_service_pb2.LoginResponse(
+        access_token=tokens.get("token") or tokens.get("access"),
+        refresh_token=tokens.get("refresh"),
+        role=user_info.get("role"),
+        is_artist=user_info.get("is_artist"),
+        user_id=user_info.get("id"),
+        username=user_info.get("username"),
+        artist_id=user_info.get("artist_profile_id")
+    )
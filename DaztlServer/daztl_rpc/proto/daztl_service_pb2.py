@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x19proto/daztl_service.proto\x12\x05\x64\x61ztl\"\x07\n\x05\x45mpty\"k\n\x0fRegisterRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\x12\n\nfirst_name\x18\x04 \x01(\t\x12\x11\n\tlast_name\x18\x05 \x01(\t\"~\n\x15RegisterArtistRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\r\n\x05\x65mail\x18\x02 \x01(\t\x12\x10\n\x08password\x18\x03 \x01(\t\x12\x12\n\nfirst_name\x18\x04 \x01(\t\x12\x11\n\tlast_name\x18\x05 \x01(\t\x12\x0b\n\x03\x62io\x18\x06 \x01(\t\"\x7f\n\x14UpdateProfileRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\r\n\x05\x65mail\x18\x02 \x01(\t\x12\x12\n\nfirst_name\x18\x03 \x01(\t\x12\x11\n\tlast_name\x18\x04 \x01(\t\x12\x10\n\x08username\x18\x05 \x01(\t\x12\x10\n\x08password\x18\x06 \x01(\t\"2\n\x0cLoginRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"\x93\x01\n\rLoginResponse\x12\x14\n\x0c\x61\x63\x63\x65ss_token\x18\x01 \x01(\t\x12\x15\n\rrefresh_token\x18\x02 \x01(\t\x12\x0c\n\x04role\x18\x03 \x01(\t\x12\x11\n\tis_artist\x18\x04 \x01(\x08\x12\x0f\n\x07user_id\x18\x05 \x01(\x05\x12\x10\n\x08username\x18\x06 \x01(\t\x12\x11\n\tartist_id\x18\x07 \x01(\x05\"\x1b\n\rSongIdRequest\x12\n\n\x02id\x18\x01 \x01(\x05\"u\n\x0cSongResponse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0e\n\x06\x61rtist\x18\x03 \x01(\t\x12\x11\n\taudio_url\x18\x04 \x01(\t\x12\x11\n\tcover_url\x18\x05 \x01(\t\x12\x14\n\x0crelease_date\x18\x06 \x01(\t\"\x1e\n\rSearchRequest\x12\r\n\x05query\x18\x01 \x01(\t\"\xb4\x01\n\x14GlobalSearchResponse\x12\"\n\x05songs\x18\x01 \x03(\x0b\x32\x13.daztl.SongResponse\x12$\n\x06\x61lbums\x18\x02 \x03(\x0b\x32\x14.daztl.AlbumResponse\x12&\n\x07\x61rtists\x18\x03 \x03(\x0b\x32\x15.daztl.ArtistResponse\x12*\n\tplaylists\x18\x04 \x03(\x0b\x32\x17.daztl.PlaylistResponse\"6\n\x10SongListResponse\x12\"\n\x05songs\x18\x01 \x03(\x0b\x32\x13.daztl.SongResponse\"9\n\x11\x41lbumListResponse\x12$\n\x06\x61lbums\x18\x01 \x03(\x0b\x32\x14.daztl.AlbumResponse\"R\n\rAlbumResponse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\r\n\x05title\x18\x02 \x01(\t\x12\x13\n\x0b\x61rtist_name\x18\x03 \x01(\t\x12\x11\n\tcover_url\x18\x04 \x01(\t\"<\n\x12\x41rtistListResponse\x12&\n\x07\x61rtists\x18\x01 \x03(\x0b\x32\x15.daztl.ArtistResponse\"C\n\x0e\x41rtistResponse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x17\n\x0fprofile_picture\x18\x03 \x01(\t\"G\n\x15\x43reatePlaylistRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x11\n\tcover_url\x18\x03 \x01(\t\"\x1f\n\x11PlaylistIdRequest\x12\n\n\x02id\x18\x01 \x01(\x05\";\n\x15PlaylistDetailRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x13\n\x0bplaylist_id\x18\x02 \x01(\x05\"\x8a\x01\n\x16PlaylistDetailResponse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\"\n\x05songs\x18\x03 \x03(\x0b\x32\x13.daztl.SongResponse\x12\x0e\n\x06status\x18\x04 \x01(\t\x12\x0f\n\x07message\x18\x05 \x01(\t\x12\x11\n\tcover_url\x18\x06 \x01(\t\"c\n\x10PlaylistResponse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\"\n\x05songs\x18\x03 \x03(\x0b\x32\x13.daztl.SongResponse\x12\x11\n\tcover_url\x18\x04 \x01(\t\"O\n\x18\x41\x64\x64SongToPlaylistRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x13\n\x0bplaylist_id\x18\x02 \x01(\x05\x12\x0f\n\x07song_id\x18\x03 \x01(\x05\"$\n\x13PlaylistListRequest\x12\r\n\x05token\x18\x01 \x01(\t\"B\n\x14PlaylistListResponse\x12*\n\tplaylists\x18\x01 \x03(\x0b\x32\x17.daztl.PlaylistResponse\"C\n\x11UploadSongRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x10\n\x08\x66ile_url\x18\x03 \x01(\t\"2\n\x12UploadAlbumRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\"\x1e\n\x0eReportResponse\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\t\"%\n\x12\x43hatMessageRequest\x12\x0f\n\x07song_id\x18\x01 \x01(\x05\"8\n\x10\x43hatListResponse\x12$\n\x08messages\x18\x01 \x03(\x0b\x32\x12.daztl.ChatMessage\"?\n\x0b\x43hatMessage\x12\x0c\n\x04user\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x11\n\ttimestamp\x18\x03 \x01(\t\"B\n\x0fSendChatRequest\x12\x0f\n\x07song_id\x18\x01 \x01(\x05\x12\r\n\x05token\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\"3\n\x0f\x41rtistIdRequest\x12\x11\n\tartist_id\x18\x01 \x01(\x05\x12\r\n\x05token\x18\x02 \x01(\t\"&\n\x12LikeStatusResponse\x12\x10\n\x08is_liked\x18\x01 \x01(\x08\"\x1d\n\x0cTokenRequest\x12\r\n\x05token\x18\x01 \x01(\t\"x\n\x13UserProfileResponse\x12\x10\n\x08username\x18\x01 \x01(\t\x12\r\n\x05\x65mail\x18\x02 \x01(\t\x12\x12\n\nfirst_name\x18\x03 \x01(\t\x12\x11\n\tlast_name\x18\x04 \x01(\t\x12\x19\n\x11profile_image_url\x18\x05 \x01(\t\",\n\x13RefreshTokenRequest\x12\x15\n\rrefresh_token\x18\x01 \x01(\t\"2\n\x0fGenericResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t2\xd4\x0c\n\x0cMusicService\x12>\n\x0cRegisterUser\x12\x16.daztl.RegisterRequest\x1a\x16.daztl.GenericResponse\x12\x44\n\rUpdateProfile\x12\x1b.daztl.UpdateProfileRequest\x1a\x16.daztl.GenericResponse\x12\x36\n\tLoginUser\x12\x13.daztl.LoginRequest\x1a\x14.daztl.LoginResponse\x12\x46\n\x0eRegisterArtist\x12\x1c.daztl.RegisterArtistRequest\x1a\x16.daztl.GenericResponse\x12\x32\n\tListSongs\x12\x0c.daztl.Empty\x1a\x17.daztl.SongListResponse\x12\x34\n\x07GetSong\x12\x14.daztl.SongIdRequest\x1a\x13.daztl.SongResponse\x12\x34\n\nListAlbums\x12\x0c.daztl.Empty\x1a\x18.daztl.AlbumListResponse\x12\x36\n\x0bListArtists\x12\x0c.daztl.Empty\x1a\x19.daztl.ArtistListResponse\x12\x46\n\x0e\x43reatePlaylist\x12\x1c.daztl.CreatePlaylistRequest\x1a\x16.daztl.GenericResponse\x12@\n\x0bGetPlaylist\x12\x18.daztl.PlaylistIdRequest\x1a\x17.daztl.PlaylistResponse\x12L\n\x11\x41\x64\x64SongToPlaylist\x12\x1f.daztl.AddSongToPlaylistRequest\x1a\x16.daztl.GenericResponse\x12P\n\x11GetPlaylistDetail\x12\x1c.daztl.PlaylistDetailRequest\x1a\x1d.daztl.PlaylistDetailResponse\x12H\n\rListPlaylists\x12\x1a.daztl.PlaylistListRequest\x1a\x1b.daztl.PlaylistListResponse\x12>\n\nUploadSong\x12\x18.daztl.UploadSongRequest\x1a\x16.daztl.GenericResponse\x12@\n\x0bUploadAlbum\x12\x19.daztl.UploadAlbumRequest\x1a\x16.daztl.GenericResponse\x12\x33\n\x0c\x41rtistReport\x12\x0c.daztl.Empty\x1a\x15.daztl.ReportResponse\x12\x33\n\x0cSystemReport\x12\x0c.daztl.Empty\x1a\x15.daztl.ReportResponse\x12\x46\n\x10ListChatMessages\x12\x19.daztl.ChatMessageRequest\x1a\x17.daztl.ChatListResponse\x12\x41\n\x0fSendChatMessage\x12\x16.daztl.SendChatRequest\x1a\x16.daztl.GenericResponse\x12<\n\nLikeArtist\x12\x16.daztl.ArtistIdRequest\x1a\x16.daztl.GenericResponse\x12\x42\n\rIsArtistLiked\x12\x16.daztl.ArtistIdRequest\x1a\x19.daztl.LikeStatusResponse\x12<\n\x0bSearchSongs\x12\x14.daztl.SearchRequest\x1a\x17.daztl.SongListResponse\x12\x36\n\nGetProfile\x12\x0c.daztl.Empty\x1a\x1a.daztl.UserProfileResponse\x12@\n\x0cRefreshToken\x12\x1a.daztl.RefreshTokenRequest\x1a\x14.daztl.LoginResponse\x12\x41\n\x0cGlobalSearch\x12\x14.daztl.SearchRequest\x1a\x1b.daztl.GlobalSearchResponseB\x1f\n\x05\x64\x61ztlB\x16\x44\x61ztlServiceOuterClassb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x19proto/daztl_service.proto\x12\x05\x64\x61ztl\"\x07\n\x05\x45mpty\"4\n\x0bPageRequest\x12\x11\n\tpage_size\x18\x01 \x01(\x05\x12\x12\n\npage_token\x18\x02 \x01(\t\"k\n\x0fRegisterRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\x12\n\nfirst_name\x18\x04 \x01(\t\x12\x11\n\tlast_name\x18\x05 \x01(\t\"~\n\x15RegisterArtistRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\r\n\x05\x65mail\x18\x02 \x01(\t\x12\x10\n\x08password\x18\x03 \x01(\t\x12\x12\n\nfirst_name\x18\x04 \x01(\t\x12\x11\n\tlast_name\x18\x05 \x01(\t\x12\x0b\n\x03\x62io\x18\x06 \x01(\t\"\x7f\n\x14UpdateProfileRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\r\n\x05\x65mail\x18\x02 \x01(\t\x12\x12\n\nfirst_name\x18\x03 \x01(\t\x12\x11\n\tlast_name\x18\x04 \x01(\t\x12\x10\n\x08username\x18\x05 \x01(\t\x12\x10\n\x08password\x18\x06 \x01(\t\"2\n\x0cLoginRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"\x93\x01\n\rLoginResponse\x12\x14\n\x0c\x61\x63\x63\x65ss_token\x18\x01 \x01(\t\x12\x15\n\rrefresh_token\x18\x02 \x01(\t\x12\x0c\n\x04role\x18\x03 \x01(\t\x12\x11\n\tis_artist\x18\x04 \x01(\x08\x12\x0f\n\x07user_id\x18\x05 \x01(\x05\x12\x10\n\x08username\x18\x06 \x01(\t\x12\x11\n\tartist_id\x18\x07 \x01(\x05\"\x1b\n\rSongIdRequest\x12\n\n\x02id\x18\x01 \x01(\x05\"u\n\x0cSongResponse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0e\n\x06\x61rtist\x18\x03 \x01(\t\x12\x11\n\taudio_url\x18\x04 \x01(\t\x12\x11\n\tcover_url\x18\x05 \x01(\t\x12\x14\n\x0crelease_date\x18\x06 \x01(\t\"H\n\x11StreamSongRequest\x12\x0f\n\x07song_id\x18\x01 \x01(\x05\x12\x0e\n\x06offset\x18\x02 \x01(\x03\x12\x12\n\nchunk_size\x18\x03 \x01(\x05\"T\n\nAudioChunk\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x0e\n\x06offset\x18\x02 \x01(\x03\x12\x12\n\ntotal_size\x18\x03 \x01(\x03\x12\x14\n\x0c\x63ontent_type\x18\x04 \x01(\t\"E\n\rSearchRequest\x12\r\n\x05query\x18\x01 \x01(\t\x12\x11\n\tpage_size\x18\x02 \x01(\x05\x12\x12\n\npage_token\x18\x03 \x01(\t\"\xb4\x01\n\x14GlobalSearchResponse\x12\"\n\x05songs\x18\x01 \x03(\x0b\x32\x13.daztl.SongResponse\x12$\n\x06\x61lbums\x18\x02 \x03(\x0b\x32\x14.daztl.AlbumResponse\x12&\n\x07\x61rtists\x18\x03 \x03(\x0b\x32\x15.daztl.ArtistResponse\x12*\n\tplaylists\x18\x04 \x03(\x0b\x32\x17.daztl.PlaylistResponse\"=\n\x0eSuggestRequest\x12\r\n\x05query\x18\x01 \x01(\t\x12\r\n\x05limit\x18\x02 \x01(\x05\x12\r\n\x05kinds\x18\x03 \x03(\t\"4\n\nSuggestion\x12\x0c\n\x04kind\x18\x01 \x01(\t\x12\n\n\x02id\x18\x02 \x01(\x03\x12\x0c\n\x04text\x18\x03 \x01(\t\"9\n\x0fSuggestResponse\x12&\n\x0bsuggestions\x18\x01 \x03(\x0b\x32\x11.daztl.Suggestion\"O\n\x10SongListResponse\x12\"\n\x05songs\x18\x01 \x03(\x0b\x32\x13.daztl.SongResponse\x12\x17\n\x0fnext_page_token\x18\x02 \x01(\t\"R\n\x11\x41lbumListResponse\x12$\n\x06\x61lbums\x18\x01 \x03(\x0b\x32\x14.daztl.AlbumResponse\x12\x17\n\x0fnext_page_token\x18\x02 \x01(\t\"R\n\rAlbumResponse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\r\n\x05title\x18\x02 \x01(\t\x12\x13\n\x0b\x61rtist_name\x18\x03 \x01(\t\x12\x11\n\tcover_url\x18\x04 \x01(\t\"U\n\x12\x41rtistListResponse\x12&\n\x07\x61rtists\x18\x01 \x03(\x0b\x32\x15.daztl.ArtistResponse\x12\x17\n\x0fnext_page_token\x18\x02 \x01(\t\"C\n\x0e\x41rtistResponse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x17\n\x0fprofile_picture\x18\x03 \x01(\t\"G\n\x15\x43reatePlaylistRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x11\n\tcover_url\x18\x03 \x01(\t\"\x1f\n\x11PlaylistIdRequest\x12\n\n\x02id\x18\x01 \x01(\x05\";\n\x15PlaylistDetailRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x13\n\x0bplaylist_id\x18\x02 \x01(\x05\"\x8a\x01\n\x16PlaylistDetailResponse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\"\n\x05songs\x18\x03 \x03(\x0b\x32\x13.daztl.SongResponse\x12\x0e\n\x06status\x18\x04 \x01(\t\x12\x0f\n\x07message\x18\x05 \x01(\t\x12\x11\n\tcover_url\x18\x06 \x01(\t\"c\n\x10PlaylistResponse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\"\n\x05songs\x18\x03 \x03(\x0b\x32\x13.daztl.SongResponse\x12\x11\n\tcover_url\x18\x04 \x01(\t\"O\n\x18\x41\x64\x64SongToPlaylistRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x13\n\x0bplaylist_id\x18\x02 \x01(\x05\x12\x0f\n\x07song_id\x18\x03 \x01(\x05\"K\n\x13PlaylistListRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x11\n\tpage_size\x18\x02 \x01(\x05\x12\x12\n\npage_token\x18\x03 \x01(\t\"[\n\x14PlaylistListResponse\x12*\n\tplaylists\x18\x01 \x03(\x0b\x32\x17.daztl.PlaylistResponse\x12\x17\n\x0fnext_page_token\x18\x02 \x01(\t\"@\n\x0eUploadFileInfo\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\x0c\n\x04size\x18\x02 \x01(\x03\x12\x0e\n\x06sha256\x18\x03 \x01(\t\"~\n\x12UploadSongMetadata\x12\r\n\x05token\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12$\n\x05\x61udio\x18\x03 \x01(\x0b\x32\x15.daztl.UploadFileInfo\x12$\n\x05\x63over\x18\x04 \x01(\x0b\x32\x15.daztl.UploadFileInfo\"w\n\x0fUploadSongChunk\x12-\n\x08metadata\x18\x01 \x01(\x0b\x32\x19.daztl.UploadSongMetadataH\x00\x12\x14\n\naudio_data\x18\x02 \x01(\x0cH\x00\x12\x14\n\ncover_data\x18\x03 \x01(\x0cH\x00\x42\t\n\x07payload\"_\n\x13UploadCoverMetadata\x12\r\n\x05token\x18\x01 \x01(\t\x12\x13\n\x0bplaylist_id\x18\x02 \x01(\x05\x12$\n\x05\x63over\x18\x03 \x01(\x0b\x32\x15.daztl.UploadFileInfo\"]\n\x10UploadCoverChunk\x12.\n\x08metadata\x18\x01 \x01(\x0b\x32\x1a.daztl.UploadCoverMetadataH\x00\x12\x0e\n\x04\x64\x61ta\x18\x02 \x01(\x0cH\x00\x42\t\n\x07payload\"2\n\x12UploadAlbumRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\"\x1e\n\x0eReportResponse\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\t\"Y\n\x12\x43hatMessageRequest\x12\x0f\n\x07song_id\x18\x01 \x01(\x05\x12\x10\n\x08since_id\x18\x02 \x01(\x03\x12\x11\n\tbefore_id\x18\x03 \x01(\x03\x12\r\n\x05limit\x18\x04 \x01(\x05\"8\n\x10\x43hatListResponse\x12$\n\x08messages\x18\x01 \x03(\x0b\x32\x12.daztl.ChatMessage\"K\n\x0b\x43hatMessage\x12\x0c\n\x04user\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x11\n\ttimestamp\x18\x03 \x01(\t\x12\n\n\x02id\x18\x04 \x01(\x03\"B\n\x0fSendChatRequest\x12\x0f\n\x07song_id\x18\x01 \x01(\x05\x12\r\n\x05token\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\"3\n\x11RecordPlayRequest\x12\x0f\n\x07song_id\x18\x01 \x01(\x05\x12\r\n\x05token\x18\x02 \x01(\t\"3\n\x0f\x41rtistIdRequest\x12\x11\n\tartist_id\x18\x01 \x01(\x05\x12\r\n\x05token\x18\x02 \x01(\t\"&\n\x12LikeStatusResponse\x12\x10\n\x08is_liked\x18\x01 \x01(\x08\"\x1d\n\x0cTokenRequest\x12\r\n\x05token\x18\x01 \x01(\t\"x\n\x13UserProfileResponse\x12\x10\n\x08username\x18\x01 \x01(\t\x12\r\n\x05\x65mail\x18\x02 \x01(\t\x12\x12\n\nfirst_name\x18\x03 \x01(\t\x12\x11\n\tlast_name\x18\x04 \x01(\t\x12\x19\n\x11profile_image_url\x18\x05 \x01(\t\",\n\x13RefreshTokenRequest\x12\x15\n\rrefresh_token\x18\x01 \x01(\t\"2\n\x0fGenericResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t2\xa1\x0f\n\x0cMusicService\x12>\n\x0cRegisterUser\x12\x16.daztl.RegisterRequest\x1a\x16.daztl.GenericResponse\x12\x44\n\rUpdateProfile\x12\x1b.daztl.UpdateProfileRequest\x1a\x16.daztl.GenericResponse\x12\x36\n\tLoginUser\x12\x13.daztl.LoginRequest\x1a\x14.daztl.LoginResponse\x12\x46\n\x0eRegisterArtist\x12\x1c.daztl.RegisterArtistRequest\x1a\x16.daztl.GenericResponse\x12\x38\n\tListSongs\x12\x12.daztl.PageRequest\x1a\x17.daztl.SongListResponse\x12\x34\n\x07GetSong\x12\x14.daztl.SongIdRequest\x1a\x13.daztl.SongResponse\x12;\n\nStreamSong\x12\x18.daztl.StreamSongRequest\x1a\x11.daztl.AudioChunk0\x01\x12:\n\nListAlbums\x12\x12.daztl.PageRequest\x1a\x18.daztl.AlbumListResponse\x12<\n\x0bListArtists\x12\x12.daztl.PageRequest\x1a\x19.daztl.ArtistListResponse\x12\x46\n\x0e\x43reatePlaylist\x12\x1c.daztl.CreatePlaylistRequest\x1a\x16.daztl.GenericResponse\x12@\n\x0bGetPlaylist\x12\x18.daztl.PlaylistIdRequest\x1a\x17.daztl.PlaylistResponse\x12L\n\x11\x41\x64\x64SongToPlaylist\x12\x1f.daztl.AddSongToPlaylistRequest\x1a\x16.daztl.GenericResponse\x12P\n\x11GetPlaylistDetail\x12\x1c.daztl.PlaylistDetailRequest\x1a\x1d.daztl.PlaylistDetailResponse\x12H\n\rListPlaylists\x12\x1a.daztl.PlaylistListRequest\x1a\x1b.daztl.PlaylistListResponse\x12>\n\nUploadSong\x12\x16.daztl.UploadSongChunk\x1a\x16.daztl.GenericResponse(\x01\x12@\n\x0bUploadCover\x12\x17.daztl.UploadCoverChunk\x1a\x16.daztl.GenericResponse(\x01\x12@\n\x0bUploadAlbum\x12\x19.daztl.UploadAlbumRequest\x1a\x16.daztl.GenericResponse\x12\x33\n\x0c\x41rtistReport\x12\x0c.daztl.Empty\x1a\x15.daztl.ReportResponse\x12\x33\n\x0cSystemReport\x12\x0c.daztl.Empty\x1a\x15.daztl.ReportResponse\x12\x46\n\x10ListChatMessages\x12\x19.daztl.ChatMessageRequest\x1a\x17.daztl.ChatListResponse\x12\x41\n\x0fSendChatMessage\x12\x16.daztl.SendChatRequest\x1a\x16.daztl.GenericResponse\x12@\n\rSubscribeChat\x12\x19.daztl.ChatMessageRequest\x1a\x12.daztl.ChatMessage0\x01\x12>\n\nRecordPlay\x12\x18.daztl.RecordPlayRequest\x1a\x16.daztl.GenericResponse\x12<\n\nLikeArtist\x12\x16.daztl.ArtistIdRequest\x1a\x16.daztl.GenericResponse\x12\x42\n\rIsArtistLiked\x12\x16.daztl.ArtistIdRequest\x1a\x19.daztl.LikeStatusResponse\x12<\n\x0bSearchSongs\x12\x14.daztl.SearchRequest\x1a\x17.daztl.SongListResponse\x12\x36\n\nGetProfile\x12\x0c.daztl.Empty\x1a\x1a.daztl.UserProfileResponse\x12@\n\x0cRefreshToken\x12\x1a.daztl.RefreshTokenRequest\x1a\x14.daztl.LoginResponse\x12\x41\n\x0cGlobalSearch\x12\x14.daztl.SearchRequest\x1a\x1b.daztl.GlobalSearchResponse\x12\x38\n\x07Suggest\x12\x15.daztl.SuggestRequest\x1a\x16.daztl.SuggestResponseB\x1f\n\x05\x64\x61ztlB\x16\x44\x61ztlServiceOuterClassb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -34,76 +34,98 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['DESCRIPTOR']._serialized_options = b'\n\005daztlB\026DaztlServiceOuterClass'
   _globals['_EMPTY']._serialized_start=36
   _globals['_EMPTY']._serialized_end=43
-  _globals['_REGISTERREQUEST']._serialized_start=45
-  _globals['_REGISTERREQUEST']._serialized_end=152
-  _globals['_REGISTERARTISTREQUEST']._serialized_start=154
-  _globals['_REGISTERARTISTREQUEST']._serialized_end=280
-  _globals['_UPDATEPROFILEREQUEST']._serialized_start=282
-  _globals['_UPDATEPROFILEREQUEST']._serialized_end=409
-  _globals['_LOGINREQUEST']._serialized_start=411
-  _globals['_LOGINREQUEST']._serialized_end=461
-  _globals['_LOGINRESPONSE']._serialized_start=464
-  _globals['_LOGINRESPONSE']._serialized_end=611
-  _globals['_SONGIDREQUEST']._serialized_start=613
-  _globals['_SONGIDREQUEST']._serialized_end=640
-  _globals['_SONGRESPONSE']._serialized_start=642
-  _globals['_SONGRESPONSE']._serialized_end=759
-  _globals['_SEARCHREQUEST']._serialized_start=761
-  _globals['_SEARCHREQUEST']._serialized_end=791
-  _globals['_GLOBALSEARCHRESPONSE']._serialized_start=794
-  _globals['_GLOBALSEARCHRESPONSE']._serialized_end=974
-  _globals['_SONGLISTRESPONSE']._serialized_start=976
-  _globals['_SONGLISTRESPONSE']._serialized_end=1030
-  _globals['_ALBUMLISTRESPONSE']._serialized_start=1032
-  _globals['_ALBUMLISTRESPONSE']._serialized_end=1089
-  _globals['_ALBUMRESPONSE']._serialized_start=1091
-  _globals['_ALBUMRESPONSE']._serialized_end=1173
-  _globals['_ARTISTLISTRESPONSE']._serialized_start=1175
-  _globals['_ARTISTLISTRESPONSE']._serialized_end=1235
-  _globals['_ARTISTRESPONSE']._serialized_start=1237
-  _globals['_ARTISTRESPONSE']._serialized_end=1304
-  _globals['_CREATEPLAYLISTREQUEST']._serialized_start=1306
-  _globals['_CREATEPLAYLISTREQUEST']._serialized_end=1377
-  _globals['_PLAYLISTIDREQUEST']._serialized_start=1379
-  _globals['_PLAYLISTIDREQUEST']._serialized_end=1410
-  _globals['_PLAYLISTDETAILREQUEST']._serialized_start=1412
-  _globals['_PLAYLISTDETAILREQUEST']._serialized_end=1471
-  _globals['_PLAYLISTDETAILRESPONSE']._serialized_start=1474
-  _globals['_PLAYLISTDETAILRESPONSE']._serialized_end=1612
-  _globals['_PLAYLISTRESPONSE']._serialized_start=1614
-  _globals['_PLAYLISTRESPONSE']._serialized_end=1713
-  _globals['_ADDSONGTOPLAYLISTREQUEST']._serialized_start=1715
-  _globals['_ADDSONGTOPLAYLISTREQUEST']._serialized_end=1794
-  _globals['_PLAYLISTLISTREQUEST']._serialized_start=1796
-  _globals['_PLAYLISTLISTREQUEST']._serialized_end=1832
-  _globals['_PLAYLISTLISTRESPONSE']._serialized_start=1834
-  _globals['_PLAYLISTLISTRESPONSE']._serialized_end=1900
-  _globals['_UPLOADSONGREQUEST']._serialized_start=1902
-  _globals['_UPLOADSONGREQUEST']._serialized_end=1969
-  _globals['_UPLOADALBUMREQUEST']._serialized_start=1971
-  _globals['_UPLOADALBUMREQUEST']._serialized_end=2021
-  _globals['_REPORTRESPONSE']._serialized_start=2023
-  _globals['_REPORTRESPONSE']._serialized_end=2053
-  _globals['_CHATMESSAGEREQUEST']._serialized_start=2055
-  _globals['_CHATMESSAGEREQUEST']._serialized_end=2092
-  _globals['_CHATLISTRESPONSE']._serialized_start=2094
-  _globals['_CHATLISTRESPONSE']._serialized_end=2150
-  _globals['_CHATMESSAGE']._serialized_start=2152
-  _globals['_CHATMESSAGE']._serialized_end=2215
-  _globals['_SENDCHATREQUEST']._serialized_start=2217
-  _globals['_SENDCHATREQUEST']._serialized_end=2283
-  _globals['_ARTISTIDREQUEST']._serialized_start=2285
-  _globals['_ARTISTIDREQUEST']._serialized_end=2336
-  _globals['_LIKESTATUSRESPONSE']._serialized_start=2338
-  _globals['_LIKESTATUSRESPONSE']._serialized_end=2376
-  _globals['_TOKENREQUEST']._serialized_start=2378
-  _globals['_TOKENREQUEST']._serialized_end=2407
-  _globals['_USERPROFILERESPONSE']._serialized_start=2409
-  _globals['_USERPROFILERESPONSE']._serialized_end=2529
-  _globals['_REFRESHTOKENREQUEST']._serialized_start=2531
-  _globals['_REFRESHTOKENREQUEST']._serialized_end=2575
-  _globals['_GENERICRESPONSE']._serialized_start=2577
-  _globals['_GENERICRESPONSE']._serialized_end=2627
-  _globals['_MUSICSERVICE']._serialized_start=2630
-  _globals['_MUSICSERVICE']._serialized_end=4250
+  _globals['_PAGEREQUEST']._serialized_start=45
+  _globals['_PAGEREQUEST']._serialized_end=97
+  _globals['_REGISTERREQUEST']._serialized_start=99
+  _globals['_REGISTERREQUEST']._serialized_end=206
+  _globals['_REGISTERARTISTREQUEST']._serialized_start=208
+  _globals['_REGISTERARTISTREQUEST']._serialized_end=334
+  _globals['_UPDATEPROFILEREQUEST']._serialized_start=336
+  _globals['_UPDATEPROFILEREQUEST']._serialized_end=463
+  _globals['_LOGINREQUEST']._serialized_start=465
+  _globals['_LOGINREQUEST']._serialized_end=515
+  _globals['_LOGINRESPONSE']._serialized_start=518
+  _globals['_LOGINRESPONSE']._serialized_end=665
+  _globals['_SONGIDREQUEST']._serialized_start=667
+  _globals['_SONGIDREQUEST']._serialized_end=694
+  _globals['_SONGRESPONSE']._serialized_start=696
+  _globals['_SONGRESPONSE']._serialized_end=813
+  _globals['_STREAMSONGREQUEST']._serialized_start=815
+  _globals['_STREAMSONGREQUEST']._serialized_end=887
+  _globals['_AUDIOCHUNK']._serialized_start=889
+  _globals['_AUDIOCHUNK']._serialized_end=973
+  _globals['_SEARCHREQUEST']._serialized_start=975
+  _globals['_SEARCHREQUEST']._serialized_end=1044
+  _globals['_GLOBALSEARCHRESPONSE']._serialized_start=1047
+  _globals['_GLOBALSEARCHRESPONSE']._serialized_end=1227
+  _globals['_SUGGESTREQUEST']._serialized_start=1229
+  _globals['_SUGGESTREQUEST']._serialized_end=1290
+  _globals['_SUGGESTION']._serialized_start=1292
+  _globals['_SUGGESTION']._serialized_end=1344
+  _globals['_SUGGESTRESPONSE']._serialized_start=1346
+  _globals['_SUGGESTRESPONSE']._serialized_end=1403
+  _globals['_SONGLISTRESPONSE']._serialized_start=1405
+  _globals['_SONGLISTRESPONSE']._serialized_end=1484
+  _globals['_ALBUMLISTRESPONSE']._serialized_start=1486
+  _globals['_ALBUMLISTRESPONSE']._serialized_end=1568
+  _globals['_ALBUMRESPONSE']._serialized_start=1570
+  _globals['_ALBUMRESPONSE']._serialized_end=1652
+  _globals['_ARTISTLISTRESPONSE']._serialized_start=1654
+  _globals['_ARTISTLISTRESPONSE']._serialized_end=1739
+  _globals['_ARTISTRESPONSE']._serialized_start=1741
+  _globals['_ARTISTRESPONSE']._serialized_end=1808
+  _globals['_CREATEPLAYLISTREQUEST']._serialized_start=1810
+  _globals['_CREATEPLAYLISTREQUEST']._serialized_end=1881
+  _globals['_PLAYLISTIDREQUEST']._serialized_start=1883
+  _globals['_PLAYLISTIDREQUEST']._serialized_end=1914
+  _globals['_PLAYLISTDETAILREQUEST']._serialized_start=1916
+  _globals['_PLAYLISTDETAILREQUEST']._serialized_end=1975
+  _globals['_PLAYLISTDETAILRESPONSE']._serialized_start=1978
+  _globals['_PLAYLISTDETAILRESPONSE']._serialized_end=2116
+  _globals['_PLAYLISTRESPONSE']._serialized_start=2118
+  _globals['_PLAYLISTRESPONSE']._serialized_end=2217
+  _globals['_ADDSONGTOPLAYLISTREQUEST']._serialized_start=2219
+  _globals['_ADDSONGTOPLAYLISTREQUEST']._serialized_end=2298
+  _globals['_PLAYLISTLISTREQUEST']._serialized_start=2300
+  _globals['_PLAYLISTLISTREQUEST']._serialized_end=2375
+  _globals['_PLAYLISTLISTRESPONSE']._serialized_start=2377
+  _globals['_PLAYLISTLISTRESPONSE']._serialized_end=2468
+  _globals['_UPLOADFILEINFO']._serialized_start=2470
+  _globals['_UPLOADFILEINFO']._serialized_end=2534
+  _globals['_UPLOADSONGMETADATA']._serialized_start=2536
+  _globals['_UPLOADSONGMETADATA']._serialized_end=2662
+  _globals['_UPLOADSONGCHUNK']._serialized_start=2664
+  _globals['_UPLOADSONGCHUNK']._serialized_end=2783
+  _globals['_UPLOADCOVERMETADATA']._serialized_start=2785
+  _globals['_UPLOADCOVERMETADATA']._serialized_end=2880
+  _globals['_UPLOADCOVERCHUNK']._serialized_start=2882
+  _globals['_UPLOADCOVERCHUNK']._serialized_end=2975
+  _globals['_UPLOADALBUMREQUEST']._serialized_start=2977
+  _globals['_UPLOADALBUMREQUEST']._serialized_end=3027
+  _globals['_REPORTRESPONSE']._serialized_start=3029
+  _globals['_REPORTRESPONSE']._serialized_end=3059
+  _globals['_CHATMESSAGEREQUEST']._serialized_start=3061
+  _globals['_CHATMESSAGEREQUEST']._serialized_end=3150
+  _globals['_CHATLISTRESPONSE']._serialized_start=3152
+  _globals['_CHATLISTRESPONSE']._serialized_end=3208
+  _globals['_CHATMESSAGE']._serialized_start=3210
+  _globals['_CHATMESSAGE']._serialized_end=3285
+  _globals['_SENDCHATREQUEST']._serialized_start=3287
+  _globals['_SENDCHATREQUEST']._serialized_end=3353
+  _globals['_RECORDPLAYREQUEST']._serialized_start=3355
+  _globals['_RECORDPLAYREQUEST']._serialized_end=3406
+  _globals['_ARTISTIDREQUEST']._serialized_start=3408
+  _globals['_ARTISTIDREQUEST']._serialized_end=3459
+  _globals['_LIKESTATUSRESPONSE']._serialized_start=3461
+  _globals['_LIKESTATUSRESPONSE']._serialized_end=3499
+  _globals['_TOKENREQUEST']._serialized_start=3501
+  _globals['_TOKENREQUEST']._serialized_end=3530
+  _globals['_USERPROFILERESPONSE']._serialized_start=3532
+  _globals['_USERPROFILERESPONSE']._serialized_end=3652
+  _globals['_REFRESHTOKENREQUEST']._serialized_start=3654
+  _globals['_REFRESHTOKENREQUEST']._serialized_end=3698
+  _globals['_GENERICRESPONSE']._serialized_start=3700
+  _globals['_GENERICRESPONSE']._serialized_end=3750
+  _globals['_MUSICSERVICE']._serialized_start=3753
+  _globals['_MUSICSERVICE']._serialized_end=5706
 # @@protoc_insertion_point(module_scope)
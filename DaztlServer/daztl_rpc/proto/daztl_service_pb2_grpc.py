@@ -56,7 +56,7 @@ class MusicServiceStub(object):
                 _registered_method=True)
         self.ListSongs = channel.unary_unary(
                 '/daztl.MusicService/ListSongs',
-                request_serializer=proto_dot_daztl__service__pb2.Empty.SerializeToString,
+                request_serializer=proto_dot_daztl__service__pb2.PageRequest.SerializeToString,
                 response_deserializer=proto_dot_daztl__service__pb2.SongListResponse.FromString,
                 _registered_method=True)
         self.GetSong = channel.unary_unary(
@@ -64,14 +64,19 @@ class MusicServiceStub(object):
                 request_serializer=proto_dot_daztl__service__pb2.SongIdRequest.SerializeToString,
                 response_deserializer=proto_dot_daztl__service__pb2.SongResponse.FromString,
                 _registered_method=True)
+        self.StreamSong = channel.unary_stream(
+                '/daztl.MusicService/StreamSong',
+                request_serializer=proto_dot_daztl__service__pb2.StreamSongRequest.SerializeToString,
+                response_deserializer=proto_dot_daztl__service__pb2.AudioChunk.FromString,
+                _registered_method=True)
         self.ListAlbums = channel.unary_unary(
                 '/daztl.MusicService/ListAlbums',
-                request_serializer=proto_dot_daztl__service__pb2.Empty.SerializeToString,
+                request_serializer=proto_dot_daztl__service__pb2.PageRequest.SerializeToString,
                 response_deserializer=proto_dot_daztl__service__pb2.AlbumListResponse.FromString,
                 _registered_method=True)
         self.ListArtists = channel.unary_unary(
                 '/daztl.MusicService/ListArtists',
-                request_serializer=proto_dot_daztl__service__pb2.Empty.SerializeToString,
+                request_serializer=proto_dot_daztl__service__pb2.PageRequest.SerializeToString,
                 response_deserializer=proto_dot_daztl__service__pb2.ArtistListResponse.FromString,
                 _registered_method=True)
         self.CreatePlaylist = channel.unary_unary(
@@ -99,9 +104,14 @@ class MusicServiceStub(object):
                 request_serializer=proto_dot_daztl__service__pb2.PlaylistListRequest.SerializeToString,
                 response_deserializer=proto_dot_daztl__service__pb2.PlaylistListResponse.FromString,
                 _registered_method=True)
-        self.UploadSong = channel.unary_unary(
+        self.UploadSong = channel.stream_unary(
                 '/daztl.MusicService/UploadSong',
-                request_serializer=proto_dot_daztl__service__pb2.UploadSongRequest.SerializeToString,
+                request_serializer=proto_dot_daztl__service__pb2.UploadSongChunk.SerializeToString,
+                response_deserializer=proto_dot_daztl__service__pb2.GenericResponse.FromString,
+                _registered_method=True)
+        self.UploadCover = channel.stream_unary(
+                '/daztl.MusicService/UploadCover',
+                request_serializer=proto_dot_daztl__service__pb2.UploadCoverChunk.SerializeToString,
                 response_deserializer=proto_dot_daztl__service__pb2.GenericResponse.FromString,
                 _registered_method=True)
         self.UploadAlbum = channel.unary_unary(
@@ -129,6 +139,16 @@ class MusicServiceStub(object):
                 request_serializer=proto_dot_daztl__service__pb2.SendChatRequest.SerializeToString,
                 response_deserializer=proto_dot_daztl__service__pb2.GenericResponse.FromString,
                 _registered_method=True)
+        self.SubscribeChat = channel.unary_stream(
+                '/daztl.MusicService/SubscribeChat',
+                request_serializer=proto_dot_daztl__service__pb2.ChatMessageRequest.SerializeToString,
+                response_deserializer=proto_dot_daztl__service__pb2.ChatMessage.FromString,
+                _registered_method=True)
+        self.RecordPlay = channel.unary_unary(
+                '/daztl.MusicService/RecordPlay',
+                request_serializer=proto_dot_daztl__service__pb2.RecordPlayRequest.SerializeToString,
+                response_deserializer=proto_dot_daztl__service__pb2.GenericResponse.FromString,
+                _registered_method=True)
         self.LikeArtist = channel.unary_unary(
                 '/daztl.MusicService/LikeArtist',
                 request_serializer=proto_dot_daztl__service__pb2.ArtistIdRequest.SerializeToString,
@@ -159,6 +179,11 @@ class MusicServiceStub(object):
                 request_serializer=proto_dot_daztl__service__pb2.SearchRequest.SerializeToString,
                 response_deserializer=proto_dot_daztl__service__pb2.GlobalSearchResponse.FromString,
                 _registered_method=True)
+        self.Suggest = channel.unary_unary(
+                '/daztl.MusicService/Suggest',
+                request_serializer=proto_dot_daztl__service__pb2.SuggestRequest.SerializeToString,
+                response_deserializer=proto_dot_daztl__service__pb2.SuggestResponse.FromString,
+                _registered_method=True)
 
 
 class MusicServiceServicer(object):
@@ -200,6 +225,12 @@ class MusicServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamSong(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def ListAlbums(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -242,7 +273,13 @@ class MusicServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
-    def UploadSong(self, request, context):
+    def UploadSong(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def UploadCover(self, request_iterator, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
@@ -278,6 +315,20 @@ class MusicServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def SubscribeChat(self, request, context):
+        """Mensajes nuevos del chat de la cancion a medida que llegan (chat_hub.py)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RecordPlay(self, request, context):
+        """Se acumula y se suma a los contadores por lotes (api/plays.py)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def LikeArtist(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -314,6 +365,12 @@ class MusicServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def Suggest(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_MusicServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -339,7 +396,7 @@ def add_MusicServiceServicer_to_server(servicer, server):
             ),
             'ListSongs': grpc.unary_unary_rpc_method_handler(
                     servicer.ListSongs,
-                    request_deserializer=proto_dot_daztl__service__pb2.Empty.FromString,
+                    request_deserializer=proto_dot_daztl__service__pb2.PageRequest.FromString,
                     response_serializer=proto_dot_daztl__service__pb2.SongListResponse.SerializeToString,
             ),
             'GetSong': grpc.unary_unary_rpc_method_handler(
@@ -347,14 +404,19 @@ def add_MusicServiceServicer_to_server(servicer, server):
                     request_deserializer=proto_dot_daztl__service__pb2.SongIdRequest.FromString,
                     response_serializer=proto_dot_daztl__service__pb2.SongResponse.SerializeToString,
             ),
+            'StreamSong': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamSong,
+                    request_deserializer=proto_dot_daztl__service__pb2.StreamSongRequest.FromString,
+                    response_serializer=proto_dot_daztl__service__pb2.AudioChunk.SerializeToString,
+            ),
             'ListAlbums': grpc.unary_unary_rpc_method_handler(
                     servicer.ListAlbums,
-                    request_deserializer=proto_dot_daztl__service__pb2.Empty.FromString,
+                    request_deserializer=proto_dot_daztl__service__pb2.PageRequest.FromString,
                     response_serializer=proto_dot_daztl__service__pb2.AlbumListResponse.SerializeToString,
             ),
             'ListArtists': grpc.unary_unary_rpc_method_handler(
                     servicer.ListArtists,
-                    request_deserializer=proto_dot_daztl__service__pb2.Empty.FromString,
+                    request_deserializer=proto_dot_daztl__service__pb2.PageRequest.FromString,
                     response_serializer=proto_dot_daztl__service__pb2.ArtistListResponse.SerializeToString,
             ),
             'CreatePlaylist': grpc.unary_unary_rpc_method_handler(
@@ -382,9 +444,14 @@ def add_MusicServiceServicer_to_server(servicer, server):
                     request_deserializer=proto_dot_daztl__service__pb2.PlaylistListRequest.FromString,
                     response_serializer=proto_dot_daztl__service__pb2.PlaylistListResponse.SerializeToString,
             ),
-            'UploadSong': grpc.unary_unary_rpc_method_handler(
+            'UploadSong': grpc.stream_unary_rpc_method_handler(
                     servicer.UploadSong,
-                    request_deserializer=proto_dot_daztl__service__pb2.UploadSongRequest.FromString,
+                    request_deserializer=proto_dot_daztl__service__pb2.UploadSongChunk.FromString,
+                    response_serializer=proto_dot_daztl__service__pb2.GenericResponse.SerializeToString,
+            ),
+            'UploadCover': grpc.stream_unary_rpc_method_handler(
+                    servicer.UploadCover,
+                    request_deserializer=proto_dot_daztl__service__pb2.UploadCoverChunk.FromString,
                     response_serializer=proto_dot_daztl__service__pb2.GenericResponse.SerializeToString,
             ),
             'UploadAlbum': grpc.unary_unary_rpc_method_handler(
@@ -412,6 +479,16 @@ def add_MusicServiceServicer_to_server(servicer, server):
                     request_deserializer=proto_dot_daztl__service__pb2.SendChatRequest.FromString,
                     response_serializer=proto_dot_daztl__service__pb2.GenericResponse.SerializeToString,
             ),
+            'SubscribeChat': grpc.unary_stream_rpc_method_handler(
+                    servicer.SubscribeChat,
+                    request_deserializer=proto_dot_daztl__service__pb2.ChatMessageRequest.FromString,
+                    response_serializer=proto_dot_daztl__service__pb2.ChatMessage.SerializeToString,
+            ),
+            'RecordPlay': grpc.unary_unary_rpc_method_handler(
+                    servicer.RecordPlay,
+                    request_deserializer=proto_dot_daztl__service__pb2.RecordPlayRequest.FromString,
+                    response_serializer=proto_dot_daztl__service__pb2.GenericResponse.SerializeToString,
+            ),
             'LikeArtist': grpc.unary_unary_rpc_method_handler(
                     servicer.LikeArtist,
                     request_deserializer=proto_dot_daztl__service__pb2.ArtistIdRequest.FromString,
@@ -442,6 +519,11 @@ def add_MusicServiceServicer_to_server(servicer, server):
                     request_deserializer=proto_dot_daztl__service__pb2.SearchRequest.FromString,
                     response_serializer=proto_dot_daztl__service__pb2.GlobalSearchResponse.SerializeToString,
             ),
+            'Suggest': grpc.unary_unary_rpc_method_handler(
+                    servicer.Suggest,
+                    request_deserializer=proto_dot_daztl__service__pb2.SuggestRequest.FromString,
+                    response_serializer=proto_dot_daztl__service__pb2.SuggestResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'daztl.MusicService', rpc_method_handlers)
@@ -576,7 +658,7 @@ class MusicService(object):
             request,
             target,
             '/daztl.MusicService/ListSongs',
-            proto_dot_daztl__service__pb2.Empty.SerializeToString,
+            proto_dot_daztl__service__pb2.PageRequest.SerializeToString,
             proto_dot_daztl__service__pb2.SongListResponse.FromString,
             options,
             channel_credentials,
@@ -615,6 +697,33 @@ class MusicService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def StreamSong(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/daztl.MusicService/StreamSong',
+            proto_dot_daztl__service__pb2.StreamSongRequest.SerializeToString,
+            proto_dot_daztl__service__pb2.AudioChunk.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def ListAlbums(request,
             target,
@@ -630,7 +739,7 @@ class MusicService(object):
             request,
             target,
             '/daztl.MusicService/ListAlbums',
-            proto_dot_daztl__service__pb2.Empty.SerializeToString,
+            proto_dot_daztl__service__pb2.PageRequest.SerializeToString,
             proto_dot_daztl__service__pb2.AlbumListResponse.FromString,
             options,
             channel_credentials,
@@ -657,7 +766,7 @@ class MusicService(object):
             request,
             target,
             '/daztl.MusicService/ListArtists',
-            proto_dot_daztl__service__pb2.Empty.SerializeToString,
+            proto_dot_daztl__service__pb2.PageRequest.SerializeToString,
             proto_dot_daztl__service__pb2.ArtistListResponse.FromString,
             options,
             channel_credentials,
@@ -805,7 +914,7 @@ class MusicService(object):
             _registered_method=True)
 
     @staticmethod
-    def UploadSong(request,
+    def UploadSong(request_iterator,
             target,
             options=(),
             channel_credentials=None,
@@ -815,11 +924,38 @@ class MusicService(object):
             wait_for_ready=None,
             timeout=None,
             metadata=None):
-        return grpc.experimental.unary_unary(
-            request,
+        return grpc.experimental.stream_unary(
+            request_iterator,
             target,
             '/daztl.MusicService/UploadSong',
-            proto_dot_daztl__service__pb2.UploadSongRequest.SerializeToString,
+            proto_dot_daztl__service__pb2.UploadSongChunk.SerializeToString,
+            proto_dot_daztl__service__pb2.GenericResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def UploadCover(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/daztl.MusicService/UploadCover',
+            proto_dot_daztl__service__pb2.UploadCoverChunk.SerializeToString,
             proto_dot_daztl__service__pb2.GenericResponse.FromString,
             options,
             channel_credentials,
@@ -966,6 +1102,60 @@ class MusicService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def SubscribeChat(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/daztl.MusicService/SubscribeChat',
+            proto_dot_daztl__service__pb2.ChatMessageRequest.SerializeToString,
+            proto_dot_daztl__service__pb2.ChatMessage.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def RecordPlay(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/daztl.MusicService/RecordPlay',
+            proto_dot_daztl__service__pb2.RecordPlayRequest.SerializeToString,
+            proto_dot_daztl__service__pb2.GenericResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def LikeArtist(request,
             target,
@@ -1127,3 +1317,30 @@ class MusicService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def Suggest(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/daztl.MusicService/Suggest',
+            proto_dot_daztl__service__pb2.SuggestRequest.SerializeToString,
+            proto_dot_daztl__service__pb2.SuggestResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -1,18 +1,99 @@
 import grpc
 from concurrent import futures
 import time
-import requests
 import json
 import base64
+import argparse
+import functools
+import os
+import threading
+import signal
 import proto.daztl_service_pb2 as daztl_service_pb2
 import proto.daztl_service_pb2_grpc as daztl_service_pb2_grpc
-
-API_BASE_URL = "http://localhost:8000/api"
-
-def make_auth_header(token):
-    return {"Authorization": f"Bearer {token}"}
+import messages
+import media
+import uploads
+from singleflight import SingleFlight
+from chat_hub import ChatHub, SlowConsumer
+from jwt_auth import JWTInterceptor, make_verifier
+from backends import BACKEND_MODES, DEFAULT_BACKEND, get_backend, BackendTimeout, BackendUnavailable
+from backends.base import verified_claims
+
+MAX_WORKERS = int(os.getenv("GRPC_MAX_WORKERS", "10"))
+GRPC_PORT = int(os.getenv("GRPC_PORT", "50051"))
+SERVER_MODES = ("threaded", "async")
+# Segundos que se esperan las llamadas en vuelo al apagar el servidor
+SHUTDOWN_GRACE = float(os.getenv("GRPC_SHUTDOWN_GRACE", "5"))
+# page_size usado cuando el cliente no envia uno. 0 mantiene la lista completa
+# para los clientes que todavia no paginan; el maximo lo aplica la API (API_MAX_PAGE_SIZE)
+DEFAULT_PAGE_SIZE = int(os.getenv("GRPC_DEFAULT_PAGE_SIZE", "0"))
+# Lecturas publicas identicas en vuelo comparten una sola llamada al backend (singleflight.py)
+SINGLE_FLIGHT = os.getenv("GRPC_SINGLE_FLIGHT", "1") == "1"
+# Cada SubscribeChat ocupa un hilo del pool mientras dura: pasado este limite
+# se rechaza para que el resto de las RPC no se queden sin hilos
+CHAT_MAX_STREAMS = int(os.getenv("GRPC_CHAT_MAX_STREAMS", str(max(1, MAX_WORKERS // 2))))
+
+def page_args(request):
+    return {"page_size": request.page_size or DEFAULT_PAGE_SIZE, "page_token": request.page_token}
+
+def conditional_args(context):
+    # El cliente reenvia el ETag de su copia en la metadata "if-none-match"
+    etag = dict(context.invocation_metadata()).get("if-none-match")
+    return {"etag": etag} if etag else {}
+
+def not_modified(response, context):
+    # Devuelve el ETag en la metadata final; con 304 el cliente conserva su
+    # copia y el servidor no arma el mensaje protobuf
+    etag = response.headers.get("ETag")
+    if not etag:
+        return False
+    metadata = [("etag", etag)]
+    if response.status_code == 304:
+        metadata.append(("not-modified", "1"))
+    context.set_trailing_metadata(metadata)
+    return response.status_code == 304
+
+def handle_backend_errors(response_cls):
+    # Traduce los errores del backend a codigos gRPC y devuelve una respuesta vacia
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(self, request, context):
+            try:
+                return handler(self, request, context)
+            except BackendTimeout:
+                context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
+                context.set_details("Backend API timeout")
+            except BackendUnavailable:
+                context.set_code(grpc.StatusCode.UNAVAILABLE)
+                context.set_details("Backend API unreachable")
+            except Exception as e:
+                context.set_code(grpc.StatusCode.INTERNAL)
+                context.set_details(f"Backend API error: {str(e)}")
+            return response_cls()
+        return wrapper
+    return decorator
 
 class MusicServiceServicer(daztl_service_pb2_grpc.MusicServiceServicer):
+    def __init__(self, backend=None, single_flight=SINGLE_FLIGHT, chat_hub=None, chat_max_streams=CHAT_MAX_STREAMS):
+        self.backend = backend or get_backend()
+        self.flights = SingleFlight() if single_flight else None
+        self.chat = chat_hub or ChatHub(local_writes=self.backend.mode == "orm")
+        self.chat_streams = threading.BoundedSemaphore(chat_max_streams)
+
+    def shared(self, method, call, **params):
+        # Solo para lecturas que no dependen del usuario
+        if self.flights is None:
+            return call(**params)
+        return self.flights.do(method, params, lambda: call(**params))
+
+    def stats(self):
+        stats = dict(self.backend.stats())
+        if self.flights is not None:
+            stats["single_flight"] = self.flights.stats()
+        stats["chat"] = self.chat.stats()
+        return stats
+
+    @handle_backend_errors(daztl_service_pb2.GenericResponse)
     def RegisterUser(self, request, context):
         payload = {
             "username": request.username,
@@ -21,31 +102,13 @@ class MusicServiceServicer(daztl_service_pb2_grpc.MusicServiceServicer):
             "first_name": request.first_name,
             "last_name": request.last_name
         }
-        try:
-            res = requests.post(f"{API_BASE_URL}/register/", json=payload, timeout=60)
-            if res.status_code == 201:
-                return daztl_service_pb2.GenericResponse(status="success", message="User registered successfully")
-            else:
-                return daztl_service_pb2.GenericResponse(status="error", message=res.text)
-        except requests.exceptions.Timeout:
-            context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
-            context.set_details("Backend API timeout")
-            return daztl_service_pb2.GenericResponse()
-            
-        except requests.exceptions.ConnectionError:
-            context.set_code(grpc.StatusCode.UNAVAILABLE)
-            context.set_details("Backend API unreachable")
-            return daztl_service_pb2.GenericResponse()
-            
-        except requests.exceptions.RequestException as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.GenericResponse()
-        except Exception as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.GenericResponse()
-        
+        res = self.backend.register_user(payload)
+        if res.status_code == 201:
+            return daztl_service_pb2.GenericResponse(status="success", message="User registered successfully")
+        else:
+            return daztl_service_pb2.GenericResponse(status="error", message=res.text)
+
+    @handle_backend_errors(daztl_service_pb2.GenericResponse)
     def RegisterArtist(self, request, context):
         payload = {
             "username": request.username,
@@ -55,78 +118,31 @@ class MusicServiceServicer(daztl_service_pb2_grpc.MusicServiceServicer):
             "last_name": request.last_name,
             "bio": request.bio
         }
-        try:
-            res = requests.post(f"{API_BASE_URL}/auth/register-artist/", json=payload, timeout=60)
-            if res.status_code == 201:
-                return daztl_service_pb2.GenericResponse(status="success", message="User registered successfully")
-            else:
-                context.set_code(grpc.StatusCode.FAILED_PRECONDITION)
-                context.set_details(f"Backend error: {res.text}")
-                return daztl_service_pb2.GenericResponse(status="error", message=res.text)
-        except requests.exceptions.Timeout:
-            context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
-            context.set_details("Backend API timeout")
-            return daztl_service_pb2.GenericResponse()
-            
-        except requests.exceptions.ConnectionError:
-            context.set_code(grpc.StatusCode.UNAVAILABLE)
-            context.set_details("Backend API unreachable")
-            return daztl_service_pb2.GenericResponse()
-            
-        except requests.exceptions.RequestException as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.GenericResponse()
-        except Exception as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.GenericResponse()
+        res = self.backend.register_artist(payload)
+        if res.status_code == 201:
+            return daztl_service_pb2.GenericResponse(status="success", message="User registered successfully")
+        else:
+            context.set_code(grpc.StatusCode.FAILED_PRECONDITION)
+            context.set_details(f"Backend error: {res.text}")
+            return daztl_service_pb2.GenericResponse(status="error", message=res.text)
 
+    @handle_backend_errors(daztl_service_pb2.LoginResponse)
     def LoginUser(self, request, context):
         payload = {
             "username": request.username,
             "password": request.password
         }
 
-        try:
-            res = requests.post(f"{API_BASE_URL}/login/", json=payload, timeout=60)
-            if res.status_code == 200:
-                tokens = res.json()
-                user_info = tokens.get("user_info", {})
-                return daztl_service_pb2.LoginResponse(
-                    access_token=tokens.get("token"), 
-                    refresh_token=tokens.get("refresh"),
-                    role=user_info.get("role"),
-                    is_artist=user_info.get("is_artist"),
-                    user_id=user_info.get("id"),
-                    username=user_info.get("username"),
-                    artist_id=user_info.get("artist_profile_id")
-                )
-            else:
-                context.set_code(grpc.StatusCode.UNAUTHENTICATED)
-                context.set_details("Invalid username or password")
-                return daztl_service_pb2.LoginResponse()
-        except requests.exceptions.Timeout:
-            context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
-            context.set_details("Backend API timeout")
-            return daztl_service_pb2.LoginResponse()
-            
-        except requests.exceptions.ConnectionError:
-            context.set_code(grpc.StatusCode.UNAVAILABLE)
-            context.set_details("Backend API unreachable")
-            return daztl_service_pb2.LoginResponse()
-            
-        except requests.exceptions.RequestException as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.LoginResponse()
-        except Exception as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
+        res = self.backend.login(payload)
+        if res.status_code == 200:
+            return messages.login_message(res.json())
+        else:
+            context.set_code(grpc.StatusCode.UNAUTHENTICATED)
+            context.set_details("Invalid username or password")
             return daztl_service_pb2.LoginResponse()
 
+    @handle_backend_errors(daztl_service_pb2.GenericResponse)
     def UpdateProfile(self, request, context):
-        headers = make_auth_header(request.token)
         payload = {
             "email": request.email,
             "first_name": request.first_name,
@@ -134,137 +150,91 @@ class MusicServiceServicer(daztl_service_pb2_grpc.MusicServiceServicer):
             "username": request.username,
             "password": request.password
         }
-        try:
-            res = requests.put(f"{API_BASE_URL}/profile/edit", headers=headers, json=payload, timeout=60)
-            if res.status_code == 200:
-                return daztl_service_pb2.GenericResponse(status="success", message="Profile updated successfully")
-            else:
-                return daztl_service_pb2.GenericResponse(status="error", message=res.text)
-        except requests.exceptions.Timeout:
-            context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
-            context.set_details("Backend API timeout")
-            return daztl_service_pb2.GenericResponse()
-            
-        except requests.exceptions.ConnectionError:
-            context.set_code(grpc.StatusCode.UNAVAILABLE)
-            context.set_details("Backend API unreachable")
-            return daztl_service_pb2.GenericResponse()
-            
-        except requests.exceptions.RequestException as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.GenericResponse()
-        except Exception as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.GenericResponse()
+        res = self.backend.update_profile(request.token, payload)
+        if res.status_code == 200:
+            return daztl_service_pb2.GenericResponse(status="success", message="Profile updated successfully")
+        else:
+            return daztl_service_pb2.GenericResponse(status="error", message=res.text)
 
+    @handle_backend_errors(daztl_service_pb2.SongListResponse)
     def ListSongs(self, request, context):
-        try:
-            res = requests.get(f"{API_BASE_URL}/songs/", timeout=60)
-            if res.status_code == 200:
-                songs_data = res.json()
-                songs = []
-                for song in songs_data:
-                    songs.append(daztl_service_pb2.SongResponse(
-                        id=song.get("id"),
-                        title=song.get("title"),
-                        artist=song.get("artist") or song.get("artist_name", ""),
-                        audio_url=song.get("audio_url"),
-                        cover_url=song.get("cover_url"),
-                        release_date=song.get("release_date", "")
-                    ))
-                return daztl_service_pb2.SongListResponse(songs=songs)
-            else:
-                context.set_code(grpc.StatusCode.INTERNAL)
-                context.set_details("Failed to fetch songs")
-                return daztl_service_pb2.SongListResponse()
-        except requests.exceptions.Timeout:
-            context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
-            context.set_details("Backend API timeout")
+        params = {**page_args(request), **conditional_args(context)}
+        res = self.shared("ListSongs", self.backend.list_songs, **params)
+        if not_modified(res, context):
             return daztl_service_pb2.SongListResponse()
-            
-        except requests.exceptions.ConnectionError:
-            context.set_code(grpc.StatusCode.UNAVAILABLE)
-            context.set_details("Backend API unreachable")
-            return daztl_service_pb2.SongListResponse()
-            
-        except requests.exceptions.RequestException as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.SongListResponse()
-        except Exception as e:
+        if res.status_code == 200:
+            return messages.song_list_message(res.json())
+        else:
             context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
+            context.set_details("Failed to fetch songs")
             return daztl_service_pb2.SongListResponse()
 
+    @handle_backend_errors(daztl_service_pb2.SongResponse)
     def GetSong(self, request, context):
-        try:
-            res = requests.get(f"{API_BASE_URL}/songs/{request.id}/")
-            if res.status_code == 200:
-                song = res.json()
-                return daztl_service_pb2.SongResponse(
-                    id=song['id'],
-                    title=song['title'],
-                    artist=song.get('artist') or song.get('artist_name', ""),
-                    audio_url=song['audio_url'],
-                    cover_url=song.get('cover_url', ''),
-                    release_date=song.get('release_date', '')
-                )
-            else:
-                context.set_code(grpc.StatusCode.NOT_FOUND)
-                context.set_details("Song not found")
-                return daztl_service_pb2.SongResponse()
-        except requests.exceptions.Timeout:
-            context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
-            context.set_details("Backend API timeout")
-            return daztl_service_pb2.SongResponse()
-            
-        except requests.exceptions.ConnectionError:
-            context.set_code(grpc.StatusCode.UNAVAILABLE)
-            context.set_details("Backend API unreachable")
-            return daztl_service_pb2.SongResponse()
-            
-        except requests.exceptions.RequestException as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
+        res = self.shared("GetSong", self.backend.get_song, song_id=request.id, **conditional_args(context))
+        if not_modified(res, context):
             return daztl_service_pb2.SongResponse()
-        except Exception as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
+        if res.status_code == 200:
+            return messages.song_message(res.json())
+        else:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details("Song not found")
             return daztl_service_pb2.SongResponse()
 
-    def RefreshToken(self, request, context):
+    def StreamSong(self, request, context):
+        # Server-streaming: el cliente puede empezar a reproducir con el primer
+        # chunk y pedir un offset para adelantar. gRPC solo pide el siguiente
+        # chunk cuando el cliente consume el anterior.
         try:
-            payload = {"refresh": request.refresh_token}
-            res = requests.post(f"{API_BASE_URL}/refresh/", json=payload, timeout=60)
-            if res.status_code == 200:
-                tokens = res.json()
-                return daztl_service_pb2.LoginResponse(
-                    access_token=tokens.get("access") or tokens.get("token"),
-                    refresh_token=tokens.get("refresh")
-                )
-            else:
-                context.set_code(grpc.StatusCode.UNAUTHENTICATED)
-                context.set_details("Invalid refresh token")
-                return daztl_service_pb2.LoginResponse()
-        except requests.exceptions.Timeout:
-            context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
-            context.set_details("Backend API timeout")
-            return daztl_service_pb2.LoginResponse()
-            
-        except requests.exceptions.ConnectionError:
-            context.set_code(grpc.StatusCode.UNAVAILABLE)
-            context.set_details("Backend API unreachable")
-            return daztl_service_pb2.LoginResponse()
-            
-        except requests.exceptions.RequestException as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.LoginResponse()
-        except Exception as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
+            res = self.backend.get_song(request.song_id)
+        except BackendTimeout:
+            context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, "Backend API timeout")
+        except BackendUnavailable:
+            context.abort(grpc.StatusCode.UNAVAILABLE, "Backend API unreachable")
+        if res.status_code != 200:
+            context.abort(grpc.StatusCode.NOT_FOUND, "Song not found")
+
+        try:
+            path, size = media.locate_audio(res.json(), request.offset)
+        except FileNotFoundError:
+            context.abort(grpc.StatusCode.NOT_FOUND, "Audio file not found")
+        except ValueError as e:
+            context.abort(grpc.StatusCode.OUT_OF_RANGE, str(e))
+
+        content_type = media.guess_content_type(path)
+        chunk_size = media.clamp_chunk_size(request.chunk_size)
+        for offset, data in media.iter_file_chunks(path, request.offset, chunk_size):
+            yield daztl_service_pb2.AudioChunk(
+                data=data, offset=offset, total_size=size, content_type=content_type
+            )
+
+    @handle_backend_errors(daztl_service_pb2.GenericResponse)
+    def UploadSong(self, request_iterator, context):
+        # El audio y la portada llegan en chunks y se verifican (tamano y sha256)
+        # en disco antes de enviarlos al backend
+        try:
+            upload = uploads.receive(uploads.song_upload(), request_iterator)
+        except uploads.UploadError as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(e))
+            return daztl_service_pb2.GenericResponse(status="error", message=str(e))
+
+        with upload:
+            meta = upload.metadata
+            res = self.backend.upload_song(meta.token, meta.title,
+                                           upload.files["audio_data"], upload.files["cover_data"])
+        if res.status_code == 201:
+            return daztl_service_pb2.GenericResponse(status="success", message="Canción subida exitosamente")
+        return daztl_service_pb2.GenericResponse(status="error", message=res.text)
+
+    @handle_backend_errors(daztl_service_pb2.LoginResponse)
+    def RefreshToken(self, request, context):
+        res = self.backend.refresh_token(request.refresh_token)
+        if res.status_code == 200:
+            return messages.login_message(res.json())
+        else:
+            context.set_code(grpc.StatusCode.UNAUTHENTICATED)
+            context.set_details("Invalid refresh token")
             return daztl_service_pb2.LoginResponse()
 
     def GetProfile(self, request, context):
@@ -274,257 +244,104 @@ class MusicServiceServicer(daztl_service_pb2_grpc.MusicServiceServicer):
         if not auth_header:
             context.abort(grpc.StatusCode.UNAUTHENTICATED, "Missing authorization header")
 
-        headers = {"Authorization": auth_header}
-        response = requests.get(f"{API_BASE_URL}/profile/", headers=headers)
+        response = self.backend.get_profile(auth_header, **conditional_args(context))
+        if not_modified(response, context):
+            return daztl_service_pb2.UserProfileResponse()
 
         if response.status_code == 200:
-            data = response.json()
-            return daztl_service_pb2.UserProfileResponse(
-                username=data["username"],
-                email=data["email"],
-                first_name=data["first_name"],
-                last_name=data["last_name"],
-                profile_image_url=data.get("profile_image_url", "")
-            )
+            return messages.profile_message(response.json())
         elif response.status_code == 401:
             context.abort(grpc.StatusCode.UNAUTHENTICATED, "Token inválido o expirado")
         else:
             context.abort(grpc.StatusCode.INTERNAL, "Error al consultar el perfil")
 
+    @handle_backend_errors(daztl_service_pb2.GenericResponse)
     def CreatePlaylist(self, request, context):
-        headers = make_auth_header(request.token)
-        payload = {"name": request.name}
-        try:
-            res = requests.post(f"{API_BASE_URL}/playlists/create/", headers=headers, json=payload, timeout=60)
-            if res.status_code == 201:
-                data = res.json()
-                playlist_id = data.get("id", -1)
-
-                if request.cover_url:
-                    image_data = base64.b64decode(request.cover_url)
-                    files = {'cover': ('cover.jpg', image_data, 'image/jpeg')}
-                    res_upload = requests.post(
-                        f"{API_BASE_URL}/playlists/{playlist_id}/upload_cover/",
-                        headers=headers,
-                        files=files,
-                        timeout=60
+        res = self.backend.create_playlist(request.token, request.name)
+        if res.status_code == 201:
+            data = res.json()
+            playlist_id = data.get("id", -1)
+
+            if request.cover_url:
+                image_data = base64.b64decode(request.cover_url)
+                res_upload = self.backend.upload_playlist_cover(request.token, playlist_id, image_data)
+                if res_upload.status_code != 200:
+                    return daztl_service_pb2.GenericResponse(
+                        status="error",
+                        message=f"Playlist creada pero fallo al subir imagen: {res_upload.text}"
                     )
-                    if res_upload.status_code != 200:
-                        return daztl_service_pb2.GenericResponse(
-                            status="error",
-                            message=f"Playlist creada pero fallo al subir imagen: {res_upload.text}"
-                        )
-
-                message = json.dumps({"id": playlist_id, "message": "Playlist creada exitosamente"})
-                return daztl_service_pb2.GenericResponse(status="success", message=message)
-
-            else:
-                return daztl_service_pb2.GenericResponse(status="error", message=res.text)
-
-        except requests.exceptions.Timeout:
-            context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
-            context.set_details("Backend API timeout")
-            return daztl_service_pb2.GenericResponse()
-
-        except requests.exceptions.ConnectionError:
-            context.set_code(grpc.StatusCode.UNAVAILABLE)
-            context.set_details("Backend API unreachable")
-            return daztl_service_pb2.GenericResponse()
 
-        except requests.exceptions.RequestException as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.GenericResponse()
+            message = json.dumps({"id": playlist_id, "message": "Playlist creada exitosamente"})
+            return daztl_service_pb2.GenericResponse(status="success", message=message)
 
-        except Exception as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.GenericResponse()
+        else:
+            return daztl_service_pb2.GenericResponse(status="error", message=res.text)
 
+    @handle_backend_errors(daztl_service_pb2.GenericResponse)
+    def UploadCover(self, request_iterator, context):
+        # Cliente-streaming: metadata y despues la imagen en chunks de bytes
+        try:
+            upload = uploads.receive(uploads.cover_upload(), request_iterator)
+        except uploads.UploadError as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(e))
+            return daztl_service_pb2.GenericResponse(status="error", message=str(e))
+
+        with upload:
+            meta = upload.metadata
+            res = self.backend.upload_playlist_cover_file(meta.token, meta.playlist_id, upload.files["data"])
+        if res.status_code == 200:
+            return daztl_service_pb2.GenericResponse(status="success", message="Cover subido exitosamente")
+        return daztl_service_pb2.GenericResponse(status="error", message=res.text)
 
     def GetPlaylist(self, request, context):
         try:
             # Obtener el token de los metadatos
             token = self.get_token_from_metadata(context)
-            
-            headers = {
-                "Authorization": f"Bearer {token}"
-            }
-            
-            response = requests.get(
-                f"{API_BASE_URL}/playlists/{request.id}/",
-                headers=headers,
-                timeout=60
-            )
+            response = self.backend.get_playlist(token, request.id)
             
             if response.status_code != 200:
                 context.set_code(grpc.StatusCode.PERMISSION_DENIED if response.status_code == 401 
                             else grpc.StatusCode.INTERNAL)
                 return daztl_service_pb2.PlaylistResponse(id=0, name="Error", songs=[])
                 
-            data = response.json()
-            songs = [
-                daztl_service_pb2.SongResponse(
-                    id=s["id"],
-                    title=s["title"],
-                    artist=s.get("artist") or s.get("artist_name", ""),
-                    audio_url=s["audio_url"],
-                    cover_url=s["cover_url"],
-                    release_date=s["release_date"]
-                ) for s in data["songs"]
-            ]
-            return daztl_service_pb2.PlaylistResponse(
-                id=data["id"],
-                name=data["name"],
-                songs=songs
-            )
+            return messages.playlist_message(response.json())
         except Exception as e:
             context.set_code(grpc.StatusCode.INTERNAL)
             return daztl_service_pb2.PlaylistResponse(id=0, name=str(e), songs=[])
 
+    @handle_backend_errors(daztl_service_pb2.GenericResponse)
     def AddSongToPlaylist(self, request, context):
-        headers = make_auth_header(request.token)
-        data = {"song_id": request.song_id}
-        try:
-            response = requests.post(
-                f"{API_BASE_URL}/playlists/{request.playlist_id}/add_song/",
-                json=data,
-                headers=headers,
-                timeout=60
-            )
-            if response.status_code == 200:
-                return daztl_service_pb2.GenericResponse(status="success", message="Canción agregada a la playlist")
-            return daztl_service_pb2.GenericResponse(status="error", message=response.text)
-        except requests.exceptions.Timeout:
-            context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
-            context.set_details("Backend API timeout")
-            return daztl_service_pb2.GenericResponse()
-            
-        except requests.exceptions.ConnectionError:
-            context.set_code(grpc.StatusCode.UNAVAILABLE)
-            context.set_details("Backend API unreachable")
-            return daztl_service_pb2.GenericResponse()
-            
-        except requests.exceptions.RequestException as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.GenericResponse()
-        
-        except Exception as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.GenericResponse()
+        response = self.backend.add_song_to_playlist(request.token, request.playlist_id, request.song_id)
+        if response.status_code == 200:
+            return daztl_service_pb2.GenericResponse(status="success", message="Canción agregada a la playlist")
+        return daztl_service_pb2.GenericResponse(status="error", message=response.text)
 
+    @handle_backend_errors(daztl_service_pb2.PlaylistDetailResponse)
     def GetPlaylistDetail(self, request, context):
-        headers = make_auth_header(request.token)
-        try:
-            response = requests.get(f"{API_BASE_URL}/playlists/{request.playlist_id}/", headers=headers, timeout=60)
-            if response.status_code == 200:
-                data = response.json()
-                songs = [
-                    daztl_service_pb2.SongResponse(
-                        id=s["id"],
-                        title=s["title"],
-                        artist=s.get("artist_name", ""),
-                        audio_url=s.get("audio_url", ""),
-                        cover_url=s.get("cover_url", ""),
-                        release_date=s.get("release_date", "")
-                    ) for s in data.get("songs", [])
-                ]
-                return daztl_service_pb2.PlaylistDetailResponse(
-                    id=data["id"],
-                    name=data["name"],
-                    songs=songs,
-                    status="success",
-                    message="Playlist cargada correctamente"
-                )
-            else:
-                return daztl_service_pb2.PlaylistDetailResponse(
-                    status="error",
-                    message=f"Error al obtener playlist: {response.text}"
-                )
-        except requests.exceptions.Timeout:
-            context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
-            context.set_details("Backend API timeout")
-            return daztl_service_pb2.PlaylistDetailResponse()
-            
-        except requests.exceptions.ConnectionError:
-            context.set_code(grpc.StatusCode.UNAVAILABLE)
-            context.set_details("Backend API unreachable")
-            return daztl_service_pb2.PlaylistDetailResponse()
-            
-        except requests.exceptions.RequestException as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.PlaylistDetailResponse()
-        
-        except Exception as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.PlaylistDetailResponse()
-        
-    def ListPlaylists(self, request, context):
-        try:
-            token = request.token
-            headers = {"Authorization": f"Bearer {token}"}
-            
-            response = requests.get("http://localhost:8000/api/playlists/", headers=headers, timeout=60)
+        response = self.backend.get_playlist(request.token, request.playlist_id)
+        if response.status_code == 200:
+            return messages.playlist_detail_message(response.json())
+        else:
+            return daztl_service_pb2.PlaylistDetailResponse(
+                status="error",
+                message=f"Error al obtener playlist: {response.text}"
+            )
 
-            if response.status_code == 200:
-                data = response.json()
-                playlist_messages = []
-
-                for playlist in data:
-                    cover_url = playlist.get("cover") or ""
-                    songs = []
-                    
-                    if 'songs' in playlist:
-                        for song in playlist['songs']:
-                            song_msg = daztl_service_pb2.SongResponse(
-                                id=song['id'],
-                                title=song['title'],
-                                artist=song['artist_name'],
-                                audio_url=song['audio_url'] or "",
-                                cover_url=song['cover_url'] or "",
-                                release_date=song['release_date'] or ""
-                            )
-                            songs.append(song_msg)
-                    
-                    playlist_msg = daztl_service_pb2.PlaylistResponse(
-                        id=playlist["id"],
-                        name=playlist["name"],
-                        cover_url=cover_url,
-                        songs=songs  # Añadir las canciones aquí
-                    )
-                    playlist_messages.append(playlist_msg)
+    @handle_backend_errors(daztl_service_pb2.PlaylistListResponse)
+    def ListPlaylists(self, request, context):
+        response = self.backend.list_playlists(request.token, **page_args(request), **conditional_args(context))
+        if not_modified(response, context):
+            return daztl_service_pb2.PlaylistListResponse()
 
-                return daztl_service_pb2.PlaylistListResponse(playlists=playlist_messages)
+        if response.status_code == 200:
+            return messages.playlist_list_message(response.json())
 
-            else:
-                print(response)
-                context.set_code(grpc.StatusCode.UNAUTHENTICATED)
-                context.set_details("No autorizado para obtener playlists")
-                return daztl_service_pb2.PlaylistListResponse()
-
-        except requests.exceptions.Timeout:
-            context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
-            context.set_details("Backend API timeout")
-            return daztl_service_pb2.PlaylistListResponse()
-            
-        except requests.exceptions.ConnectionError:
-            context.set_code(grpc.StatusCode.UNAVAILABLE)
-            context.set_details("Backend API unreachable")
-            return daztl_service_pb2.PlaylistListResponse()
-            
-        except requests.exceptions.RequestException as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.PlaylistListResponse()
-        
-        except Exception as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
+        else:
+            context.set_code(grpc.StatusCode.UNAUTHENTICATED)
+            context.set_details("No autorizado para obtener playlists")
             return daztl_service_pb2.PlaylistListResponse()
+
     @staticmethod
     def get_token_from_metadata(context):
         for key, value in context.invocation_metadata():
@@ -536,24 +353,9 @@ class MusicServiceServicer(daztl_service_pb2_grpc.MusicServiceServicer):
         query = request.query
         token = self.get_token_from_metadata(context)
         try:
-            response = requests.get(
-                f"{API_BASE_URL}/songs/",
-                headers={"Authorization": f"Bearer {token}"},
-                params={"q": query}
-            )
+            response = self.backend.list_songs(query, token=token, **page_args(request))
             if response.status_code == 200:
-                songs_data = response.json()
-                songs = [
-                    daztl_service_pb2.SongResponse(
-                        id=s["id"],
-                        title=s["title"],
-                        artist=s.get("artist_name", ""),
-                        audio_url=s["audio_url"],
-                        cover_url=s["cover_url"],
-                        release_date=s["release_date"]
-                    ) for s in songs_data
-                ]
-                return daztl_service_pb2.SongListResponse(songs=songs)
+                return messages.song_list_message(response.json())
             else:
                 context.abort(grpc.StatusCode.INTERNAL, "Error al buscar canciones en el backend")
         except Exception as e:
@@ -565,273 +367,218 @@ class MusicServiceServicer(daztl_service_pb2_grpc.MusicServiceServicer):
         token = self.get_token_from_metadata(context)
 
         try:
-            response = requests.get(
-                f"{API_BASE_URL}/search/",
-                headers={"Authorization": f"Bearer {token}"},
-                params={"q": query}
-            )
+            response = self.backend.global_search(query, token=token, page_size=request.page_size)
 
             if response.status_code != 200:
                 context.abort(grpc.StatusCode.INTERNAL, "Error al buscar contenido en el backend")
 
-            data = response.json()
-
-            songs = [
-                daztl_service_pb2.SongResponse(
-                    id=s["id"],
-                    title=s["title"],
-                    artist=s.get("artist_name", ""),
-                    audio_url=s["audio_url"],
-                    cover_url=s["cover_url"],
-                    release_date=s["release_date"]
-                ) for s in data.get("songs", [])
-            ]
-
-            albums = [
-                daztl_service_pb2.AlbumResponse(
-                    id=a["id"],
-                    title=a["title"]
-                ) for a in data.get("albums", [])
-            ]
-
-            artists = [
-                daztl_service_pb2.ArtistResponse(
-                    id=ar["id"],
-                    name=ar["user"]["username"]
-                ) for ar in data.get("artists", [])
-            ]
-
-            playlists = [
-                daztl_service_pb2.PlaylistResponse(
-                    id=p["id"],
-                    name=p["name"],
-                    songs=[
-                        daztl_service_pb2.SongResponse(
-                            id=s["id"],
-                            title=s["title"],
-                            artist=s.get("artist", ""),
-                            audio_url=s["audio_url"],
-                            cover_url=s["cover_url"],
-                            release_date=s["release_date"]
-                        ) for s in p.get("songs", [])
-                    ]
-                ) for p in data.get("playlists", [])
-            ]
-
-            return daztl_service_pb2.GlobalSearchResponse(
-                songs=songs,
-                albums=albums,
-                artists=artists,
-                playlists=playlists
-            )
+            return messages.global_search_message(response.json())
 
         except Exception as e:
             context.abort(grpc.StatusCode.INTERNAL, f"Excepción: {str(e)}")
 
-    def ListAlbums(self, request, context):
-        try:
-            response = requests.get("http://localhost:8000/api/albums/", timeout=60)
-
-            if response.status_code == 200:
-                data = response.json()
-                album_messages = []
-
-                for album in data:
-                    cover_url = album.get("cover_image") or ""
-                    artist_name = album.get("artist_name") or ""
-
-                    album_msg = daztl_service_pb2.AlbumResponse(
-                        id=album.get("id"),
-                        title=album.get("title"),
-                        artist_name=artist_name,
-                        cover_url=cover_url
-                    )
-                    album_messages.append(album_msg)
-
-                return daztl_service_pb2.AlbumListResponse(albums=album_messages)
-
-            else:
-                context.set_code(grpc.StatusCode.INTERNAL)
-                context.set_details("Failed to fetch albums")
-                return daztl_service_pb2.AlbumListResponse()
+    @handle_backend_errors(daztl_service_pb2.SuggestResponse)
+    def Suggest(self, request, context):
+        response = self.shared("Suggest", self.backend.suggest, query=request.query,
+                               limit=request.limit, kinds=list(request.kinds))
+        if response.status_code != 200:
+            context.abort(grpc.StatusCode.INTERNAL, "Error al obtener sugerencias")
+        return messages.suggest_message(response.json())
 
-        except requests.exceptions.Timeout:
-            context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
-            context.set_details("Backend API timeout")
-            return daztl_service_pb2.AlbumListResponse()
-
-        except requests.exceptions.ConnectionError:
-            context.set_code(grpc.StatusCode.UNAVAILABLE)
-            context.set_details("Backend API unreachable")
+    @handle_backend_errors(daztl_service_pb2.AlbumListResponse)
+    def ListAlbums(self, request, context):
+        params = {**page_args(request), **conditional_args(context)}
+        response = self.shared("ListAlbums", self.backend.list_albums, **params)
+        if not_modified(response, context):
             return daztl_service_pb2.AlbumListResponse()
 
-        except requests.exceptions.RequestException as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.AlbumListResponse()
+        if response.status_code == 200:
+            return messages.album_list_message(response.json())
 
-        except Exception as e:
+        else:
             context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
+            context.set_details("Failed to fetch albums")
             return daztl_service_pb2.AlbumListResponse()
 
+    @handle_backend_errors(daztl_service_pb2.ArtistListResponse)
     def ListArtists(self, request, context):
-        try:
-            response = requests.get("http://localhost:8000/api/artists/", timeout=60)
-
-            if response.status_code == 200:
-                data = response.json()
-                artist_messages = []
-
-                for artist in data:
-                    artist_messages.append(daztl_service_pb2.ArtistResponse(
-                        id=artist.get("id"),
-                        name=artist.get("user", {}).get("username", ""),
-                        profile_picture=artist.get("profile_picture", "")
-                    ))
-
-                return daztl_service_pb2.ArtistListResponse(artists=artist_messages)
-
-            else:
-                context.set_code(grpc.StatusCode.INTERNAL)
-                context.set_details("Failed to fetch artists")
-                return daztl_service_pb2.ArtistListResponse()
-
-        except requests.exceptions.Timeout:
-            context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
-            context.set_details("Backend API timeout")
-            return daztl_service_pb2.ArtistListResponse()
-
-        except requests.exceptions.ConnectionError:
-            context.set_code(grpc.StatusCode.UNAVAILABLE)
-            context.set_details("Backend API unreachable")
+        params = {**page_args(request), **conditional_args(context)}
+        response = self.shared("ListArtists", self.backend.list_artists, **params)
+        if not_modified(response, context):
             return daztl_service_pb2.ArtistListResponse()
 
-        except requests.exceptions.RequestException as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.ArtistListResponse()
+        if response.status_code == 200:
+            return messages.artist_list_message(response.json())
 
-        except Exception as e:
+        else:
             context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
+            context.set_details("Failed to fetch artists")
             return daztl_service_pb2.ArtistListResponse()
 
+    @handle_backend_errors(daztl_service_pb2.GenericResponse)
     def LikeArtist(self, request, context):
-        try:
-            headers = make_auth_header(request.token)
-            artist_id = request.artist_id
-            
-            # Primero verificamos si ya existe el like
-            res = requests.get(
-                f"{API_BASE_URL}/artists/{artist_id}/like/status/",
-                headers=headers,
-                timeout=60
-            )
-            
-            if res.status_code == 200:
-                is_liked = res.json().get("liked", False)
-                
-                if is_liked:
-                    # Si ya está liked, hacemos unlike
-                    res = requests.delete(
-                        f"{API_BASE_URL}/artists/{artist_id}/like/",
-                        headers=headers,
-                        timeout=60
-                    )
-                else:
-                    # Si no está liked, hacemos like
-                    res = requests.post(
-                        f"{API_BASE_URL}/artists/{artist_id}/like/",
-                        headers=headers,
-                        timeout=60
-                    )
-                
-                if res.status_code in (200, 201):
-                    return daztl_service_pb2.GenericResponse(
-                        status="success",
-                        message="Like status updated successfully"
-                    )
-                else:
-                    context.set_code(grpc.StatusCode.INTERNAL)
-                    context.set_details(f"Error updating like: {res.text}")
-                    return daztl_service_pb2.GenericResponse()
-                    
+        artist_id = request.artist_id
+
+        # Primero verificamos si ya existe el like
+        res = self.backend.like_status(request.token, artist_id)
+
+        if res.status_code == 200:
+            is_liked = res.json().get("liked", False)
+
+            if is_liked:
+                # Si ya está liked, hacemos unlike
+                res = self.backend.unlike_artist(request.token, artist_id)
+            else:
+                # Si no está liked, hacemos like
+                res = self.backend.like_artist(request.token, artist_id)
+
+            if res.status_code in (200, 201):
+                return daztl_service_pb2.GenericResponse(
+                    status="success",
+                    message="Like status updated successfully"
+                )
             else:
                 context.set_code(grpc.StatusCode.INTERNAL)
-                context.set_details("Failed to check like status")
+                context.set_details(f"Error updating like: {res.text}")
                 return daztl_service_pb2.GenericResponse()
-                
-        except requests.exceptions.Timeout:
-            context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
-            context.set_details("Backend API timeout")
-            return daztl_service_pb2.GenericResponse()
-            
-        except requests.exceptions.ConnectionError:
-            context.set_code(grpc.StatusCode.UNAVAILABLE)
-            context.set_details("Backend API unreachable")
-            return daztl_service_pb2.GenericResponse()
-            
-        except requests.exceptions.RequestException as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.GenericResponse()
-        
-        except Exception as e:
+
+        else:
             context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
+            context.set_details("Failed to check like status")
             return daztl_service_pb2.GenericResponse()
 
+    @handle_backend_errors(daztl_service_pb2.LikeStatusResponse)
     def IsArtistLiked(self, request, context):
-        try:
-            headers = make_auth_header(request.token)
-            artist_id = request.artist_id
-            
-            res = requests.get(
-                f"{API_BASE_URL}/artists/{artist_id}/like/status/",
-                headers=headers,
-                timeout=60
-            )
-            
-            if res.status_code == 200:
-                is_liked = res.json().get("liked", False)
-                return daztl_service_pb2.LikeStatusResponse(is_liked=is_liked)
-            else:
-                context.set_code(grpc.StatusCode.INTERNAL)
-                context.set_details("Failed to get like status")
-                return daztl_service_pb2.LikeStatusResponse()
-                
-        except requests.exceptions.Timeout:
-            context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
-            context.set_details("Backend API timeout")
-            return daztl_service_pb2.LikeStatusResponse()
-            
-        except requests.exceptions.ConnectionError:
-            context.set_code(grpc.StatusCode.UNAVAILABLE)
-            context.set_details("Backend API unreachable")
-            return daztl_service_pb2.LikeStatusResponse()
-            
-        except requests.exceptions.RequestException as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
-            return daztl_service_pb2.LikeStatusResponse()
-        
-        except Exception as e:
+        res = self.backend.like_status(request.token, request.artist_id)
+
+        if res.status_code == 200:
+            is_liked = res.json().get("liked", False)
+            return daztl_service_pb2.LikeStatusResponse(is_liked=is_liked)
+        else:
             context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(f"Backend API error: {str(e)}")
+            context.set_details("Failed to get like status")
             return daztl_service_pb2.LikeStatusResponse()
 
-def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    daztl_service_pb2_grpc.add_MusicServiceServicer_to_server(MusicServiceServicer(), server)
-    server.add_insecure_port("[::]:50051")
+    @handle_backend_errors(daztl_service_pb2.ChatListResponse)
+    def ListChatMessages(self, request, context):
+        token = self.get_token_from_metadata(context)
+        response = self.backend.list_chat_messages(
+            token, request.song_id, request.since_id, request.before_id, request.limit)
+        if response.status_code == 200:
+            return messages.chat_list_message(response.json())
+        context.set_code(grpc.StatusCode.UNAUTHENTICATED if response.status_code == 401
+                         else grpc.StatusCode.INTERNAL)
+        context.set_details("Error al obtener el chat")
+        return daztl_service_pb2.ChatListResponse()
+
+    @handle_backend_errors(daztl_service_pb2.GenericResponse)
+    def SendChatMessage(self, request, context):
+        response = self.backend.send_chat_message(request.token, request.song_id, request.message)
+        # 202: aceptado por el buffer de escritura de api/chat_buffer.py, todavia sin id.
+        # A los SubscribeChat llega por api/broadcast.py cuando se guarda, ya con id
+        if response.status_code not in (201, 202):
+            return daztl_service_pb2.GenericResponse(status="error", message=response.text)
+        return daztl_service_pb2.GenericResponse(status="success", message="Mensaje enviado")
+
+    @handle_backend_errors(daztl_service_pb2.GenericResponse)
+    def RecordPlay(self, request, context):
+        response = self.backend.record_play(request.token, request.song_id)
+        # 202: queda en el buffer de api/plays.py hasta el proximo volcado
+        if response.status_code != 202:
+            return daztl_service_pb2.GenericResponse(status="error", message=response.text)
+        return daztl_service_pb2.GenericResponse(status="success", message="Reproduccion registrada")
+
+    def subscriber_token(self, context):
+        # Sin el interceptor JWT (GRPC_JWT_VERIFY=0) el token se valida contra el backend
+        token = self.get_token_from_metadata(context)
+        if not token:
+            return None
+        if verified_claims(token) is not None:
+            return token
+        response = self.backend.get_profile(f"Bearer {token}")
+        return token if response.status_code == 200 else None
+
+    def SubscribeChat(self, request, context):
+        # Server-streaming: solo los mensajes enviados despues de suscribirse;
+        # el historial se pide con ListChatMessages. En este servidor cada
+        # suscripcion ocupa un hilo mientras dura: se aceptan hasta
+        # GRPC_CHAT_MAX_STREAMS; para salas grandes usar --server async
+        try:
+            token = self.subscriber_token(context)
+        except BackendTimeout:
+            context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, "Backend API timeout")
+        except BackendUnavailable:
+            context.abort(grpc.StatusCode.UNAVAILABLE, "Backend API unreachable")
+        if token is None:
+            context.abort(grpc.StatusCode.UNAUTHENTICATED, "Token inválido o expirado")
+        if not self.chat.available():
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION,
+                          "SubscribeChat requiere CHAT_BROADCAST_BACKEND=redis con este despliegue")
+        if not self.chat_streams.acquire(blocking=False):
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                          "Demasiadas suscripciones al chat en este proceso; usar --server async")
+        subscription = self.chat.subscribe(request.song_id)
+        # Si el cliente cancela se despierta el get() que esta esperando
+        context.add_callback(subscription.close)
+        try:
+            yield from subscription
+        except SlowConsumer as e:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+        finally:
+            subscription.close()
+            self.chat_streams.release()
+
+def log_backend_stats(servicer, interval):
+    while True:
+        time.sleep(interval)
+        print(f"backend stats: {servicer.stats()}")
+
+def wait_for_shutdown_signal():
+    # SIGTERM (docker stop / supervisor) y SIGINT terminan igual: sin aceptar
+    # llamadas nuevas y dejando terminar las que estan en vuelo
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda signum, frame: stop.set())
+    while not stop.wait(3600):
+        pass
+
+def serve(backend_mode=None, max_workers=MAX_WORKERS, stats_interval=0, port=GRPC_PORT, reuse_port=False):
+    # Un slot del pool de conexiones por hilo del servidor
+    backend = get_backend(backend_mode, pool_size=max_workers)
+    # Con reuse_port varios procesos escuchan en el mismo puerto y el kernel
+    # reparte las conexiones entre ellos (ver supervisor.py)
+    verifier = make_verifier(backend.mode)
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers),
+                         interceptors=[JWTInterceptor(verifier)] if verifier else None,
+                         options=[("grpc.so_reuseport", int(reuse_port))])
+    backend.warm_up()
+    # Con varios procesos (reuse_port) el broadcast en memoria no alcanza para el chat
+    servicer = MusicServiceServicer(backend, chat_hub=ChatHub(local_writes=backend.mode == "orm" and not reuse_port))
+    # Inicializa Django y el broadcast del chat ahora: si falla, falla el arranque
+    servicer.chat.attach()
+    daztl_service_pb2_grpc.add_MusicServiceServicer_to_server(servicer, server)
+    server.add_insecure_port(f"[::]:{port}")
     server.start()
-    print("gRPC server running on port 50051...")
-    try:
-        while True:
-            time.sleep(86400)
-    except KeyboardInterrupt:
-        server.stop(0)
+    print(f"gRPC server running on port {port} (pid {os.getpid()}, {backend.mode} backend, {max_workers} workers)...")
+    if stats_interval:
+        threading.Thread(target=log_backend_stats, args=(servicer, stats_interval), daemon=True).start()
+    wait_for_shutdown_signal()
+    server.stop(SHUTDOWN_GRACE).wait()
+    print(f"backend stats: {servicer.stats()}")
 
 if __name__ == '__main__':
-    serve()
+    parser = argparse.ArgumentParser(description="Daztl gRPC gateway")
+    parser.add_argument("--backend", choices=BACKEND_MODES, default=DEFAULT_BACKEND,
+                        help="http: proxy a la API REST, orm: modelos de Django en proceso")
+    parser.add_argument("--server", choices=SERVER_MODES, default=os.getenv("GRPC_SERVER_MODE", "threaded"),
+                        help="threaded: ThreadPoolExecutor, async: grpc.aio con backend asincrono")
+    parser.add_argument("--port", type=int, default=GRPC_PORT)
+    parser.add_argument("--max-workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--stats-interval", type=int, default=0,
+                        help="Segundos entre cada log de metricas del backend (0 = desactivado)")
+    args = parser.parse_args()
+    if args.server == "async":
+        from aio_server import run_async
+        run_async(args.backend, args.port)
+    else:
+        serve(args.backend, args.max_workers, args.stats_interval, args.port)
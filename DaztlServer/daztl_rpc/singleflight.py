@@ -0,0 +1,100 @@
+# Coalescencia de lecturas identicas concurrentes (single-flight). Cuando sale
+# un lanzamiento cientos de clientes piden ListSongs/GetSong a la vez: la
+# primera llamada con una clave (metodo + parametros normalizados) va al
+# backend y las que llegan mientras sigue en vuelo esperan y reciben la misma
+# respuesta ya decodificada, o la misma excepcion. No es una cache: al terminar
+# la llamada la clave se libera y la siguiente vuelve a ir al backend.
+import asyncio
+import json
+import threading
+from collections import Counter
+
+from backends import BackendResponse
+
+
+def make_key(method, params):
+    return method, json.dumps(params, sort_keys=True, default=str)
+
+
+def decoded(response):
+    # Se comparte el json ya parseado: cada llamada arma su propio mensaje
+    # protobuf sin volver a decodificar el cuerpo
+    if isinstance(response, BackendResponse):
+        return response
+    try:
+        data = response.json()
+    except ValueError:
+        data = response.text
+    return BackendResponse(response.status_code, data, response.headers)
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    # Para el servidor con ThreadPoolExecutor
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.calls = Counter()
+        self.collapsed = Counter()
+
+    def do(self, method, params, fn):
+        key = make_key(method, params)
+        with self._lock:
+            self.calls[method] += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.collapsed[method] += 1
+        if leader:
+            try:
+                flight.result = decoded(fn())
+            except BaseException as e:
+                flight.error = e
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                flight.done.set()
+        else:
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def stats(self):
+        with self._lock:
+            return {
+                method: {
+                    "calls": self.calls[method],
+                    "collapsed": self.collapsed[method],
+                    "collapse_rate": round(self.collapsed[method] / self.calls[method], 4),
+                }
+                for method in sorted(self.calls)
+            }
+
+
+class AsyncSingleFlight(SingleFlight):
+    # Para el servidor grpc.aio: todo corre en el event loop, no hace falta
+    # lock. La llamada al backend es una tarea propia, asi que si el cliente
+    # que la inicio cancela, las demas la siguen esperando.
+    async def do(self, method, params, fn):
+        key = make_key(method, params)
+        self.calls[method] += 1
+        task = self._flights.get(key)
+        if task is None:
+            task = self._flights[key] = asyncio.ensure_future(self._run(fn))
+            task.add_done_callback(lambda _: self._flights.pop(key, None))
+        else:
+            self.collapsed[method] += 1
+        return await asyncio.shield(task)
+
+    @staticmethod
+    async def _run(fn):
+        return decoded(await fn())
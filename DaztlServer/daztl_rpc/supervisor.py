@@ -0,0 +1,104 @@
+# Modo multiproceso del gateway: un proceso por nucleo, todos escuchando en el
+# mismo puerto con SO_REUSEPORT para que el kernel reparta las conexiones.
+# Cada worker corre serve() (o serve_async) con su propio GIL, asi que el armado
+# de protobuf en ListPlaylists/GlobalSearch ya no compite por un solo nucleo.
+#
+#   python daztl_rpc/supervisor.py --processes 4 --backend http
+import argparse
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+from backends import BACKEND_MODES, DEFAULT_BACKEND
+from server import GRPC_PORT, MAX_WORKERS, SERVER_MODES, SHUTDOWN_GRACE
+
+PROCESSES = int(os.getenv("GRPC_PROCESSES", "0")) or os.cpu_count() or 1
+# Un worker que muere antes de este tiempo cuenta como fallo de arranque y el
+# reinicio se retrasa cada vez mas para no entrar en un bucle de crashes
+MIN_UPTIME = 5
+MAX_RESTART_DELAY = 30
+
+
+def run_worker(server_mode, backend_mode, port, max_workers):
+    if server_mode == "async":
+        from aio_server import run_async
+        run_async(backend_mode, port, reuse_port=True)
+    else:
+        from server import serve
+        serve(backend_mode, max_workers, port=port, reuse_port=True)
+
+
+class Supervisor:
+    def __init__(self, processes=PROCESSES, server_mode="threaded", backend_mode=None,
+                 port=GRPC_PORT, max_workers=MAX_WORKERS):
+        self.processes = processes
+        self.worker_args = (server_mode, backend_mode, port, max_workers)
+        # spawn y no fork: grpc no soporta procesos hijos creados con fork
+        # despues de inicializar su runtime
+        self.context = multiprocessing.get_context("spawn")
+        self.workers = {}
+        self.restart_delay = {}
+        self.stopping = threading.Event()
+
+    def start_worker(self, slot):
+        process = self.context.Process(target=run_worker, args=self.worker_args,
+                                       name=f"daztl-grpc-{slot}", daemon=False)
+        process.start()
+        self.workers[slot] = (process, time.monotonic())
+        print(f"supervisor: worker {slot} started (pid {process.pid})")
+
+    def check_workers(self):
+        for slot, (process, started) in list(self.workers.items()):
+            if process.is_alive() or self.stopping.is_set():
+                continue
+            uptime = time.monotonic() - started
+            if uptime < MIN_UPTIME:
+                delay = min(self.restart_delay.get(slot, 0.5) * 2, MAX_RESTART_DELAY)
+            else:
+                delay = 0
+            self.restart_delay[slot] = delay or 0.5
+            print(f"supervisor: worker {slot} (pid {process.pid}) exited with code {process.exitcode}, "
+                  f"restarting in {delay:.1f}s")
+            if self.stopping.wait(delay):
+                return
+            self.start_worker(slot)
+
+    def stop(self):
+        # Reenvia SIGTERM: cada worker deja de aceptar llamadas y termina las
+        # que tiene en vuelo durante SHUTDOWN_GRACE segundos
+        for process, _ in self.workers.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + SHUTDOWN_GRACE + 5
+        for slot, (process, _) in self.workers.items():
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                print(f"supervisor: worker {slot} (pid {process.pid}) did not stop, killing it")
+                process.kill()
+                process.join()
+
+    def run(self):
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda signum, frame: self.stopping.set())
+        print(f"supervisor: starting {self.processes} workers on port {self.worker_args[2]}")
+        for slot in range(self.processes):
+            self.start_worker(slot)
+        while not self.stopping.wait(1):
+            self.check_workers()
+        print("supervisor: shutting down")
+        self.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Daztl gRPC gateway, un proceso por nucleo")
+    parser.add_argument("--processes", type=int, default=PROCESSES,
+                        help="Procesos worker (por defecto GRPC_PROCESSES o el numero de CPUs)")
+    parser.add_argument("--backend", choices=BACKEND_MODES, default=DEFAULT_BACKEND)
+    parser.add_argument("--server", choices=SERVER_MODES, default=os.getenv("GRPC_SERVER_MODE", "threaded"))
+    parser.add_argument("--port", type=int, default=GRPC_PORT)
+    parser.add_argument("--max-workers", type=int, default=MAX_WORKERS,
+                        help="Hilos por proceso en modo threaded")
+    args = parser.parse_args()
+    Supervisor(args.processes, args.server, args.backend, args.port, args.max_workers).run()
@@ -0,0 +1,43 @@
+import os
+import sys
+
+import pytest
+
+RPC_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RPC_ROOT not in sys.path:
+    sys.path.insert(0, RPC_ROOT)
+
+
+class FakeContext:
+    def __init__(self, metadata=None):
+        self.metadata = list((metadata or {}).items())
+        self.code = None
+        self.details = None
+        self.trailing_metadata = ()
+        self.callbacks = []
+
+    def invocation_metadata(self):
+        return self.metadata
+
+    def set_code(self, code):
+        self.code = code
+
+    def set_details(self, details):
+        self.details = details
+
+    def set_trailing_metadata(self, metadata):
+        self.trailing_metadata = metadata
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+        return True
+
+    def abort(self, code, details):
+        self.code = code
+        self.details = details
+        raise Exception(details)
+
+
+@pytest.fixture
+def grpc_context():
+    return FakeContext()
@@ -0,0 +1,69 @@
+import asyncio
+
+import grpc
+
+from aio_server import AsyncMusicServiceServicer
+from backends import BackendResponse, BackendTimeout
+import proto.daztl_service_pb2 as daztl_service_pb2
+
+
+class FakeAsyncBackend:
+    mode = "fake"
+
+    def __init__(self, songs=None, error=None):
+        self.songs = songs or []
+        self.error = error
+        self.calls = 0
+
+    async def list_songs(self, query=None, token=None, page_size=0, page_token=""):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        if self.error:
+            raise self.error
+        return BackendResponse(200, self.songs)
+
+
+def test_list_songs_runs_concurrently(grpc_context):
+    backend = FakeAsyncBackend(songs=[{"id": 1, "title": "Async Song", "artist_name": "artist"}])
+    servicer = AsyncMusicServiceServicer(backend, single_flight=False)
+
+    async def burst():
+        return await asyncio.gather(*(servicer.ListSongs(daztl_service_pb2.PageRequest(), grpc_context)
+                                      for _ in range(50)))
+
+    loop = asyncio.new_event_loop()
+    try:
+        start = loop.time()
+        responses = loop.run_until_complete(burst())
+        elapsed = loop.time() - start
+    finally:
+        loop.close()
+
+    assert backend.calls == 50
+    assert all(r.songs[0].title == "Async Song" for r in responses)
+    # 50 llamadas de 50 ms en serie tardarian 2.5 s
+    assert elapsed < 1
+
+
+def test_backend_timeout_maps_to_deadline_exceeded(grpc_context):
+    servicer = AsyncMusicServiceServicer(FakeAsyncBackend(error=BackendTimeout("slow")))
+
+    response = asyncio.run(servicer.ListSongs(daztl_service_pb2.PageRequest(), grpc_context))
+
+    assert response == daztl_service_pb2.SongListResponse()
+    assert grpc_context.code == grpc.StatusCode.DEADLINE_EXCEEDED
+
+
+def test_identical_list_songs_share_one_backend_call(grpc_context):
+    backend = FakeAsyncBackend(songs=[{"id": 1, "title": "Async Song", "artist_name": "artist"}])
+    servicer = AsyncMusicServiceServicer(backend)
+
+    async def burst():
+        return await asyncio.gather(*(servicer.ListSongs(daztl_service_pb2.PageRequest(page_size=size), grpc_context)
+                                      for size in [10] * 30 + [20] * 20))
+
+    responses = asyncio.run(burst())
+
+    assert backend.calls == 2
+    assert all(r.songs[0].title == "Async Song" for r in responses)
+    assert servicer.flights.stats()["ListSongs"] == {"calls": 50, "collapsed": 48, "collapse_rate": 0.96}
@@ -0,0 +1,246 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import grpc
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from aio_server import AsyncMusicServiceServicer
+from api import broadcast
+from api.broadcast import MemoryBroadcast, Message, chat_channel
+from api.models import User, ArtistProfile, Song, LiveChat
+from backends import BackendResponse
+from backends.base import verified_token
+from chat_hub import DROP_OLDEST, ChatHub, SlowConsumer
+from server import MusicServiceServicer
+import proto.daztl_service_pb2 as daztl_service_pb2
+
+RPC_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def chat(message_id, text="hola"):
+    return {"id": message_id, "song": 1, "user": {"username": "oyente"}, "message": text,
+            "timestamp": "2026-01-01T00:00:00Z"}
+
+
+class FakeChatBackend:
+    mode = "fake"
+
+    def __init__(self, layer=None):
+        self.sent = []
+        self.layer = layer
+
+    def stats(self):
+        return {}
+
+    def send_chat_message(self, token, song_id, message):
+        # Como la senal de api/signals.py al guardar: publica en el broadcast
+        self.sent.append((token, song_id, message))
+        data = chat(len(self.sent), message)
+        self.layer.publish(chat_channel(song_id), Message(data["id"], json.dumps(data)))
+        return BackendResponse(201, data)
+
+    def get_profile(self, auth_header, etag=None):
+        return BackendResponse(200 if auth_header == "Bearer valid" else 401, {})
+
+
+class FakeAsyncChatBackend(FakeChatBackend):
+    async def send_chat_message(self, token, song_id, message):
+        return super().send_chat_message(token, song_id, message)
+
+    async def get_profile(self, auth_header, etag=None):
+        return super().get_profile(auth_header, etag)
+
+
+def test_publish_reaches_only_subscribers_of_the_song():
+    hub = ChatHub()
+    first, second, other = hub.subscribe(1), hub.subscribe(1), hub.subscribe(2)
+
+    assert hub.publish(1, "m1") == 2
+    assert (first.get(0), second.get(0), other.get(0)) == ("m1", "m1", None)
+
+    first.close()
+    assert hub.subscribers(1) == 1
+    assert hub.stats()["delivered"] == 2
+
+
+def test_slow_consumer_is_disconnected():
+    hub = ChatHub(queue_size=2)
+    slow, fast = hub.subscribe(1), hub.subscribe(1)
+    for i in range(3):
+        hub.publish(1, f"m{i}")
+        assert fast.get(0) == f"m{i}"
+
+    assert hub.subscribers(1) == 1
+    assert hub.stats()["disconnected"] == 1
+    # Recibe lo que ya tenia en la cola y despues el error
+    assert [slow.get(0), slow.get(0)] == ["m0", "m1"]
+    with pytest.raises(SlowConsumer):
+        slow.get(0)
+
+
+def test_drop_oldest_keeps_latest_messages():
+    hub = ChatHub(queue_size=2, policy=DROP_OLDEST)
+    subscription = hub.subscribe(1)
+    for i in range(5):
+        hub.publish(1, f"m{i}")
+
+    assert [subscription.get(0), subscription.get(0)] == ["m3", "m4"]
+    assert subscription.dropped == 3
+    assert hub.stats()["dropped"] == 3
+
+
+def shared_hub(**options):
+    layer = MemoryBroadcast(queue_size=8, policy="disconnect")
+    return layer, ChatHub(broadcast=layer, **options)
+
+
+def start_stream(servicer, context, received):
+    stream = servicer.SubscribeChat(daztl_service_pb2.ChatMessageRequest(song_id=1), context)
+    reader = threading.Thread(target=lambda: received.append(next(stream)))
+    reader.start()
+    while servicer.chat.subscribers(1) == 0:
+        reader.join(0.01)
+    return stream, reader
+
+
+def test_send_chat_message_streams_to_subscribers(grpc_context):
+    layer, hub = shared_hub(local_writes=True)
+    servicer = MusicServiceServicer(FakeChatBackend(layer), chat_hub=hub)
+    grpc_context.metadata = [("authorization", "Bearer valid")]
+    received = []
+    stream, reader = start_stream(servicer, grpc_context, received)
+
+    response = servicer.SendChatMessage(
+        daztl_service_pb2.SendChatRequest(song_id=1, token="valid", message="hola sala"), grpc_context)
+    reader.join(5)
+
+    assert response.status == "success"
+    assert received[0].message == "hola sala" and received[0].user == "oyente" and received[0].id == 1
+    # Al cortar el cliente gRPC corre los callbacks registrados
+    for callback in grpc_context.callbacks:
+        callback()
+    assert servicer.chat.subscribers(1) == 0
+    stream.close()
+
+
+def test_subscribe_requires_shared_broadcast(grpc_context):
+    # Gateway http o con varios procesos y broadcast en memoria: no veria
+    # los mensajes guardados en otros procesos
+    _, hub = shared_hub()
+    servicer = MusicServiceServicer(FakeChatBackend(), chat_hub=hub)
+    grpc_context.metadata = [("authorization", "Bearer valid")]
+    with pytest.raises(Exception):
+        next(servicer.SubscribeChat(daztl_service_pb2.ChatMessageRequest(song_id=1), grpc_context))
+    assert grpc_context.code == grpc.StatusCode.FAILED_PRECONDITION
+
+
+def test_available_sets_up_django_from_the_gateway_directory(settings):
+    # Como el supervisor en Docker: sys.path[0] es daztl_rpc/ y api/ todavia
+    # no es importable; attach() inicializa Django antes de mirar el broadcast
+    script = (
+        "import sys; assert 'api' not in sys.modules\n"
+        "from chat_hub import ChatHub\n"
+        "print(ChatHub().available(), ChatHub(local_writes=True).available())\n"
+    )
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE, "CHAT_BROADCAST_BACKEND": "memory"}
+    result = subprocess.run([sys.executable, "-c", script], cwd=RPC_ROOT, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["False", "True"]
+
+
+def test_threaded_server_limits_open_streams(grpc_context):
+    layer, hub = shared_hub(local_writes=True)
+    servicer = MusicServiceServicer(FakeChatBackend(layer), chat_hub=hub, chat_max_streams=1)
+    grpc_context.metadata = [("authorization", "Bearer valid")]
+    received = []
+    stream, reader = start_stream(servicer, grpc_context, received)
+
+    second = type(grpc_context)({"authorization": "Bearer valid"})
+    with pytest.raises(Exception):
+        next(servicer.SubscribeChat(daztl_service_pb2.ChatMessageRequest(song_id=1), second))
+    assert second.code == grpc.StatusCode.RESOURCE_EXHAUSTED
+
+    servicer.SendChatMessage(daztl_service_pb2.SendChatRequest(song_id=1, token="valid", message="m"), grpc_context)
+    reader.join(5)
+    stream.close()
+    # Al terminar el primero se libera el lugar
+    assert servicer.chat_streams.acquire(blocking=False)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_messages_saved_by_other_transports_reach_subscribers(grpc_context, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    broadcast.reset()
+    user = User.objects.create_user(username="oyente", password="password123")
+    song = Song.objects.create(
+        title="Sala", artist=ArtistProfile.objects.create(user=User.objects.create_user(username="sala", password="x")),
+        audio_file=SimpleUploadedFile("s.mp3", b"file_content", content_type="audio/mpeg"),
+    )
+    servicer = MusicServiceServicer(FakeChatBackend(), chat_hub=ChatHub(local_writes=True))
+    grpc_context.metadata = [("authorization", "Bearer valid")]
+    stream = servicer.SubscribeChat(daztl_service_pb2.ChatMessageRequest(song_id=song.id), grpc_context)
+    received = []
+    reader = threading.Thread(target=lambda: received.append(next(stream)))
+    reader.start()
+    while servicer.chat.subscribers(song.id) == 0:
+        reader.join(0.01)
+
+    # Guardado por REST o por el WebSocket: lo publica la senal, con su id
+    chat_row = LiveChat.objects.create(song=song, user=user, message="por REST")
+    reader.join(5)
+    stream.close()
+    broadcast.reset()
+
+    assert (received[0].id, received[0].message, received[0].user) == (chat_row.id, "por REST", "oyente")
+
+
+def test_subscribe_requires_valid_token(grpc_context):
+    servicer = MusicServiceServicer(FakeChatBackend())
+    grpc_context.metadata = [("authorization", "Bearer expired")]
+    with pytest.raises(Exception):
+        next(servicer.SubscribeChat(daztl_service_pb2.ChatMessageRequest(song_id=1), grpc_context))
+    assert grpc_context.code == grpc.StatusCode.UNAUTHENTICATED
+
+
+def test_verified_token_skips_backend_check(grpc_context):
+    backend = FakeChatBackend()
+    backend.get_profile = None
+    servicer = MusicServiceServicer(backend)
+    grpc_context.metadata = [("authorization", "Bearer checked")]
+    reset = verified_token.set(("checked", {"user_id": "1"}))
+    try:
+        assert servicer.subscriber_token(grpc_context) == "checked"
+    finally:
+        verified_token.reset(reset)
+
+
+def test_async_subscribers_receive_messages(grpc_context):
+    layer, hub = shared_hub(local_writes=True)
+    servicer = AsyncMusicServiceServicer(FakeAsyncChatBackend(layer), chat_hub=hub)
+    grpc_context.metadata = [("authorization", "Bearer valid")]
+
+    async def listen():
+        stream = servicer.SubscribeChat(daztl_service_pb2.ChatMessageRequest(song_id=1), grpc_context)
+        try:
+            return await stream.__anext__()
+        finally:
+            await stream.aclose()
+
+    async def room():
+        listeners = [asyncio.ensure_future(listen()) for _ in range(100)]
+        while servicer.chat.subscribers(1) < 100:
+            await asyncio.sleep(0.01)
+        await servicer.SendChatMessage(
+            daztl_service_pb2.SendChatRequest(song_id=1, token="valid", message="estreno"), grpc_context)
+        return await asyncio.gather(*listeners)
+
+    received = asyncio.run(room())
+
+    assert [m.message for m in received] == ["estreno"] * 100
+    assert servicer.chat.subscribers(1) == 0
@@ -0,0 +1,76 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import grpc
+import pytest
+
+from backends import BackendTimeout, BackendUnavailable
+from backends.http import HttpBackend
+from server import MusicServiceServicer
+import proto.daztl_service_pb2 as daztl_service_pb2
+
+
+class SongsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps([{"id": 1, "title": "Keep Alive", "artist_name": "a",
+                            "audio_url": "", "cover_url": "", "release_date": ""}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api_server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), SongsHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/api"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class RaisingBackend:
+    mode = "stub"
+
+    def __init__(self, error):
+        self.error = error
+
+    def list_songs(self, query=None, token=None, page_size=0, page_token=""):
+        raise self.error
+
+
+class TestHttpBackend:
+    def test_reuses_keep_alive_connections(self, api_server):
+        backend = HttpBackend(base_url=api_server, pool_size=2)
+        for _ in range(5):
+            assert backend.list_songs().status_code == 200
+
+        stats = backend.stats()["pool"]
+        assert stats["checkouts"] == 5
+        assert stats["misses"] == 1
+        assert stats["hits"] == 4
+
+    def test_connection_error_is_translated(self):
+        backend = HttpBackend(base_url="http://127.0.0.1:9/api", timeout=1)
+        with pytest.raises(BackendUnavailable):
+            backend.list_songs()
+
+    @pytest.mark.parametrize("error, code", [
+        (BackendTimeout("slow"), grpc.StatusCode.DEADLINE_EXCEEDED),
+        (BackendUnavailable("down"), grpc.StatusCode.UNAVAILABLE),
+        (ValueError("boom"), grpc.StatusCode.INTERNAL),
+    ])
+    def test_backend_errors_map_to_status_codes(self, error, code, grpc_context):
+        servicer = MusicServiceServicer(RaisingBackend(error))
+        response = servicer.ListSongs(daztl_service_pb2.PageRequest(), grpc_context)
+
+        assert grpc_context.code == code
+        assert response == daztl_service_pb2.SongListResponse()
@@ -0,0 +1,125 @@
+import asyncio
+import collections
+from datetime import timedelta
+
+import grpc
+import pytest
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+import jwt_auth
+from backends.base import verified_claims
+from jwt_auth import AsyncJWTInterceptor, InvalidToken, JWTInterceptor, JWTVerifier, make_verifier
+import proto.daztl_service_pb2 as daztl_service_pb2
+
+CallDetails = collections.namedtuple("CallDetails", ["method", "invocation_metadata"])
+
+
+def access_token(user_id=1, lifetime=None):
+    token = AccessToken()
+    token["user_id"] = user_id
+    if lifetime is not None:
+        token.set_exp(lifetime=lifetime)
+    return str(token)
+
+
+def intercept(verifier, method, behavior):
+    handler = JWTInterceptor(verifier).intercept_service(
+        lambda details: grpc.unary_unary_rpc_method_handler(behavior),
+        CallDetails(f"/daztl.MusicService/{method}", ()),
+    )
+    return handler.unary_unary
+
+
+def test_verifies_tokens_signed_by_django():
+    claims = make_verifier("orm").claims(access_token(user_id=7))
+    assert claims["user_id"] == 7
+
+
+@pytest.mark.parametrize("token", [
+    access_token(lifetime=timedelta(seconds=-1)),
+    access_token()[:-2] + "xx",
+    str(RefreshToken()),
+    "not-a-token",
+])
+def test_rejects_invalid_tokens(token):
+    with pytest.raises(InvalidToken):
+        make_verifier("orm").claims(token)
+
+
+def test_rejects_tokens_signed_with_other_key():
+    with pytest.raises(InvalidToken):
+        JWTVerifier("other-key").claims(access_token())
+
+
+def test_caches_claims_until_expiry(monkeypatch):
+    verifier = make_verifier("orm")
+    token = access_token()
+    claims = verifier.claims(token)
+    assert verifier.claims(token) is claims
+
+    monkeypatch.setattr(jwt_auth.time, "time", lambda: claims["exp"] + 1)
+    with pytest.raises(InvalidToken):
+        verifier.claims(token)
+
+
+def test_interceptor_rejects_before_handler(grpc_context):
+    calls = []
+    handler = intercept(make_verifier("orm"), "ListPlaylists", lambda request, context: calls.append(request))
+
+    expired = access_token(lifetime=timedelta(seconds=-1))
+    with pytest.raises(Exception):
+        handler(daztl_service_pb2.PlaylistListRequest(token=expired), grpc_context)
+
+    assert grpc_context.code == grpc.StatusCode.UNAUTHENTICATED
+    assert calls == []
+
+
+def test_interceptor_passes_verified_claims(grpc_context):
+    token = access_token(user_id=3)
+    handler = intercept(make_verifier("orm"), "ListPlaylists",
+                        lambda request, context: verified_claims(request.token)["user_id"])
+
+    assert handler(daztl_service_pb2.PlaylistListRequest(token=token), grpc_context) == 3
+    assert verified_claims(token) is None
+
+
+def test_interceptor_reads_authorization_metadata(grpc_context):
+    handler = intercept(make_verifier("orm"), "GetProfile", lambda request, context: "ok")
+
+    context = type(grpc_context)({"authorization": f"Bearer {access_token()}"})
+    assert handler(daztl_service_pb2.Empty(), context) == "ok"
+
+    with pytest.raises(Exception):
+        handler(daztl_service_pb2.Empty(), grpc_context)
+    assert grpc_context.code == grpc.StatusCode.UNAUTHENTICATED
+
+
+def test_public_methods_are_not_wrapped():
+    behavior = lambda request, context: "ok"  # noqa: E731
+    handler = intercept(make_verifier("orm"), "ListSongs", behavior)
+    assert handler is behavior
+
+
+def test_async_upload_token_is_checked_on_the_first_message(grpc_context):
+    async def behavior(request_iterator, context):
+        return [chunk.WhichOneof("payload") async for chunk in request_iterator], verified_claims(token)["user_id"]
+
+    async def stream(first):
+        yield first
+        yield daztl_service_pb2.UploadCoverChunk(data=b"png")
+
+    async def call(first, context):
+        handler = await AsyncJWTInterceptor(make_verifier("orm")).intercept_service(
+            lambda details: asyncio.sleep(0, grpc.stream_unary_rpc_method_handler(behavior)),
+            CallDetails("/daztl.MusicService/UploadCover", ()),
+        )
+        return await handler.stream_unary(stream(first), context)
+
+    token = access_token(user_id=5)
+    metadata = daztl_service_pb2.UploadCoverChunk(metadata=daztl_service_pb2.UploadCoverMetadata(token=token))
+    assert asyncio.run(call(metadata, grpc_context)) == (["metadata", "data"], 5)
+
+    # Bytes antes de la metadata: no hay token que verificar
+    with pytest.raises(Exception):
+        asyncio.run(call(daztl_service_pb2.UploadCoverChunk(data=b"png"), grpc_context))
+    assert grpc_context.code == grpc.StatusCode.UNAUTHENTICATED
@@ -0,0 +1,210 @@
+import grpc
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework_simplejwt.tokens import AccessToken
+
+from django.db import DEFAULT_DB_ALIAS
+
+from api import plays
+from api.models import User, ArtistProfile, Song, Playlist, Like, LiveChat
+from api.tests.test_db_router import REPLICA, replica, seed, set_version  # noqa: F401
+from daztl import db_router
+from backends import get_backend
+from server import MusicServiceServicer
+import proto.daztl_service_pb2 as daztl_service_pb2
+
+
+@pytest.mark.django_db
+class TestOrmBackend:
+    def setup_method(self):
+        self.servicer = MusicServiceServicer(get_backend("orm"))
+
+        self.user = User.objects.create_user(
+            username="listener",
+            email="listener@example.com",
+            password="password123",
+            role="listener"
+        )
+        self.token = str(AccessToken.for_user(self.user))
+
+        artist_user = User.objects.create_user(
+            username="ormartist",
+            email="ormartist@example.com",
+            password="password123",
+            role="artist"
+        )
+        self.artist = ArtistProfile.objects.create(user=artist_user, bio="bio")
+        self.song = Song.objects.create(
+            title="Orm Song",
+            artist=self.artist,
+            audio_file=SimpleUploadedFile("orm.mp3", b"file_content", content_type="audio/mpeg")
+        )
+
+    def test_list_songs(self, grpc_context):
+        response = self.servicer.ListSongs(daztl_service_pb2.PageRequest(), grpc_context)
+
+        assert grpc_context.code is None
+        assert [s.title for s in response.songs] == ["Orm Song"]
+        assert response.songs[0].artist == "ormartist"
+        assert response.songs[0].audio_url.startswith("http://")
+
+    def test_list_songs_pages_with_token(self, grpc_context):
+        for i in range(4):
+            Song.objects.create(
+                title=f"Paged Song {i}",
+                artist=self.artist,
+                audio_file=SimpleUploadedFile(f"paged{i}.mp3", b"file_content", content_type="audio/mpeg")
+            )
+
+        titles, token = [], ""
+        while True:
+            response = self.servicer.ListSongs(
+                daztl_service_pb2.PageRequest(page_size=2, page_token=token), grpc_context
+            )
+            assert len(response.songs) <= 2
+            titles += [s.title for s in response.songs]
+            token = response.next_page_token
+            if not token:
+                break
+
+        assert titles == ["Orm Song"] + [f"Paged Song {i}" for i in range(4)]
+
+    def test_get_song_not_found(self, grpc_context):
+        self.servicer.GetSong(daztl_service_pb2.SongIdRequest(id=9999), grpc_context)
+        assert grpc_context.code == grpc.StatusCode.NOT_FOUND
+
+    def test_list_playlists_requires_valid_token(self, grpc_context):
+        Playlist.objects.create(user=self.user, name="Mine")
+
+        response = self.servicer.ListPlaylists(daztl_service_pb2.PlaylistListRequest(token=self.token), grpc_context)
+        assert [p.name for p in response.playlists] == ["Mine"]
+
+        bad_context = type(grpc_context)()
+        self.servicer.ListPlaylists(daztl_service_pb2.PlaylistListRequest(token="bad"), bad_context)
+        assert bad_context.code == grpc.StatusCode.UNAUTHENTICATED
+
+    def test_like_artist_toggles(self, grpc_context):
+        request = daztl_service_pb2.ArtistIdRequest(artist_id=self.artist.id, token=self.token)
+
+        self.servicer.LikeArtist(request, grpc_context)
+        assert Like.objects.filter(user=self.user, artist=self.artist).exists()
+
+        self.servicer.LikeArtist(request, grpc_context)
+        assert not Like.objects.filter(user=self.user, artist=self.artist).exists()
+
+    def test_suggest(self, grpc_context, monkeypatch):
+        from api import autocomplete
+        monkeypatch.setattr(autocomplete, "engine", autocomplete.Autocomplete())
+
+        response = self.servicer.Suggest(daztl_service_pb2.SuggestRequest(query="orm so", kinds=["song"]), grpc_context)
+
+        assert grpc_context.code is None
+        assert [(s.kind, s.id, s.text) for s in response.suggestions] == [("song", self.song.id, "Orm Song")]
+
+    def test_catalog_reads_are_cached(self, grpc_context):
+        from api.tests.utils import assert_max_queries
+
+        self.servicer.GetSong(daztl_service_pb2.SongIdRequest(id=self.song.id), grpc_context)
+        self.servicer.ListSongs(daztl_service_pb2.PageRequest(), grpc_context)
+        with assert_max_queries(1):
+            # Solo la relectura de la version del catalogo, si ya vencio
+            response = self.servicer.GetSong(daztl_service_pb2.SongIdRequest(id=self.song.id), grpc_context)
+            self.servicer.ListSongs(daztl_service_pb2.PageRequest(), grpc_context)
+        assert response.title == "Orm Song"
+
+        self.song.title = "Renamed"
+        self.song.save()
+        response = self.servicer.ListSongs(daztl_service_pb2.PageRequest(), grpc_context)
+        assert [s.title for s in response.songs] == ["Renamed"]
+
+    def test_list_songs_not_modified(self, grpc_context):
+        self.servicer.ListSongs(daztl_service_pb2.PageRequest(), grpc_context)
+        etag = dict(grpc_context.trailing_metadata)["etag"]
+
+        context = type(grpc_context)({"if-none-match": etag})
+        response = self.servicer.ListSongs(daztl_service_pb2.PageRequest(), context)
+        assert not response.songs
+        assert dict(context.trailing_metadata) == {"etag": etag, "not-modified": "1"}
+
+        self.song.title = "Renamed"
+        self.song.save()
+        context = type(grpc_context)({"if-none-match": etag})
+        response = self.servicer.ListSongs(daztl_service_pb2.PageRequest(), context)
+        assert [s.title for s in response.songs] == ["Renamed"]
+        assert "not-modified" not in dict(context.trailing_metadata)
+
+    def test_verified_token_skips_validation(self, grpc_context, monkeypatch):
+        from backends.base import verified_token
+        from jwt_auth import make_verifier
+
+        Playlist.objects.create(user=self.user, name="Mine")
+        backend = self.servicer.backend
+        monkeypatch.setattr(backend._jwt, "get_validated_token", lambda token: pytest.fail("revalidated"))
+        reset = verified_token.set((self.token, make_verifier("orm").claims(self.token)))
+        try:
+            response = self.servicer.ListPlaylists(daztl_service_pb2.PlaylistListRequest(token=self.token), grpc_context)
+        finally:
+            verified_token.reset(reset)
+        assert [p.name for p in response.playlists] == ["Mine"]
+
+    def test_list_chat_messages_since_id(self, grpc_context):
+        chats = [LiveChat.objects.create(song=self.song, user=self.user, message=f"m{i}") for i in range(4)]
+        grpc_context.metadata = [("authorization", f"Bearer {self.token}")]
+
+        response = self.servicer.ListChatMessages(
+            daztl_service_pb2.ChatMessageRequest(song_id=self.song.id, since_id=chats[1].id), grpc_context
+        )
+        assert [(m.id, m.message) for m in response.messages] == [(chats[2].id, "m2"), (chats[3].id, "m3")]
+
+        response = self.servicer.ListChatMessages(
+            daztl_service_pb2.ChatMessageRequest(song_id=self.song.id, before_id=chats[3].id, limit=2), grpc_context
+        )
+        assert [m.message for m in response.messages] == ["m1", "m2"]
+
+    def test_record_play_is_counted_on_flush(self, grpc_context):
+        recorder = plays.PlayRecorder(buffer=plays.MEMORY, interval=3600)
+        plays.reset(recorder)
+        try:
+            for _ in range(2):
+                response = self.servicer.RecordPlay(
+                    daztl_service_pb2.RecordPlayRequest(song_id=self.song.id, token=self.token), grpc_context
+                )
+                assert response.status == "success"
+            response = self.servicer.RecordPlay(daztl_service_pb2.RecordPlayRequest(song_id=self.song.id), grpc_context)
+            assert response.status == "error"
+
+            self.song.refresh_from_db()
+            assert self.song.play_count == 0
+            assert recorder.flush() == 2
+        finally:
+            plays.reset()
+        self.song.refresh_from_db()
+        assert self.song.play_count == 2
+
+
+@pytest.mark.django_db
+class TestOrmReplicaReads:
+    @pytest.fixture(autouse=True)
+    def seeded(self, replica):
+        seed(DEFAULT_DB_ALIAS, "Primary Song")
+        seed(REPLICA, "Replica Song")
+        set_version(DEFAULT_DB_ALIAS, 3)
+        set_version(REPLICA, 3)
+
+    def titles(self, token):
+        response = self.backend.list_songs(token=token)
+        assert response.status_code == 200
+        return [song["title"] for song in response.json()]
+
+    def test_writer_reads_from_primary_afterwards(self):
+        self.backend = get_backend("orm")
+        writer = User.objects.create_user(username="rpcwriter", password="password123")
+        reader = User.objects.create_user(username="rpcreader", password="password123")
+        writer_token, reader_token = str(AccessToken.for_user(writer)), str(AccessToken.for_user(reader))
+        assert self.titles(writer_token) == ["Replica Song"]
+
+        assert self.backend.like_artist(writer_token, 100).status_code == 201
+        assert db_router.is_sticky(writer.pk)
+        assert self.titles(writer_token) == ["Primary Song"]
+        assert self.titles(reader_token) == ["Replica Song"]
+        assert self.titles(None) == ["Replica Song"]
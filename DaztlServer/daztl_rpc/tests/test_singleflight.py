@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backends import BackendResponse, BackendTimeout
+from singleflight import AsyncSingleFlight, SingleFlight
+
+
+class FakeHttpResponse:
+    status_code = 200
+    text = '{"id": 1}'
+    headers = {"ETag": '"1"'}
+
+    def __init__(self):
+        self.decoded = 0
+
+    def json(self):
+        self.decoded += 1
+        return {"id": 1}
+
+
+def run_concurrently(flights, fn, callers=20, **params):
+    release = threading.Event()
+    calls = []
+
+    def backend_call():
+        calls.append(1)
+        release.wait(5)
+        return fn()
+
+    with ThreadPoolExecutor(callers) as pool:
+        futures = [pool.submit(flights.do, "GetSong", params, backend_call) for _ in range(callers)]
+        # Todas las llamadas quedan esperando a la primera
+        while sum(flights.calls.values()) < callers:
+            time.sleep(0.01)
+        release.set()
+        return calls, futures
+
+
+def test_concurrent_calls_share_decoded_result():
+    flights = SingleFlight()
+    response = FakeHttpResponse()
+
+    calls, futures = run_concurrently(flights, lambda: response, song_id=1)
+    results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert response.decoded == 1
+    assert all(result is results[0] for result in results)
+    assert results[0].json() == {"id": 1}
+    assert results[0].headers["ETag"] == '"1"'
+    assert flights.stats() == {"GetSong": {"calls": 20, "collapsed": 19, "collapse_rate": 0.95}}
+
+
+def test_error_is_raised_in_every_caller():
+    flights = SingleFlight()
+
+    def fail():
+        raise BackendTimeout("slow")
+
+    calls, futures = run_concurrently(flights, fail, callers=5, song_id=1)
+
+    assert len(calls) == 1
+    for future in futures:
+        with pytest.raises(BackendTimeout):
+            future.result()
+
+
+def test_finished_call_is_not_reused():
+    flights = SingleFlight()
+    results = iter([BackendResponse(200, "first"), BackendResponse(200, "second")])
+
+    assert flights.do("GetSong", {"song_id": 1}, lambda: next(results)).json() == "first"
+    assert flights.do("GetSong", {"song_id": 1}, lambda: next(results)).json() == "second"
+    assert flights.stats()["GetSong"]["collapsed"] == 0
+
+
+def test_async_leader_cancellation_does_not_cancel_followers():
+    flights = AsyncSingleFlight()
+
+    async def backend_call():
+        await asyncio.sleep(0.05)
+        return BackendResponse(200, "song")
+
+    async def scenario():
+        leader = asyncio.ensure_future(flights.do("GetSong", {"song_id": 1}, backend_call))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.do("GetSong", {"song_id": 1}, backend_call))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(scenario()).json() == "song"
+    assert flights.stats()["GetSong"]["collapsed"] == 1
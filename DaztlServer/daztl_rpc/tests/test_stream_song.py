@@ -0,0 +1,102 @@
+import asyncio
+import threading
+
+import grpc
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from api.models import User, ArtistProfile, Song
+from backends import get_backend
+from server import MusicServiceServicer
+import media
+import proto.daztl_service_pb2 as daztl_service_pb2
+
+AUDIO = bytes(range(256)) * 40  # 10240 bytes
+
+
+@pytest.mark.django_db
+class TestStreamSong:
+    @pytest.fixture(autouse=True)
+    def media_root(self, tmp_path, settings, monkeypatch):
+        settings.MEDIA_ROOT = str(tmp_path)
+        monkeypatch.setattr(media, "MEDIA_ROOT", str(tmp_path))
+
+    def setup_method(self):
+        self.servicer = MusicServiceServicer(get_backend("orm"))
+
+    def create_song(self, content=AUDIO):
+        artist_user = User.objects.create_user(
+            username="streamer",
+            email="streamer@example.com",
+            password="password123",
+            role="artist"
+        )
+        artist = ArtistProfile.objects.create(user=artist_user, bio="bio")
+        return Song.objects.create(
+            title="Stream Song",
+            artist=artist,
+            audio_file=SimpleUploadedFile("stream.mp3", content, content_type="audio/mpeg")
+        )
+
+    def test_streams_whole_file_in_chunks(self, grpc_context):
+        song = self.create_song()
+        request = daztl_service_pb2.StreamSongRequest(song_id=song.id, chunk_size=4096)
+
+        chunks = list(self.servicer.StreamSong(request, grpc_context))
+
+        assert [c.offset for c in chunks] == [0, 4096, 8192]
+        assert b"".join(c.data for c in chunks) == AUDIO
+        assert all(c.total_size == len(AUDIO) for c in chunks)
+        assert chunks[0].content_type == "audio/mpeg"
+
+    def test_offset_seeks_into_file(self, grpc_context):
+        song = self.create_song()
+        request = daztl_service_pb2.StreamSongRequest(song_id=song.id, offset=10000)
+
+        chunks = list(self.servicer.StreamSong(request, grpc_context))
+
+        assert len(chunks) == 1
+        assert chunks[0].offset == 10000
+        assert chunks[0].data == AUDIO[10000:]
+
+    def test_offset_past_end_is_out_of_range(self, grpc_context):
+        song = self.create_song()
+        request = daztl_service_pb2.StreamSongRequest(song_id=song.id, offset=len(AUDIO) + 1)
+
+        with pytest.raises(Exception):
+            list(self.servicer.StreamSong(request, grpc_context))
+        assert grpc_context.code == grpc.StatusCode.OUT_OF_RANGE
+
+    def test_unknown_song_is_not_found(self, grpc_context):
+        with pytest.raises(Exception):
+            list(self.servicer.StreamSong(daztl_service_pb2.StreamSongRequest(song_id=9999), grpc_context))
+        assert grpc_context.code == grpc.StatusCode.NOT_FOUND
+
+
+def test_resolve_media_path_stays_inside_media_root(tmp_path):
+    root = str(tmp_path)
+    assert media.resolve_media_path("http://localhost:8000/media/songs/a%20b.mp3", root) == \
+        str(tmp_path / "songs" / "a b.mp3")
+    assert media.resolve_media_path("/media/../settings.py", root) is None
+    assert media.resolve_media_path("http://localhost:8000/static/x.mp3", root) is None
+    assert media.resolve_media_path("", root) is None
+
+
+def test_async_chunks_are_read_off_the_event_loop(tmp_path, monkeypatch):
+    path = tmp_path / "track.mp3"
+    path.write_bytes(AUDIO)
+    readers = []
+    iter_file_chunks = media.iter_file_chunks
+
+    def recording(*args):
+        for chunk in iter_file_chunks(*args):
+            readers.append(threading.get_ident())
+            yield chunk
+    monkeypatch.setattr(media, "iter_file_chunks", recording)
+
+    async def stream():
+        return [chunk async for chunk in media.iter_file_chunks_async(str(path), 1000, 4096)], threading.get_ident()
+
+    chunks, loop_thread = asyncio.run(stream())
+    assert chunks == list(iter_file_chunks(str(path), 1000, 4096))
+    assert len(readers) == 3 and loop_thread not in readers
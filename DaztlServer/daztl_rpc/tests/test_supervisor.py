@@ -0,0 +1,61 @@
+import supervisor
+from supervisor import Supervisor
+
+
+class FakeProcess:
+    def __init__(self, pid, alive=True, exitcode=None):
+        self.pid = pid
+        self.alive = alive
+        self.exitcode = exitcode
+
+    def is_alive(self):
+        return self.alive
+
+
+def make_supervisor(monkeypatch):
+    sup = Supervisor(processes=2)
+    started = []
+
+    def start_worker(slot):
+        started.append(slot)
+        sup.workers[slot] = (FakeProcess(100 + len(started)), supervisor.time.monotonic())
+
+    monkeypatch.setattr(sup, "start_worker", start_worker)
+    return sup, started
+
+
+def test_crashed_worker_is_restarted(monkeypatch):
+    sup, started = make_supervisor(monkeypatch)
+    long_ago = supervisor.time.monotonic() - 60
+    sup.workers = {
+        0: (FakeProcess(1, alive=False, exitcode=-9), long_ago),
+        1: (FakeProcess(2), long_ago),
+    }
+
+    sup.check_workers()
+
+    assert started == [0]
+    assert sup.workers[0][0].pid != 1
+
+
+def test_no_restart_while_stopping(monkeypatch):
+    sup, started = make_supervisor(monkeypatch)
+    sup.workers = {0: (FakeProcess(1, alive=False, exitcode=0), supervisor.time.monotonic())}
+    sup.stopping.set()
+
+    sup.check_workers()
+
+    assert started == []
+
+
+def test_crash_loop_backs_off(monkeypatch):
+    sup, started = make_supervisor(monkeypatch)
+    delays = []
+    monkeypatch.setattr(sup.stopping, "wait", lambda delay: delays.append(delay) or False)
+
+    for _ in range(3):
+        sup.workers = {0: (FakeProcess(1, alive=False, exitcode=1), supervisor.time.monotonic())}
+        sup.check_workers()
+
+    assert delays == [1.0, 2.0, 4.0]
+    assert started == [0, 0, 0]
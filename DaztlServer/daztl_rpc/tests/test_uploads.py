@@ -0,0 +1,190 @@
+import collections
+import hashlib
+import io
+import os
+
+import grpc
+import pytest
+from PIL import Image
+from rest_framework_simplejwt.tokens import AccessToken
+from urllib3 import encode_multipart_formdata
+
+from api.models import User, ArtistProfile, Song
+from backends import get_backend
+from backends.multipart import MultipartStream
+from jwt_auth import JWTInterceptor, make_verifier
+from server import MusicServiceServicer
+import uploads
+import proto.daztl_service_pb2 as daztl_service_pb2
+
+AUDIO = os.urandom(300 * 1024)
+CallDetails = collections.namedtuple("CallDetails", ["method", "invocation_metadata"])
+
+
+def png_bytes():
+    buf = io.BytesIO()
+    Image.new("RGB", (8, 8), "red").save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def file_info(filename, data, **overrides):
+    info = {"filename": filename, "size": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+    info.update(overrides)
+    return daztl_service_pb2.UploadFileInfo(**info)
+
+
+def song_stream(token, audio=AUDIO, cover=None, chunk_size=64 * 1024, **audio_overrides):
+    cover = cover or png_bytes()
+    yield daztl_service_pb2.UploadSongChunk(metadata=daztl_service_pb2.UploadSongMetadata(
+        token=token,
+        title="Streamed Song",
+        audio=file_info("track.flac", audio, **audio_overrides),
+        cover=file_info("cover.png", cover),
+    ))
+    for start in range(0, len(audio), chunk_size):
+        yield daztl_service_pb2.UploadSongChunk(audio_data=audio[start:start + chunk_size])
+    yield daztl_service_pb2.UploadSongChunk(cover_data=cover)
+
+
+@pytest.fixture
+def upload_tmp_dir(tmp_path, monkeypatch):
+    staging = tmp_path / "staging"
+    staging.mkdir()
+    monkeypatch.setattr(uploads, "UPLOAD_TMP_DIR", str(staging))
+    return staging
+
+
+class TestReceive:
+    def test_verified_upload_is_staged_on_disk(self, upload_tmp_dir):
+        upload = uploads.receive(uploads.song_upload(), song_stream("token"))
+        with upload:
+            with open(upload.files["audio_data"].path, "rb") as f:
+                assert f.read() == AUDIO
+            assert upload.files["audio_data"].content_type == "audio/flac"
+        assert os.listdir(upload_tmp_dir) == []
+
+    def test_checksum_mismatch_is_rejected(self, upload_tmp_dir):
+        with pytest.raises(uploads.UploadError, match="sha256"):
+            uploads.receive(uploads.song_upload(), song_stream("token", sha256="0" * 64))
+        assert os.listdir(upload_tmp_dir) == []
+
+    def test_more_bytes_than_declared_is_rejected(self, upload_tmp_dir):
+        with pytest.raises(uploads.UploadError, match="declarados"):
+            uploads.receive(uploads.song_upload(), song_stream("token", size=1024))
+        assert os.listdir(upload_tmp_dir) == []
+
+    def test_metadata_must_come_first(self, upload_tmp_dir):
+        chunks = [daztl_service_pb2.UploadSongChunk(audio_data=b"abc")]
+        with pytest.raises(uploads.UploadError, match="metadata"):
+            uploads.receive(uploads.song_upload(), iter(chunks))
+
+    def test_size_limit(self, upload_tmp_dir, monkeypatch):
+        monkeypatch.setattr(uploads, "MAX_AUDIO_SIZE", 1024)
+        with pytest.raises(uploads.UploadError, match="maximo"):
+            uploads.receive(uploads.song_upload(), song_stream("token"))
+        assert os.listdir(upload_tmp_dir) == []
+
+
+def test_multipart_stream_matches_urllib3_encoding(tmp_path):
+    path = tmp_path / "track.mp3"
+    path.write_bytes(AUDIO)
+
+    class Staged:
+        filename = "track.mp3"
+        content_type = "audio/mpeg"
+        size = len(AUDIO)
+
+    Staged.path = str(path)
+    stream = MultipartStream({"title": "Song"}, {"audio_file": Staged()}, boundary="b0undary")
+    body = b""
+    while True:
+        block = stream.read(8192)
+        if not block:
+            break
+        assert len(block) <= 8192
+        body += block
+
+    expected, content_type = encode_multipart_formdata(
+        [("title", "Song"), ("audio_file", ("track.mp3", AUDIO, "audio/mpeg"))], boundary="b0undary"
+    )
+    assert body == expected
+    assert len(stream) == len(expected)
+    assert stream.content_type == content_type
+
+
+@pytest.mark.django_db
+class TestOrmUploads:
+    @pytest.fixture(autouse=True)
+    def media_root(self, tmp_path, settings, upload_tmp_dir):
+        settings.MEDIA_ROOT = str(tmp_path / "media")
+        self.media_root = tmp_path / "media"
+        self.staging = upload_tmp_dir
+
+    def setup_method(self):
+        self.servicer = MusicServiceServicer(get_backend("orm"))
+        artist_user = User.objects.create_user(
+            username="uploader",
+            email="uploader@example.com",
+            password="password123",
+            role="artist"
+        )
+        ArtistProfile.objects.create(user=artist_user, bio="bio")
+        self.token = str(AccessToken.for_user(artist_user))
+
+    def test_upload_song_saves_to_media_root(self, grpc_context):
+        response = self.servicer.UploadSong(song_stream(self.token), grpc_context)
+
+        assert response.status == "success"
+        song = Song.objects.get(title="Streamed Song")
+        with open(song.audio_file.path, "rb") as f:
+            assert f.read() == AUDIO
+        assert song.audio_file.path.startswith(str(self.media_root))
+        assert os.listdir(self.staging) == []
+
+    def test_upload_song_requires_artist(self, grpc_context):
+        listener = User.objects.create_user(
+            username="listener2",
+            email="listener2@example.com",
+            password="password123",
+            role="listener"
+        )
+        response = self.servicer.UploadSong(song_stream(str(AccessToken.for_user(listener))), grpc_context)
+
+        assert response.status == "error"
+        assert not Song.objects.exists()
+        assert os.listdir(self.staging) == []
+
+    def test_bad_checksum_is_invalid_argument(self, grpc_context):
+        response = self.servicer.UploadSong(song_stream(self.token, sha256="f" * 64), grpc_context)
+
+        assert response.status == "error"
+        assert grpc_context.code == grpc.StatusCode.INVALID_ARGUMENT
+        assert not Song.objects.exists()
+
+    def intercepted(self, method):
+        handler = JWTInterceptor(make_verifier("orm")).intercept_service(
+            lambda details: grpc.stream_unary_rpc_method_handler(getattr(self.servicer, method)),
+            CallDetails(f"/daztl.MusicService/{method}", ()),
+        )
+        return handler.stream_unary
+
+    def test_invalid_token_is_rejected_before_reading_the_file(self, grpc_context):
+        read = []
+
+        def stream():
+            for chunk in song_stream("not-a-token"):
+                read.append(chunk.WhichOneof("payload"))
+                yield chunk
+
+        with pytest.raises(Exception):
+            self.intercepted("UploadSong")(stream(), grpc_context)
+
+        assert grpc_context.code == grpc.StatusCode.UNAUTHENTICATED
+        assert read == ["metadata"]
+        assert os.listdir(self.staging) == []
+
+    def test_verified_upload_reaches_the_handler(self, grpc_context):
+        response = self.intercepted("UploadSong")(song_stream(self.token), grpc_context)
+
+        assert response.status == "success"
+        assert Song.objects.filter(title="Streamed Song").exists()
@@ -0,0 +1,136 @@
+# Recepcion de los uploads cliente-streaming (UploadSong / UploadCover). Cada
+# chunk se escribe a un archivo temporal mientras se calcula el sha256, asi que
+# la memoria usada no depende del tamano del archivo. El backend recibe el
+# archivo ya verificado en disco y lo reenvia por partes (http) o lo mueve a
+# MEDIA_ROOT (orm).
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+
+# Mismo filesystem que MEDIA_ROOT para que el modo orm mueva el archivo en vez de copiarlo
+UPLOAD_TMP_DIR = os.getenv("UPLOAD_TMP_DIR") or None
+MAX_AUDIO_SIZE = int(os.getenv("MAX_AUDIO_UPLOAD_SIZE", str(500 * 1024 * 1024)))
+MAX_IMAGE_SIZE = int(os.getenv("MAX_IMAGE_UPLOAD_SIZE", str(20 * 1024 * 1024)))
+
+SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class UploadError(Exception):
+    pass
+
+
+class StagedFile:
+    def __init__(self, info, max_size):
+        self.filename = os.path.basename(info.filename or "")
+        if not self.filename:
+            raise UploadError("Falta el nombre del archivo")
+        if info.size <= 0:
+            raise UploadError(f"{self.filename}: tamaño declarado invalido")
+        if info.size > max_size:
+            raise UploadError(f"{self.filename}: excede el tamaño maximo de {max_size} bytes")
+        self.expected_sha256 = info.sha256.lower()
+        if not SHA256_RE.match(self.expected_sha256):
+            raise UploadError(f"{self.filename}: sha256 invalido")
+        self.expected_size = info.size
+        self.content_type = mimetypes.guess_type(self.filename)[0] or "application/octet-stream"
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._file = tempfile.NamedTemporaryFile(prefix="daztl-upload-", dir=UPLOAD_TMP_DIR, delete=False)
+        self.path = self._file.name
+
+    def write(self, data):
+        if self.size + len(data) > self.expected_size:
+            raise UploadError(f"{self.filename}: se recibieron mas bytes de los declarados")
+        self._file.write(data)
+        self._sha256.update(data)
+        self.size += len(data)
+
+    def finish(self):
+        self._file.close()
+        if self.size != self.expected_size:
+            raise UploadError(f"{self.filename}: se recibieron {self.size} de {self.expected_size} bytes")
+        if self._sha256.hexdigest() != self.expected_sha256:
+            raise UploadError(f"{self.filename}: el checksum sha256 no coincide")
+
+    def discard(self):
+        self._file.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            # El backend orm ya lo movio a MEDIA_ROOT
+            pass
+
+
+class Upload:
+    # El primer mensaje del stream trae la metadata; los demas traen bytes en el
+    # campo del oneof que corresponde a cada archivo
+    def __init__(self, file_specs):
+        # file_specs(metadata) -> {campo del oneof: (UploadFileInfo, tamano maximo)}
+        self._file_specs = file_specs
+        self.metadata = None
+        self.files = {}
+
+    def feed(self, chunk):
+        kind = chunk.WhichOneof("payload")
+        if kind == "metadata":
+            if self.metadata is not None:
+                raise UploadError("Metadata duplicada en el stream")
+            self.metadata = chunk.metadata
+            for field, (info, max_size) in self._file_specs(chunk.metadata).items():
+                self.files[field] = StagedFile(info, max_size)
+        elif kind is None:
+            raise UploadError("Mensaje vacio en el stream")
+        elif self.metadata is None:
+            raise UploadError("El primer mensaje del stream debe ser la metadata")
+        else:
+            self.files[kind].write(getattr(chunk, kind))
+
+    def finish(self):
+        if self.metadata is None:
+            raise UploadError("El stream no contiene metadata")
+        for staged in self.files.values():
+            staged.finish()
+        return self
+
+    def discard(self):
+        for staged in self.files.values():
+            staged.discard()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.discard()
+
+
+def song_upload():
+    return Upload(lambda meta: {
+        "audio_data": (meta.audio, MAX_AUDIO_SIZE),
+        "cover_data": (meta.cover, MAX_IMAGE_SIZE),
+    })
+
+
+def cover_upload():
+    return Upload(lambda meta: {"data": (meta.cover, MAX_IMAGE_SIZE)})
+
+
+def receive(upload, request_iterator):
+    try:
+        for chunk in request_iterator:
+            upload.feed(chunk)
+        return upload.finish()
+    except BaseException:
+        upload.discard()
+        raise
+
+
+async def receive_async(upload, request_iterator):
+    try:
+        async for chunk in request_iterator:
+            upload.feed(chunk)
+        return upload.finish()
+    except BaseException:
+        upload.discard()
+        raise